@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 
 from infrastructure.database.repositories import UserRepository, APIKeyRepository
 from infrastructure.database.models.user import User, APIKey
+from infrastructure.cache.principal_cache import invalidate_principal
 
 
 class UserService:
@@ -51,7 +52,9 @@ class UserService:
             k: v for k, v in update_data.items() if k not in sensitive_fields
         }
 
-        return await self.user_repository.update(user_id, update_data)
+        user = await self.user_repository.update(user_id, update_data)
+        await invalidate_principal(user_id)
+        return user
 
     async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
@@ -183,13 +186,17 @@ class UserService:
         if reason:
             update_data["deactivation_reason"] = reason
 
-        return await self.user_repository.update(user_id, update_data) is not None
+        updated = await self.user_repository.update(user_id, update_data) is not None
+        await invalidate_principal(user_id)
+        return updated
 
     async def reactivate_user(self, user_id: UUID) -> bool:
         """Reactivate user account"""
-        return (
+        updated = (
             await self.user_repository.update(
                 user_id, {"is_active": True, "deactivation_reason": None}
             )
             is not None
         )
+        await invalidate_principal(user_id)
+        return updated
@@ -21,7 +21,9 @@ from infrastructure.exchanges.bingx_connector import BingXConnector
 from infrastructure.exchanges.bitget_connector import BitgetConnector
 from infrastructure.pricing.binance_price_service import BinancePriceService
 from infrastructure.services.bot_sltp_monitor_service import get_bot_sltp_monitor
+from infrastructure.services.candle_close_scheduler import CandleCloseScheduler
 from infrastructure.services.indicator_alert_monitor import get_indicator_alert_monitor
+from infrastructure.services.order_history_sync_service import get_order_history_sync_service
 from infrastructure.ai.data_collector import TradingDataCollector
 from infrastructure.news.news_collector import NewsCollector
 
@@ -31,6 +33,7 @@ logger = structlog.get_logger(__name__)
 # BingX has more restrictive rate limits, so we sync it less frequently
 BINGX_SYNC_INTERVAL = 60  # 60 seconds for BingX
 DEFAULT_SYNC_INTERVAL = 30  # 30 seconds for other exchanges
+ORDER_HISTORY_SYNC_INTERVAL = "2m"  # 📥 Incremental order history sync every 2 minutes
 
 
 class SyncScheduler:
@@ -40,6 +43,22 @@ class SyncScheduler:
     # 11:00 UTC = 08:00 Brasília (horário de verão) / 09:00 Brasília (horário normal)
     DAILY_REPORT_HOUR_UTC = 11  # 8h Brasília
 
+    # ⏱️ Jobs (nome, intervalo), disparados na fronteira do intervalo (UTC) pelo
+    # CandleCloseScheduler - sem sleep(30) + contadores de loops
+    SYNC_JOBS = [
+        ("accounts", f"{DEFAULT_SYNC_INTERVAL}s"),
+        ("bot_sltp_orders", f"{DEFAULT_SYNC_INTERVAL}s"),
+        ("bot_position_counters", "2m"),
+        # Idempotentes pela data: re-tentados a cada minuto até rodarem no dia
+        # (uma falha à meia-noite não pode deixar o reset para o dia seguinte)
+        ("daily_reset", "1m"),
+        ("daily_report", "1m"),
+        ("bingx_position_modes", "5m"),
+        ("order_history", ORDER_HISTORY_SYNC_INTERVAL),
+    ]
+    # Rodam uma vez ao iniciar (antes da primeira fronteira)
+    STARTUP_JOBS = ["accounts", "bot_sltp_orders", "daily_reset", "daily_report"]
+
     def __init__(self):
         self.is_running = False
         self._task = None
@@ -51,8 +70,19 @@ class SyncScheduler:
         self._indicator_alert_monitor = None
         # 📊 Track when daily report was last sent
         self._last_daily_report_date: str = None
-        # 🔄 Counter for position mode sync (every 10 loops = ~5 minutes)
-        self._position_mode_sync_counter: int = 0
+        # ⏱️ Dispara os jobs periódicos nas fronteiras dos intervalos
+        self._jobs_scheduler = CandleCloseScheduler(
+            self._run_due_jobs, grace_seconds=0, intrabar=False, name="SyncScheduler"
+        )
+        self._jobs = {
+            "accounts": self._sync_all_accounts,
+            "bot_sltp_orders": self._monitor_bot_sltp_orders,
+            "bot_position_counters": self._sync_bot_position_counters,
+            "daily_reset": self._check_daily_reset,
+            "daily_report": self._check_daily_report,
+            "bingx_position_modes": self._sync_bingx_position_modes,
+            "order_history": self._sync_order_history,
+        }
 
     async def start(self):
         """Inicia o scheduler"""
@@ -80,6 +110,7 @@ class SyncScheduler:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        await self._jobs_scheduler.stop()
 
         # Stop Indicator Alert Monitor
         if self._indicator_alert_monitor:
@@ -91,39 +122,30 @@ class SyncScheduler:
         logger.info("⏹️ Sync scheduler stopped")
 
     async def _sync_loop(self):
-        """Loop principal de sincronização"""
-        sync_counter = 0  # Counter to run some tasks less frequently
-        while self.is_running:
-            try:
-                await self._sync_all_accounts()
-
-                # Monitor SL/TP orders for bot subscriptions
-                await self._monitor_bot_sltp_orders()
-
-                # 🔄 Sync bot position counters every 2 minutes (every 4 loops)
-                sync_counter += 1
-                if sync_counter >= 4:
-                    await self._sync_bot_position_counters()
-                    sync_counter = 0
-
-                # 📅 Check and reset daily loss counters at midnight UTC
-                await self._check_daily_reset()
+        """
+        Loop principal de sincronização: roda os jobs iniciais e entrega os
+        jobs periódicos ao scheduler, que acorda só na próxima fronteira.
+        """
+        for name in self.STARTUP_JOBS:
+            await self._run_job(name)
 
-                # 📊 Check if it's time to send daily AI market report
-                await self._check_daily_report()
+        await self._jobs_scheduler.set_groups(self.SYNC_JOBS)
+        await self._jobs_scheduler.start()
 
-                # 🔄 Sync BingX position modes every 10 loops (~5 minutes)
-                self._position_mode_sync_counter += 1
-                if self._position_mode_sync_counter >= 10:
-                    await self._sync_bingx_position_modes()
-                    self._position_mode_sync_counter = 0
+    async def _run_due_jobs(self, jobs, reason: str):
+        """Callback do scheduler: roda os jobs vencidos na ordem de SYNC_JOBS"""
+        due = set(jobs)
+        for job in self.SYNC_JOBS:
+            if job in due and self.is_running:
+                await self._run_job(job[0])
 
-                await asyncio.sleep(30)  # Aguarda 30 segundos (otimizado para 100-500 clientes)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in sync loop: {e}")
-                await asyncio.sleep(10)  # Aguarda 10 segundos em caso de erro
+    async def _run_job(self, name: str):
+        try:
+            await self._jobs[name]()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in sync job {name}: {e}")
 
     async def _sync_all_accounts(self):
         """Sincroniza todas as contas de exchange ativas"""
@@ -257,6 +279,42 @@ class SyncScheduler:
         except Exception as e:
             logger.error(f"❌ Error syncing positions for account {account_id}: {e}")
 
+    async def _sync_order_history(self):
+        """
+        Sincroniza apenas as ordens novas de cada conta (delta por watermark)
+        para que GET /api/v1/orders seja servido direto do banco.
+        Contas que ainda não tiveram o primeiro sync são ignoradas aqui - o
+        bootstrap acontece no primeiro acesso à página de ordens.
+        """
+        try:
+            order_sync = get_order_history_sync_service(transaction_db)
+
+            accounts = await transaction_db.fetch("""
+                SELECT ea.id, ea.name, ea.exchange, ea.api_key, ea.secret_key, ea.passphrase,
+                       ea.testnet, ea.user_id
+                FROM exchange_accounts ea
+                WHERE ea.is_active = true
+                  AND EXISTS (
+                      SELECT 1 FROM order_sync_watermarks w
+                      WHERE w.exchange_account_id = ea.id
+                  )
+            """)
+
+            total_fetched = 0
+            for account in accounts:
+                try:
+                    connector = await self._get_exchange_connector(account)
+                    result = await order_sync.sync_account(str(account['id']), connector)
+                    total_fetched += result.get('fetched_count', 0)
+                except Exception as e:
+                    logger.error(f"❌ Error syncing order history for account {account['id']}: {e}")
+
+            if total_fetched > 0:
+                logger.info(f"📥 Order history sync: {total_fetched} new/updated orders across {len(accounts)} accounts")
+
+        except Exception as e:
+            logger.error(f"❌ Error in order history sync: {e}")
+
     async def _monitor_bot_sltp_orders(self):
         """
         Monitor SL/TP orders for bot subscriptions.
@@ -384,7 +442,7 @@ class SyncScheduler:
     async def _check_daily_reset(self):
         """
         Check if it's a new day (UTC) and reset daily loss counters.
-        This runs every 30 seconds but only resets once per day.
+        Runs at startup and every minute; only resets once per day (a failed run is retried).
         Also generates daily P&L snapshots for historical tracking.
         """
         try:
@@ -9,9 +9,25 @@ from .positions_cache import (
     get_positions_cache,
     start_cache_cleanup_task
 )
+from .principal_cache import (
+    PrincipalCache,
+    get_principal_cache,
+    invalidate_principal
+)
+from .shared_cache import (
+    SharedCache,
+    SharedCacheBackend,
+    shared_cache_backend
+)
 
 __all__ = [
     "PositionsCache",
     "get_positions_cache",
-    "start_cache_cleanup_task"
+    "start_cache_cleanup_task",
+    "PrincipalCache",
+    "get_principal_cache",
+    "invalidate_principal",
+    "SharedCache",
+    "SharedCacheBackend",
+    "shared_cache_backend"
 ]
@@ -1,40 +1,179 @@
 """
 Candles Cache Module
 High-performance cache for market candles data with intelligent TTL
+
+Cada (symbol, interval, market_type) guarda UMA série contígua em arrays
+colunares (time, open, high, low, close, volume). Qualquer pedido de `limit`
+ou intervalo de tempo é respondido como fatia dessa série, candles novos são
+mesclados incrementalmente e um orçamento de memória em bytes é respeitado
+com eviction LRU. O tamanho é calculado pelos arrays (sem json.dumps).
+
+Com Redis disponível (shared_cache), cada série também é publicada como bytes
+dos arrays (msgpack) para que outros workers a reutilizem, e /cache/invalidate
+é propagado a todos os workers via pub/sub.
 """
 
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import hashlib
-import json
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+import time
+from typing import Dict, List, Optional, Any, Tuple
 import logging
 
+from .shared_cache import MSGPACK_AVAILABLE, SharedCache, SharedCacheBackend
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64MB (~1.4M candles)
+IDLE_SECONDS = 1800  # Séries sem acesso há 30min são liberadas no cleanup
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+BYTES_PER_CANDLE = 8 * (len(COLUMNS) + 1)
+
+# Mapeamento de intervalo para milissegundos
+INTERVAL_MS = {
+    "1m": 60 * 1000,
+    "3m": 3 * 60 * 1000,
+    "5m": 5 * 60 * 1000,
+    "15m": 15 * 60 * 1000,
+    "30m": 30 * 60 * 1000,
+    "1h": 60 * 60 * 1000,
+    "2h": 2 * 60 * 60 * 1000,
+    "4h": 4 * 60 * 60 * 1000,
+    "6h": 6 * 60 * 60 * 1000,
+    "8h": 8 * 60 * 60 * 1000,
+    "12h": 12 * 60 * 60 * 1000,
+    "1d": 24 * 60 * 60 * 1000,
+    "3d": 3 * 24 * 60 * 60 * 1000,
+    "1w": 7 * 24 * 60 * 60 * 1000,
+    "1M": 30 * 24 * 60 * 60 * 1000,
+}
+
+
+def interval_to_ms(interval: str) -> int:
+    """Converte intervalo (1m, 4h, 1d...) para milissegundos"""
+    if interval in INTERVAL_MS:
+        return INTERVAL_MS[interval]
+    unit = interval[-1]
+    multipliers = {"m": 60 * 1000, "h": 60 * 60 * 1000, "d": 24 * 60 * 60 * 1000, "w": 7 * 24 * 60 * 60 * 1000}
+    return int(interval[:-1]) * multipliers.get(unit, 60 * 1000)
+
+
+class CandleSeries:
+    """Série contígua de candles de um mercado, ordenada por time (ms)"""
+
+    __slots__ = ("interval_ms", "market_type", "time", "columns", "refreshed_at", "last_access")
+
+    def __init__(self, interval_ms: int, market_type: str):
+        self.interval_ms = interval_ms
+        self.market_type = market_type
+        self.time = array("q")
+        self.columns = {name: array("d") for name in COLUMNS}
+        self.refreshed_at = 0.0  # Última vez que a cauda (candle em formação) veio da exchange
+        self.last_access = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.time) * BYTES_PER_CANDLE
+
+    def merge(self, candles: List[Dict[str, Any]]) -> bool:
+        """
+        Mescla candles ordenados por time. Sobreposições são substituídas
+        pelos dados novos. Retorna False se o bloco for disjunto da série.
+        """
+        new_time = array("q", (int(c["time"]) for c in candles))
+        new_columns = {name: array("d", (float(c[name]) for c in candles)) for name in COLUMNS}
+
+        if not self.time:
+            self.time = new_time
+            self.columns = new_columns
+            return True
+
+        first, last = new_time[0], new_time[-1]
+        if first > self.time[-1] + self.interval_ms or last + self.interval_ms < self.time[0]:
+            return False
+
+        i = bisect_left(self.time, first)
+        j = bisect_right(self.time, last)
+
+        if j == len(self.time):
+            # Caso comum (cauda nova): altera in-place, sem recopiar o histórico
+            del self.time[i:]
+            self.time.extend(new_time)
+            for name in COLUMNS:
+                del self.columns[name][i:]
+                self.columns[name].extend(new_columns[name])
+        else:
+            self.time = self.time[:i] + new_time + self.time[j:]
+            for name in COLUMNS:
+                column = self.columns[name]
+                self.columns[name] = column[:i] + new_columns[name] + column[j:]
+        return True
+
+    def to_packed(self) -> Dict[str, Any]:
+        """Representação compacta para o L2 (bytes dos arrays, sem converter candle a candle)"""
+        packed = {"i": self.interval_ms, "m": self.market_type, "r": self.refreshed_at, "time": self.time.tobytes()}
+        for name in COLUMNS:
+            packed[name] = self.columns[name].tobytes()
+        return packed
+
+    @classmethod
+    def from_packed(cls, packed: Dict[str, Any]) -> "CandleSeries":
+        series = cls(packed["i"], packed["m"])
+        series.refreshed_at = packed["r"]
+        series.time.frombytes(packed["time"])
+        for name in COLUMNS:
+            series.columns[name].frombytes(packed[name])
+        return series
+
+    def trim_oldest(self, count: int) -> None:
+        del self.time[:count]
+        for name in COLUMNS:
+            del self.columns[name][:count]
+
+    def slice(self, lo: int, hi: int) -> List[Dict[str, Any]]:
+        times = self.time
+        o, h, l, c, v = (self.columns[name] for name in COLUMNS)
+        return [
+            {"time": times[k], "open": o[k], "high": h[k], "low": l[k], "close": c[k], "volume": v[k]}
+            for k in range(lo, hi)
+        ]
+
 
 class CandlesCache:
     """
     Cache específico para dados de candles com TTL inteligente baseado no intervalo.
 
-    Intervalos menores (1m-5m) = TTL curto (30s)
-    Intervalos médios (15m-1h) = TTL médio (2min)
-    Intervalos maiores (4h-1d) = TTL longo (5min)
+    O TTL vale para a cauda da série (candle em formação); candles fechados
+    não mudam e ficam até serem removidos por LRU/idle.
+
+    Intervalos menores (1m-5m) = TTL curto (60s)
+    Intervalos médios (15m-1h) = TTL médio (5min)
+    Intervalos maiores (4h-1d) = TTL longo (10min)
+
+    Sem await interno: cada operação é atômica no event loop, sem lock.
     """
 
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = asyncio.Lock()
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, backend: Optional[SharedCacheBackend] = None):
+        self._series: "OrderedDict[Tuple[str, str, str], CandleSeries]" = OrderedDict()
+        self._max_bytes = max_bytes
         self._stats = {
             "hits": 0,
             "misses": 0,
             "total_requests": 0,
+            "evictions": 0,
+            "l2_loads": 0,
             "cached_bytes": 0
         }
-
-    def _get_cache_key(self, symbol: str, interval: str, limit: int) -> str:
-        """Generate unique cache key"""
-        return f"candles:{symbol}:{interval}:{limit}"
+        # L2 compartilhado: este cache já é o L1 (séries colunares), então local=False
+        self._shared = SharedCache(
+            "candles", default_ttl=IDLE_SECONDS, local=False, broadcast_sets=False, backend=backend
+        )
+        self._shared.on_invalidate(self._drop_local)
 
     def _get_ttl_seconds(self, interval: str) -> int:
         """
@@ -54,81 +193,258 @@ class CandlesCache:
         else:
             return 180  # Default 3 minutes (was 1min)
 
-    async def get(self, symbol: str, interval: str, limit: int) -> Optional[Dict[str, Any]]:
-        """Get cached candles data"""
-        async with self._lock:
-            self._stats["total_requests"] += 1
+    def _is_fresh(self, series: CandleSeries, interval: str) -> bool:
+        now = time.time()
+        # Cauda cujo último candle já fechou está velha mesmo dentro do TTL
+        # (avaliações disparadas no fechamento precisam do candle novo)
+        if series.time and series.time[-1] + series.interval_ms <= now * 1000:
+            return False
+        return now - series.refreshed_at < self._get_ttl_seconds(interval)
 
-            cache_key = self._get_cache_key(symbol, interval, limit)
+    def _touch(self, key: Tuple[str, str, str]) -> Optional[CandleSeries]:
+        series = self._series.get(key)
+        if series is not None:
+            series.last_access = time.monotonic()
+            self._series.move_to_end(key)
+        return series
 
-            if cache_key not in self._cache:
-                self._stats["misses"] += 1
-                logger.info(f"❌ CACHE MISS: {cache_key}")
-                return None
+    def _record(self, hit: bool, key: Tuple[str, str, str]) -> None:
+        self._stats["total_requests"] += 1
+        if hit:
+            self._stats["hits"] += 1
+            logger.debug(f"✅ CACHE HIT: {key}")
+        else:
+            self._stats["misses"] += 1
+            logger.debug(f"❌ CACHE MISS: {key}")
+
+    def _shared_key(self, key: Tuple[str, str, str]) -> str:
+        return ":".join(key)
+
+    def _distributed(self) -> bool:
+        return MSGPACK_AVAILABLE and self._shared.distributed
+
+    async def _load_shared(self, key: Tuple[str, str, str]) -> bool:
+        """Traz a série do L2 (outro worker já buscou) se ela for mais completa/recente"""
+        if not self._distributed():
+            return False
+
+        packed = await self._shared.get(self._shared_key(key))
+        if not packed:
+            return False
+
+        try:
+            series = CandleSeries.from_packed(packed)
+        except Exception as e:
+            logger.debug(f"Invalid shared candle series {key}: {e}")
+            return False
+
+        local = self._series.get(key)
+        if local is not None and series.refreshed_at <= local.refreshed_at and len(series) <= len(local):
+            return False
+
+        self._series[key] = series
+        self._stats["cached_bytes"] += series.nbytes - (local.nbytes if local else 0)
+        self._stats["l2_loads"] += 1
+        self._touch(key)
+        self._evict(key)
+        return True
+
+    async def _publish(self, key: Tuple[str, str, str], series: CandleSeries) -> None:
+        if self._distributed():
+            await self._shared.set(self._shared_key(key), series.to_packed())
+
+    def _drop_local(self, shared_key: str, is_prefix: bool) -> int:
+        """Remove séries locais pela chave/prefixo do L2 (também usado por invalidações remotas)"""
+        keys = [
+            key for key in self._series
+            if (self._shared_key(key).startswith(shared_key) if is_prefix else self._shared_key(key) == shared_key)
+        ]
+        for key in keys:
+            self._stats["cached_bytes"] -= self._series.pop(key).nbytes
+        return len(keys)
+
+    def _result(self, series: CandleSeries, lo: int, hi: int) -> Dict[str, Any]:
+        return {"success": True, "candles": series.slice(lo, hi), "market_type": series.market_type}
+
+    def _latest_bounds(
+        self, series: Optional[CandleSeries], interval: str, limit: int
+    ) -> Optional[Tuple[int, int]]:
+        if series is None or len(series) < limit or not self._is_fresh(series, interval):
+            return None
+        return len(series) - limit, len(series)
+
+    def _range_bounds(
+        self,
+        series: Optional[CandleSeries],
+        interval: str,
+        limit: int,
+        start_time: Optional[int],
+        end_time: Optional[int],
+    ) -> Optional[Tuple[int, int]]:
+        if series is None or not series.time:
+            return None
+
+        times = series.time
+        step = series.interval_ms
+        now_ms = int(time.time() * 1000)
 
-            entry = self._cache[cache_key]
+        if end_time is None:
+            end_time = now_ms
+        hi = bisect_right(times, end_time)
 
-            # Check if expired
-            if datetime.utcnow() > entry["expires_at"]:
-                del self._cache[cache_key]
-                self._stats["misses"] += 1
-                logger.info(f"⏰ CACHE EXPIRED: {cache_key}")
+        # Candle que contém end_time precisa estar na série
+        if hi == 0 or end_time >= times[hi - 1] + step:
+            return None
+        if times[hi - 1] + step > now_ms and not self._is_fresh(series, interval):
+            # Inclui o candle em formação: só vale se a cauda estiver fresca
+            return None
+
+        if start_time is not None:
+            if times[0] > start_time:
                 return None
+            lo = bisect_left(times, start_time)
+            return lo, min(hi, lo + limit)
 
-            self._stats["hits"] += 1
-            hit_rate = (self._stats["hits"] / self._stats["total_requests"]) * 100
-            logger.info(f"✅ CACHE HIT: {cache_key} (Hit Rate: {hit_rate:.1f}%)")
-
-            return entry["data"]
-
-    async def set(self, symbol: str, interval: str, limit: int, data: Dict[str, Any]):
-        """Cache candles data with intelligent TTL"""
-        async with self._lock:
-            cache_key = self._get_cache_key(symbol, interval, limit)
-            ttl_seconds = self._get_ttl_seconds(interval)
-            expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
-
-            # Calculate approximate size
-            data_size = len(json.dumps(data))
-
-            self._cache[cache_key] = {
-                "data": data,
-                "expires_at": expires_at,
-                "cached_at": datetime.utcnow(),
-                "size_bytes": data_size
-            }
-
-            self._stats["cached_bytes"] = sum(
-                entry.get("size_bytes", 0)
-                for entry in self._cache.values()
-            )
-
-            logger.info(
-                f"💾 CACHE SET: {cache_key} "
-                f"(TTL: {ttl_seconds}s, Size: {data_size/1024:.1f}KB, "
-                f"Total Cache: {self._stats['cached_bytes']/1024:.1f}KB)"
-            )
+        lo = hi - limit
+        if lo < 0:
+            return None
+        return lo, hi
+
+    async def get(
+        self, symbol: str, interval: str, limit: int, market_type: str = "futures"
+    ) -> Optional[Dict[str, Any]]:
+        """Últimos `limit` candles, se a cauda ainda estiver dentro do TTL"""
+        key = (symbol, interval, market_type)
+        bounds = self._latest_bounds(self._touch(key), interval, limit)
+
+        if bounds is None and await self._load_shared(key):
+            bounds = self._latest_bounds(self._touch(key), interval, limit)
+
+        self._record(bounds is not None, key)
+        if bounds is None:
+            return None
+        return self._result(self._series[key], *bounds)
+
+    async def get_range(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: Optional[int],
+        end_time: Optional[int],
+        market_type: str = "futures",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fatia por intervalo de tempo (mesma semântica da exchange): com
+        start_time, até `limit` candles a partir dele; sem start_time, os
+        `limit` candles que terminam em end_time.
+        """
+        key = (symbol, interval, market_type)
+        bounds = self._range_bounds(self._touch(key), interval, limit, start_time, end_time)
+
+        if bounds is None and await self._load_shared(key):
+            bounds = self._range_bounds(self._touch(key), interval, limit, start_time, end_time)
+
+        self._record(bounds is not None, key)
+        if bounds is None:
+            return None
+        return self._result(self._series[key], *bounds)
+
+    async def get_stale_tail(
+        self, symbol: str, interval: str, limit: int, market_type: str = "futures"
+    ) -> Optional[int]:
+        """
+        Time (ms) do último candle quando a série cobre `limit` mas a cauda
+        expirou - basta buscar a partir dele e mesclar (atualização incremental).
+        """
+        series = self._series.get((symbol, interval, market_type))
+        if series is None or len(series) < limit or self._is_fresh(series, interval):
+            return None
+        return series.time[-1]
+
+    async def set(
+        self,
+        symbol: str,
+        interval: str,
+        candles: List[Dict[str, Any]],
+        market_type: str = "futures",
+        source_market_type: Optional[str] = None,
+        is_latest: bool = False,
+    ) -> None:
+        """
+        Mescla candles na série do mercado.
+
+        Args:
+            candles: Candles ordenados por time (ms)
+            market_type: Mercado pedido (parte da chave)
+            source_market_type: Mercado que de fato respondeu (fallback futures->spot)
+            is_latest: Os candles terminam no candle em formação (renova o TTL da cauda)
+        """
+        if not candles:
+            return
+
+        key = (symbol, interval, market_type)
+        series = self._series.get(key)
+        if series is None:
+            series = CandleSeries(interval_to_ms(interval), source_market_type or market_type)
+            self._series[key] = series
+
+        before = series.nbytes
+        if not series.merge(candles):
+            if self._is_fresh(series, interval) and not is_latest:
+                # Bloco histórico disjunto não substitui uma série ao vivo
+                return
+            series = CandleSeries(series.interval_ms, source_market_type or market_type)
+            series.merge(candles)
+            self._series[key] = series
+
+        if source_market_type:
+            series.market_type = source_market_type
+        if is_latest:
+            series.refreshed_at = time.time()
+
+        self._stats["cached_bytes"] += series.nbytes - before
+        self._touch(key)
+        self._evict(key)
+        await self._publish(key, series)
+
+        logger.debug(
+            f"💾 CACHE SET: {key} ({len(series)} candles, "
+            f"Total Cache: {self._stats['cached_bytes']/1024:.1f}KB)"
+        )
+
+    def _evict(self, keep: Tuple[str, str, str]) -> None:
+        """LRU: remove as séries menos usadas até caber no orçamento"""
+        while self._stats["cached_bytes"] > self._max_bytes and len(self._series) > 1:
+            key, series = self._series.popitem(last=False)
+            if key == keep:
+                self._series[key] = series
+                continue
+            self._stats["cached_bytes"] -= series.nbytes
+            self._stats["evictions"] += 1
+            logger.info(f"♻️ CACHE EVICTED: {key} ({series.nbytes/1024:.1f}KB)")
+
+        if self._stats["cached_bytes"] > self._max_bytes:
+            # Uma única série maior que o orçamento: descarta o histórico mais antigo
+            series = self._series[keep]
+            excess = -(-(self._stats["cached_bytes"] - self._max_bytes) // BYTES_PER_CANDLE)
+            series.trim_oldest(excess)
+            self._stats["cached_bytes"] -= excess * BYTES_PER_CANDLE
 
     async def invalidate(self, symbol: Optional[str] = None):
-        """Invalidate cache for specific symbol or all"""
-        async with self._lock:
-            if symbol:
-                # Invalidate specific symbol
-                keys_to_delete = [
-                    key for key in self._cache.keys()
-                    if key.startswith(f"candles:{symbol}:")
-                ]
-                for key in keys_to_delete:
-                    del self._cache[key]
-                    logger.info(f"🗑️ CACHE INVALIDATED: {key}")
-                return len(keys_to_delete)
-            else:
-                # Invalidate all
-                count = len(self._cache)
-                self._cache.clear()
-                self._stats["cached_bytes"] = 0
-                logger.info(f"🗑️ CACHE CLEARED: {count} entries")
-                return count
+        """Invalidate cache for specific symbol or all (in every worker)"""
+        if symbol:
+            # Invalidate specific symbol
+            symbol = symbol.upper().replace("/", "")
+            prefix = f"{symbol}:"
+        else:
+            # Invalidate all
+            prefix = ""
+
+        count = self._drop_local(prefix, True)
+        await self._shared.invalidate_prefix(prefix)
+        logger.info(f"🗑️ CACHE INVALIDATED: {symbol or 'all'} ({count} series)")
+        return count
 
     def get_metrics(self) -> Dict[str, Any]:
         """Get cache metrics"""
@@ -140,24 +456,25 @@ class CandlesCache:
             "misses": self._stats["misses"],
             "hit_rate": round(hit_rate, 2),
             "total_requests": total,
-            "cached_entries": len(self._cache),
-            "cached_kb": round(self._stats["cached_bytes"] / 1024, 2)
+            "cached_entries": len(self._series),
+            "cached_candles": sum(len(series) for series in self._series.values()),
+            "evictions": self._stats["evictions"],
+            "l2_loads": self._stats["l2_loads"],
+            "shared": self._shared.get_metrics(),
+            "cached_kb": round(self._stats["cached_bytes"] / 1024, 2),
+            "max_kb": round(self._max_bytes / 1024, 2)
         }
 
     async def cleanup_expired(self):
-        """Remove expired entries"""
-        async with self._lock:
-            now = datetime.utcnow()
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if now > entry["expires_at"]
-            ]
+        """Remove séries sem acesso há mais de IDLE_SECONDS"""
+        cutoff = time.monotonic() - IDLE_SECONDS
+        idle_keys = [key for key, series in self._series.items() if series.last_access < cutoff]
 
-            for key in expired_keys:
-                del self._cache[key]
+        for key in idle_keys:
+            self._stats["cached_bytes"] -= self._series.pop(key).nbytes
 
-            if expired_keys:
-                logger.info(f"🧹 Cleaned up {len(expired_keys)} expired cache entries")
+        if idle_keys:
+            logger.info(f"🧹 Cleaned up {len(idle_keys)} idle candle series")
 
 
 # Global singleton instance
@@ -172,4 +489,4 @@ async def start_candles_cache_cleanup():
             await candles_cache.cleanup_expired()
         except Exception as e:
             logger.error(f"Error in candles cache cleanup: {e}")
-            await asyncio.sleep(60)
\ No newline at end of file
+            await asyncio.sleep(60)
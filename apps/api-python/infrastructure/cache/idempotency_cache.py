@@ -1,42 +1,31 @@
 """
-Idempotency Cache - In-memory cache for preventing duplicate requests
+Idempotency Cache - Shared cache for preventing duplicate requests
 
-This module provides a simple in-memory cache with TTL for idempotency.
-Can be easily replaced with Redis for production scaling.
+This module provides a cache with TTL for idempotency keys on top of the shared
+two-level cache (L1 in-process + L2 Redis), so a retried request is recognized
+even when it lands on a different Gunicorn worker.
 """
 
-import asyncio
-import json
-from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import structlog
 
+from .shared_cache import SharedCache
+
 logger = structlog.get_logger(__name__)
 
 
 class IdempotencyCache:
     """
-    Thread-safe in-memory cache with TTL for idempotency keys
+    Cache with TTL for idempotency keys
 
     Features:
-    - Automatic expiration (TTL)
-    - Thread-safe operations
-    - JSON serialization
-    - Easy migration to Redis
+    - Automatic expiration (TTL; Redis expires L2 entries)
+    - Shared across workers (Redis L2 + pub/sub invalidation)
+    - msgpack serialization
     """
 
     def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = None  # Será inicializado quando event loop estiver disponível
-        self._cleanup_task = None
-
-    def _ensure_initialized(self):
-        """Ensure lock is initialized (called lazily when event loop is available)"""
-        if self._lock is None:
-            self._lock = asyncio.Lock()
-            # Start cleanup task only once
-            if self._cleanup_task is None:
-                self._cleanup_task = asyncio.create_task(self._cleanup_expired())
+        self._shared = SharedCache("idempotency", default_ttl=60)
 
     async def get(self, key: str) -> Optional[Dict[str, Any]]:
         """
@@ -48,21 +37,10 @@ class IdempotencyCache:
         Returns:
             Cached value if exists and not expired, None otherwise
         """
-        self._ensure_initialized()
-        async with self._lock:
-            if key not in self._cache:
-                return None
-
-            entry = self._cache[key]
-
-            # Check expiration
-            if datetime.utcnow() > entry['expires_at']:
-                del self._cache[key]
-                logger.debug(f"Cache entry expired: {key}")
-                return None
-
+        value = await self._shared.get(key)
+        if value is not None:
             logger.info(f"✅ Cache HIT: {key}")
-            return entry['value']
+        return value
 
     async def set(self, key: str, value: Dict[str, Any], ttl_seconds: int = 60):
         """
@@ -70,75 +48,28 @@ class IdempotencyCache:
 
         Args:
             key: Idempotency key
-            value: Value to cache (must be JSON-serializable)
+            value: Value to cache (must be serializable)
             ttl_seconds: Time to live in seconds (default: 60)
         """
-        self._ensure_initialized()
-        async with self._lock:
-            expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
-
-            self._cache[key] = {
-                'value': value,
-                'expires_at': expires_at,
-                'created_at': datetime.utcnow()
-            }
-
-            logger.info(f"✅ Cache SET: {key} (TTL: {ttl_seconds}s)")
+        await self._shared.set(key, value, ttl_seconds)
+        logger.info(f"✅ Cache SET: {key} (TTL: {ttl_seconds}s)")
 
     async def delete(self, key: str):
         """Delete cached entry"""
-        self._ensure_initialized()
-        async with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                logger.info(f"🗑️ Cache DELETE: {key}")
+        await self._shared.delete(key)
+        logger.info(f"🗑️ Cache DELETE: {key}")
 
     async def clear(self):
         """Clear all cache entries"""
-        self._ensure_initialized()
-        async with self._lock:
-            count = len(self._cache)
-            self._cache.clear()
-            logger.info(f"🗑️ Cache CLEARED: {count} entries removed")
-
-    async def _cleanup_expired(self):
-        """Background task to remove expired entries"""
-        while True:
-            try:
-                await asyncio.sleep(30)  # Run every 30 seconds
-
-                if self._lock is None:
-                    continue
-
-                async with self._lock:
-                    now = datetime.utcnow()
-                    expired_keys = [
-                        key for key, entry in self._cache.items()
-                        if now > entry['expires_at']
-                    ]
-
-                    for key in expired_keys:
-                        del self._cache[key]
-
-                    if expired_keys:
-                        logger.info(f"🧹 Cleaned up {len(expired_keys)} expired cache entries")
-
-            except Exception as e:
-                logger.error(f"Error in cache cleanup: {e}")
+        count = await self._shared.invalidate_prefix("")
+        logger.info(f"🗑️ Cache CLEARED: {count} entries removed")
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
+        self._shared.cleanup_expired()
         return {
-            'total_entries': len(self._cache),
-            'entries': [
-                {
-                    'key': key[:20] + '...' if len(key) > 20 else key,
-                    'created_at': entry['created_at'].isoformat(),
-                    'expires_at': entry['expires_at'].isoformat(),
-                    'ttl_remaining': (entry['expires_at'] - datetime.utcnow()).total_seconds()
-                }
-                for key, entry in self._cache.items()
-            ]
+            'total_entries': self._shared.local_size(),
+            **self._shared.get_metrics()
         }
 
 
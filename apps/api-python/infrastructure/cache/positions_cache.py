@@ -5,34 +5,19 @@ Implements TTL-based caching for positions data with automatic invalidation
 on order creation/modification. This reduces redundant API calls while ensuring
 data freshness for critical trading operations.
 
+Backed by the shared two-level cache (L1 in-process + L2 Redis) so every
+Gunicorn worker sees the same entries and invalidations are global.
+
 Security: Cache only structural data (positions metadata), never prices.
 """
 
 import asyncio
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Optional, Any
 import logging
 
-logger = logging.getLogger(__name__)
-
-
-@dataclass
-class CacheEntry:
-    """Single cache entry with TTL and metadata."""
-    data: Any
-    created_at: datetime
-    ttl_seconds: int
-    hit_count: int = 0
+from .shared_cache import SharedCache
 
-    def is_valid(self) -> bool:
-        """Check if cache entry is still valid based on TTL."""
-        age = (datetime.utcnow() - self.created_at).total_seconds()
-        return age < self.ttl_seconds
-
-    def increment_hit(self) -> None:
-        """Increment cache hit counter for metrics."""
-        self.hit_count += 1
+logger = logging.getLogger(__name__)
 
 
 class PositionsCache:
@@ -42,7 +27,8 @@ class PositionsCache:
     Design decisions:
     - TTL of 30s: Balance between freshness and performance (PERFORMANCE OPTIMIZATION)
     - User-scoped keys: Prevent data leakage between users
-    - Automatic cleanup: Remove stale entries every 60s
+    - Shared across workers: L1 per process + Redis L2, invalidation via pub/sub
+    - Automatic cleanup: Remove stale L1 entries every 60s
     - Metrics: Track hits/misses for monitoring
     """
 
@@ -53,14 +39,8 @@ class PositionsCache:
         Args:
             default_ttl: Default time-to-live in seconds (default: 30s for better performance)
         """
-        self._cache: Dict[str, CacheEntry] = {}
-        self._lock = asyncio.Lock()
         self._default_ttl = default_ttl
-
-        # Metrics
-        self._hits = 0
-        self._misses = 0
-        self._invalidations = 0
+        self._shared = SharedCache("positions", default_ttl=default_ttl)
 
         logger.info(f"PositionsCache initialized with TTL={default_ttl}s")
 
@@ -88,27 +68,10 @@ class PositionsCache:
         Returns:
             Cached data if valid, None otherwise
         """
-        async with self._lock:
-            key = self._make_key(user_id, key_type)
-            entry = self._cache.get(key)
-
-            if entry is None:
-                self._misses += 1
-                logger.debug(f"Cache MISS: {key}")
-                return None
-
-            if not entry.is_valid():
-                # Remove expired entry
-                del self._cache[key]
-                self._misses += 1
-                logger.debug(f"Cache EXPIRED: {key}")
-                return None
-
-            # Cache hit
-            entry.increment_hit()
-            self._hits += 1
-            logger.debug(f"Cache HIT: {key} (hits={entry.hit_count})")
-            return entry.data
+        key = self._make_key(user_id, key_type)
+        data = await self._shared.get(key)
+        logger.debug(f"Cache {'HIT' if data is not None else 'MISS'}: {key}")
+        return data
 
     async def set(self, user_id: int, key_type: str, data: Any, ttl: Optional[int] = None) -> None:
         """
@@ -120,22 +83,15 @@ class PositionsCache:
             data: Data to cache
             ttl: Custom TTL in seconds (uses default if not provided)
         """
-        async with self._lock:
-            key = self._make_key(user_id, key_type)
-            ttl = ttl or self._default_ttl
+        key = self._make_key(user_id, key_type)
+        ttl = ttl or self._default_ttl
 
-            entry = CacheEntry(
-                data=data,
-                created_at=datetime.utcnow(),
-                ttl_seconds=ttl
-            )
-
-            self._cache[key] = entry
-            logger.debug(f"Cache SET: {key} (TTL={ttl}s)")
+        await self._shared.set(key, data, ttl)
+        logger.debug(f"Cache SET: {key} (TTL={ttl}s)")
 
     async def invalidate(self, user_id: int, key_type: Optional[str] = None) -> int:
         """
-        Invalidate cache entries for a user.
+        Invalidate cache entries for a user (in every worker).
 
         Args:
             user_id: User identifier
@@ -144,56 +100,35 @@ class PositionsCache:
         Returns:
             Number of entries invalidated
         """
-        async with self._lock:
-            if key_type:
-                # Invalidate specific key
-                key = self._make_key(user_id, key_type)
-                if key in self._cache:
-                    del self._cache[key]
-                    self._invalidations += 1
-                    logger.info(f"Cache INVALIDATED: {key}")
-                    return 1
-                return 0
-            else:
-                # Invalidate all keys for user
-                prefix = f"user:{user_id}:"
-                keys_to_remove = [k for k in self._cache.keys() if k.startswith(prefix)]
-
-                for k in keys_to_remove:
-                    del self._cache[k]
-
-                count = len(keys_to_remove)
-                self._invalidations += count
-                logger.info(f"Cache INVALIDATED: {count} entries for user {user_id}")
-                return count
+        if key_type:
+            # Invalidate specific key
+            key = self._make_key(user_id, key_type)
+            count = await self._shared.delete(key)
+            logger.info(f"Cache INVALIDATED: {key}")
+            return count
+        else:
+            # Invalidate all keys for user
+            count = await self._shared.invalidate_prefix(f"user:{user_id}:")
+            logger.info(f"Cache INVALIDATED: {count} entries for user {user_id}")
+            return count
 
     async def clear(self) -> None:
         """Clear all cache entries."""
-        async with self._lock:
-            count = len(self._cache)
-            self._cache.clear()
-            logger.warning(f"Cache CLEARED: {count} entries removed")
+        count = await self._shared.invalidate_prefix("")
+        logger.warning(f"Cache CLEARED: {count} entries removed")
 
     async def cleanup_expired(self) -> int:
         """
-        Remove all expired entries from cache.
+        Remove all expired entries from the local (L1) cache.
+        Redis expires L2 entries by itself.
 
         Returns:
             Number of entries removed
         """
-        async with self._lock:
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if not entry.is_valid()
-            ]
-
-            for key in expired_keys:
-                del self._cache[key]
-
-            if expired_keys:
-                logger.info(f"Cache CLEANUP: {len(expired_keys)} expired entries removed")
-
-            return len(expired_keys)
+        removed = self._shared.cleanup_expired()
+        if removed:
+            logger.info(f"Cache CLEANUP: {removed} expired entries removed")
+        return removed
 
     def get_metrics(self) -> Dict[str, Any]:
         """
@@ -202,23 +137,24 @@ class PositionsCache:
         Returns:
             Dictionary with hits, misses, hit_rate, size, invalidations
         """
-        total_requests = self._hits + self._misses
-        hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0.0
+        stats = self._shared.get_metrics()
+        hits = stats["l1_hits"] + stats["l2_hits"]
 
         return {
-            "hits": self._hits,
-            "misses": self._misses,
-            "hit_rate": round(hit_rate, 2),
-            "size": len(self._cache),
-            "invalidations": self._invalidations,
-            "total_requests": total_requests
+            "hits": hits,
+            "misses": stats["misses"],
+            "hit_rate": stats["hit_rate"],
+            "size": stats["l1_size"],
+            "invalidations": stats["invalidations"],
+            "total_requests": hits + stats["misses"],
+            "l1_hits": stats["l1_hits"],
+            "l2_hits": stats["l2_hits"],
+            "backend": stats["backend"]
         }
 
     def reset_metrics(self) -> None:
         """Reset all metrics counters."""
-        self._hits = 0
-        self._misses = 0
-        self._invalidations = 0
+        self._shared.reset_metrics()
         logger.info("Cache metrics reset")
 
 
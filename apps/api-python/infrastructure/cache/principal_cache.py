@@ -0,0 +1,126 @@
+"""
+Principal Cache - Authorization data of authenticated users
+
+Every authenticated request used to load the user row (get_current_user) and
+admin endpoints ran up to three EXISTS queries (verify_admin). The principal
+(active flag, admin flag, roles) changes rarely, so it is cached per user id
+with a short TTL on the shared two-level cache: steady-state requests resolve
+authorization from L1 without touching the database.
+
+Explicit invalidation (invalidate_principal) is called on user/admin updates
+and is propagated to every worker through the shared cache pub/sub.
+"""
+
+from typing import Any, Dict, Optional, Union
+from uuid import UUID
+
+import structlog
+
+from .shared_cache import SharedCache
+
+logger = structlog.get_logger(__name__)
+
+PRINCIPAL_TTL_SECONDS = 30
+# Usuário inexistente: cache curto (evita martelar o banco com token de usuário removido)
+MISSING_PRINCIPAL_TTL_SECONDS = 5
+
+
+def build_principal(row: Optional[Any], user_id: str) -> Dict[str, Any]:
+    """Principal dict from the users LEFT JOIN admins row (None = user not found)"""
+    if row is None:
+        return {"user_id": user_id, "exists": False, "is_active": False, "is_admin": False, "roles": []}
+
+    roles = ["user"]
+    if row["is_admin"]:
+        roles.append("admin")
+    if row["admin_active"] and row["admin_role"] and row["admin_role"] not in roles:
+        roles.append(row["admin_role"])
+
+    return {
+        "user_id": user_id,
+        "exists": True,
+        "is_active": bool(row["is_active"]),
+        "is_admin": bool(row["is_admin"]),
+        "roles": roles,
+    }
+
+
+class PrincipalCache:
+    """
+    Short-TTL cache of user principals keyed by user id.
+
+    - L1 per process, Redis L2 shared by the workers (SharedCache "principals")
+    - Miss: ONE query (users LEFT JOIN admins)
+    - invalidate(): drops the entry in every worker
+    """
+
+    def __init__(self, db_pool=None, ttl: int = PRINCIPAL_TTL_SECONDS):
+        self._db = db_pool
+        self._ttl = ttl
+        self._shared = SharedCache("principals", default_ttl=ttl)
+
+    @property
+    def db(self):
+        if self._db is None:
+            from infrastructure.database.connection_transaction_mode import transaction_db
+            self._db = transaction_db
+        return self._db
+
+    async def get(self, user_id: Union[str, UUID]) -> Dict[str, Any]:
+        """
+        Principal of a user (cached). Invalid ids resolve to a non-existing principal.
+        """
+        user_id = str(user_id)
+        principal = await self._shared.get(user_id)
+        if principal is not None:
+            return principal
+
+        try:
+            user_uuid = UUID(user_id)
+        except (ValueError, TypeError):
+            return build_principal(None, user_id)
+
+        row = await self.db.fetchrow("""
+            SELECT u.is_active, u.is_admin,
+                   a.role AS admin_role, COALESCE(a.is_active, false) AS admin_active
+            FROM users u
+            LEFT JOIN admins a ON a.user_id = u.id
+            WHERE u.id = $1
+        """, user_uuid)
+
+        principal = build_principal(row, user_id)
+        ttl = self._ttl if principal["exists"] else MISSING_PRINCIPAL_TTL_SECONDS
+        await self._shared.set(user_id, principal, ttl)
+        return principal
+
+    async def invalidate(self, user_id: Union[str, UUID]) -> int:
+        """Drop a cached principal (all workers). Call after user/admin updates."""
+        removed = await self._shared.delete(str(user_id))
+        logger.debug("Principal cache invalidated", user_id=str(user_id))
+        return removed
+
+    async def clear(self) -> int:
+        return await self._shared.invalidate_prefix("")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return self._shared.get_metrics()
+
+
+# Global singleton instance
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get or create singleton principal cache"""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache()
+    return _principal_cache
+
+
+async def invalidate_principal(user_id: Union[str, UUID]) -> None:
+    """Invalidate a user's principal; never raises (cache errors must not fail the update)"""
+    try:
+        await get_principal_cache().invalidate(user_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to invalidate principal cache for {user_id}: {e}")
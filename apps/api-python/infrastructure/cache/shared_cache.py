@@ -0,0 +1,383 @@
+"""
+Shared Cache - Two-level cache (L1 in-process + L2 Redis)
+
+Gunicorn runs several Uvicorn workers, so a purely in-process cache is warmed
+once per worker and a user hitting different workers keeps missing. This module
+puts a Redis tier (msgpack encoded) behind the local dicts:
+
+- L1: per-process dict with TTL (no network on hot keys)
+- L2: Redis, shared by all workers (hit ratio is shared)
+- Invalidation: every delete/prefix invalidation (and, optionally, every set)
+  is published on a Redis channel so the other workers drop their L1 copy.
+
+If Redis is not reachable the caches keep working L1-only.
+"""
+
+import asyncio
+import inspect
+import json
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+KEY_PREFIX = "gcache"
+INVALIDATION_CHANNEL = f"{KEY_PREFIX}:invalidate"
+
+
+def _default(value: Any) -> Any:
+    """Tipos que msgpack/json não serializam nativamente"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def pack(value: Any) -> bytes:
+    """Serializa para o L2 (msgpack; JSON se msgpack não estiver instalado)"""
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(value, default=_default, use_bin_type=True)
+    return json.dumps(value, default=_default).encode()
+
+
+def unpack(data: bytes) -> Any:
+    if MSGPACK_AVAILABLE:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    return json.loads(data)
+
+
+class SharedCacheBackend:
+    """
+    Conexão Redis compartilhada pelos caches + listener de invalidação (pub/sub).
+    Um por processo; cada worker se identifica por instance_id para ignorar as
+    próprias mensagens.
+    """
+
+    def __init__(self):
+        self._redis = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._caches: Dict[str, "SharedCache"] = {}
+        self.instance_id = uuid.uuid4().hex
+        self._errors = 0
+
+    @property
+    def available(self) -> bool:
+        return self._redis is not None
+
+    def register(self, cache: "SharedCache") -> None:
+        self._caches[cache.namespace] = cache
+
+    async def connect(self, redis_url: Optional[str] = None) -> bool:
+        """Conecta ao Redis; em caso de falha os caches seguem apenas com L1"""
+        if self._redis is not None:
+            return True
+
+        try:
+            import redis.asyncio as redis
+
+            if redis_url is None:
+                from infrastructure.config.settings import get_settings
+                redis_url = get_settings().redis_url
+
+            client = redis.from_url(redis_url, socket_connect_timeout=2, socket_timeout=2)
+            await client.ping()
+        except Exception as e:
+            logger.warning(f"⚠️ Shared cache L2 (Redis) unavailable, using in-process cache only: {e}")
+            return False
+
+        self._redis = client
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info("✅ Shared cache L2 (Redis) connected", msgpack=MSGPACK_AVAILABLE)
+        return True
+
+    async def disconnect(self) -> None:
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener_task = None
+
+        if self._redis is not None:
+            try:
+                await self._redis.close()
+            except Exception:
+                pass
+            self._redis = None
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{KEY_PREFIX}:{namespace}:{key}"
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        self._errors += 1
+        logger.debug(f"Shared cache L2 {operation} failed: {error}")
+
+    async def get(self, namespace: str, key: str) -> Tuple[Optional[bytes], int]:
+        """Retorna (valor, ttl restante em ms)"""
+        if self._redis is None:
+            return None, 0
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.get(self._key(namespace, key))
+                pipe.pttl(self._key(namespace, key))
+                data, pttl = await pipe.execute()
+            return data, pttl or 0
+        except Exception as e:
+            self._failed("get", e)
+            return None, 0
+
+    async def set(self, namespace: str, key: str, data: bytes, ttl: int) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(self._key(namespace, key), data, ex=max(1, int(ttl)))
+        except Exception as e:
+            self._failed("set", e)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.delete(self._key(namespace, key))
+        except Exception as e:
+            self._failed("delete", e)
+
+    async def delete_prefix(self, namespace: str, prefix: str) -> int:
+        if self._redis is None:
+            return 0
+        try:
+            keys = [k async for k in self._redis.scan_iter(match=f"{self._key(namespace, prefix)}*", count=500)]
+            if keys:
+                await self._redis.delete(*keys)
+            return len(keys)
+        except Exception as e:
+            self._failed("delete_prefix", e)
+            return 0
+
+    async def publish(self, namespace: str, key: str, is_prefix: bool) -> None:
+        if self._redis is None:
+            return
+        try:
+            message = pack({"o": self.instance_id, "n": namespace, "k": key, "p": is_prefix})
+            await self._redis.publish(INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            self._failed("publish", e)
+
+    async def _listen(self) -> None:
+        """Aplica invalidações publicadas pelos outros workers"""
+        while self._redis is not None:
+            pubsub = None
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                while True:
+                    # Polling com timeout curto (o socket_timeout do client derrubaria listen())
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        await self.handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed("subscribe", e)
+                await asyncio.sleep(5)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    async def handle_message(self, data: bytes) -> None:
+        try:
+            payload = unpack(data)
+        except Exception:
+            return
+        if payload.get("o") == self.instance_id:
+            return
+        cache = self._caches.get(payload.get("n"))
+        if cache is not None:
+            await cache.apply_remote_invalidation(payload.get("k", ""), bool(payload.get("p")))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis" if self.available else "memory",
+            "encoding": "msgpack" if MSGPACK_AVAILABLE else "json",
+            "l2_errors": self._errors,
+            "namespaces": sorted(self._caches.keys()),
+        }
+
+
+# Global backend (um por processo/worker)
+shared_cache_backend = SharedCacheBackend()
+
+
+class SharedCache:
+    """
+    Cache de um namespace sobre o backend compartilhado.
+
+    Args:
+        namespace: Prefixo das chaves no Redis e nome no canal de invalidação
+        default_ttl: TTL padrão (segundos)
+        local: Manter cópia L1 em memória (False quando o dono já tem seu próprio L1)
+        broadcast_sets: Publicar invalidação também a cada set (mantém L1 dos outros workers coerente)
+        max_local_entries: Limite de entradas no L1
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        default_ttl: int = 60,
+        local: bool = True,
+        broadcast_sets: bool = True,
+        max_local_entries: int = 10_000,
+        backend: Optional[SharedCacheBackend] = None,
+    ):
+        self.namespace = namespace
+        self._default_ttl = default_ttl
+        self._local_enabled = local
+        self._broadcast_sets = broadcast_sets
+        self._max_local_entries = max_local_entries
+        self._backend = backend or shared_cache_backend
+        self._local: Dict[str, Tuple[float, Any]] = {}
+        self._listeners: List[Callable[[str, bool], Any]] = []
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "sets": 0, "invalidations": 0}
+        self._backend.register(self)
+
+    # ==================== L1 ====================
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            del self._local[key]
+            return None
+        return entry[1]
+
+    def _set_local(self, key: str, value: Any, ttl: float) -> None:
+        if not self._local_enabled or ttl <= 0:
+            return
+        if len(self._local) >= self._max_local_entries and key not in self._local:
+            self.cleanup_expired()
+            if len(self._local) >= self._max_local_entries:
+                # Remove a entrada mais antiga (ordem de inserção)
+                self._local.pop(next(iter(self._local)))
+        self._local[key] = (time.monotonic() + ttl, value)
+
+    def _drop_local(self, key: str, is_prefix: bool) -> int:
+        if not is_prefix:
+            return 1 if self._local.pop(key, None) is not None else 0
+        keys = [k for k in self._local if k.startswith(key)]
+        for k in keys:
+            del self._local[k]
+        return len(keys)
+
+    # ==================== API ====================
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self._get_local(key)
+        if value is not None:
+            self._stats["l1_hits"] += 1
+            return value
+
+        data, pttl = await self._backend.get(self.namespace, key)
+        if data is None:
+            self._stats["misses"] += 1
+            return None
+
+        try:
+            value = unpack(data)
+        except Exception as e:
+            logger.debug(f"Shared cache decode failed for {self.namespace}:{key}: {e}")
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["l2_hits"] += 1
+        self._set_local(key, value, pttl / 1000 if pttl > 0 else self._default_ttl)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = ttl or self._default_ttl
+        self._stats["sets"] += 1
+        self._set_local(key, value, ttl)
+
+        if self._backend.available:
+            await self._backend.set(self.namespace, key, pack(value), ttl)
+            if self._broadcast_sets:
+                await self._backend.publish(self.namespace, key, False)
+
+    async def delete(self, key: str) -> int:
+        removed = self._drop_local(key, False)
+        self._stats["invalidations"] += 1
+        await self._backend.delete(self.namespace, key)
+        await self._backend.publish(self.namespace, key, False)
+        return removed
+
+    async def invalidate_prefix(self, prefix: str = "") -> int:
+        """Invalida todas as chaves com o prefixo (em todos os workers)"""
+        removed = self._drop_local(prefix, True)
+        self._stats["invalidations"] += 1
+        removed_l2 = await self._backend.delete_prefix(self.namespace, prefix)
+        await self._backend.publish(self.namespace, prefix, True)
+        return max(removed, removed_l2)
+
+    @property
+    def distributed(self) -> bool:
+        """True quando há L2 (Redis) conectado"""
+        return self._backend.available
+
+    def on_invalidate(self, callback: Callable[[str, bool], Any]) -> None:
+        """Callback (key_or_prefix, is_prefix) chamado em invalidações vindas de outros workers"""
+        self._listeners.append(callback)
+
+    async def apply_remote_invalidation(self, key: str, is_prefix: bool) -> None:
+        self._drop_local(key, is_prefix)
+        for callback in self._listeners:
+            try:
+                result = callback(key, is_prefix)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error in shared cache invalidation callback: {e}")
+
+    def cleanup_expired(self) -> int:
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._local.items() if now >= expires_at]
+        for k in expired:
+            del self._local[k]
+        return len(expired)
+
+    def local_size(self) -> int:
+        return len(self._local)
+
+    def reset_metrics(self) -> None:
+        for name in self._stats:
+            self._stats[name] = 0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        hits = self._stats["l1_hits"] + self._stats["l2_hits"]
+        total = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / total * 100, 2) if total > 0 else 0.0,
+            "l1_size": len(self._local),
+            "backend": "redis" if self._backend.available else "memory",
+        }
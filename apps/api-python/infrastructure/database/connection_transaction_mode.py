@@ -88,6 +88,11 @@ class TransactionModeDatabase:
         async with self._pool.acquire() as conn:
             return await conn.execute(query, *args)
 
+    async def executemany(self, query: str, args):
+        """Execute a query for each set of arguments (batch)"""
+        async with self._pool.acquire() as conn:
+            return await conn.executemany(query, args)
+
     async def fetch(self, query: str, *args):
         """Fetch rows"""
         async with self._pool.acquire() as conn:
@@ -410,7 +410,12 @@ class StrategyBacktestResult(Base):
 
     # Detailed data
     trades: Mapped[Optional[dict]] = mapped_column(JSONB, comment="List of simulated trades")
-    equity_curve: Mapped[Optional[dict]] = mapped_column(JSONB, comment="Equity curve data for charts")
+    equity_curve: Mapped[Optional[dict]] = mapped_column(JSONB, comment="Equity curve data for charts (columnar time/equity/price arrays)")
+
+    config_hash: Mapped[Optional[str]] = mapped_column(
+        String(64),
+        comment="Hash of strategy definition + range + config (result cache key)"
+    )
 
     # Relationship
     strategy: Mapped["Strategy"] = relationship("Strategy", back_populates="backtest_results")
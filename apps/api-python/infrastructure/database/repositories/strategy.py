@@ -356,6 +356,24 @@ class StrategyBacktestResultRepository(BaseRepository[StrategyBacktestResult]):
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_by_config_hash(
+        self,
+        strategy_id: str,
+        config_hash: str
+    ) -> Optional[StrategyBacktestResult]:
+        """Get the most recent result computed for an identical backtest definition"""
+        query = (
+            select(StrategyBacktestResult)
+            .where(
+                StrategyBacktestResult.strategy_id == strategy_id,
+                StrategyBacktestResult.config_hash == config_hash
+            )
+            .order_by(StrategyBacktestResult.created_at.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
     async def get_best_by_win_rate(
         self,
         strategy_id: str
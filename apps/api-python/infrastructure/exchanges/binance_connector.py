@@ -12,6 +12,8 @@ from decimal import Decimal
 from typing import Dict, Any, Optional
 import structlog
 
+from infrastructure.pricing.price_oracle import ORDER_PRICE_MAX_AGE_SECONDS, get_price_oracle
+
 logger = structlog.get_logger()
 
 
@@ -329,6 +331,13 @@ class BinanceConnector:
                 price = demo_prices.get(symbol.upper(), "1.00")
                 return Decimal(price)
 
+            # Preço recente do oracle compartilhado (futures primeiro, depois spot)
+            if not self.testnet:
+                for feed in ("binance_futures", "binance"):
+                    cached_price = get_price_oracle(feed).get_price(symbol, ORDER_PRICE_MAX_AGE_SECONDS)
+                    if cached_price:
+                        return Decimal(str(cached_price))
+
             # Real price - use correct API based on market type
             # For futures, we need to use the futures API endpoint
             import requests
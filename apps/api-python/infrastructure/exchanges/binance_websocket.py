@@ -483,6 +483,22 @@ class BinanceWebSocketManager:
 
         logger.info(f"Unsubscribed from stream: {stream_name}")
 
+    async def remove_kline_callback(self, stream_name: str, callback: KlineCallback) -> None:
+        """
+        Remove one kline callback, keeping the stream for other subscribers
+
+        Args:
+            stream_name: Stream ID returned from subscribe_kline
+            callback: Callback passed to subscribe_kline
+        """
+        callbacks = self._kline_callbacks.get(stream_name, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+        # Last subscriber gone: drop the stream
+        if not callbacks:
+            await self.unsubscribe(stream_name)
+
     def get_subscribed_streams(self) -> List[str]:
         """Get list of currently subscribed streams"""
         return list(self._subscribed_streams)
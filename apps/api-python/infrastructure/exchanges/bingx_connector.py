@@ -13,16 +13,20 @@ from decimal import Decimal
 from typing import Dict, Any, Optional
 import structlog
 
+from infrastructure.cache.shared_cache import SharedCache
+from infrastructure.pricing.price_oracle import ORDER_PRICE_MAX_AGE_SECONDS, get_price_oracle
+
 logger = structlog.get_logger()
 
-# 🚀 RATE LIMIT FIX: Global cache for BingX balances
+# 🚀 RATE LIMIT FIX: Cache for BingX balances shared by all workers (L1 + Redis L2)
 # Cache TTL: 60 seconds - reduces API calls significantly
-_bingx_balance_cache: Dict[str, Dict[str, Any]] = {}
-_bingx_cache_timestamps: Dict[str, float] = {}
+# Entries are kept longer (stale) to be served while rate limited
 BINGX_CACHE_TTL = 60  # 60 seconds cache for balances
+BINGX_STALE_TTL = 3600
+_bingx_balance_cache = SharedCache("bingx_balance", default_ttl=BINGX_STALE_TTL)
 
-# 🚀 RATE LIMIT FIX: Track rate limit errors with backoff
-_bingx_rate_limit_until: Dict[str, float] = {}  # api_key -> timestamp when rate limit expires
+# 🚀 RATE LIMIT FIX: Track rate limit errors with backoff (shared: one worker blocked = all wait)
+_bingx_rate_limit_until = SharedCache("bingx_rate_limit", default_ttl=60)  # api_key -> timestamp when rate limit expires
 
 
 class BingXConnector:
@@ -554,6 +558,12 @@ class BingXConnector:
             # Normalize symbol to BingX format (BTC-USDT)
             symbol_bingx = symbol.replace("USDT", "-USDT") if "-" not in symbol else symbol
 
+            # Preço recente do oracle compartilhado (leitura em memória)
+            if not self.testnet:
+                cached_price = get_price_oracle("bingx_swap").get_price(symbol_bingx, ORDER_PRICE_MAX_AGE_SECONDS)
+                if cached_price:
+                    return Decimal(str(cached_price))
+
             # Get ticker price from BingX FUTURES API (most common for bot trading)
             session = await self._get_session()
             url = f"{self.base_url}/openApi/swap/v2/quote/price"
@@ -2185,18 +2195,10 @@ class BingXConnector:
         Returns:
             float: Price in USDT or None if not found
         """
-        session = await self._get_session()
-        url = "https://api.binance.com/api/v3/ticker/price"
-
-        try:
-            async with session.get(url, params={"symbol": f"{asset}USDT"}) as response:
-                result = await response.json()
-                if "price" in result:
-                    return float(result["price"])
-        except Exception as e:
-            logger.debug(f"Could not get {asset} price from Binance: {e}")
-
-        return None
+        # Mapa compartilhado de preços (um request em massa por intervalo, não um por ativo)
+        oracle = get_price_oracle("binance")
+        await oracle.ensure_fresh()
+        return oracle.get_price(f"{asset}USDT")
 
     async def _get_price_from_bingx(self, asset: str) -> Optional[float]:
         """
@@ -2208,6 +2210,11 @@ class BingXConnector:
         Returns:
             float: Price in USDT or None if not found
         """
+        if not self.testnet:
+            oracle = get_price_oracle("bingx")
+            await oracle.ensure_fresh()
+            return oracle.get_price(f"{asset}-USDT")
+
         session = await self._get_session()
         url = f"{self.base_url}/openApi/spot/v1/ticker/24hr"
         timestamp = int(time.time() * 1000)
@@ -2323,8 +2330,6 @@ class BingXConnector:
                 "price_sources": dict        # Count by source (BINANCE, BINGX, STABLE)
             }
         """
-        global _bingx_balance_cache, _bingx_cache_timestamps, _bingx_rate_limit_until
-
         try:
             if self.is_demo_mode():
                 return {
@@ -2338,17 +2343,20 @@ class BingXConnector:
                 }
 
             # 🚀 RATE LIMIT FIX: Check if we're in rate limit cooldown
-            cache_key = self.api_key[:16] if self.api_key else "default"
+            # Chave é hash da api_key (vai para o Redis, nunca a chave em si)
+            cache_key = hashlib.sha256(self.api_key.encode()).hexdigest()[:16] if self.api_key else "default"
             current_time = time.time()
 
-            if cache_key in _bingx_rate_limit_until:
-                rate_limit_until = _bingx_rate_limit_until[cache_key]
+            rate_limit_until = await _bingx_rate_limit_until.get(cache_key)
+            cache_entry = await _bingx_balance_cache.get(cache_key)
+
+            if rate_limit_until is not None:
                 if current_time < rate_limit_until:
                     wait_seconds = int(rate_limit_until - current_time)
                     logger.warning(f"⏳ BingX rate limit active, returning cached data. Wait {wait_seconds}s")
                     # Return cached data if available
-                    if cache_key in _bingx_balance_cache:
-                        cached = _bingx_balance_cache[cache_key].copy()
+                    if cache_entry:
+                        cached = dict(cache_entry["result"])
                         cached["from_cache"] = True
                         cached["rate_limited"] = True
                         return cached
@@ -2365,11 +2373,11 @@ class BingXConnector:
                     }
 
             # 🚀 RATE LIMIT FIX: Check cache first (60 second TTL)
-            if cache_key in _bingx_cache_timestamps:
-                cache_age = current_time - _bingx_cache_timestamps[cache_key]
-                if cache_age < BINGX_CACHE_TTL and cache_key in _bingx_balance_cache:
+            if cache_entry:
+                cache_age = current_time - cache_entry["cached_at"]
+                if cache_age < BINGX_CACHE_TTL:
                     logger.info(f"✅ BingX balance from cache (age: {cache_age:.1f}s)")
-                    cached = _bingx_balance_cache[cache_key].copy()
+                    cached = dict(cache_entry["result"])
                     cached["from_cache"] = True
                     return cached
 
@@ -2513,8 +2521,7 @@ class BingXConnector:
             }
 
             # 🚀 RATE LIMIT FIX: Cache successful result
-            _bingx_balance_cache[cache_key] = result.copy()
-            _bingx_cache_timestamps[cache_key] = current_time
+            await _bingx_balance_cache.set(cache_key, {"result": result.copy(), "cached_at": current_time})
             logger.info(f"✅ BingX balance cached for {BINGX_CACHE_TTL}s")
 
             return result
@@ -2532,18 +2539,19 @@ class BingXConnector:
                 if match:
                     unblock_ts_ms = int(match.group(1))
                     unblock_ts_s = unblock_ts_ms / 1000
-                    _bingx_rate_limit_until[cache_key] = unblock_ts_s
+                    await _bingx_rate_limit_until.set(cache_key, unblock_ts_s, ttl=max(1, int(unblock_ts_s - time.time()) + 1))
                     wait_seconds = int(unblock_ts_s - time.time())
                     logger.warning(f"🚫 BingX rate limit detected. Will retry after {wait_seconds}s")
                 else:
                     # Default backoff: 60 seconds
-                    _bingx_rate_limit_until[cache_key] = time.time() + 60
+                    await _bingx_rate_limit_until.set(cache_key, time.time() + 60, ttl=60)
                     logger.warning(f"🚫 BingX rate limit detected. Backing off for 60s")
 
                 # Return cached data if available
-                if cache_key in _bingx_balance_cache:
+                cache_entry = await _bingx_balance_cache.get(cache_key)
+                if cache_entry:
                     logger.info(f"⏳ Returning cached balance data during rate limit")
-                    cached = _bingx_balance_cache[cache_key].copy()
+                    cached = dict(cache_entry["result"])
                     cached["from_cache"] = True
                     cached["rate_limited"] = True
                     return cached
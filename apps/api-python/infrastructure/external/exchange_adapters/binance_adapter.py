@@ -9,6 +9,8 @@ from datetime import datetime
 import aiohttp
 import json
 
+from infrastructure.pricing.price_oracle import ORDER_PRICE_MAX_AGE_SECONDS, get_price_oracle
+
 from .base_adapter import (
     BaseExchangeAdapter,
     OrderResponse,
@@ -342,7 +344,12 @@ class BinanceAdapter(BaseExchangeAdapter):
         return exchange_info
 
     async def get_ticker_price(self, symbol: str) -> Decimal:
-        """Get current price for symbol"""
+        """Get current price for symbol (shared price oracle when recent enough)"""
+        if not self.testnet:
+            cached_price = get_price_oracle("binance").get_price(symbol, ORDER_PRICE_MAX_AGE_SECONDS)
+            if cached_price:
+                return Decimal(str(cached_price))
+
         params = {"symbol": symbol}
         response = await self._make_request("GET", "/api/v3/ticker/price", params)
         return Decimal(response["price"])
@@ -16,6 +16,17 @@ from .bollinger import BollingerCalculator
 from .ema_cross import EMACrossCalculator
 from .ema import EMACalculator
 from .atr import ATRCalculator
+from .rolling import RollingExtrema, donchian_midline, rolling_max, rolling_min
+from .profile import LiveProfile, PriceProfiles, build_profiles, rolling_windows, session_bounds
+from .primitives import (
+    carry_band,
+    directional_movement,
+    ema_filter,
+    on_balance_volume,
+    rolling_mean,
+    true_range,
+    wilder_smooth,
+)
 
 __all__ = [
     # Base classes
@@ -42,4 +53,23 @@ __all__ = [
     "EMACrossCalculator",
     "EMACalculator",
     "ATRCalculator",
+    # Utilitarios de janela
+    "RollingExtrema",
+    "donchian_midline",
+    "rolling_max",
+    "rolling_min",
+    # Perfis de preco (TPO / volume at price)
+    "LiveProfile",
+    "PriceProfiles",
+    "build_profiles",
+    "rolling_windows",
+    "session_bounds",
+    # Primitivas vetorizadas (ADX, OBV, SuperTrend)
+    "carry_band",
+    "directional_movement",
+    "ema_filter",
+    "on_balance_volume",
+    "rolling_mean",
+    "true_range",
+    "wilder_smooth",
 ]
@@ -35,6 +35,7 @@ from typing import Dict, List, Optional, Any
 import numpy as np
 
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .primitives import directional_movement, true_range, wilder_smooth
 
 
 class ADXCalculator(BaseIndicatorCalculator):
@@ -46,6 +47,7 @@ class ADXCalculator(BaseIndicatorCalculator):
 
     name = "adx"
     required_candles = 50
+    vectorized_series = True
 
     def __init__(self, parameters: Optional[Dict[str, Any]] = None):
         super().__init__(parameters)
@@ -57,87 +59,45 @@ class ADXCalculator(BaseIndicatorCalculator):
         if self.parameters.get("period", 14) < 1:
             raise ValueError("period must be >= 1")
 
-    def calculate(self, candles: List[Candle]) -> IndicatorResult:
-        """
-        Calculate ADX, +DI, and -DI values
-
-        Returns:
-            IndicatorResult with keys:
-            - adx: ADX value (0-100)
-            - plus_di: +DI value (0-100)
-            - minus_di: -DI value (0-100)
-            - trend_strength: 0 (weak), 1 (moderate), 2 (strong)
-            - signal: 1 (bullish cross), -1 (bearish cross), 0 (neutral)
-        """
-        if len(candles) < self.required_candles:
-            raise ValueError(f"Need at least {self.required_candles} candles, got {len(candles)}")
-
-        # Convert to numpy arrays
+    def _compute(self, candles: List[Candle]) -> Dict[str, np.ndarray]:
+        """ADX, +DI and -DI for every candle (full-series array ops)"""
         highs = np.array([float(c.high) for c in candles])
         lows = np.array([float(c.low) for c in candles])
         closes = np.array([float(c.close) for c in candles])
 
-        n = len(closes)
-
-        # Calculate True Range
-        tr = np.zeros(n)
-        tr[0] = highs[0] - lows[0]
-        for i in range(1, n):
-            tr[i] = max(
-                highs[i] - lows[i],
-                abs(highs[i] - closes[i-1]),
-                abs(lows[i] - closes[i-1])
-            )
-
-        # Calculate Directional Movement (+DM and -DM)
-        plus_dm = np.zeros(n)
-        minus_dm = np.zeros(n)
-
-        for i in range(1, n):
-            up_move = highs[i] - highs[i-1]
-            down_move = lows[i-1] - lows[i]
-
-            if up_move > down_move and up_move > 0:
-                plus_dm[i] = up_move
-            else:
-                plus_dm[i] = 0
-
-            if down_move > up_move and down_move > 0:
-                minus_dm[i] = down_move
-            else:
-                minus_dm[i] = 0
+        # True Range e Directional Movement (+DM / -DM)
+        tr = true_range(highs, lows, closes)
+        plus_dm, minus_dm = directional_movement(highs, lows)
 
         # Smooth TR, +DM, -DM using Wilder's smoothing
-        smoothed_tr = self._wilder_smooth(tr, self.period)
-        smoothed_plus_dm = self._wilder_smooth(plus_dm, self.period)
-        smoothed_minus_dm = self._wilder_smooth(minus_dm, self.period)
+        smoothed_tr = wilder_smooth(tr, self.period)
+        smoothed_plus_dm = wilder_smooth(plus_dm, self.period)
+        smoothed_minus_dm = wilder_smooth(minus_dm, self.period)
 
         # Calculate +DI and -DI
-        plus_di = np.zeros(n)
-        minus_di = np.zeros(n)
-
-        for i in range(n):
-            if smoothed_tr[i] > 0:
-                plus_di[i] = (smoothed_plus_dm[i] / smoothed_tr[i]) * 100
-                minus_di[i] = (smoothed_minus_dm[i] / smoothed_tr[i]) * 100
+        has_range = smoothed_tr > 0
+        safe_tr = np.where(has_range, smoothed_tr, 1.0)
+        plus_di = np.where(has_range, smoothed_plus_dm / safe_tr * 100, 0.0)
+        minus_di = np.where(has_range, smoothed_minus_dm / safe_tr * 100, 0.0)
 
         # Calculate DX (Directional Index)
-        dx = np.zeros(n)
-        for i in range(n):
-            di_sum = plus_di[i] + minus_di[i]
-            if di_sum > 0:
-                dx[i] = abs(plus_di[i] - minus_di[i]) / di_sum * 100
+        di_sum = plus_di + minus_di
+        has_di = di_sum > 0
+        dx = np.where(has_di, np.abs(plus_di - minus_di) / np.where(has_di, di_sum, 1.0) * 100, 0.0)
 
         # Calculate ADX (smoothed DX)
-        adx = self._wilder_smooth(dx, self.period)
+        adx = wilder_smooth(dx, self.period)
+
+        return {"adx": adx, "plus_di": plus_di, "minus_di": minus_di}
 
-        # Get current values
-        current_adx = adx[-1]
-        current_plus_di = plus_di[-1]
-        current_minus_di = minus_di[-1]
+    def _result_at(self, candles: List[Candle], series: Dict[str, np.ndarray], i: int) -> IndicatorResult:
+        """IndicatorResult for candle i (same values as calculate(candles[:i + 1]))"""
+        current_adx = series["adx"][i]
+        current_plus_di = series["plus_di"][i]
+        current_minus_di = series["minus_di"][i]
 
-        prev_plus_di = plus_di[-2] if len(plus_di) > 1 else current_plus_di
-        prev_minus_di = minus_di[-2] if len(minus_di) > 1 else current_minus_di
+        prev_plus_di = series["plus_di"][i - 1] if i > 0 else current_plus_di
+        prev_minus_di = series["minus_di"][i - 1] if i > 0 else current_minus_di
 
         # Determine trend strength
         if current_adx < 20:
@@ -164,7 +124,7 @@ class ADXCalculator(BaseIndicatorCalculator):
 
         return IndicatorResult(
             name=self.name,
-            timestamp=candles[-1].timestamp,
+            timestamp=candles[i].timestamp,
             values={
                 "adx": Decimal(str(round(current_adx, 2))),
                 "plus_di": Decimal(str(round(current_plus_di, 2))),
@@ -174,34 +134,31 @@ class ADXCalculator(BaseIndicatorCalculator):
             }
         )
 
-    def _wilder_smooth(self, data: np.ndarray, period: int) -> np.ndarray:
+    def calculate(self, candles: List[Candle]) -> IndicatorResult:
         """
-        Apply Wilder's smoothing method
+        Calculate ADX, +DI, and -DI values
 
-        This is similar to EMA but with a different multiplier:
-        Wilder Smoothing = Previous Value + (Current Value - Previous Value) / Period
+        Returns:
+            IndicatorResult with keys:
+            - adx: ADX value (0-100)
+            - plus_di: +DI value (0-100)
+            - minus_di: -DI value (0-100)
+            - trend_strength: 0 (weak), 1 (moderate), 2 (strong)
+            - signal: 1 (bullish cross), -1 (bearish cross), 0 (neutral)
         """
-        result = np.zeros(len(data))
-
-        # First value is SMA
-        if period <= len(data):
-            result[period - 1] = np.mean(data[:period])
-
-        # Apply Wilder's smoothing
-        for i in range(period, len(data)):
-            result[i] = result[i-1] + (data[i] - result[i-1]) / period
+        if len(candles) < self.required_candles:
+            raise ValueError(f"Need at least {self.required_candles} candles, got {len(candles)}")
 
-        return result
+        return self._result_at(candles, self._compute(candles), len(candles) - 1)
 
     def calculate_series(self, candles: List[Candle]) -> List[IndicatorResult]:
-        """Calculate ADX for entire series"""
-        results = []
+        """Calculate ADX for entire series
 
-        for i in range(self.required_candles, len(candles) + 1):
-            try:
-                result = self.calculate(candles[:i])
-                results.append(result)
-            except (ValueError, IndexError):
-                continue
+        The recursions are causal, so one pass over all candles gives the
+        same values as calculate() on every prefix.
+        """
+        if len(candles) < self.required_candles:
+            return []
 
-        return results
+        series = self._compute(candles)
+        return [self._result_at(candles, series, i) for i in range(self.required_candles - 1, len(candles))]
@@ -70,6 +70,9 @@ class BaseIndicatorCalculator(ABC):
 
     name: str = "base"
     required_candles: int = 100
+    # True quando calculate_series calcula a serie inteira de uma vez (sem
+    # chamar calculate() por candle); o backtest pre-calcula esses indicadores
+    vectorized_series: bool = False
 
     def __init__(self, parameters: Optional[Dict[str, Any]] = None):
         """Initialize calculator with optional parameters"""
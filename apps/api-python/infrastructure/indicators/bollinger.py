@@ -2,9 +2,11 @@
 
 from decimal import Decimal
 from typing import Dict, List, Any
-import math
+
+import numpy as np
 
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .classic import bollinger
 
 
 class BollingerCalculator(BaseIndicatorCalculator):
@@ -27,6 +29,7 @@ class BollingerCalculator(BaseIndicatorCalculator):
 
     name = "bollinger"
     required_candles = 25
+    vectorized_series = True
 
     def _validate_parameters(self) -> None:
         """Validate Bollinger parameters"""
@@ -37,42 +40,16 @@ class BollingerCalculator(BaseIndicatorCalculator):
         if stddev <= 0:
             raise ValueError("Standard deviation must be > 0")
 
-    def calculate(self, candles: List[Candle]) -> IndicatorResult:
-        """Calculate Bollinger Bands values"""
-        period = self.get_parameter("period", 20)
-        stddev_mult = self.get_parameter("stddev", 2.0)
-
-        if len(candles) < period:
-            raise ValueError(f"Need at least {period} candles for Bollinger Bands")
-
-        closes = [float(c.close) for c in candles[-period:]]
-        current_close = closes[-1]
-
-        # Calculate SMA (middle band)
-        sma = sum(closes) / period
-
-        # Calculate standard deviation
-        variance = sum((c - sma) ** 2 for c in closes) / period
-        stddev = math.sqrt(variance)
-
-        # Calculate bands
-        upper = sma + (stddev * stddev_mult)
-        lower = sma - (stddev * stddev_mult)
+    def _compute(self, candles: List[Candle]) -> Dict[str, np.ndarray]:
+        """Bands, bandwidth and %B for every candle (population std per window)"""
+        closes = [float(c.close) for c in candles]
+        return bollinger(closes, self.get_parameter("period", 20), self.get_parameter("stddev", 2.0))
 
-        # Calculate bandwidth (volatility indicator)
+    def _result_at(self, candles: List[Candle], bands: Dict[str, np.ndarray], i: int) -> IndicatorResult:
+        """IndicatorResult for candle i (same values as calculate(candles[:i + 1]))"""
         # Low bandwidth = squeeze (low volatility, potential breakout)
-        # High bandwidth = high volatility
-        bandwidth = ((upper - lower) / sma) * 100 if sma > 0 else 0
-
-        # Calculate %B (position within bands)
-        # < 0: Below lower band
-        # > 1: Above upper band
-        # 0.5: At middle band
-        band_range = upper - lower
-        if band_range > 0:
-            percent_b = (current_close - lower) / band_range
-        else:
-            percent_b = 0.5
+        # %B < 0: below lower band, > 1: above upper band, 0.5: at middle band
+        percent_b = float(bands["percent_b"][i])
 
         # Determine signal based on %B
         # 1 = near lower band (potential buy)
@@ -87,13 +64,33 @@ class BollingerCalculator(BaseIndicatorCalculator):
 
         return IndicatorResult(
             name=self.name,
-            timestamp=candles[-1].timestamp,
+            timestamp=candles[i].timestamp,
             values={
-                "upper": Decimal(str(round(upper, 8))),
-                "middle": Decimal(str(round(sma, 8))),
-                "lower": Decimal(str(round(lower, 8))),
-                "bandwidth": Decimal(str(round(bandwidth, 4))),
+                "upper": Decimal(str(round(float(bands["upper"][i]), 8))),
+                "middle": Decimal(str(round(float(bands["middle"][i]), 8))),
+                "lower": Decimal(str(round(float(bands["lower"][i]), 8))),
+                "bandwidth": Decimal(str(round(float(bands["bandwidth"][i]), 4))),
                 "percent_b": Decimal(str(round(percent_b, 4))),
                 "signal": Decimal(str(signal))
             }
         )
+
+    def calculate(self, candles: List[Candle]) -> IndicatorResult:
+        """Calculate Bollinger Bands values"""
+        period = self.get_parameter("period", 20)
+
+        if len(candles) < period:
+            raise ValueError(f"Need at least {period} candles for Bollinger Bands")
+
+        # So a ultima janela e necessaria
+        window = candles[-period:]
+        return self._result_at(window, self._compute(window), period - 1)
+
+    def calculate_series(self, candles: List[Candle]) -> List[IndicatorResult]:
+        """Calculate Bollinger Bands for entire series (one sliding-window pass)"""
+        first = max(self.required_candles, self.get_parameter("period", 20)) - 1
+        if len(candles) <= first:
+            return []
+
+        bands = self._compute(candles)
+        return [self._result_at(candles, bands, i) for i in range(first, len(candles))]
@@ -0,0 +1,224 @@
+"""
+Classic indicators as arrays (RSI, EMA, MACD, Bollinger, EMA cross, Nadaraya-Watson)
+
+Implementacao unica usada pelos calculators (backtest), pelo
+IndicatorAlertMonitor (alertas) e pelo StrategyEngineService /
+StrategyWebSocketMonitor (estrategias ao vivo). Antes cada um tinha sua
+copia com loops Python; agora os quatro chamam estas funcoes e calculam os
+mesmos valores.
+
+Convencoes:
+- Entradas sao sequencias de floats (oldest first); saidas sao arrays
+  alinhados com a entrada, com NaN onde o indicador ainda nao existe.
+- ema() semeia com a SMA dos primeiros `period` valores (padrao dos
+  calculators / backtests e do TA-Lib) para todos os consumidores. Alertas e
+  engines ao vivo semeavam com o primeiro valor; MACD e EMA cross deles
+  mudam nos primeiros candles da janela e passam a bater com o backtest.
+- *_snapshot: dicts com os valores do ultimo candle usados na avaliacao de
+  condicoes das estrategias ao vivo.
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .primitives import ema_filter, wilder_smooth
+
+# Pesos gaussianos abaixo disso sao 0.0 em float64 (exp(-745))
+_KERNEL_CUTOFF_SIGMAS = 39
+
+
+def _as_array(values: Sequence[float]) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def ema(values: Sequence[float], period: int) -> np.ndarray:
+    """
+    EMA with alpha = 2 / (period + 1), aligned with `values`.
+
+    Leading NaNs are skipped (EMA of a series that starts later, e.g. the
+    MACD line). First value at period-1 = mean of the first `period` values.
+    """
+    values = _as_array(values)
+    result = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) == 0:
+        return result
+
+    first = valid[0]
+    tail = values[first:]
+    if len(tail) >= period:
+        smoothed = ema_filter(tail, 2 / (period + 1), start=period - 1, initial=float(np.mean(tail[:period])))
+        result[first + period - 1:] = smoothed[period - 1:]
+    return result
+
+
+def rsi(closes: Sequence[float], period: int = 14) -> np.ndarray:
+    """Wilder RSI aligned with closes (defined from index `period`); 100 when there are no losses"""
+    closes = _as_array(closes)
+    result = np.full(len(closes), np.nan)
+    if len(closes) < period + 1:
+        return result
+
+    deltas = np.diff(closes)
+    avg_gain = wilder_smooth(np.where(deltas > 0, deltas, 0.0), period)[period - 1:]
+    avg_loss = wilder_smooth(np.where(deltas < 0, -deltas, 0.0), period)[period - 1:]
+
+    has_loss = avg_loss != 0
+    rs = avg_gain / np.where(has_loss, avg_loss, 1.0)
+    result[period:] = np.where(has_loss, 100 - (100 / (1 + rs)), 100.0)
+    return result
+
+
+def macd(
+    closes: Sequence[float],
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(macd_line, signal_line, histogram) aligned with closes"""
+    macd_line = ema(closes, fast) - ema(closes, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def ema_cross(closes: Sequence[float], fast: int = 9, slow: int = 21) -> Tuple[np.ndarray, np.ndarray]:
+    """(fast_ema, slow_ema) aligned with closes"""
+    return ema(closes, fast), ema(closes, slow)
+
+
+def crossover(fast: np.ndarray, slow: np.ndarray, strict: bool = False) -> np.ndarray:
+    """
+    1 where `fast` crosses above `slow`, -1 where it crosses below, else 0.
+
+    strict=False counts a touch on the previous candle (prev <=, as the
+    calculators do); strict=True requires prev < / prev > (alert semantics).
+    """
+    fast = _as_array(fast)
+    slow = _as_array(slow)
+    result = np.zeros(len(fast), dtype=int)
+    if len(fast) < 2:
+        return result
+
+    prev_fast, prev_slow = fast[:-1], slow[:-1]
+    cur_fast, cur_slow = fast[1:], slow[1:]
+    if strict:
+        up = (prev_fast < prev_slow) & (cur_fast > cur_slow)
+        down = (prev_fast > prev_slow) & (cur_fast < cur_slow)
+    else:
+        up = (prev_fast <= prev_slow) & (cur_fast > cur_slow)
+        down = (prev_fast >= prev_slow) & (cur_fast < cur_slow)
+    result[1:] = np.where(up, 1, np.where(down, -1, 0))
+    return result
+
+
+def bollinger(closes: Sequence[float], period: int = 20, stddev: float = 2.0) -> Dict[str, np.ndarray]:
+    """middle / upper / lower / bandwidth / percent_b aligned with closes (population std)"""
+    closes = _as_array(closes)
+    n = len(closes)
+    middle = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if n >= period:
+        windows = sliding_window_view(closes, period)
+        middle[period - 1:] = windows.mean(axis=1)
+        std[period - 1:] = windows.std(axis=1)
+
+    upper = middle + stddev * std
+    lower = middle - stddev * std
+    band_range = upper - lower
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bandwidth = np.where(middle > 0, band_range / middle * 100, 0.0)
+        percent_b = np.where(band_range > 0, (closes - lower) / band_range, 0.5)
+    undefined = np.isnan(middle)
+    bandwidth[undefined] = np.nan
+    percent_b[undefined] = np.nan
+
+    return {"middle": middle, "upper": upper, "lower": lower, "bandwidth": bandwidth, "percent_b": percent_b}
+
+
+def kernel_regression(prices: Sequence[float], bandwidth: float) -> np.ndarray:
+    """
+    Nadaraya-Watson Gaussian kernel regression over the whole window:
+    y[i] = sum_j w(i - j) * x[j] / sum_j w(i - j), w(d) = exp(-0.5 * (d / bandwidth)^2).
+
+    One convolution instead of the O(n^2) double loop; weights beyond
+    39 bandwidths are exactly 0.0 in float64 and are left out.
+    """
+    prices = _as_array(prices)
+    n = len(prices)
+    if n == 0:
+        return prices.copy()
+
+    radius = int(min(n - 1, np.ceil(_KERNEL_CUTOFF_SIGMAS * bandwidth)))
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+
+    weighted = np.convolve(prices, kernel)[radius:radius + n]
+    weights = np.convolve(np.ones(n), kernel)[radius:radius + n]
+    return np.where(weights > 0, weighted / np.where(weights > 0, weights, 1.0), prices)
+
+
+def nadaraya_watson_envelope(closes: Sequence[float], bandwidth: float = 8, mult: float = 3.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(y_hat, upper, lower) with bands at mult * mean absolute error (alert / live semantics)"""
+    closes = _as_array(closes)
+    y_hat = kernel_regression(closes, bandwidth)
+    mae = np.mean(np.abs(closes - y_hat))
+    return y_hat, y_hat + mult * mae, y_hat - mult * mae
+
+
+# ========== Snapshots para avaliacao de condicoes (engines ao vivo) ==========
+
+def nadaraya_watson_snapshot(closes: Sequence[float], params: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    bandwidth = params.get('bandwidth', 8)
+    if len(closes) < bandwidth * 2:
+        return None
+
+    y_hat, upper, lower = nadaraya_watson_envelope(closes, bandwidth, params.get('mult', 3.0))
+    return {'value': float(y_hat[-1]), 'upper': float(upper[-1]), 'lower': float(lower[-1])}
+
+
+def rsi_snapshot(closes: Sequence[float], params: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    period = params.get('period', 14)
+    if len(closes) < period + 1:
+        return None
+    return {'value': float(rsi(closes, period)[-1])}
+
+
+def macd_snapshot(closes: Sequence[float], params: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    slow = params.get('slow', 26)
+    signal_period = params.get('signal', 9)
+    if len(closes) < slow + signal_period:
+        return None
+
+    macd_line, signal_line, histogram = macd(closes, params.get('fast', 12), slow, signal_period)
+    return {
+        'macd': float(macd_line[-1]),
+        'signal_line': float(signal_line[-1]),
+        'histogram': float(histogram[-1])
+    }
+
+
+def bollinger_snapshot(closes: Sequence[float], params: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    period = params.get('period', 20)
+    if len(closes) < period:
+        return None
+
+    # So a ultima janela e necessaria
+    bands = bollinger(_as_array(closes)[-period:], period, params.get('stddev', 2.0))
+    return {key: float(bands[key][-1]) for key in ('middle', 'upper', 'lower', 'bandwidth', 'percent_b')}
+
+
+def ema_cross_snapshot(closes: Sequence[float], params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    slow_period = params.get('slow_period', 21)
+    if len(closes) < slow_period:
+        return None
+
+    fast_ema, slow_ema = ema_cross(closes, params.get('fast_period', 9), slow_period)
+    return {
+        'fast_ema': float(fast_ema[-1]),
+        'slow_ema': float(slow_ema[-1]),
+        # 1 = bullish (fast > slow), -1 = bearish
+        'trend': 1 if fast_ema[-1] > slow_ema[-1] else -1
+    }
@@ -3,7 +3,10 @@
 from decimal import Decimal
 from typing import Dict, List, Any
 
+import numpy as np
+
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .classic import ema
 
 
 class EMACalculator(BaseIndicatorCalculator):
@@ -18,6 +21,7 @@ class EMACalculator(BaseIndicatorCalculator):
 
     name = "ema"
     required_candles = 25
+    vectorized_series = True
 
     def _validate_parameters(self) -> None:
         """Validate EMA parameters"""
@@ -25,38 +29,46 @@ class EMACalculator(BaseIndicatorCalculator):
         if period < 2:
             raise ValueError("EMA period must be >= 2")
 
-    def calculate(self, candles: List[Candle]) -> IndicatorResult:
-        """Calculate EMA value"""
-        period = self.get_parameter("period", 20)
-
-        if len(candles) < period:
-            raise ValueError(f"Need at least {period} candles for EMA")
-
-        closes = [float(c.close) for c in candles]
-        current_close = closes[-1]
-
-        # Calculate EMA
-        multiplier = 2 / (period + 1)
-        ema = sum(closes[:period]) / period  # Start with SMA
-
-        for i in range(period, len(closes)):
-            ema = (closes[i] - ema) * multiplier + ema
+    def _result_at(self, candles: List[Candle], ema_values: np.ndarray, i: int) -> IndicatorResult:
+        """IndicatorResult for candle i (same values as calculate(candles[:i + 1]))"""
+        current_close = float(candles[i].close)
+        current_ema = float(ema_values[i])
 
         # Determine trend
         # 1 = price above EMA (bullish)
         # -1 = price below EMA (bearish)
-        if current_close > ema:
+        if current_close > current_ema:
             trend = 1
-        elif current_close < ema:
+        elif current_close < current_ema:
             trend = -1
         else:
             trend = 0
 
         return IndicatorResult(
             name=self.name,
-            timestamp=candles[-1].timestamp,
+            timestamp=candles[i].timestamp,
             values={
-                "value": Decimal(str(round(ema, 8))),
+                "value": Decimal(str(round(current_ema, 8))),
                 "trend": Decimal(str(trend))
             }
         )
+
+    def calculate(self, candles: List[Candle]) -> IndicatorResult:
+        """Calculate EMA value"""
+        period = self.get_parameter("period", 20)
+
+        if len(candles) < period:
+            raise ValueError(f"Need at least {period} candles for EMA")
+
+        closes = [float(c.close) for c in candles]
+        return self._result_at(candles, ema(closes, period), len(candles) - 1)
+
+    def calculate_series(self, candles: List[Candle]) -> List[IndicatorResult]:
+        """Calculate EMA for entire series (one pass, SMA-seeded)"""
+        period = self.get_parameter("period", 20)
+        first = max(self.required_candles, period) - 1
+        if len(candles) <= first:
+            return []
+
+        ema_values = ema([float(c.close) for c in candles], period)
+        return [self._result_at(candles, ema_values, i) for i in range(first, len(candles))]
@@ -3,7 +3,10 @@
 from decimal import Decimal
 from typing import Dict, List, Any
 
+import numpy as np
+
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .classic import crossover, ema_cross
 
 
 class EMACrossCalculator(BaseIndicatorCalculator):
@@ -23,6 +26,7 @@ class EMACrossCalculator(BaseIndicatorCalculator):
 
     name = "ema_cross"
     required_candles = 30
+    vectorized_series = True
 
     def _validate_parameters(self) -> None:
         """Validate EMA Cross parameters"""
@@ -31,47 +35,20 @@ class EMACrossCalculator(BaseIndicatorCalculator):
         if fast >= slow:
             raise ValueError("Fast period must be less than slow period")
 
-    def _calculate_ema(self, values: List[float], period: int) -> List[float]:
-        """Calculate Exponential Moving Average"""
-        if len(values) < period:
-            return []
-
-        multiplier = 2 / (period + 1)
-        ema = [sum(values[:period]) / period]  # Start with SMA
-
-        for i in range(period, len(values)):
-            ema.append((values[i] - ema[-1]) * multiplier + ema[-1])
-
-        return ema
-
-    def calculate(self, candles: List[Candle]) -> IndicatorResult:
-        """Calculate EMA Cross values"""
-        fast_period = self.get_parameter("fast_period", 9)
-        slow_period = self.get_parameter("slow_period", 21)
-
-        if len(candles) < slow_period + 2:
-            raise ValueError(f"Need at least {slow_period + 2} candles for EMA Cross")
-
+    def _compute(self, candles: List[Candle]) -> Dict[str, np.ndarray]:
+        """Fast / slow EMA and crossover for every candle"""
         closes = [float(c.close) for c in candles]
+        fast_ema, slow_ema = ema_cross(
+            closes,
+            self.get_parameter("fast_period", 9),
+            self.get_parameter("slow_period", 21)
+        )
+        return {"fast_ema": fast_ema, "slow_ema": slow_ema, "crossover": crossover(fast_ema, slow_ema)}
 
-        # Calculate EMAs
-        fast_ema_series = self._calculate_ema(closes, fast_period)
-        slow_ema_series = self._calculate_ema(closes, slow_period)
-
-        # Get the last values (aligned)
-        # Fast EMA has more values, need to align with slow EMA
-        offset = slow_period - fast_period
-
-        if len(slow_ema_series) < 2:
-            raise ValueError("Not enough data for crossover detection")
-
-        # Current values
-        current_fast = fast_ema_series[-1]
-        current_slow = slow_ema_series[-1]
-
-        # Previous values for crossover detection
-        prev_fast = fast_ema_series[-2]
-        prev_slow = slow_ema_series[-2]
+    def _result_at(self, candles: List[Candle], series: Dict[str, np.ndarray], i: int) -> IndicatorResult:
+        """IndicatorResult for candle i (same values as calculate(candles[:i + 1]))"""
+        current_fast = float(series["fast_ema"][i])
+        current_slow = float(series["slow_ema"][i])
 
         # Determine trend
         # 1 = bullish (fast > slow)
@@ -83,28 +60,36 @@ class EMACrossCalculator(BaseIndicatorCalculator):
         else:
             trend = 0
 
-        # Detect crossover
-        # 1 = bullish crossover
-        # -1 = bearish crossover
-        # 0 = no crossover
-        if prev_fast <= prev_slow and current_fast > current_slow:
-            crossover = 1
-        elif prev_fast >= prev_slow and current_fast < current_slow:
-            crossover = -1
-        else:
-            crossover = 0
-
         # Calculate distance between EMAs (as percentage)
         distance = ((current_fast - current_slow) / current_slow) * 100 if current_slow > 0 else 0
 
         return IndicatorResult(
             name=self.name,
-            timestamp=candles[-1].timestamp,
+            timestamp=candles[i].timestamp,
             values={
                 "fast_ema": Decimal(str(round(current_fast, 8))),
                 "slow_ema": Decimal(str(round(current_slow, 8))),
                 "trend": Decimal(str(trend)),
-                "crossover": Decimal(str(crossover)),
+                # 1 = bullish crossover, -1 = bearish crossover, 0 = no crossover
+                "crossover": Decimal(str(int(series["crossover"][i]))),
                 "distance": Decimal(str(round(distance, 4)))
             }
         )
+
+    def calculate(self, candles: List[Candle]) -> IndicatorResult:
+        """Calculate EMA Cross values"""
+        slow_period = self.get_parameter("slow_period", 21)
+
+        if len(candles) < slow_period + 2:
+            raise ValueError(f"Need at least {slow_period + 2} candles for EMA Cross")
+
+        return self._result_at(candles, self._compute(candles), len(candles) - 1)
+
+    def calculate_series(self, candles: List[Candle]) -> List[IndicatorResult]:
+        """Calculate EMA Cross for entire series (one pass)"""
+        first = max(self.required_candles, self.get_parameter("slow_period", 21) + 2) - 1
+        if len(candles) <= first:
+            return []
+
+        series = self._compute(candles)
+        return [self._result_at(candles, series, i) for i in range(first, len(candles))]
@@ -36,6 +36,7 @@ from typing import Dict, List, Optional, Any
 import numpy as np
 
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .rolling import donchian_midline
 
 
 class IchimokuCalculator(BaseIndicatorCalculator):
@@ -80,17 +81,9 @@ class IchimokuCalculator(BaseIndicatorCalculator):
         """
         Calculate Donchian Channel midline (used for Ichimoku lines)
 
-        Returns (period-high + period-low) / 2 for each point
+        Returns (period-high + period-low) / 2 for each point (O(n) rolling extrema)
         """
-        n = len(highs)
-        result = np.zeros(n)
-
-        for i in range(period - 1, n):
-            period_high = np.max(highs[i - period + 1:i + 1])
-            period_low = np.min(lows[i - period + 1:i + 1])
-            result[i] = (period_high + period_low) / 2
-
-        return result
+        return donchian_midline(highs, lows, period)
 
     def calculate(self, candles: List[Candle]) -> IndicatorResult:
         """
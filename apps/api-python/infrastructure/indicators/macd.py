@@ -3,7 +3,10 @@
 from decimal import Decimal
 from typing import Dict, List, Any
 
+import numpy as np
+
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .classic import crossover, macd
 
 
 class MACDCalculator(BaseIndicatorCalculator):
@@ -25,6 +28,7 @@ class MACDCalculator(BaseIndicatorCalculator):
 
     name = "macd"
     required_candles = 35  # Need enough for slow EMA + signal
+    vectorized_series = True
 
     def _validate_parameters(self) -> None:
         """Validate MACD parameters"""
@@ -33,78 +37,52 @@ class MACDCalculator(BaseIndicatorCalculator):
         if fast >= slow:
             raise ValueError("Fast period must be less than slow period")
 
-    def _calculate_ema(self, values: List[float], period: int) -> List[float]:
-        """Calculate Exponential Moving Average"""
-        if len(values) < period:
-            return []
-
-        multiplier = 2 / (period + 1)
-        ema = [sum(values[:period]) / period]  # Start with SMA
-
-        for i in range(period, len(values)):
-            ema.append((values[i] - ema[-1]) * multiplier + ema[-1])
-
-        return ema
+    def _compute(self, candles: List[Candle]) -> Dict[str, np.ndarray]:
+        """MACD line, signal line, histogram and crossover for every candle"""
+        closes = [float(c.close) for c in candles]
+        macd_line, signal_line, histogram = macd(
+            closes,
+            self.get_parameter("fast", 12),
+            self.get_parameter("slow", 26),
+            self.get_parameter("signal", 9)
+        )
+        # 1 = bullish crossover (MACD crosses above signal)
+        # -1 = bearish crossover (MACD crosses below signal)
+        # 0 = no crossover
+        return {
+            "macd": macd_line,
+            "signal_line": signal_line,
+            "histogram": histogram,
+            "crossover": crossover(macd_line, signal_line)
+        }
+
+    def _result_at(self, candles: List[Candle], series: Dict[str, np.ndarray], i: int) -> IndicatorResult:
+        """IndicatorResult for candle i (same values as calculate(candles[:i + 1]))"""
+        return IndicatorResult(
+            name=self.name,
+            timestamp=candles[i].timestamp,
+            values={
+                "macd": Decimal(str(round(float(series["macd"][i]), 8))),
+                "signal_line": Decimal(str(round(float(series["signal_line"][i]), 8))),
+                "histogram": Decimal(str(round(float(series["histogram"][i]), 8))),
+                "crossover": Decimal(str(int(series["crossover"][i])))
+            }
+        )
 
     def calculate(self, candles: List[Candle]) -> IndicatorResult:
         """Calculate MACD values"""
-        fast_period = self.get_parameter("fast", 12)
-        slow_period = self.get_parameter("slow", 26)
-        signal_period = self.get_parameter("signal", 9)
-
-        min_candles = slow_period + signal_period
+        min_candles = self.get_parameter("slow", 26) + self.get_parameter("signal", 9)
         if len(candles) < min_candles:
             raise ValueError(f"Need at least {min_candles} candles for MACD")
 
-        closes = [float(c.close) for c in candles]
+        return self._result_at(candles, self._compute(candles), len(candles) - 1)
 
-        # Calculate EMAs
-        fast_ema = self._calculate_ema(closes, fast_period)
-        slow_ema = self._calculate_ema(closes, slow_period)
-
-        # Align EMAs (slow EMA starts later)
-        offset = slow_period - fast_period
-        aligned_fast = fast_ema[offset:]
-
-        # Calculate MACD line
-        macd_line = [f - s for f, s in zip(aligned_fast, slow_ema)]
-
-        # Calculate Signal line (EMA of MACD)
-        if len(macd_line) < signal_period:
-            raise ValueError("Not enough data for signal line")
-
-        signal_line = self._calculate_ema(macd_line, signal_period)
-
-        # Current values
-        current_macd = macd_line[-1]
-        current_signal = signal_line[-1]
-        current_histogram = current_macd - current_signal
-
-        # Previous values for crossover detection
-        if len(macd_line) >= 2 and len(signal_line) >= 2:
-            prev_macd = macd_line[-2]
-            prev_signal = signal_line[-2]
-
-            # Detect crossover
-            # 1 = bullish crossover (MACD crosses above signal)
-            # -1 = bearish crossover (MACD crosses below signal)
-            # 0 = no crossover
-            if prev_macd <= prev_signal and current_macd > current_signal:
-                crossover = 1
-            elif prev_macd >= prev_signal and current_macd < current_signal:
-                crossover = -1
-            else:
-                crossover = 0
-        else:
-            crossover = 0
+    def calculate_series(self, candles: List[Candle]) -> List[IndicatorResult]:
+        """Calculate MACD for entire series (the EMAs are causal: one pass)"""
+        min_candles = self.get_parameter("slow", 26) + self.get_parameter("signal", 9)
+        first = max(self.required_candles, min_candles) - 1
+        if len(candles) <= first:
+            return []
 
-        return IndicatorResult(
-            name=self.name,
-            timestamp=candles[-1].timestamp,
-            values={
-                "macd": Decimal(str(round(current_macd, 8))),
-                "signal_line": Decimal(str(round(current_signal, 8))),
-                "histogram": Decimal(str(round(current_histogram, 8))),
-                "crossover": Decimal(str(crossover))
-            }
-        )
+        series = self._compute(candles)
+        return [self._result_at(candles, series, i) for i in range(first, len(candles))]
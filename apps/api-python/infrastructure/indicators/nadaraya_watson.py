@@ -11,6 +11,7 @@ from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .classic import kernel_regression
 
 
 class NadarayaWatsonCalculator(BaseIndicatorCalculator):
@@ -100,24 +101,7 @@ class NadarayaWatsonCalculator(BaseIndicatorCalculator):
 
     def _calculate_kernel_regression(self, prices: List[float]) -> List[float]:
         """Calculate Nadaraya-Watson kernel regression values"""
-        n = len(prices)
-        nw_values = []
-
-        for i in range(n):
-            weighted_sum = 0.0
-            weight_sum = 0.0
-
-            for j in range(n):
-                weight = self._gaussian_kernel(i - j, self.bandwidth)
-                weighted_sum += weight * prices[j]
-                weight_sum += weight
-
-            if weight_sum > 0:
-                nw_values.append(weighted_sum / weight_sum)
-            else:
-                nw_values.append(prices[i])
-
-        return nw_values
+        return kernel_regression(prices, self.bandwidth).tolist()
 
     def calculate(self, candles: List[Candle]) -> IndicatorResult:
         """Calculate Nadaraya-Watson Envelope values
@@ -39,6 +39,8 @@ from typing import Dict, List, Optional, Any
 import numpy as np
 
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .primitives import on_balance_volume, rolling_mean
+from .rolling import rolling_max, rolling_min
 
 
 class OBVCalculator(BaseIndicatorCalculator):
@@ -56,6 +58,7 @@ class OBVCalculator(BaseIndicatorCalculator):
 
     name = "obv"
     required_candles = 50
+    vectorized_series = True
 
     def __init__(self, parameters: Optional[Dict[str, Any]] = None):
         super().__init__(parameters)
@@ -69,152 +72,143 @@ class OBVCalculator(BaseIndicatorCalculator):
         if self.parameters.get("signal_period", 14) < 1:
             raise ValueError("signal_period must be >= 1")
 
-    def calculate(self, candles: List[Candle]) -> IndicatorResult:
-        """
-        Calculate OBV value and signals
-
-        Returns:
-            IndicatorResult with keys:
-            - obv: Current OBV value
-            - obv_sma: SMA of OBV
-            - obv_normalized: OBV normalized (0-100 scale over signal_period)
-            - trend: 1 (OBV > SMA = bullish), -1 (OBV < SMA = bearish)
-            - divergence: 1 (bullish divergence), -1 (bearish divergence), 0 (none)
-            - signal: 1 (buy), -1 (sell), 0 (neutral)
-        """
-        if len(candles) < self.required_candles:
-            raise ValueError(f"Need at least {self.required_candles} candles, got {len(candles)}")
-
-        # Convert to numpy arrays
+    def _compute(self, candles: List[Candle]) -> Dict[str, np.ndarray]:
+        """OBV, its SMA and the derived signals for every candle (full-series array ops)"""
         closes = np.array([float(c.close) for c in candles])
         volumes = np.array([float(c.volume) for c in candles])
-
         n = len(closes)
+        index = np.arange(n)
 
         # Calculate OBV
-        obv = np.zeros(n)
-        obv[0] = volumes[0]
-
-        for i in range(1, n):
-            if closes[i] > closes[i - 1]:
-                obv[i] = obv[i - 1] + volumes[i]
-            elif closes[i] < closes[i - 1]:
-                obv[i] = obv[i - 1] - volumes[i]
-            else:
-                obv[i] = obv[i - 1]
-
-        # Calculate SMA of OBV
+        obv = on_balance_volume(closes, volumes)
+
+        # Calculate SMA of OBV (0 antes da primeira janela completa)
         obv_sma = np.zeros(n)
-        for i in range(self.sma_period - 1, n):
-            obv_sma[i] = np.mean(obv[i - self.sma_period + 1:i + 1])
+        obv_sma[self.sma_period - 1:] = rolling_mean(obv, self.sma_period)
 
         # Normalize OBV to 0-100 scale over signal period
-        obv_normalized = 50.0  # Default neutral
-        if n >= self.signal_period:
-            recent_obv = obv[-self.signal_period:]
-            obv_min = np.min(recent_obv)
-            obv_max = np.max(recent_obv)
-            if obv_max != obv_min:
-                obv_normalized = 100 * (obv[-1] - obv_min) / (obv_max - obv_min)
-
-        # Current values
-        current_obv = obv[-1]
-        current_sma = obv_sma[-1]
+        period = self.signal_period
+        obv_normalized = np.full(n, 50.0)  # Default neutral
+        if n >= period:
+            obv_max = rolling_max(obv, period)
+            obv_min = rolling_min(obv, period)
+            spread = obv_max - obv_min
+            window_obv = obv[period - 1:]
+            obv_normalized[period - 1:] = np.where(
+                spread != 0, 100 * (window_obv - obv_min) / np.where(spread != 0, spread, 1.0), 50.0
+            )
+
+        # OBV rate of change (momentum): obv[i] vs obv[i-4]
+        obv_roc = np.zeros(n)
+        if n >= 5:
+            base = obv[:-4]
+            obv_roc[4:] = np.where(base != 0, (obv[4:] - base) / np.where(base != 0, np.abs(base), 1.0) * 100, 0.0)
 
         # Determine trend
-        trend = 1 if current_obv > current_sma else -1
+        trend = np.where(obv > obv_sma, 1, -1)
 
         # Detect divergence
-        divergence = self._detect_divergence(closes, obv)
-
-        # OBV rate of change (momentum)
-        obv_roc = 0.0
-        if n >= 5 and obv[-5] != 0:
-            obv_roc = ((obv[-1] - obv[-5]) / abs(obv[-5])) * 100
-
-        # Generate signal
-        signal = 0
+        divergence = self._divergence(closes, obv)
 
-        # Strong signal: trend + divergence
-        if trend == 1 and divergence == 1:
-            signal = 1  # Strong buy
-        elif trend == -1 and divergence == -1:
-            signal = -1  # Strong sell
         # Medium signal: OBV crossing SMA
-        elif len(obv_sma) >= 2:
-            prev_obv = obv[-2]
-            prev_sma = obv_sma[-2]
-            # Bullish cross
-            if prev_obv <= prev_sma and current_obv > current_sma:
-                signal = 1
-            # Bearish cross
-            elif prev_obv >= prev_sma and current_obv < current_sma:
-                signal = -1
+        prev_obv = np.concatenate(([np.nan], obv[:-1]))
+        prev_sma = np.concatenate(([np.nan], obv_sma[:-1]))
+        cross = np.zeros(n, dtype=int)
+        cross[(prev_obv <= prev_sma) & (obv > obv_sma)] = 1
+        cross[(prev_obv >= prev_sma) & (obv < obv_sma) & (cross == 0)] = -1
+        cross[index < 1] = 0
 
-        return IndicatorResult(
-            name=self.name,
-            timestamp=candles[-1].timestamp,
-            values={
-                "obv": Decimal(str(round(current_obv, 2))),
-                "obv_sma": Decimal(str(round(current_sma, 2))),
-                "obv_normalized": Decimal(str(round(obv_normalized, 2))),
-                "obv_roc": Decimal(str(round(obv_roc, 4))),
-                "trend": Decimal(str(int(trend))),
-                "divergence": Decimal(str(int(divergence))),
-                "signal": Decimal(str(signal)),
-            }
+        # Strong signal: trend + divergence
+        signal = np.select(
+            [(trend == 1) & (divergence == 1), (trend == -1) & (divergence == -1)],
+            [1, -1],
+            default=cross
         )
 
-    def _detect_divergence(self, closes: np.ndarray, obv: np.ndarray) -> int:
+        return {
+            "obv": obv,
+            "obv_sma": obv_sma,
+            "obv_normalized": obv_normalized,
+            "obv_roc": obv_roc,
+            "trend": trend,
+            "divergence": divergence,
+            "signal": signal,
+        }
+
+    def _divergence(self, closes: np.ndarray, obv: np.ndarray) -> np.ndarray:
         """
-        Detect bullish or bearish divergence
+        Bullish or bearish divergence at every candle
 
-        Returns:
+        Compares the last signal_period candles with the signal_period before:
             1 = bullish divergence (price lower low, OBV higher low)
             -1 = bearish divergence (price higher high, OBV lower high)
-            0 = no divergence
+            0 = no divergence (or fewer than 2 * signal_period candles)
         """
         period = self.signal_period
+        n = len(closes)
+        divergence = np.zeros(n, dtype=int)
+        if n < period * 2:
+            return divergence
 
-        if len(closes) < period * 2:
-            return 0
+        # rolling_*[k] = janela [k, k + period); recent termina em i, previous em i - period
+        recent = slice(period, None)
+        previous = slice(None, -period)
 
-        # Recent and previous periods
-        recent_closes = closes[-period:]
-        prev_closes = closes[-period * 2:-period]
-        recent_obv = obv[-period:]
-        prev_obv = obv[-period * 2:-period]
+        close_low = rolling_min(closes, period)
+        close_high = rolling_max(closes, period)
+        obv_low = rolling_min(obv, period)
+        obv_high = rolling_max(obv, period)
 
-        # Find lows and highs
-        recent_close_low = np.min(recent_closes)
-        prev_close_low = np.min(prev_closes)
-        recent_obv_low = np.min(recent_obv)
-        prev_obv_low = np.min(prev_obv)
+        # Bullish divergence: Price makes lower low, OBV makes higher low
+        bullish = (close_low[recent] < close_low[previous]) & (obv_low[recent] > obv_low[previous])
+        # Bearish divergence: Price makes higher high, OBV makes lower high
+        bearish = (close_high[recent] > close_high[previous]) & (obv_high[recent] < obv_high[previous])
 
-        recent_close_high = np.max(recent_closes)
-        prev_close_high = np.max(prev_closes)
-        recent_obv_high = np.max(recent_obv)
-        prev_obv_high = np.max(prev_obv)
+        divergence[period * 2 - 1:] = np.where(bullish, 1, np.where(bearish, -1, 0))
+        return divergence
 
-        # Bullish divergence: Price makes lower low, OBV makes higher low
-        if recent_close_low < prev_close_low and recent_obv_low > prev_obv_low:
-            return 1
+    def _result_at(self, candles: List[Candle], series: Dict[str, np.ndarray], i: int) -> IndicatorResult:
+        """IndicatorResult for candle i (same values as calculate(candles[:i + 1]))"""
+        return IndicatorResult(
+            name=self.name,
+            timestamp=candles[i].timestamp,
+            values={
+                "obv": Decimal(str(round(series["obv"][i], 2))),
+                "obv_sma": Decimal(str(round(series["obv_sma"][i], 2))),
+                "obv_normalized": Decimal(str(round(series["obv_normalized"][i], 2))),
+                "obv_roc": Decimal(str(round(series["obv_roc"][i], 4))),
+                "trend": Decimal(str(int(series["trend"][i]))),
+                "divergence": Decimal(str(int(series["divergence"][i]))),
+                "signal": Decimal(str(int(series["signal"][i]))),
+            }
+        )
 
-        # Bearish divergence: Price makes higher high, OBV makes lower high
-        if recent_close_high > prev_close_high and recent_obv_high < prev_obv_high:
-            return -1
+    def calculate(self, candles: List[Candle]) -> IndicatorResult:
+        """
+        Calculate OBV value and signals
 
-        return 0
+        Returns:
+            IndicatorResult with keys:
+            - obv: Current OBV value
+            - obv_sma: SMA of OBV
+            - obv_normalized: OBV normalized (0-100 scale over signal_period)
+            - trend: 1 (OBV > SMA = bullish), -1 (OBV < SMA = bearish)
+            - divergence: 1 (bullish divergence), -1 (bearish divergence), 0 (none)
+            - signal: 1 (buy), -1 (sell), 0 (neutral)
+        """
+        if len(candles) < self.required_candles:
+            raise ValueError(f"Need at least {self.required_candles} candles, got {len(candles)}")
+
+        return self._result_at(candles, self._compute(candles), len(candles) - 1)
 
     def calculate_series(self, candles: List[Candle]) -> List[IndicatorResult]:
-        """Calculate OBV for entire series"""
-        results = []
+        """Calculate OBV for entire series
 
-        for i in range(self.required_candles, len(candles) + 1):
-            try:
-                result = self.calculate(candles[:i])
-                results.append(result)
-            except (ValueError, IndexError):
-                continue
+        Every value only looks back, so one pass over all candles gives the
+        same values as calculate() on every prefix.
+        """
+        if len(candles) < self.required_candles:
+            return []
 
-        return results
+        series = self._compute(candles)
+        return [self._result_at(candles, series, i) for i in range(self.required_candles - 1, len(candles))]
@@ -0,0 +1,207 @@
+"""
+Array primitives shared by the indicator calculators
+
+Substituem os loops `for i in range(1, n)` de ADX, OBV e SuperTrend por
+operacoes vetorizadas sobre a serie inteira:
+
+- true_range / directional_movement: TR e +DM/-DM com diff/maximum.
+- rolling_mean: SMA de janelas completas (sliding_window_view, mesma soma
+  de cada janela que np.mean; cumsum acumula erro em series longas).
+- ema_filter: filtro recursivo de 1a ordem y[i] = y[i-1] + alpha * (x[i] - y[i-1])
+  (equivalente a scipy.signal.lfilter([alpha], [1, alpha - 1])). Resolvido em
+  blocos pela forma fechada y[k + t] = d^(t+1) * (y[k-1] + alpha * sum x[k+j] / d^(j+1)),
+  d = 1 - alpha; o bloco e limitado para d^-B nao estourar, entao o loop
+  Python roda n / B vezes (B ~ 370 para period 14).
+- wilder_smooth: media de Wilder (semente = SMA dos primeiros `period`).
+- on_balance_volume: OBV como cumsum do volume com sinal.
+- carry_band: bandas do SuperTrend (min/max acumulado que reinicia quando o
+  close anterior rompe a banda), resolvidas com uma sparse table de minimos.
+"""
+
+import math
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Razao maxima d^-B dentro de um bloco do ema_filter
+_MAX_BLOCK_GROWTH = 1e12
+_MAX_BLOCK = 4096
+
+
+def true_range(highs: Sequence[float], lows: Sequence[float], closes: Sequence[float]) -> np.ndarray:
+    """max(high - low, |high - prev close|, |low - prev close|); tr[0] = high - low"""
+    highs = np.asarray(highs, dtype=float)
+    lows = np.asarray(lows, dtype=float)
+    closes = np.asarray(closes, dtype=float)
+
+    tr = highs - lows
+    if len(tr) > 1:
+        prev_close = closes[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(highs[1:] - prev_close), np.abs(lows[1:] - prev_close)))
+    return tr
+
+
+def directional_movement(highs: Sequence[float], lows: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """(+DM, -DM) per Wilder; index 0 is 0"""
+    highs = np.asarray(highs, dtype=float)
+    lows = np.asarray(lows, dtype=float)
+
+    plus_dm = np.zeros(len(highs))
+    minus_dm = np.zeros(len(highs))
+    if len(highs) > 1:
+        up_move = np.diff(highs)
+        down_move = -np.diff(lows)
+        plus_dm[1:] = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm[1:] = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    return plus_dm, minus_dm
+
+
+def rolling_mean(values: Sequence[float], period: int) -> np.ndarray:
+    """Mean of each full window of `period` values (len = n - period + 1)"""
+    values = np.asarray(values, dtype=float)
+    if period < 1:
+        raise ValueError("period must be >= 1")
+    if len(values) < period:
+        return np.empty(0)
+
+    return sliding_window_view(values, period).mean(axis=1)
+
+
+def _block_size(decay: float) -> int:
+    return int(min(_MAX_BLOCK, max(1, math.log(_MAX_BLOCK_GROWTH) / -math.log(decay))))
+
+
+def ema_filter(values: Sequence[float], alpha: float, start: int = 0, initial: Optional[float] = None) -> np.ndarray:
+    """
+    First-order recursive filter y[i] = y[i-1] + alpha * (x[i] - y[i-1]) for i > start.
+
+    y[start] = initial (x[start] by default); values before start are 0.
+    """
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha must be in (0, 1]")
+
+    y = np.zeros(n)
+    if n <= start:
+        return y
+    y[start] = x[start] if initial is None else initial
+
+    decay = 1.0 - alpha
+    if decay == 0:
+        y[start + 1:] = x[start + 1:]
+        return y
+
+    block = _block_size(decay)
+    powers = decay ** np.arange(1, block + 1)
+    previous = y[start]
+    i = start + 1
+    while i < n:
+        chunk = x[i:i + block]
+        weights = powers[:len(chunk)]
+        out = weights * (previous + alpha * np.cumsum(chunk / weights))
+        y[i:i + len(chunk)] = out
+        previous = out[-1]
+        i += len(chunk)
+    return y
+
+
+def wilder_smooth(values: Sequence[float], period: int) -> np.ndarray:
+    """
+    Wilder's smoothing: y[period-1] = mean of the first `period` values,
+    then y[i] = y[i-1] + (x[i] - y[i-1]) / period. Zeros before the seed.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) < period:
+        return np.zeros(len(values))
+    return ema_filter(values, 1.0 / period, start=period - 1, initial=float(np.mean(values[:period])))
+
+
+def on_balance_volume(closes: Sequence[float], volumes: Sequence[float]) -> np.ndarray:
+    """OBV: obv[0] = volume[0], then +/- volume by close direction"""
+    closes = np.asarray(closes, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    if len(closes) == 0:
+        return np.zeros(0)
+
+    signed = np.empty(len(volumes))
+    signed[0] = volumes[0]
+    signed[1:] = np.sign(np.diff(closes)) * volumes[1:]
+    return np.cumsum(signed)
+
+
+def _min_table(values: np.ndarray) -> np.ndarray:
+    """Sparse table: row L holds min(values[i:i + 2**L]) (inf past the end)"""
+    n = len(values)
+    levels = max(1, int(n).bit_length())
+    table = np.full((levels, n), np.inf)
+    table[0] = values
+    for level in range(1, levels):
+        half = 1 << (level - 1)
+        width = n - (1 << level) + 1
+        if width <= 0:
+            break
+        table[level, :width] = np.minimum(table[level - 1, :width], table[level - 1, half:half + width])
+    return table
+
+
+def _range_min(table: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """min(values[starts[i]:ends[i] + 1]) for every i (inclusive ends)"""
+    level = np.floor(np.log2(ends - starts + 1)).astype(np.int64)
+    return np.minimum(table[level, starts], table[level, ends - (1 << level) + 1])
+
+
+def _carry_min_band(basic: np.ndarray, closes: np.ndarray) -> np.ndarray:
+    n = len(basic)
+    table = _min_table(basic)
+    index = np.arange(n)
+
+    # last_below[k]: ultimo j <= k com basic[j] < closes[k] (-1 se nenhum), por
+    # binary lifting: estende [s, k] enquanto o bloco anterior for >= closes[k]
+    start = index + 1
+    for level in range(table.shape[0] - 1, -1, -1):
+        candidate = start - (1 << level)
+        valid = candidate >= 0
+        extend = valid & (table[level, np.maximum(candidate, 0)] >= closes)
+        start = np.where(extend, candidate, start)
+    last_below = start - 1
+
+    # O trecho iniciado em r reinicia em k + 1 para o primeiro k com
+    # last_below[k] >= r (o close rompeu o minimo do trecho):
+    # next_break[r] = min{k : last_below[k] >= r}
+    first_k = np.full(n + 1, n)
+    has_below = last_below >= 0
+    np.minimum.at(first_k, last_below[has_below], index[has_below])
+    next_break = np.minimum.accumulate(first_k[::-1])[::-1].tolist()
+
+    # Um passo escalar por reinicio
+    segment_start = np.zeros(n, dtype=np.int64)
+    restart = 0
+    while True:
+        restart = next_break[restart] + 1
+        if restart >= n:
+            break
+        segment_start[restart] = restart
+    segment_start = np.maximum.accumulate(segment_start)
+
+    return _range_min(table, segment_start, index)
+
+
+def carry_band(basic: np.ndarray, closes: np.ndarray, upper: bool) -> np.ndarray:
+    """
+    Final SuperTrend band from the basic band.
+
+    Upper: band[i] = min(band[i-1], basic[i]) unless closes[i-1] > band[i-1],
+    which restarts it at basic[i] (lower band: max and closes[i-1] < band[i-1]).
+    So band[i] = min(basic[restart..i]); the restarts are found with a sparse
+    min table (O(n log n) array ops) and band values are range-min queries.
+    """
+    basic = np.asarray(basic, dtype=float)
+    closes = np.asarray(closes, dtype=float)
+    if len(basic) == 0:
+        return np.empty(0)
+    if upper:
+        return _carry_min_band(basic, closes)
+    # Banda inferior = banda superior espelhada
+    return -_carry_min_band(-basic, -closes)
@@ -0,0 +1,316 @@
+"""
+Histogram-based price profiles (TPO counts / volume at price)
+
+Cada candle conta 1 TPO em todos os bins de preco entre low e high
+(bin k = [k * tick, (k + 1) * tick)), e seu volume e distribuido igualmente
+entre esses bins. Em vez de um dict preenchido nivel a nivel, os perfis sao
+montados com um array de diferencas (+1 no bin do low, -1 depois do bin do
+high) via np.bincount seguido de cumsum, para varias sessoes de uma vez:
+
+- build_profiles: perfis de N sessoes/janelas (start, end) em poucas passadas
+  vetorizadas; as janelas podem se sobrepor (series rolling para backtest).
+- PriceProfiles: POC, Value Area e VPOC de todas as sessoes como arrays.
+- session_bounds / rolling_windows: geram os (starts, ends) para sessoes por
+  tempo (ex: diaria) ou janelas de `period` candles.
+- LiveProfile: perfil da sessao ao vivo atualizado por candle, com o candle em
+  formacao substituido a cada tick.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Tolerancia para high exatamente sobre a fronteira de um bin (erro de float)
+_BIN_EPSILON = 1e-9
+
+
+def price_bins(prices: Sequence[float], tick_size) -> np.ndarray:
+    """Bin index floor(price / tick_size) of each price"""
+    return np.floor(np.asarray(prices, dtype=float) / tick_size).astype(np.int64)
+
+
+def _candle_bins(highs: np.ndarray, lows: np.ndarray, tick: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    low_bins = np.floor(lows / tick).astype(np.int64)
+    high_bins = np.floor(highs / tick + _BIN_EPSILON).astype(np.int64)
+    # O bin do low sempre conta, mesmo com high < low em dados ruins
+    return low_bins, np.maximum(high_bins, low_bins)
+
+
+def rolling_windows(n: int, period: int, first_end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(starts, ends) of the windows of the last `period` candles ending at each index >= first_end - 1"""
+    first_end = period if first_end is None else max(first_end, period)
+    ends = np.arange(first_end, n + 1, dtype=np.int64)
+    return ends - period, ends
+
+
+def session_bounds(timestamps: Sequence[float], session_seconds: float, offset_seconds: float = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """(starts, ends) of consecutive candles sharing the same session (timestamps in seconds, sorted)"""
+    keys = np.floor((np.asarray(timestamps, dtype=float) - offset_seconds) / session_seconds).astype(np.int64)
+    if len(keys) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(keys)]))
+    return starts, ends
+
+
+class PriceProfiles:
+    """
+    Profiles of several sessions stored back to back in flat arrays.
+
+    Session s owns bins offsets[s]:offsets[s + 1]; bin j of the session is
+    the price level (base_bins[s] + j) * tick_sizes[s].
+    """
+
+    __slots__ = ("base_bins", "tick_sizes", "offsets", "tpo", "volume", "_levels")
+
+    def __init__(self, base_bins: np.ndarray, tick_sizes: np.ndarray, offsets: np.ndarray, tpo: np.ndarray, volume: np.ndarray):
+        self.base_bins = base_bins
+        self.tick_sizes = tick_sizes
+        self.offsets = offsets
+        self.tpo = tpo
+        self.volume = volume
+        self._levels: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.base_bins)
+
+    @property
+    def session_of_bin(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self)), np.diff(self.offsets))
+
+    @property
+    def levels(self) -> np.ndarray:
+        """Price level of every bin, rounded to 8 decimals"""
+        if self._levels is None:
+            session = self.session_of_bin
+            bins = self.base_bins[session] + (np.arange(len(self.tpo)) - self.offsets[session])
+            self._levels = np.round(bins * self.tick_sizes[session], 8)
+        return self._levels
+
+    def profile(self, session: int = 0) -> Dict[float, int]:
+        """{price level: TPO count} of one session (only levels with TPOs)"""
+        start, end = self.offsets[session], self.offsets[session + 1]
+        counts = self.tpo[start:end]
+        touched = counts > 0
+        return dict(zip(self.levels[start:end][touched].tolist(), counts[touched].tolist()))
+
+    def volume_profile(self, session: int = 0) -> Dict[float, float]:
+        """{price level: volume} of one session (only levels with TPOs)"""
+        start, end = self.offsets[session], self.offsets[session + 1]
+        touched = self.tpo[start:end] > 0
+        return dict(zip(self.levels[start:end][touched].tolist(), self.volume[start:end][touched].tolist()))
+
+    def _mean_of_max(self, values: np.ndarray) -> np.ndarray:
+        # Media dos niveis empatados no maximo de cada sessao
+        starts = self.offsets[:-1]
+        is_max = values == np.maximum.reduceat(values, starts)[self.session_of_bin]
+        return np.add.reduceat(np.where(is_max, self.levels, 0.0), starts) / np.add.reduceat(is_max, starts)
+
+    def poc(self) -> np.ndarray:
+        """Point of Control per session (mean of the levels with the most TPOs)"""
+        return self._mean_of_max(self.tpo)
+
+    def volume_poc(self) -> np.ndarray:
+        """Volume Point of Control per session (mean of the levels with the most volume)"""
+        return self._mean_of_max(np.where(self.tpo > 0, self.volume, -1.0))
+
+    def value_area(self, value_area_percent: float = 70.0, poc: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (VAH, VAL) per session.
+
+        Starting at the level nearest the POC, the area grows one touched level
+        at a time toward the side with more TPOs (up on ties) until it holds
+        value_area_percent of the session's TPOs. Every session expands in
+        lockstep, so the Python loop runs once per level of the widest session.
+        """
+        if poc is None:
+            poc = self.poc()
+
+        touched = self.tpo > 0
+        counts = self.tpo[touched]
+        levels = self.levels[touched]
+        session = self.session_of_bin[touched]
+        sizes = np.bincount(session, minlength=len(self))
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        lasts = starts + sizes - 1
+
+        # Nivel mais proximo do POC (o primeiro em caso de empate)
+        distance = np.abs(levels - poc[session])
+        nearest = distance == np.minimum.reduceat(distance, starts)[session]
+        low = np.minimum.reduceat(np.where(nearest, np.arange(len(counts)), len(counts)), starts)
+        high = low.copy()
+
+        target = np.floor(np.add.reduceat(counts, starts) * (value_area_percent / 100))
+        current = counts[low].astype(float)
+        last_index = len(counts) - 1
+
+        while True:
+            can_up = high < lasts
+            can_down = low > starts
+            active = (current < target) & (can_up | can_down)
+            if not active.any():
+                break
+
+            up = np.where(can_up, counts[np.minimum(high + 1, last_index)], -1)
+            down = np.where(can_down, counts[np.maximum(low - 1, 0)], -1)
+            go_up = active & can_up & (up >= down)
+            go_down = active & ~go_up
+
+            high += go_up
+            low -= go_down
+            current += np.where(go_up, up, 0) + np.where(go_down, down, 0)
+
+        return levels[high], levels[low]
+
+
+def build_profiles(
+    highs: Sequence[float],
+    lows: Sequence[float],
+    volumes: Optional[Sequence[float]],
+    tick_size,
+    starts: Sequence[int],
+    ends: Sequence[int]
+) -> PriceProfiles:
+    """
+    Build the profiles of the candle ranges [starts[s], ends[s]).
+
+    tick_size is a scalar or one value per session. Ranges may overlap;
+    each one must contain at least one candle.
+    """
+    highs = np.asarray(highs, dtype=float)
+    lows = np.asarray(lows, dtype=float)
+    volumes = np.zeros(len(highs)) if volumes is None else np.asarray(volumes, dtype=float)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    lengths = ends - starts
+    if len(starts) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return PriceProfiles(empty, np.empty(0), np.zeros(1, dtype=np.int64), empty, np.empty(0))
+    if np.any(lengths < 1):
+        raise ValueError("every session must contain at least one candle")
+
+    n_sessions = len(starts)
+    tick_sizes = np.broadcast_to(np.asarray(tick_size, dtype=float), (n_sessions,)).copy()
+
+    # Uma entrada por (sessao, candle): janelas sobrepostas repetem o candle
+    first_entry = np.cumsum(lengths) - lengths
+    session = np.repeat(np.arange(n_sessions), lengths)
+    candle = np.arange(lengths.sum()) - first_entry[session] + starts[session]
+
+    tick = tick_sizes[session]
+    low_bins, high_bins = _candle_bins(highs[candle], lows[candle], tick)
+
+    base_bins = np.minimum.reduceat(low_bins, first_entry)
+    widths = np.maximum.reduceat(high_bins, first_entry) - base_bins + 1
+    offsets = np.concatenate(([0], np.cumsum(widths)))
+    total = int(offsets[-1])
+
+    first = offsets[session] + low_bins - base_bins[session]
+    after_last = offsets[session] + high_bins - base_bins[session] + 1
+
+    tpo = np.cumsum(np.bincount(first, minlength=total + 1) - np.bincount(after_last, minlength=total + 1))[:total]
+
+    per_bin_volume = volumes[candle] / (high_bins - low_bins + 1)
+    volume_diff = (
+        np.bincount(first, weights=per_bin_volume, minlength=total + 1)
+        - np.bincount(after_last, weights=per_bin_volume, minlength=total + 1)
+    )
+    volume = np.maximum(np.cumsum(volume_diff)[:total], 0.0)
+
+    return PriceProfiles(base_bins, tick_sizes, offsets, tpo, volume)
+
+
+class LiveProfile:
+    """
+    Incremental profile of the live session.
+
+    add() folds a closed candle into the histogram (O(bins of the candle));
+    update_forming() replaces the contribution of the forming candle, so
+    intrabar ticks never rebuild the session. snapshot() exposes the current
+    state as a one-session PriceProfiles for POC / Value Area.
+    """
+
+    def __init__(self, tick_size: float):
+        if tick_size <= 0:
+            raise ValueError("tick_size must be > 0")
+        self.tick_size = float(tick_size)
+        self.candles = 0
+        self._base_bin: Optional[int] = None
+        self._tpo = np.zeros(0, dtype=np.int64)
+        self._volume = np.zeros(0)
+        self._forming: Optional[Tuple[int, int, float]] = None
+
+    def _bins(self, high: float, low: float) -> Tuple[int, int]:
+        low_bins, high_bins = _candle_bins(np.array([high], dtype=float), np.array([low], dtype=float), self.tick_size)
+        return int(low_bins[0]), int(high_bins[0])
+
+    def _ensure(self, low_bin: int, high_bin: int) -> None:
+        if self._base_bin is None:
+            self._base_bin = low_bin
+        if low_bin < self._base_bin:
+            pad = self._base_bin - low_bin
+            self._tpo = np.concatenate((np.zeros(pad, dtype=np.int64), self._tpo))
+            self._volume = np.concatenate((np.zeros(pad), self._volume))
+            self._base_bin = low_bin
+        needed = high_bin - self._base_bin + 1
+        if needed > len(self._tpo):
+            pad = needed - len(self._tpo)
+            self._tpo = np.concatenate((self._tpo, np.zeros(pad, dtype=np.int64)))
+            self._volume = np.concatenate((self._volume, np.zeros(pad)))
+
+    def _apply(self, low_bin: int, high_bin: int, volume: float, sign: int) -> None:
+        self._ensure(low_bin, high_bin)
+        first = low_bin - self._base_bin
+        last = high_bin - self._base_bin + 1
+        self._tpo[first:last] += sign
+        self._volume[first:last] += sign * volume / (last - first)
+
+    def add(self, high: float, low: float, volume: float = 0.0) -> None:
+        """Fold a closed candle into the session (drops any forming candle)"""
+        self.clear_forming()
+        low_bin, high_bin = self._bins(high, low)
+        self._apply(low_bin, high_bin, float(volume), 1)
+        self.candles += 1
+
+    def update_forming(self, high: float, low: float, volume: float = 0.0) -> None:
+        """Replace the forming candle's contribution with its latest high/low/volume"""
+        self.clear_forming()
+        low_bin, high_bin = self._bins(high, low)
+        self._apply(low_bin, high_bin, float(volume), 1)
+        self._forming = (low_bin, high_bin, float(volume))
+
+    def clear_forming(self) -> None:
+        if self._forming is not None:
+            low_bin, high_bin, volume = self._forming
+            self._apply(low_bin, high_bin, volume, -1)
+            self._forming = None
+
+    def reset(self) -> None:
+        """Start a new session"""
+        self.__init__(self.tick_size)
+
+    def snapshot(self) -> Optional[PriceProfiles]:
+        """Current session (closed + forming candle) as a one-session PriceProfiles"""
+        if self._base_bin is None or not self._tpo.any():
+            return None
+        return PriceProfiles(
+            np.array([self._base_bin], dtype=np.int64),
+            np.array([self.tick_size]),
+            np.array([0, len(self._tpo)], dtype=np.int64),
+            self._tpo.copy(),
+            np.maximum(self._volume, 0.0),
+        )
+
+    def key_levels(self, value_area_percent: float = 70.0) -> Optional[Dict[str, float]]:
+        """{"poc", "vah", "val", "volume_poc"} of the live session"""
+        profiles = self.snapshot()
+        if profiles is None:
+            return None
+        poc = profiles.poc()
+        vah, val = profiles.value_area(value_area_percent, poc)
+        return {
+            "poc": float(poc[0]),
+            "vah": float(vah[0]),
+            "val": float(val[0]),
+            "volume_poc": float(profiles.volume_poc()[0]),
+        }
@@ -0,0 +1,135 @@
+"""
+Rolling window extrema (max/min) in O(n)
+
+Usado por Ichimoku (Donchian midline), Stochastic e Stochastic RSI, que antes
+faziam np.max/np.min de uma fatia para cada indice (O(n*period)).
+
+- rolling_max / rolling_min: serie completa com o algoritmo van Herk/Gil-Werman
+  (prefix/suffix max por blocos de `period`), ~3 passadas vetorizadas
+  independente do periodo. Retorna so as janelas completas (len = n - period + 1),
+  o valor i corresponde a janela que termina em values[i + period - 1].
+- RollingExtrema: variante streaming (deques monotonicas) para candles ao vivo:
+  push() para candles fechados e peek() para o candle em formacao.
+"""
+
+from collections import deque
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _rolling_extreme(values: Sequence[float], period: int, use_max: bool) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if period < 1:
+        raise ValueError("period must be >= 1")
+    if n < period:
+        return np.empty(0)
+    if period == 1:
+        return values.copy()
+
+    accumulate = np.maximum.accumulate if use_max else np.minimum.accumulate
+    combine = np.maximum if use_max else np.minimum
+    fill = -np.inf if use_max else np.inf
+
+    blocks = -(-n // period)
+    padded = np.full(blocks * period, fill)
+    padded[:n] = values
+    padded = padded.reshape(blocks, period)
+
+    # prefix[i]: extremo do inicio do bloco ate i; suffix[i]: de i ate o fim do bloco
+    prefix = accumulate(padded, axis=1).ravel()
+    suffix = accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    # Janela [i - period + 1, i] cruza no maximo uma fronteira de bloco
+    return combine(suffix[:n - period + 1], prefix[period - 1:n])
+
+
+def rolling_max(values: Sequence[float], period: int) -> np.ndarray:
+    """Max of each full window of `period` values (len = n - period + 1)"""
+    return _rolling_extreme(values, period, use_max=True)
+
+
+def rolling_min(values: Sequence[float], period: int) -> np.ndarray:
+    """Min of each full window of `period` values (len = n - period + 1)"""
+    return _rolling_extreme(values, period, use_max=False)
+
+
+def donchian_midline(highs: Sequence[float], lows: Sequence[float], period: int) -> np.ndarray:
+    """(period-high + period-low) / 2 aligned with the input; 0 before the first full window"""
+    result = np.zeros(len(highs))
+    if len(highs) >= period:
+        result[period - 1:] = (rolling_max(highs, period) + rolling_min(lows, period)) / 2
+    return result
+
+
+class RollingExtrema:
+    """
+    Streaming rolling max/min for live candles.
+
+    push(high, low) adds a closed candle and returns (max, min) of the last
+    `period` candles (None until the window is full). peek(high, low) returns
+    the extrema of the last period-1 closed candles plus a forming candle
+    without changing state, so intrabar ticks cost O(1).
+    For a single series (e.g. RSI values) pass only `high`.
+    """
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("period must be >= 1")
+        self.period = period
+        self.count = 0
+        # (indice, valor) com valores monotonicos: frente = extremo da janela
+        self._max: deque = deque()
+        self._min: deque = deque()
+
+    def push(self, high: float, low: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        low = high if low is None else low
+        index = self.count
+        self.count += 1
+
+        while self._max and self._max[-1][1] <= high:
+            self._max.pop()
+        self._max.append((index, high))
+        while self._min and self._min[-1][1] >= low:
+            self._min.pop()
+        self._min.append((index, low))
+
+        oldest = self.count - self.period
+        while self._max[0][0] < oldest:
+            self._max.popleft()
+        while self._min[0][0] < oldest:
+            self._min.popleft()
+
+        if self.count < self.period:
+            return None
+        return self._max[0][1], self._min[0][1]
+
+    def peek(self, high: float, low: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        low = high if low is None else low
+        if self.count + 1 < self.period:
+            return None
+
+        # Janela do candle em formacao: period-1 fechados + ele
+        oldest = self.count + 1 - self.period
+        window_max = self._front(self._max, oldest)
+        window_min = self._front(self._min, oldest)
+        return (
+            high if window_max is None else max(window_max, high),
+            low if window_min is None else min(window_min, low),
+        )
+
+    @staticmethod
+    def _front(dq: deque, oldest: int) -> Optional[float]:
+        # Apenas a frente pode estar fora da janela (indices crescentes)
+        for index, value in dq:
+            if index >= oldest:
+                return value
+        return None
+
+    @property
+    def value(self) -> Optional[Tuple[float, float]]:
+        """(max, min) of the last `period` closed values"""
+        if self.count < self.period:
+            return None
+        return self._max[0][1], self._min[0][1]
@@ -3,7 +3,10 @@
 from decimal import Decimal
 from typing import Dict, List, Any
 
+import numpy as np
+
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .classic import rsi
 
 
 class RSICalculator(BaseIndicatorCalculator):
@@ -23,6 +26,7 @@ class RSICalculator(BaseIndicatorCalculator):
 
     name = "rsi"
     required_candles = 20  # Need extra candles for warm-up
+    vectorized_series = True
 
     def _validate_parameters(self) -> None:
         """Validate RSI parameters"""
@@ -30,38 +34,11 @@ class RSICalculator(BaseIndicatorCalculator):
         if period < 2:
             raise ValueError("RSI period must be >= 2")
 
-    def calculate(self, candles: List[Candle]) -> IndicatorResult:
-        """Calculate RSI value"""
-        period = self.get_parameter("period", 14)
+    def _result_at(self, candles: List[Candle], rsi_values: np.ndarray, i: int) -> IndicatorResult:
+        """IndicatorResult for candle i (same values as calculate(candles[:i + 1]))"""
         overbought = self.get_parameter("overbought", 70)
         oversold = self.get_parameter("oversold", 30)
-
-        if len(candles) < period + 1:
-            raise ValueError(f"Need at least {period + 1} candles for RSI")
-
-        # Calculate price changes
-        closes = [float(c.close) for c in candles]
-        changes = [closes[i] - closes[i-1] for i in range(1, len(closes))]
-
-        # Separate gains and losses
-        gains = [max(0, c) for c in changes]
-        losses = [abs(min(0, c)) for c in changes]
-
-        # Calculate initial average (SMA)
-        avg_gain = sum(gains[:period]) / period
-        avg_loss = sum(losses[:period]) / period
-
-        # Calculate smoothed averages (EMA-like)
-        for i in range(period, len(changes)):
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-
-        # Calculate RSI
-        if avg_loss == 0:
-            rsi_value = 100.0
-        else:
-            rs = avg_gain / avg_loss
-            rsi_value = 100 - (100 / (1 + rs))
+        rsi_value = float(rsi_values[i])
 
         # Determine signal
         # 1 = oversold (buy signal), -1 = overbought (sell signal), 0 = neutral
@@ -74,7 +51,7 @@ class RSICalculator(BaseIndicatorCalculator):
 
         return IndicatorResult(
             name=self.name,
-            timestamp=candles[-1].timestamp,
+            timestamp=candles[i].timestamp,
             values={
                 "value": Decimal(str(round(rsi_value, 2))),
                 "overbought": Decimal(str(overbought)),
@@ -82,3 +59,23 @@ class RSICalculator(BaseIndicatorCalculator):
                 "signal": Decimal(str(signal))
             }
         )
+
+    def calculate(self, candles: List[Candle]) -> IndicatorResult:
+        """Calculate RSI value"""
+        period = self.get_parameter("period", 14)
+
+        if len(candles) < period + 1:
+            raise ValueError(f"Need at least {period + 1} candles for RSI")
+
+        closes = [float(c.close) for c in candles]
+        return self._result_at(candles, rsi(closes, period), len(candles) - 1)
+
+    def calculate_series(self, candles: List[Candle]) -> List[IndicatorResult]:
+        """Calculate RSI for entire series (Wilder smoothing is causal: one pass)"""
+        period = self.get_parameter("period", 14)
+        first = max(self.required_candles, period + 1) - 1
+        if len(candles) <= first:
+            return []
+
+        rsi_values = rsi([float(c.close) for c in candles], period)
+        return [self._result_at(candles, rsi_values, i) for i in range(first, len(candles))]
@@ -34,6 +34,7 @@ from typing import Dict, List, Optional, Any
 import numpy as np
 
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .rolling import rolling_max, rolling_min
 
 
 class StochasticCalculator(BaseIndicatorCalculator):
@@ -81,20 +82,16 @@ class StochasticCalculator(BaseIndicatorCalculator):
         lows = np.array([float(c.low) for c in candles])
         closes = np.array([float(c.close) for c in candles])
 
-        # Calculate raw %K values
-        raw_k = []
-        for i in range(self.k_period - 1, len(closes)):
-            window_high = highs[i - self.k_period + 1:i + 1]
-            window_low = lows[i - self.k_period + 1:i + 1]
-
-            highest = np.max(window_high)
-            lowest = np.min(window_low)
-
-            if highest - lowest > 0:
-                k = ((closes[i] - lowest) / (highest - lowest)) * 100
-            else:
-                k = 50.0  # Neutral when range is 0
-            raw_k.append(k)
+        # Calculate raw %K values (rolling extrema in O(n))
+        highest = rolling_max(highs, self.k_period)
+        lowest = rolling_min(lows, self.k_period)
+        price_range = highest - lowest
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw_k = np.where(
+                price_range > 0,
+                ((closes[self.k_period - 1:] - lowest) / price_range) * 100,
+                50.0  # Neutral when range is 0
+            ).tolist()
 
         # Smooth %K
         k_smooth = self._sma(raw_k, self.smooth) if self.smooth > 1 else raw_k
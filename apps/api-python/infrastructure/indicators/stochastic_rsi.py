@@ -34,6 +34,8 @@ from typing import Dict, List, Optional, Any
 import numpy as np
 
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .classic import rsi
+from .rolling import rolling_max, rolling_min
 
 
 class StochasticRSICalculator(BaseIndicatorCalculator):
@@ -86,18 +88,17 @@ class StochasticRSICalculator(BaseIndicatorCalculator):
         if len(rsi_values) < self.stoch_period:
             raise ValueError("Not enough RSI values for Stochastic calculation")
 
-        # Step 2: Apply Stochastic formula to RSI values
-        stoch_rsi = []
-        for i in range(self.stoch_period - 1, len(rsi_values)):
-            window = rsi_values[i - self.stoch_period + 1:i + 1]
-            min_rsi = np.min(window)
-            max_rsi = np.max(window)
-
-            if max_rsi - min_rsi > 0:
-                sr = ((rsi_values[i] - min_rsi) / (max_rsi - min_rsi)) * 100
-            else:
-                sr = 50.0  # Neutral
-            stoch_rsi.append(sr)
+        # Step 2: Apply Stochastic formula to RSI values (rolling extrema in O(n))
+        rsi_array = np.asarray(rsi_values)
+        max_rsi = rolling_max(rsi_array, self.stoch_period)
+        min_rsi = rolling_min(rsi_array, self.stoch_period)
+        rsi_range = max_rsi - min_rsi
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stoch_rsi = np.where(
+                rsi_range > 0,
+                ((rsi_array[self.stoch_period - 1:] - min_rsi) / rsi_range) * 100,
+                50.0  # Neutral
+            ).tolist()
 
         if len(stoch_rsi) < self.k_period:
             raise ValueError("Not enough data for %K smoothing")
@@ -163,31 +164,8 @@ class StochasticRSICalculator(BaseIndicatorCalculator):
         RSI = 100 - (100 / (1 + RS))
         RS = Average Gain / Average Loss
         """
-        deltas = np.diff(closes)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-
-        # Initialize arrays
-        avg_gain = np.zeros(len(deltas))
-        avg_loss = np.zeros(len(deltas))
-
-        # First average is simple average
-        if self.rsi_period <= len(gains):
-            avg_gain[self.rsi_period - 1] = np.mean(gains[:self.rsi_period])
-            avg_loss[self.rsi_period - 1] = np.mean(losses[:self.rsi_period])
-
-        # Subsequent values use Wilder's smoothing (EMA-like)
-        for i in range(self.rsi_period, len(deltas)):
-            avg_gain[i] = (avg_gain[i-1] * (self.rsi_period - 1) + gains[i]) / self.rsi_period
-            avg_loss[i] = (avg_loss[i-1] * (self.rsi_period - 1) + losses[i]) / self.rsi_period
-
-        # Calculate RS and RSI
-        # Avoid division by zero
-        rs = np.where(avg_loss != 0, avg_gain / avg_loss, 100)
-        rsi = 100 - (100 / (1 + rs))
-
         # Return only valid values (after warmup period)
-        return list(rsi[self.rsi_period - 1:])
+        return rsi(closes, self.rsi_period)[self.rsi_period:].tolist()
 
     def _sma(self, data: List[float], period: int) -> List[float]:
         """Calculate Simple Moving Average"""
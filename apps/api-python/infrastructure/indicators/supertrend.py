@@ -31,6 +31,7 @@ from typing import Dict, List, Optional, Any
 import numpy as np
 
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .primitives import carry_band, true_range, wilder_smooth
 
 
 class SuperTrendCalculator(BaseIndicatorCalculator):
@@ -43,6 +44,7 @@ class SuperTrendCalculator(BaseIndicatorCalculator):
 
     name = "supertrend"
     required_candles = 50
+    vectorized_series = True
 
     def __init__(self, parameters: Optional[Dict[str, Any]] = None):
         super().__init__(parameters)
@@ -56,27 +58,12 @@ class SuperTrendCalculator(BaseIndicatorCalculator):
         if self.parameters.get("multiplier", 3.0) <= 0:
             raise ValueError("multiplier must be > 0")
 
-    def calculate(self, candles: List[Candle]) -> IndicatorResult:
-        """
-        Calculate SuperTrend value and trend direction
-
-        Returns:
-            IndicatorResult with keys:
-            - value: Current SuperTrend value (support/resistance level)
-            - trend: 1 (bullish), -1 (bearish)
-            - upper: Upper band value
-            - lower: Lower band value
-            - signal: 1 (buy - trend just turned bullish),
-                     -1 (sell - trend just turned bearish),
-                     0 (no change)
-        """
-        if len(candles) < self.required_candles:
-            raise ValueError(f"Need at least {self.required_candles} candles, got {len(candles)}")
-
-        # Convert to numpy arrays
+    def _compute(self, candles: List[Candle]) -> Dict[str, np.ndarray]:
+        """SuperTrend, bands and trend for every candle (full-series array ops)"""
         highs = np.array([float(c.high) for c in candles])
         lows = np.array([float(c.low) for c in candles])
         closes = np.array([float(c.close) for c in candles])
+        n = len(closes)
 
         # Calculate ATR
         atr = self._calculate_atr(highs, lows, closes)
@@ -88,70 +75,77 @@ class SuperTrendCalculator(BaseIndicatorCalculator):
         upper_basic = hl2 + (self.multiplier * atr)
         lower_basic = hl2 - (self.multiplier * atr)
 
-        # Initialize arrays for final bands and trend
-        n = len(closes)
-        upper_band = np.zeros(n)
-        lower_band = np.zeros(n)
-        supertrend = np.zeros(n)
-        trend = np.zeros(n)  # 1 = bullish, -1 = bearish
-
-        # Set initial values
-        upper_band[0] = upper_basic[0]
-        lower_band[0] = lower_basic[0]
-        trend[0] = 1  # Start bullish
-
-        # Calculate SuperTrend with proper band logic
-        for i in range(1, n):
-            # Upper band calculation
-            # If new upper is lower than previous upper OR price closed above previous upper
-            if upper_basic[i] < upper_band[i-1] or closes[i-1] > upper_band[i-1]:
-                upper_band[i] = upper_basic[i]
-            else:
-                upper_band[i] = upper_band[i-1]
-
-            # Lower band calculation
-            # If new lower is higher than previous lower OR price closed below previous lower
-            if lower_basic[i] > lower_band[i-1] or closes[i-1] < lower_band[i-1]:
-                lower_band[i] = lower_basic[i]
-            else:
-                lower_band[i] = lower_band[i-1]
-
-            # Trend direction logic
-            if trend[i-1] == 1:  # Was bullish
-                if closes[i] < lower_band[i]:
-                    trend[i] = -1  # Flip to bearish
-                    supertrend[i] = upper_band[i]
-                else:
-                    trend[i] = 1  # Stay bullish
-                    supertrend[i] = lower_band[i]
-            else:  # Was bearish
-                if closes[i] > upper_band[i]:
-                    trend[i] = 1  # Flip to bullish
-                    supertrend[i] = lower_band[i]
-                else:
-                    trend[i] = -1  # Stay bearish
-                    supertrend[i] = upper_band[i]
+        # Final bands: a banda superior so desce (e a inferior so sobe) ate o
+        # close anterior rompe-la, quando reinicia na banda basica
+        upper_band = carry_band(upper_basic, closes, upper=True)
+        lower_band = carry_band(lower_basic, closes, upper=False)
+
+        # Trend direction logic: bullish vira bearish com close < lower,
+        # bearish vira bullish com close > upper. Com as duas condicoes
+        # (bandas cruzadas) a tendencia sempre inverte.
+        breaks_down = closes < lower_band
+        breaks_up = closes > upper_band
+        forced = np.zeros(n)
+        forced[breaks_down & ~breaks_up] = -1
+        forced[breaks_up & ~breaks_down] = 1
+        toggles = (breaks_down & breaks_up).astype(np.int64)
+        forced[0] = 1  # Start bullish
+        toggles[0] = 0
+
+        # Ultimo valor forcado, invertido uma vez por toggle desde entao
+        last_forced = np.maximum.accumulate(np.where(forced != 0, np.arange(n), 0))
+        toggle_count = np.cumsum(toggles)
+        flips = toggle_count - toggle_count[last_forced]
+        trend = forced[last_forced] * np.where(flips % 2 == 0, 1, -1)
+
+        supertrend = np.where(trend == 1, lower_band, upper_band)
+        supertrend[0] = 0.0
+
+        return {"value": supertrend, "trend": trend, "upper": upper_band, "lower": lower_band}
+
+    def _result_at(self, candles: List[Candle], series: Dict[str, np.ndarray], i: int) -> IndicatorResult:
+        """IndicatorResult for candle i (same values as calculate(candles[:i + 1]))"""
+        trend = series["trend"]
 
         # Detect trend change signal
         signal = 0
-        if len(trend) >= 2:
-            if trend[-2] == -1 and trend[-1] == 1:
+        if i >= 1:
+            if trend[i - 1] == -1 and trend[i] == 1:
                 signal = 1  # Bullish reversal signal
-            elif trend[-2] == 1 and trend[-1] == -1:
+            elif trend[i - 1] == 1 and trend[i] == -1:
                 signal = -1  # Bearish reversal signal
 
         return IndicatorResult(
             name=self.name,
-            timestamp=candles[-1].timestamp,
+            timestamp=candles[i].timestamp,
             values={
-                "value": Decimal(str(round(supertrend[-1], 8))),
-                "trend": Decimal(str(int(trend[-1]))),
-                "upper": Decimal(str(round(upper_band[-1], 8))),
-                "lower": Decimal(str(round(lower_band[-1], 8))),
+                "value": Decimal(str(round(series["value"][i], 8))),
+                "trend": Decimal(str(int(trend[i]))),
+                "upper": Decimal(str(round(series["upper"][i], 8))),
+                "lower": Decimal(str(round(series["lower"][i], 8))),
                 "signal": Decimal(str(signal)),
             }
         )
 
+    def calculate(self, candles: List[Candle]) -> IndicatorResult:
+        """
+        Calculate SuperTrend value and trend direction
+
+        Returns:
+            IndicatorResult with keys:
+            - value: Current SuperTrend value (support/resistance level)
+            - trend: 1 (bullish), -1 (bearish)
+            - upper: Upper band value
+            - lower: Lower band value
+            - signal: 1 (buy - trend just turned bullish),
+                     -1 (sell - trend just turned bearish),
+                     0 (no change)
+        """
+        if len(candles) < self.required_candles:
+            raise ValueError(f"Need at least {self.required_candles} candles, got {len(candles)}")
+
+        return self._result_at(candles, self._compute(candles), len(candles) - 1)
+
     def _calculate_atr(
         self,
         highs: np.ndarray,
@@ -165,43 +159,19 @@ class SuperTrendCalculator(BaseIndicatorCalculator):
         - High - Low (current bar range)
         - |High - Previous Close|
         - |Low - Previous Close|
-        """
-        n = len(closes)
-        tr = np.zeros(n)
-
-        # First TR is just high - low
-        tr[0] = highs[0] - lows[0]
-
-        # Calculate True Range for remaining bars
-        for i in range(1, n):
-            tr[i] = max(
-                highs[i] - lows[i],
-                abs(highs[i] - closes[i-1]),
-                abs(lows[i] - closes[i-1])
-            )
-
-        # Calculate ATR using Wilder's smoothing (same as EMA but different formula)
-        atr = np.zeros(n)
 
-        # Initial ATR is SMA of first 'period' TRs
-        if self.period <= n:
-            atr[self.period - 1] = np.mean(tr[:self.period])
-
-        # Subsequent ATRs use Wilder's smoothing
-        for i in range(self.period, n):
-            atr[i] = (atr[i-1] * (self.period - 1) + tr[i]) / self.period
-
-        return atr
+        ATR = Wilder's smoothing of TR (SMA of the first 'period' TRs as seed)
+        """
+        return wilder_smooth(true_range(highs, lows, closes), self.period)
 
     def calculate_series(self, candles: List[Candle]) -> List[IndicatorResult]:
-        """Calculate SuperTrend for entire series"""
-        results = []
+        """Calculate SuperTrend for entire series
 
-        for i in range(self.required_candles, len(candles) + 1):
-            try:
-                result = self.calculate(candles[:i])
-                results.append(result)
-            except (ValueError, IndexError):
-                continue
+        Bands and trend only depend on earlier candles, so one pass over all
+        candles gives the same values as calculate() on every prefix.
+        """
+        if len(candles) < self.required_candles:
+            return []
 
-        return results
+        series = self._compute(candles)
+        return [self._result_at(candles, series, i) for i in range(self.required_candles - 1, len(candles))]
@@ -4,13 +4,18 @@ Implementation of Market Profile analysis showing price distribution
 over time with POC (Point of Control), Value Area High/Low.
 
 Based on the TradingView TPO Market Profile indicator.
+Profiles are NumPy histograms (see profile.py), so calculate_series and
+calculate_sessions profile the whole history in one pass.
 """
 
-from collections import defaultdict
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
 from .base import BaseIndicatorCalculator, Candle, IndicatorResult
+from .profile import PriceProfiles, build_profiles, rolling_windows, session_bounds
+from .rolling import rolling_max, rolling_min
 
 
 class TPOCalculator(BaseIndicatorCalculator):
@@ -35,6 +40,7 @@ class TPOCalculator(BaseIndicatorCalculator):
 
     name = "tpo"
     required_candles = 24
+    vectorized_series = True
 
     def __init__(self, parameters: Optional[Dict[str, Any]] = None):
         super().__init__(parameters)
@@ -60,137 +66,62 @@ class TPOCalculator(BaseIndicatorCalculator):
 
     def _calculate_tick_size(self, candles: List[Candle]) -> float:
         """Auto-calculate appropriate tick size based on price range"""
-        prices = [float(c.close) for c in candles]
-        price_range = max(prices) - min(prices)
-
-        if price_range == 0:
-            return float(prices[0]) * 0.001
-
-        tick_size = price_range / self.row_size
-
-        magnitude = 10 ** (len(str(int(tick_size))) - 1)
-        tick_size = round(tick_size / magnitude) * magnitude
-
-        return max(tick_size, 0.00000001)
-
-    def _build_tpo_profile(self, candles: List[Candle], tick_size: float) -> Dict[float, int]:
-        """Build TPO profile - count time at each price level"""
-        profile: Dict[float, int] = defaultdict(int)
-
-        for candle in candles:
-            low = float(candle.low)
-            high = float(candle.high)
-
-            price_level = (low // tick_size) * tick_size
-
-            while price_level <= high:
-                profile[round(price_level, 8)] += 1
-                price_level += tick_size
+        closes = np.array([float(c.close) for c in candles])
+        return float(self._tick_sizes(closes, np.array([0]), np.array([len(closes)]))[0])
 
-        return dict(profile)
+    def _tick_sizes(self, closes: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Auto tick size of each window: close range / row_size rounded to its magnitude"""
+        if self.tick_size is not None:
+            return np.full(len(starts), float(self.tick_size))
 
-    def _find_poc(self, profile: Dict[float, int]) -> float:
-        """Find Point of Control (price with maximum TPO count)"""
-        if not profile:
-            return 0.0
-
-        max_count = max(profile.values())
-        poc_levels = [price for price, count in profile.items() if count == max_count]
-
-        return sum(poc_levels) / len(poc_levels)
-
-    def _calculate_value_area(
-        self,
-        profile: Dict[float, int],
-        poc: float,
-        tick_size: float
-    ) -> Tuple[float, float]:
-        """Calculate Value Area High and Low
-
-        The Value Area contains X% of all TPO counts, centered on POC.
-        """
-        if not profile:
-            return 0.0, 0.0
-
-        total_tpo = sum(profile.values())
-        target_tpo = int(total_tpo * (self.value_area_percent / 100))
-
-        sorted_prices = sorted(profile.keys())
-        if not sorted_prices:
-            return poc, poc
-
-        poc_index = min(range(len(sorted_prices)),
-                       key=lambda i: abs(sorted_prices[i] - poc))
-
-        va_low_idx = poc_index
-        va_high_idx = poc_index
-        current_tpo = profile.get(sorted_prices[poc_index], 0)
-
-        while current_tpo < target_tpo and (va_low_idx > 0 or va_high_idx < len(sorted_prices) - 1):
-            expand_up = False
-            expand_down = False
-
-            if va_low_idx > 0 and va_high_idx < len(sorted_prices) - 1:
-                up_tpo = profile.get(sorted_prices[va_high_idx + 1], 0)
-                down_tpo = profile.get(sorted_prices[va_low_idx - 1], 0)
-
-                if up_tpo >= down_tpo:
-                    expand_up = True
-                else:
-                    expand_down = True
-            elif va_high_idx < len(sorted_prices) - 1:
-                expand_up = True
-            elif va_low_idx > 0:
-                expand_down = True
-            else:
-                break
-
-            if expand_up:
-                va_high_idx += 1
-                current_tpo += profile.get(sorted_prices[va_high_idx], 0)
-            elif expand_down:
-                va_low_idx -= 1
-                current_tpo += profile.get(sorted_prices[va_low_idx], 0)
-
-        val = sorted_prices[va_low_idx]
-        vah = sorted_prices[va_high_idx]
-
-        return vah, val
-
-    def calculate(self, candles: List[Candle]) -> IndicatorResult:
-        """Calculate TPO Market Profile values
-
-        Args:
-            candles: List of OHLCV candles (oldest first)
-
-        Returns:
-            IndicatorResult with 'poc', 'vah', 'val', 'signal'
-        """
-        if len(candles) < self.required_candles:
-            raise ValueError(f"Need at least {self.required_candles} candles, got {len(candles)}")
+        if np.all(ends - starts == self.period):
+            # Janelas rolling de tamanho fixo: range em O(n)
+            price_range = rolling_max(closes, self.period)[starts] - rolling_min(closes, self.period)[starts]
+        else:
+            price_range = np.array([np.ptp(closes[s:e]) for s, e in zip(starts, ends)])
 
-        analysis_candles = candles[-self.period:]
+        tick_size = price_range / self.row_size
 
-        tick_size = self.tick_size
-        if tick_size is None:
-            tick_size = self._calculate_tick_size(analysis_candles)
+        # Arredonda para 1 algarismo significativo. Antes a magnitude era
+        # 10 ** (digitos da parte inteira - 1), que vale 1 para tick < 1 e
+        # zerava o tick (-> 1e-8) em ativos de preco baixo
+        magnitude = np.ones_like(tick_size)
+        positive = tick_size > 0
+        magnitude[positive] = 10.0 ** np.floor(np.log10(tick_size[positive]))
+        magnitude[positive & (magnitude * 10 <= tick_size)] *= 10
+        magnitude[positive & (magnitude > tick_size)] /= 10
 
-        profile = self._build_tpo_profile(analysis_candles, tick_size)
+        tick_size = np.maximum(np.round(np.round(tick_size / magnitude) * magnitude, 10), 0.00000001)
+        return np.where(price_range == 0, closes[starts] * 0.001, tick_size)
 
-        poc = self._find_poc(profile)
-        vah, val = self._calculate_value_area(profile, poc, tick_size)
+    def _build_profiles(self, candles: List[Candle], starts: np.ndarray, ends: np.ndarray) -> Tuple[PriceProfiles, np.ndarray]:
+        """Histogram profiles of the candle windows [starts, ends) and their tick sizes"""
+        highs = np.array([float(c.high) for c in candles])
+        lows = np.array([float(c.low) for c in candles])
+        volumes = np.array([float(c.volume) for c in candles])
+        closes = np.array([float(c.close) for c in candles])
 
-        current_close = float(candles[-1].close)
-        if current_close > vah:
-            signal = -1  # Bearish - price above Value Area
-        elif current_close < val:
-            signal = 1   # Bullish - price below Value Area
-        else:
-            signal = 0   # Neutral - within Value Area
+        tick_sizes = self._tick_sizes(closes, starts, ends)
+        return build_profiles(highs, lows, volumes, tick_sizes, starts, ends), tick_sizes
 
+    def _build_tpo_profile(self, candles: List[Candle], tick_size: float) -> Dict[float, int]:
+        """Build TPO profile - count time at each price level"""
+        highs = [float(c.high) for c in candles]
+        lows = [float(c.low) for c in candles]
+        profiles = build_profiles(highs, lows, None, tick_size, [0], [len(candles)])
+        return profiles.profile(0)
+
+    def _signal(self, close: float, vah: float, val: float) -> int:
+        if close > vah:
+            return -1  # Bearish - price above Value Area
+        if close < val:
+            return 1   # Bullish - price below Value Area
+        return 0       # Neutral - within Value Area
+
+    def _result(self, timestamp, poc: float, vah: float, val: float, signal: int, tick_size: float) -> IndicatorResult:
         return IndicatorResult(
             name=self.name,
-            timestamp=candles[-1].timestamp,
+            timestamp=timestamp,
             values={
                 "poc": Decimal(str(round(poc, 8))),
                 "vah": Decimal(str(round(vah, 8))),
@@ -213,34 +144,82 @@ class TPOCalculator(BaseIndicatorCalculator):
             raise ValueError(f"Need at least {self.required_candles} candles, got {len(candles)}")
 
         analysis_candles = candles[-self.period:]
+        profiles, tick_sizes = self._build_profiles(analysis_candles, np.array([0]), np.array([len(analysis_candles)]))
 
-        tick_size = self.tick_size
-        if tick_size is None:
-            tick_size = self._calculate_tick_size(analysis_candles)
+        poc = profiles.poc()
+        vah, val = profiles.value_area(self.value_area_percent, poc)
+        signal = self._signal(float(candles[-1].close), float(vah[0]), float(val[0]))
 
-        profile = self._build_tpo_profile(analysis_candles, tick_size)
+        result = self._result(candles[-1].timestamp, float(poc[0]), float(vah[0]), float(val[0]), signal, float(tick_sizes[0]))
+        return result, profiles.profile(0)
 
-        poc = self._find_poc(profile)
-        vah, val = self._calculate_value_area(profile, poc, tick_size)
+    def calculate(self, candles: List[Candle]) -> IndicatorResult:
+        """Calculate TPO Market Profile values
 
-        current_close = float(candles[-1].close)
-        if current_close > vah:
-            signal = -1
-        elif current_close < val:
-            signal = 1
-        else:
-            signal = 0
+        Args:
+            candles: List of OHLCV candles (oldest first)
 
-        result = IndicatorResult(
-            name=self.name,
-            timestamp=candles[-1].timestamp,
-            values={
-                "poc": Decimal(str(round(poc, 8))),
-                "vah": Decimal(str(round(vah, 8))),
-                "val": Decimal(str(round(val, 8))),
-                "signal": Decimal(str(signal)),
-                "tick_size": Decimal(str(tick_size))
-            }
-        )
+        Returns:
+            IndicatorResult with 'poc', 'vah', 'val', 'signal'
+        """
+        result, _ = self.calculate_with_profile(candles)
+        return result
 
-        return result, profile
+    def calculate_series(self, candles: List[Candle]) -> List[IndicatorResult]:
+        """Calculate TPO for entire series
+
+        All rolling windows of `period` candles are profiled in one
+        histogram pass instead of one calculate() per candle.
+        """
+        if len(candles) < self.required_candles:
+            return []
+
+        starts, ends = rolling_windows(len(candles), self.period, self.required_candles)
+        profiles, tick_sizes = self._build_profiles(candles, starts, ends)
+        poc = profiles.poc()
+        vah, val = profiles.value_area(self.value_area_percent, poc)
+
+        results = []
+        for end, p, h, l, tick in zip(ends.tolist(), poc.tolist(), vah.tolist(), val.tolist(), tick_sizes.tolist()):
+            candle = candles[end - 1]
+            signal = self._signal(float(candle.close), h, l)
+            results.append(self._result(candle.timestamp, p, h, l, signal, tick))
+        return results
+
+    def calculate_sessions(
+        self,
+        candles: List[Candle],
+        session_hours: float = 24,
+        offset_hours: float = 0
+    ) -> List[Dict[str, Any]]:
+        """Profile every session (e.g. daily) of the history at once
+
+        Returns one dict per session with start/end timestamps, poc, vah, val,
+        volume_poc and tick_size (oldest first).
+        """
+        if not candles:
+            return []
+
+        timestamps = [c.timestamp.timestamp() for c in candles]
+        starts, ends = session_bounds(timestamps, session_hours * 3600, offset_hours * 3600)
+        profiles, tick_sizes = self._build_profiles(candles, starts, ends)
+        poc = profiles.poc()
+        vah, val = profiles.value_area(self.value_area_percent, poc)
+        volume_poc = profiles.volume_poc()
+
+        return [
+            {
+                "start": candles[start].timestamp,
+                "end": candles[end - 1].timestamp,
+                "candles": end - start,
+                "poc": round(p, 8),
+                "vah": round(h, 8),
+                "val": round(l, 8),
+                "volume_poc": round(v, 8),
+                "tick_size": tick,
+            }
+            for start, end, p, h, l, v, tick in zip(
+                starts.tolist(), ends.tolist(), poc.tolist(), vah.tolist(),
+                val.tolist(), volume_poc.tolist(), tick_sizes.tolist()
+            )
+        ]
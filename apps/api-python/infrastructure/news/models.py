@@ -49,3 +49,5 @@ class DailyNewsDigest:
     top_articles: List[NewsArticle]
     trending_currencies: List[str]
     market_sentiment: NewsSentiment
+    # Mentions per currency over the whole day (trending survives incremental runs)
+    currency_counts: Dict[str, int] = field(default_factory=dict)
@@ -1,16 +1,22 @@
 """
 News Collector Service
 Aggregates news from multiple sources and stores daily digests
+
+Sources are fetched concurrently (each with its own timeout) using conditional
+requests, so a run takes as long as the slowest source and unchanged feeds cost
+a 304. Articles already seen (URL/title hash in news_article_index) are dropped
+and the day's digest is updated incrementally with the new ones only.
 """
 
-from datetime import datetime
-from typing import List, Optional
-from dataclasses import asdict
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 import json
 
 import structlog
 
-from .models import NewsArticle, DailyNewsDigest, NewsSentiment
+from .models import NewsArticle, DailyNewsDigest, NewsSentiment, NewsSource
+from .sources.base_source import BaseNewsSource
 from .sources.cryptopanic_source import CryptoPanicSource
 from .sources.coindesk_source import CoinDeskSource
 from .sources.coingecko_source import CoinGeckoSource
@@ -19,6 +25,18 @@ from .sources.theblock_source import TheBlockSource
 
 logger = structlog.get_logger(__name__)
 
+ARTICLES_PER_SOURCE = 20
+TOP_ARTICLES = 20
+# Chaves de dedupe mais antigas que isso são removidas (feeds não repetem notícias tão velhas)
+DEDUPE_RETENTION_DAYS = 30
+
+
+def _utc_naive(value: datetime) -> datetime:
+    """Sort key for mixed naive (RSS) and aware (API) timestamps"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 
 class NewsCollector:
     """
@@ -35,7 +53,7 @@ class NewsCollector:
 
     def __init__(self, db_connection=None):
         self.db = db_connection
-        self.sources = [
+        self.sources: List[BaseNewsSource] = [
             CryptoPanicSource(),      # Aggregated with sentiment
             CoinDeskSource(),          # Quality journalism
             CoinGeckoSource(),         # Trending coins
@@ -45,32 +63,114 @@ class NewsCollector:
 
     async def collect_daily_news(self) -> DailyNewsDigest:
         """
-        Collect news from all sources and create daily digest.
+        Collect new articles from all sources and merge them into today's digest.
 
         Returns:
             DailyNewsDigest with aggregated news data
         """
-        all_articles: List[NewsArticle] = []
+        date = datetime.utcnow().strftime("%Y-%m-%d")
+
+        await self._load_source_state()
+        results = await asyncio.gather(*(self._collect_from(source) for source in self.sources))
+
+        new_articles, new_keys = await self._filter_new(
+            [(source, article) for source, articles in zip(self.sources, results) for article in articles]
+        )
+
+        previous = await self._load_digest_data(date)
+        digest = self._build_digest(date, new_articles, previous)
+
+        # Save to database if connection provided
+        # Validators e índice só depois do digest gravado: senão os artigos
+        # voltariam como 304 / duplicados na próxima execução e seriam perdidos
+        if self.db and await self._save_digest(digest):
+            await self._save_source_state()
+            await self._index_articles(new_keys)
+
+        logger.info(
+            "Daily news collection complete",
+            new_articles=len(new_articles),
+            total_articles=digest.total_articles,
+            bullish=digest.bullish_count,
+            bearish=digest.bearish_count,
+            sentiment=digest.market_sentiment.value,
+            trending=digest.trending_currencies[:5]
+        )
+
+        return digest
+
+    async def _collect_from(self, source: BaseNewsSource) -> List[NewsArticle]:
+        """Fetch one source within its own timeout; failures yield no articles"""
+        try:
+            articles = await asyncio.wait_for(
+                source.fetch_news(limit=ARTICLES_PER_SOURCE),
+                timeout=source.timeout
+            )
+            logger.info(
+                f"Collected {len(articles)} articles from {source.name}",
+                source=source.name,
+                count=len(articles)
+            )
+            return articles
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout collecting from {source.name} after {source.timeout}s")
+        except Exception as e:
+            logger.error(f"Error collecting from {source.name}: {e}")
+        return []
+
+    async def _filter_new(
+        self,
+        collected: List[Tuple[BaseNewsSource, NewsArticle]]
+    ) -> Tuple[List[NewsArticle], List[Tuple[str, str]]]:
+        """
+        Drop articles whose URL/title hash was seen before (in this run or in
+        news_article_index).
 
-        for source in self.sources:
+        Returns:
+            (new articles, [(key_hash, source)] to index)
+        """
+        keyed = [(source, article, source.dedupe_keys(article)) for source, article in collected]
+
+        seen = set()
+        if self.db:
+            all_keys = list({key for _, _, keys in keyed for key in keys})
             try:
-                articles = await source.fetch_news(limit=20)
-                all_articles.extend(articles)
-                logger.info(
-                    f"Collected {len(articles)} articles from {source.name}",
-                    source=source.name,
-                    count=len(articles)
-                )
+                rows = await self.db.fetch("""
+                    SELECT key_hash FROM news_article_index WHERE key_hash = ANY($1::text[])
+                """, all_keys) if all_keys else []
+                seen = {row["key_hash"] for row in rows}
             except Exception as e:
-                logger.error(f"Error collecting from {source.name}: {e}")
+                logger.warning(f"Could not read news dedupe index: {e}")
 
-        # Sort by date (most recent first)
-        all_articles.sort(key=lambda x: x.published_at, reverse=True)
+        new_articles = []
+        new_keys = []
+        for _, article, keys in keyed:
+            if any(key in seen for key in keys):
+                continue
+            seen.update(keys)
+            new_articles.append(article)
+            new_keys.extend((key, article.source.value) for key in keys)
 
-        # Calculate sentiment distribution
-        bullish = sum(1 for a in all_articles if a.sentiment == NewsSentiment.BULLISH)
-        bearish = sum(1 for a in all_articles if a.sentiment == NewsSentiment.BEARISH)
-        neutral = len(all_articles) - bullish - bearish
+        return new_articles, new_keys
+
+    def _build_digest(
+        self,
+        date: str,
+        new_articles: List[NewsArticle],
+        previous: Optional[Dict[str, Any]] = None
+    ) -> DailyNewsDigest:
+        """Today's digest = previously stored digest (if any) + new articles"""
+        previous = previous or {}
+        previous_articles = [self._article_from_data(a) for a in previous.get("articles", [])]
+
+        bullish = previous.get("bullish_count", 0) + sum(
+            1 for a in new_articles if a.sentiment == NewsSentiment.BULLISH
+        )
+        bearish = previous.get("bearish_count", 0) + sum(
+            1 for a in new_articles if a.sentiment == NewsSentiment.BEARISH
+        )
+        total = previous.get("total_articles", 0) + len(new_articles)
+        neutral = total - bullish - bearish
 
         # Determine overall market sentiment
         if bullish > bearish * 1.5:
@@ -80,9 +180,13 @@ class NewsCollector:
         else:
             market_sentiment = NewsSentiment.NEUTRAL
 
-        # Find trending currencies
-        currency_counts = {}
-        for article in all_articles:
+        # Find trending currencies (digests gravados antes só têm os top artigos)
+        currency_counts = dict(previous.get("currency_counts") or {})
+        if not currency_counts:
+            for article in previous_articles:
+                for currency in article.currencies:
+                    currency_counts[currency] = currency_counts.get(currency, 0) + 1
+        for article in new_articles:
             for currency in article.currencies:
                 currency_counts[currency] = currency_counts.get(currency, 0) + 1
 
@@ -92,35 +196,116 @@ class NewsCollector:
             reverse=True
         )[:10]
 
-        # Create digest
-        digest = DailyNewsDigest(
-            date=datetime.utcnow().strftime("%Y-%m-%d"),
-            total_articles=len(all_articles),
+        # Sort by date (most recent first)
+        top_articles = sorted(
+            previous_articles + new_articles,
+            key=lambda x: _utc_naive(x.published_at),
+            reverse=True
+        )[:TOP_ARTICLES]
+
+        return DailyNewsDigest(
+            date=date,
+            total_articles=total,
             bullish_count=bullish,
             bearish_count=bearish,
             neutral_count=neutral,
-            top_articles=all_articles[:20],  # Top 20 articles
+            top_articles=top_articles,
             trending_currencies=trending,
-            market_sentiment=market_sentiment
+            market_sentiment=market_sentiment,
+            currency_counts=currency_counts
         )
 
-        # Save to database if connection provided
-        if self.db:
-            await self._save_digest(digest)
-
-        logger.info(
-            "Daily news collection complete",
-            total_articles=len(all_articles),
-            bullish=bullish,
-            bearish=bearish,
-            sentiment=market_sentiment.value,
-            trending=trending[:5]
+    @staticmethod
+    def _article_from_data(data: Dict[str, Any]) -> NewsArticle:
+        """Rebuild a stored digest article"""
+        return NewsArticle(
+            id=data["id"],
+            source=NewsSource(data["source"]),
+            title=data["title"],
+            summary=data.get("summary", ""),
+            url=data["url"],
+            published_at=datetime.fromisoformat(data["published_at"]),
+            sentiment=NewsSentiment(data["sentiment"]) if data.get("sentiment") else None,
+            currencies=data.get("currencies", [])
         )
 
-        return digest
+    async def _load_digest_data(self, date: str) -> Optional[Dict[str, Any]]:
+        """Stored digest JSON for `date` (base for the incremental update)"""
+        if not self.db:
+            return None
+        try:
+            result = await self.db.fetchrow("""
+                SELECT data FROM ai_news_digests WHERE date = $1
+            """, date)
+            if result:
+                return json.loads(result["data"])
+        except Exception as e:
+            logger.warning(f"Could not load news digest for {date}: {e}")
+        return None
+
+    async def _load_source_state(self):
+        """Restore ETag/Last-Modified of every source URL from the last run"""
+        if not self.db:
+            return
+        try:
+            rows = await self.db.fetch("""
+                SELECT source, url, etag, last_modified FROM news_source_state
+            """)
+        except Exception as e:
+            logger.warning(f"Could not load news source state: {e}")
+            return
+
+        by_name = {source.name: source for source in self.sources}
+        for row in rows:
+            source = by_name.get(row["source"])
+            if source:
+                source.validators[row["url"]] = {
+                    "etag": row["etag"],
+                    "last_modified": row["last_modified"]
+                }
+
+    async def _save_source_state(self):
+        """Persist ETag/Last-Modified for the next run"""
+        rows = [
+            (source.name, url, validators.get("etag"), validators.get("last_modified"))
+            for source in self.sources
+            for url, validators in source.validators.items()
+        ]
+        if not rows:
+            return
+        try:
+            await self.db.executemany("""
+                INSERT INTO news_source_state (source, url, etag, last_modified, updated_at)
+                VALUES ($1, $2, $3, $4, NOW())
+                ON CONFLICT (url) DO UPDATE SET
+                    source = EXCLUDED.source,
+                    etag = EXCLUDED.etag,
+                    last_modified = EXCLUDED.last_modified,
+                    updated_at = NOW()
+            """, rows)
+        except Exception as e:
+            logger.warning(f"Could not save news source state: {e}")
+
+    async def _index_articles(self, keys: List[Tuple[str, str]]):
+        """Add the keys of the new articles to the dedupe index and expire old ones"""
+        try:
+            if keys:
+                await self.db.execute("""
+                    INSERT INTO news_article_index (key_hash, source, first_seen_at)
+                    SELECT key_hash, source, NOW()
+                    FROM UNNEST($1::text[], $2::text[]) AS k(key_hash, source)
+                    ON CONFLICT (key_hash) DO NOTHING
+                """, [key for key, _ in keys], [source for _, source in keys])
+
+            await self.db.execute(f"""
+                DELETE FROM news_article_index
+                WHERE first_seen_at < NOW() - INTERVAL '{DEDUPE_RETENTION_DAYS} days'
+            """)
+        except Exception as e:
+            logger.warning(f"Could not update news dedupe index: {e}")
 
-    async def _save_digest(self, digest: DailyNewsDigest):
-        """Save digest to database"""
+    async def _save_digest(self, digest: DailyNewsDigest) -> bool:
+        """Save digest to database; returns False if the write failed"""
         query = """
             INSERT INTO ai_news_digests (date, data, created_at)
             VALUES ($1, $2, NOW())
@@ -138,6 +323,7 @@ class NewsCollector:
                 "neutral_count": digest.neutral_count,
                 "market_sentiment": digest.market_sentiment.value,
                 "trending_currencies": digest.trending_currencies,
+                "currency_counts": digest.currency_counts,
                 "articles": [
                     {
                         "id": a.id,
@@ -155,9 +341,11 @@ class NewsCollector:
 
             await self.db.execute(query, digest.date, json.dumps(data))
             logger.info(f"Saved news digest for {digest.date}")
+            return True
 
         except Exception as e:
             logger.error(f"Error saving news digest: {e}")
+            return False
 
     async def get_digest(self, date: Optional[str] = None) -> Optional[DailyNewsDigest]:
         """
@@ -192,7 +380,8 @@ class NewsCollector:
                     neutral_count=data["neutral_count"],
                     top_articles=[],  # Articles stored separately
                     trending_currencies=data["trending_currencies"],
-                    market_sentiment=NewsSentiment(data["market_sentiment"])
+                    market_sentiment=NewsSentiment(data["market_sentiment"]),
+                    currency_counts=data.get("currency_counts", {})
                 )
         except Exception as e:
             logger.error(f"Error retrieving digest: {e}")
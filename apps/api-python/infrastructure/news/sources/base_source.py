@@ -4,7 +4,9 @@ Abstract class for all news sources
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
+import hashlib
+import re
 import httpx
 import structlog
 
@@ -13,12 +15,37 @@ from ..models import NewsArticle
 logger = structlog.get_logger(__name__)
 
 
+def dedupe_hash(value: str) -> str:
+    """Stable key for the dedupe index"""
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme/host, drop query string, fragment and trailing slash"""
+    url = url.strip().split("#", 1)[0].split("?", 1)[0].rstrip("/")
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        return url.lower()
+    host, slash, path = rest.partition("/")
+    return f"{scheme.lower()}://{host.lower()}{slash}{path}"
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, punctuation-free title (same headline syndicated by two sources)"""
+    return " ".join(re.sub(r"[^\w]+", " ", title.lower()).split())
+
+
 class BaseNewsSource(ABC):
     """Abstract base class for news sources"""
 
     def __init__(self, api_key: Optional[str] = None, timeout: int = 30):
         self.api_key = api_key
         self.timeout = timeout
+        # Conditional request validators per URL: {"etag": ..., "last_modified": ...}
+        # Loaded/persisted by NewsCollector (news_source_state table)
+        self.validators: Dict[str, Dict[str, str]] = {}
+        # Optional httpx transport (tests plug recorded responses here)
+        self.transport: Optional[httpx.AsyncBaseTransport] = None
 
     @property
     @abstractmethod
@@ -31,9 +58,65 @@ class BaseNewsSource(ABC):
         """Fetch news articles from this source"""
         pass
 
-    async def _make_request(self, url: str, params: dict = None, headers: dict = None) -> dict:
-        """Make HTTP request to source API"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            return response.json()
+    def dedupe_keys(self, article: NewsArticle) -> List[str]:
+        """
+        Hashes that identify an article across runs and sources (URL and title).
+        An article is a duplicate when any of its keys was already seen.
+        """
+        keys = []
+        if article.url:
+            keys.append(dedupe_hash(f"url:{normalize_url(article.url)}"))
+        title = normalize_title(article.title or "")
+        if title:
+            keys.append(dedupe_hash(f"title:{title}"))
+        return keys
+
+    async def _fetch(
+        self,
+        url: str,
+        params: dict = None,
+        headers: dict = None,
+        follow_redirects: bool = False
+    ) -> Optional[httpx.Response]:
+        """
+        Conditional GET: sends If-None-Match / If-Modified-Since from the last
+        response for this URL.
+
+        Returns:
+            The response, or None when the server answered 304 Not Modified
+        """
+        request_headers = dict(headers or {})
+        cached = self.validators.get(url) or {}
+        if cached.get("etag"):
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=follow_redirects,
+            transport=self.transport
+        ) as client:
+            response = await client.get(url, params=params, headers=request_headers)
+
+        if response.status_code == 304:
+            logger.debug(f"{self.name} not modified", url=url)
+            return None
+
+        response.raise_for_status()
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.validators[url] = {"etag": etag, "last_modified": last_modified}
+        else:
+            self.validators.pop(url, None)
+
+        return response
+
+    async def _make_request(self, url: str, params: dict = None, headers: dict = None) -> Optional[dict]:
+        """Make HTTP request to source API (None when unchanged since the last run)"""
+        response = await self._fetch(url, params=params, headers=headers)
+        if response is None:
+            return None
+        return response.json()
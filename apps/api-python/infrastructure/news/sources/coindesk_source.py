@@ -8,7 +8,6 @@ from typing import List
 from time import mktime
 
 import structlog
-import httpx
 
 from .base_source import BaseNewsSource
 from ..models import NewsArticle, NewsSource
@@ -45,12 +44,11 @@ class CoinDeskSource(BaseNewsSource):
             return []
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
-                response = await client.get(self.RSS_URL)
-                response.raise_for_status()
-                content = response.text
+            response = await self._fetch(self.RSS_URL, follow_redirects=True)
+            if response is None:
+                return []  # Feed inalterado desde a última coleta
 
-            feed = feedparser.parse(content)
+            feed = feedparser.parse(response.text)
             return self._parse_feed(feed, limit)
 
         except Exception as e:
@@ -4,11 +4,11 @@ Fetches trending coins and news from CoinGecko API
 """
 
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 import structlog
 
-from .base_source import BaseNewsSource
+from .base_source import BaseNewsSource, dedupe_hash
 from ..models import NewsArticle, NewsSource, NewsSentiment
 
 logger = structlog.get_logger(__name__)
@@ -27,12 +27,18 @@ class CoinGeckoSource(BaseNewsSource):
         """Fetch trending coins as 'news' items"""
         try:
             trending = await self._fetch_trending()
+            if trending is None:
+                return []  # Trending inalterado desde a última coleta
             return self._convert_to_articles(trending, limit)
         except Exception as e:
             logger.error(f"CoinGecko fetch failed: {e}")
             return []
 
-    async def _fetch_trending(self) -> dict:
+    def dedupe_keys(self, article: NewsArticle) -> List[str]:
+        """Trending is a daily snapshot: the same coin may trend again tomorrow"""
+        return [dedupe_hash(f"id:{article.id}")]
+
+    async def _fetch_trending(self) -> Optional[dict]:
         """Fetch trending coins from CoinGecko"""
         url = f"{self.BASE_URL}/search/trending"
         return await self._make_request(url)
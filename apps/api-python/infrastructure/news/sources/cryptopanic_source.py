@@ -43,6 +43,8 @@ class CryptoPanicSource(BaseNewsSource):
 
         try:
             data = await self._make_request(self.BASE_URL, params)
+            if data is None:
+                return []  # Nada novo desde a última coleta
             return self._parse_response(data, limit)
         except Exception as e:
             logger.error(f"CryptoPanic fetch failed: {e}")
@@ -8,7 +8,6 @@ from typing import List
 from time import mktime
 
 import structlog
-import httpx
 
 from .base_source import BaseNewsSource
 from ..models import NewsArticle, NewsSource, NewsSentiment
@@ -42,14 +41,13 @@ class TheBlockSource(BaseNewsSource):
             return []
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.RSS_URL, headers={
-                    "User-Agent": "Mozilla/5.0 (compatible; TradingBot/1.0)"
-                })
-                response.raise_for_status()
-                content = response.text
-
-            feed = feedparser.parse(content)
+            response = await self._fetch(self.RSS_URL, headers={
+                "User-Agent": "Mozilla/5.0 (compatible; TradingBot/1.0)"
+            })
+            if response is None:
+                return []  # Feed inalterado desde a última coleta
+
+            feed = feedparser.parse(response.text)
             return self._parse_feed(feed, limit)
 
         except Exception as e:
@@ -4,7 +4,8 @@ Binance Price Service - Real-time price conversion to USDT
 
 import structlog
 from typing import Dict, Any
-import requests
+
+from infrastructure.pricing.price_oracle import get_price_oracle
 
 logger = structlog.get_logger(__name__)
 
@@ -19,23 +20,15 @@ class BinancePriceService:
         self._not_found_cache = set()  # Cache de moedas que não existem na Binance
 
     async def get_all_ticker_prices(self) -> Dict[str, float]:
-        """Get all ticker prices from Binance API"""
-        try:
-            url = f"{self.base_url}/api/v3/ticker/price"
-            response = requests.get(url, timeout=10)
-
-            if response.status_code == 200:
-                ticker_data = response.json()
-                prices = {item['symbol']: float(item['price']) for item in ticker_data}
-                logger.info(f"✅ Fetched {len(prices)} ticker prices from Binance")
-                return prices
-            else:
-                logger.error(f"❌ Failed to fetch prices: {response.status_code}")
-                return {}
-
-        except Exception as e:
-            logger.error(f"❌ Error fetching Binance prices: {e}")
-            return {}
+        """
+        Get all ticker prices from the shared Binance price oracle
+        (in-memory map refreshed by one background request; no HTTP per call)
+        """
+        oracle = get_price_oracle("binance_testnet" if self.testnet else "binance")
+        prices = await oracle.ensure_fresh()
+        if not prices:
+            logger.error("❌ No Binance prices available", oracle=oracle.get_status())
+        return prices
 
     async def calculate_usdt_value(self, asset: str, amount: float, prices: Dict[str, float]) -> float:
         """
@@ -0,0 +1,263 @@
+"""
+Price Oracle
+Process-wide symbol -> price map per exchange feed, refreshed by ONE bulk
+ticker request in the background (every REFRESH_INTERVAL_SECONDS).
+
+Dashboards, sync, spot P&L and order sizing read prices from memory instead of
+calling the exchange per request/asset. Every map carries staleness metadata:
+
+- ensure_fresh(): for bulk readers (balances, P&L). Refreshes on demand when
+  the map is older than stale_after (e.g. the background loop is not running
+  in this process), so callers always get a usable map.
+- get_price(symbol, max_age): pure dictionary read; returns None when the
+  price is older than max_age so order paths fall back to a direct request.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+REFRESH_INTERVAL_SECONDS = 5.0
+STALE_AFTER_SECONDS = 30.0
+# Preço usado para dimensionar/validar ordens não pode ser mais velho que isso
+ORDER_PRICE_MAX_AGE_SECONDS = 10.0
+REQUEST_TIMEOUT_SECONDS = 10.0
+
+STABLECOINS = ("USDT", "USDC", "BUSD", "FDUSD")
+
+
+def normalize_symbol(symbol: str) -> str:
+    """BTC-USDT / btc/usdt / BTCUSDT -> BTCUSDT"""
+    return symbol.replace("-", "").replace("/", "").replace("_", "").upper()
+
+
+def _parse_binance(payload) -> Dict[str, float]:
+    """[{"symbol": "BTCUSDT", "price": "..."}]"""
+    return {item["symbol"]: float(item["price"]) for item in payload}
+
+
+def _parse_bingx_spot(payload) -> Dict[str, float]:
+    """{"code": 0, "data": [{"symbol": "BTC-USDT", "lastPrice": "..."}]}"""
+    if payload.get("code") != 0:
+        raise ValueError(f"BingX ticker error: {payload.get('msg') or payload.get('code')}")
+    prices = {}
+    for item in payload.get("data", []):
+        price = float(item.get("lastPrice") or 0)
+        if price > 0:
+            prices[normalize_symbol(item["symbol"])] = price
+    return prices
+
+
+def _parse_bingx_swap(payload) -> Dict[str, float]:
+    """{"code": 0, "data": [{"symbol": "BTC-USDT", "price": "..."}]}"""
+    if payload.get("code") != 0:
+        raise ValueError(f"BingX price error: {payload.get('msg') or payload.get('code')}")
+    prices = {}
+    for item in payload.get("data", []):
+        price = float(item.get("price") or 0)
+        if price > 0:
+            prices[normalize_symbol(item["symbol"])] = price
+    return prices
+
+
+# feed -> (bulk ticker URL, parser)
+FEEDS: Dict[str, tuple] = {
+    "binance": ("https://api.binance.com/api/v3/ticker/price", _parse_binance),
+    "binance_testnet": ("https://testnet.binance.vision/api/v3/ticker/price", _parse_binance),
+    "binance_futures": ("https://fapi.binance.com/fapi/v1/ticker/price", _parse_binance),
+    "bingx": ("https://open-api.bingx.com/openApi/spot/v1/ticker/24hr", _parse_bingx_spot),
+    "bingx_swap": ("https://open-api.bingx.com/openApi/swap/v2/quote/price", _parse_bingx_swap),
+}
+
+# Feeds refreshed in background by the API process (others refresh on demand)
+PRICE_FEEDS_STARTED_AT_BOOT = ("binance", "binance_futures", "bingx", "bingx_swap")
+
+
+class PriceOracle:
+    """In-memory price map of one exchange feed"""
+
+    def __init__(
+        self,
+        feed: str,
+        url: Optional[str] = None,
+        parser: Optional[Callable] = None,
+        refresh_interval: float = REFRESH_INTERVAL_SECONDS,
+        stale_after: float = STALE_AFTER_SECONDS
+    ):
+        default_url, default_parser = FEEDS.get(feed, (None, None))
+        self.feed = feed
+        self.url = url or default_url
+        self.parser = parser or default_parser
+        if not self.url or not self.parser:
+            raise ValueError(f"Unknown price feed: {feed}")
+
+        self.refresh_interval = refresh_interval
+        self.stale_after = stale_after
+        # Substituído inteiro a cada refresh: quem guardou a referência lê um snapshot consistente
+        self._prices: Dict[str, float] = {}
+        self.updated_at: Optional[float] = None  # Unix time do último refresh bem-sucedido
+        self._fetched_at: Optional[float] = None  # time.monotonic() do último refresh
+        self._lock = asyncio.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self.is_running = False
+        # Optional httpx transport (tests plug recorded responses here)
+        self.transport: Optional[httpx.AsyncBaseTransport] = None
+        self._stats = {"refreshes": 0, "errors": 0, "on_demand_refreshes": 0}
+
+    # ==================== Lifecycle ====================
+
+    async def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"❌ Price oracle {self.feed} initial load failed: {e}")
+        self._task = asyncio.create_task(self._refresh_loop())
+        logger.info("💹 Price oracle started", feed=self.feed, symbols=len(self._prices))
+
+    async def stop(self):
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def _refresh_loop(self):
+        while self.is_running:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"⚠️ Price oracle {self.feed} refresh failed: {e}")
+
+    # ==================== Refresh ====================
+
+    async def refresh(self, if_older_than: Optional[float] = None) -> int:
+        """
+        One bulk ticker request; replaces the whole map. Returns symbol count.
+        With if_older_than, skipped when another caller refreshed meanwhile.
+        """
+        async with self._lock:
+            if if_older_than is not None:
+                age = self.age_seconds
+                if age is not None and age <= if_older_than:
+                    return len(self._prices)
+                self._stats["on_demand_refreshes"] += 1
+            try:
+                if self._client is None:
+                    self._client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SECONDS, transport=self.transport)
+                response = await self._client.get(self.url)
+                response.raise_for_status()
+                prices = self.parser(response.json())
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+
+            self._prices = prices
+            self.updated_at = time.time()
+            self._fetched_at = time.monotonic()
+            self._stats["refreshes"] += 1
+            return len(prices)
+
+    async def ensure_fresh(self) -> Dict[str, float]:
+        """
+        Current map, refreshed on demand when older than stale_after.
+        On refresh failure the last map (possibly empty) is returned.
+        """
+        if not self.is_stale:
+            return self._prices
+        try:
+            await self.refresh(if_older_than=self.stale_after)
+        except Exception as e:
+            logger.warning(f"⚠️ Price oracle {self.feed} unavailable, using last snapshot: {e}")
+        return self._prices
+
+    # ==================== Lookups ====================
+
+    @property
+    def prices(self) -> Dict[str, float]:
+        """Current symbol -> price map (read-only snapshot)"""
+        return self._prices
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        if self._fetched_at is None:
+            return None
+        return time.monotonic() - self._fetched_at
+
+    @property
+    def is_stale(self) -> bool:
+        age = self.age_seconds
+        return age is None or age > self.stale_after
+
+    def get_price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Price of a symbol (any separator), None if unknown or older than max_age"""
+        if max_age is not None:
+            age = self.age_seconds
+            if age is None or age > max_age:
+                return None
+        return self._prices.get(normalize_symbol(symbol))
+
+    def get_asset_usdt_price(self, asset: str, max_age: Optional[float] = None) -> Optional[float]:
+        """
+        USDT price of an asset: stablecoins = 1, then ASSETUSDT, then
+        ASSETBUSD / ASSETUSDC converted to USDT.
+        """
+        asset = asset.upper()
+        if asset in STABLECOINS:
+            return 1.0
+
+        price = self.get_price(f"{asset}USDT", max_age)
+        if price:
+            return price
+
+        for quote in ("BUSD", "USDC"):
+            pair = self.get_price(f"{asset}{quote}", max_age)
+            quote_usdt = self.get_price(f"{quote}USDT", max_age)
+            if pair and quote_usdt:
+                return pair * quote_usdt
+
+        return None
+
+    def get_status(self) -> Dict[str, object]:
+        """Staleness metadata for health/monitoring endpoints"""
+        age = self.age_seconds
+        return {
+            "feed": self.feed,
+            "running": self.is_running,
+            "symbols": len(self._prices),
+            "updated_at": self.updated_at,
+            "age_seconds": round(age, 3) if age is not None else None,
+            "stale": self.is_stale,
+            **self._stats,
+        }
+
+
+# Singletons por feed
+_oracles: Dict[str, PriceOracle] = {}
+
+
+def get_price_oracle(feed: str = "binance") -> PriceOracle:
+    """Get or create singleton price oracle for a feed"""
+    oracle = _oracles.get(feed)
+    if oracle is None:
+        oracle = _oracles[feed] = PriceOracle(feed)
+    return oracle
+
+
+def get_running_oracles() -> List[PriceOracle]:
+    """Oracles created in this process (for shutdown/status)"""
+    return list(_oracles.values())
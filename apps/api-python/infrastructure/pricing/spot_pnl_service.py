@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 import structlog
 from infrastructure.database.connection_transaction_mode import transaction_db
 from infrastructure.pricing.binance_price_service import BinancePriceService
+from infrastructure.services.spot_cost_basis_ledger import get_spot_cost_basis_ledger
 
 logger = structlog.get_logger(__name__)
 
@@ -255,7 +256,7 @@ class SpotPnlService:
                 "pnl_usdt": pnl_usdt,
                 "pnl_percentage": pnl_percentage,
                 "is_profitable": pnl_usdt > 0,
-                "avg_price_source": source,  # "exchange_trades", "db_orders", "estimated_95%"
+                "avg_price_source": source,  # "cost_basis_ledger", "exchange_trades", "db_orders", "estimated_95%"
                 "current_price_source": price_source  # "binance", "bingx", "db_calculated"
             }
 
@@ -274,9 +275,10 @@ class SpotPnlService:
 
         Prioridade:
         1. Cache (se válido)
-        2. API da exchange (myTrades)
-        3. Tabela orders do nosso DB
-        4. Estimativa
+        2. Ledger de custo spot (spot_cost_basis, atualizado pelo sync de ordens)
+        3. API da exchange (myTrades)
+        4. Tabela orders do nosso DB
+        5. Estimativa
 
         Returns:
             tuple: (avg_price, source)
@@ -290,7 +292,16 @@ class SpotPnlService:
                     logger.debug(f"📦 {asset}: Using cached avg price ${cached['avg_price']:.4f}")
                     return cached['avg_price'], "cache"
 
-            # 2. Tentar buscar da API da exchange
+            # 2. Ledger de custo (lookup por chave primária, sem chamar a exchange)
+            try:
+                position = await get_spot_cost_basis_ledger(transaction_db).get_position(account_id, asset)
+                if position and position['quantity'] > 0 and position['avg_cost'] > 0:
+                    logger.debug(f"📒 {asset}: Avg cost ${position['avg_cost']:.4f} from cost-basis ledger")
+                    return position['avg_cost'], "cost_basis_ledger"
+            except Exception as ledger_err:
+                logger.warning(f"⚠️ Error reading cost-basis ledger for {asset}: {ledger_err}")
+
+            # 3. Tentar buscar da API da exchange
             if connector and hasattr(connector, 'get_account_trades'):
                 try:
                     symbol = f"{asset}-USDT"  # BingX format
@@ -333,12 +344,12 @@ class SpotPnlService:
                 except Exception as api_err:
                     logger.warning(f"⚠️ Error fetching trades from exchange for {asset}: {api_err}")
 
-            # 3. Fallback: Buscar da tabela orders do nosso DB
+            # 4. Fallback: Buscar da tabela orders do nosso DB
             avg_price_db = await self._get_avg_price_from_db_orders(account_id, asset)
             if avg_price_db > 0:
                 return avg_price_db, "db_orders"
 
-            # 4. Não encontrou nenhum trade
+            # 5. Não encontrou nenhum trade
             return 0.0, "not_found"
 
         except Exception as e:
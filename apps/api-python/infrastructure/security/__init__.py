@@ -8,6 +8,7 @@ from .tradingview_webhook_schema import TradingViewWebhookPayload, WebhookRespon
 from .distributed_lock import DistributedLock
 from .circuit_breaker import ExchangeCircuitBreaker, CircuitBreakerConfig, CircuitBreakerError
 from .error_sanitizer import ErrorSanitizer, get_error_sanitizer
+from .token_revocation import TokenRevocationStore, get_token_revocation_store
 
 __all__ = [
     "EncryptionService",
@@ -24,4 +25,6 @@ __all__ = [
     "CircuitBreakerError",
     "ErrorSanitizer",
     "get_error_sanitizer",
+    "TokenRevocationStore",
+    "get_token_revocation_store",
 ]
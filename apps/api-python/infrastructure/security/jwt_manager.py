@@ -3,13 +3,14 @@
 import jwt
 import secrets
 import hashlib
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 
 import structlog
 from infrastructure.config.settings import get_settings
+from infrastructure.security.token_revocation import TokenRevocationStore, get_token_revocation_store
 
 logger = structlog.get_logger(__name__)
 
@@ -59,12 +60,19 @@ class JWTManager:
         # In production, this would be stored in Redis/database
         # For now, using in-memory storage with cleanup
         self.refresh_token_store: Dict[str, Dict] = {}
-        self.blacklisted_tokens: set = set()
+        # Revoked JTIs: shared across workers, entries expire with the token
+        self._revocation_store: Optional[TokenRevocationStore] = None
         
         # Cleanup counters
         self.cleanup_counter = 0
         self.cleanup_interval = 100
     
+    @property
+    def revocation_store(self) -> TokenRevocationStore:
+        if self._revocation_store is None:
+            self._revocation_store = get_token_revocation_store()
+        return self._revocation_store
+
     def create_token_pair(self, user_id: str, user_email: str, additional_claims: Optional[Dict] = None) -> TokenPair:
         """Create access and refresh token pair with rotation"""
         
@@ -229,8 +237,11 @@ class JWTManager:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
             jti = payload.get("jti")
             if jti:
-                self.blacklisted_tokens.add(jti)
+                self.revocation_store.revoke(jti, float(payload["exp"]))
                 logger.info("Token revoked", jti=jti)
+        except jwt.ExpiredSignatureError:
+            # Already unusable; nothing to store
+            pass
         except jwt.InvalidTokenError:
             logger.warning("Attempted to revoke invalid token")
     
@@ -255,7 +266,7 @@ class JWTManager:
             
             # Check if token is blacklisted
             jti = payload.get("jti")
-            if jti and jti in self.blacklisted_tokens:
+            if jti and self.revocation_store.is_revoked(jti):
                 return TokenValidationResult(
                     is_valid=False,
                     error="Token has been revoked"
@@ -305,9 +316,10 @@ class JWTManager:
         for token_hash, token_data in self.refresh_token_store.items():
             if token_data.get("user_id") == str(user_id):
                 tokens_to_remove.append(token_hash)
-                # Add JTI to blacklist if available
+                # Revoke JTI until the token would expire anyway
                 if "jti" in token_data:
-                    self.blacklisted_tokens.add(token_data["jti"])
+                    expires_at = token_data["expires_at"].replace(tzinfo=timezone.utc).timestamp()
+                    self.revocation_store.revoke(token_data["jti"], expires_at)
         
         for token_hash in tokens_to_remove:
             del self.refresh_token_store[token_hash]
@@ -330,10 +342,7 @@ class JWTManager:
             for token_hash in expired_tokens:
                 del self.refresh_token_store[token_hash]
             
-            # Limit blacklist size (keep only recent entries)
-            if len(self.blacklisted_tokens) > 10000:
-                # In production, implement proper cleanup based on token expiration
-                self.blacklisted_tokens = set(list(self.blacklisted_tokens)[-5000:])
+            # Revoked JTIs expire by themselves at token expiry (revocation store)
             
             if expired_tokens:
                 logger.info(f"Cleaned up {len(expired_tokens)} expired refresh tokens")
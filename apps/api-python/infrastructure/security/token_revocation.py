@@ -0,0 +1,255 @@
+"""JWT revocation store shared across workers with a local bloom filter fast path"""
+
+import hashlib
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+import redis
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Revogações feitas em outro worker ficam visíveis localmente em até SYNC_INTERVAL
+# (sincronização numa thread de fundo, nunca no caminho da requisição)
+DEFAULT_SYNC_INTERVAL_SECONDS = 5.0
+DEFAULT_BLOOM_CAPACITY = 100_000
+DEFAULT_BLOOM_ERROR_RATE = 0.001
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter (no false negatives).
+
+    Sized for `capacity` items at `error_rate` false positives; k bit positions
+    per item come from double hashing one SHA-256 digest.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_BLOOM_CAPACITY, error_rate: float = DEFAULT_BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class InMemoryRevocationBackend:
+    """
+    Process-local backend (tests / single worker without Redis).
+    jti -> expiry (unix time); expired entries are dropped on read.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[jti] = max(expires_at, self._entries.get(jti, 0))
+
+    def active_revocations(self) -> Dict[str, float]:
+        now = time.time()
+        with self._lock:
+            for jti in [j for j, exp in self._entries.items() if exp <= now]:
+                del self._entries[jti]
+            return dict(self._entries)
+
+
+class RedisRevocationBackend:
+    """
+    Redis backend shared by every Gunicorn worker.
+
+    - {prefix}:{jti} with TTL = remaining token lifetime (exact lookups)
+    - {prefix}:index sorted set (score = expiry) to rebuild the local state;
+      expired members are trimmed on each sync
+
+    The client connects on first command and reconnects on the next one after
+    a failure, so Redis being down at startup is not permanent.
+    """
+
+    def __init__(self, redis_url: str, key_prefix: str = "jwt_revoked"):
+        self.redis_client = redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2
+        )
+        self.key_prefix = key_prefix
+        self.index_key = f"{key_prefix}:index"
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        ttl = int(math.ceil(expires_at - time.time()))
+        if ttl <= 0:
+            return
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.set(f"{self.key_prefix}:{jti}", "1", ex=ttl)
+        pipe.zadd(self.index_key, {jti: expires_at})
+        pipe.execute()
+
+    def active_revocations(self) -> Dict[str, float]:
+        now = time.time()
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zremrangebyscore(self.index_key, "-inf", now)
+        pipe.zrangebyscore(self.index_key, now, "+inf", withscores=True)
+        _, members = pipe.execute()
+        return dict(members)
+
+
+class TokenRevocationStore:
+    """
+    Revoked JWT ids with expiry at token expiry.
+
+    is_revoked() never does I/O: a local bloom filter answers the common
+    not-revoked case with a few bit tests, and bloom hits are resolved against
+    the local snapshot of active revocations (jti -> expiry). A background
+    thread (start()) rebuilds both from the shared backend every sync_interval
+    seconds, which also forgets expired revocations. Revocations that could not
+    be written to the backend stay pending and are written again on each sync.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        sync_interval: float = DEFAULT_SYNC_INTERVAL_SECONDS,
+        capacity: int = DEFAULT_BLOOM_CAPACITY,
+        error_rate: float = DEFAULT_BLOOM_ERROR_RATE
+    ):
+        self.backend = backend or InMemoryRevocationBackend()
+        self.sync_interval = sync_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._revoked: Dict[str, float] = {}
+        # Revogações deste worker ainda não vistas num snapshot do backend
+        self._recent: Dict[str, float] = {}
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stats = {"checks": 0, "bloom_negatives": 0, "syncs": 0, "sync_errors": 0, "backend_write_errors": 0}
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke a token id until expires_at (unix time)"""
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._remember(self._revoked, jti, expires_at)
+            self._remember(self._recent, jti, expires_at)
+            self._bloom.add(jti)
+
+        try:
+            self.backend.revoke(jti, expires_at)
+        except Exception as e:
+            # Já vale neste worker; os outros veem depois que o sync regravar
+            self._stats["backend_write_errors"] += 1
+            with self._lock:
+                self._remember(self._pending, jti, expires_at)
+            logger.warning("Revocation backend write failed, will retry on next sync", error=str(e))
+
+    def is_revoked(self, jti: str) -> bool:
+        self._stats["checks"] += 1
+
+        if jti not in self._bloom:
+            self._stats["bloom_negatives"] += 1
+            return False
+
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def sync(self) -> int:
+        """Write pending revocations, then rebuild the local state from the backend"""
+        with self._sync_lock:
+            with self._lock:
+                pending = dict(self._pending)
+            for jti, expires_at in pending.items():
+                self.backend.revoke(jti, expires_at)
+                with self._lock:
+                    if self._pending.get(jti) == expires_at:
+                        del self._pending[jti]
+
+            revoked = dict(self.backend.active_revocations())
+            now = time.time()
+            with self._lock:
+                self._recent = {
+                    jti: expires_at for jti, expires_at in self._recent.items()
+                    if jti not in revoked and expires_at > now
+                }
+                for source in (self._recent, self._pending):
+                    for jti, expires_at in source.items():
+                        self._remember(revoked, jti, expires_at)
+                bloom = BloomFilter(max(self.capacity, len(revoked) * 2), self.error_rate)
+                for jti in revoked:
+                    bloom.add(jti)
+                self._revoked = revoked
+                self._bloom = bloom
+
+            self._stats["syncs"] += 1
+            return len(revoked)
+
+    def start(self) -> None:
+        """Start the background sync thread (first sync runs immediately)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._sync_loop, name="jwt-revocation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _sync_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                # Mantém o estado anterior; tenta de novo no próximo intervalo
+                self._stats["sync_errors"] += 1
+                logger.warning("Revocation store sync failed", error=str(e))
+            self._stop.wait(self.sync_interval)
+
+    @staticmethod
+    def _remember(entries: Dict[str, float], jti: str, expires_at: float) -> None:
+        entries[jti] = max(expires_at, entries.get(jti, 0))
+
+    def get_metrics(self) -> Dict[str, object]:
+        return {
+            **self._stats,
+            "bloom_items": self._bloom.count,
+            "bloom_bits": self._bloom.size,
+            "pending_writes": len(self._pending),
+            "backend": type(self.backend).__name__,
+        }
+
+
+# Global instance (created on first use)
+_revocation_store: Optional[TokenRevocationStore] = None
+
+
+def get_token_revocation_store() -> TokenRevocationStore:
+    """Get or create singleton revocation store (Redis, synced by a background thread)"""
+    global _revocation_store
+    if _revocation_store is None:
+        from infrastructure.config.settings import get_settings
+
+        redis_url = get_settings().redis_url
+        _revocation_store = TokenRevocationStore(RedisRevocationBackend(redis_url))
+        _revocation_store.start()
+        logger.info("JWT revocation store using Redis", redis_url=redis_url)
+    return _revocation_store
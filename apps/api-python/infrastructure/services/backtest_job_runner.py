@@ -0,0 +1,463 @@
+"""
+Backtest Job Runner
+Runs backtests as background jobs instead of inside the HTTP request.
+
+- Execution: each job runs in a separate process (spawn ProcessPoolExecutor),
+  so the simulation never holds the Gunicorn worker's event loop. A job is a
+  module-level `async work(params, report)`; pool processes keep one event loop
+  and open their own database/cache connections (process_setup).
+- Bounded concurrency (semaphore + pool size): a burst of backtests queues up.
+- Progress: the simulation reports (candles processed, total, trades) back over
+  a multiprocessing queue; the runner keeps it on the job and pushes throttled
+  snapshots to a notifier.
+- Result cache: jobs carry a cache key (BacktestService.build_cache_key). A
+  finished payload is stored in the shared cache, an identical submit is
+  answered immediately, and identical in-flight submits of the same owner share
+  one job (a job id is only ever handed to the user who owns it).
+- Job state lives in the shared cache (Redis): snapshots answer
+  `GET /backtest/jobs/{id}` on any worker, and a cancel request made on another
+  worker is left there as a flag that the owning worker picks up.
+"""
+import asyncio
+import multiprocessing
+import queue
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import structlog
+
+from infrastructure.cache.shared_cache import SharedCache, shared_cache_backend
+
+logger = structlog.get_logger(__name__)
+
+MAX_CONCURRENT_JOBS = 2
+PROGRESS_PUBLISH_INTERVAL = 1.0  # segundos entre snapshots de progresso
+RESULT_CACHE_TTL = 6 * 3600
+JOB_RETENTION_SECONDS = 3600
+
+# (candles_processed, total_candles, trades)
+ProgressReporter = Callable[[int, int, int], Awaitable[None]]
+# (event_type, job snapshot)
+JobNotifier = Callable[[str, Dict[str, Any]], Awaitable[None]]
+# Função async de módulo (picklable): (params, report) -> payload
+JobWork = Callable[[Dict[str, Any], ProgressReporter], Awaitable[Dict[str, Any]]]
+ProcessSetup = Callable[[], Awaitable[None]]
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    """Levantada no processo do job quando o cancelamento é pedido"""
+
+
+async def connect_job_process() -> None:
+    """Conexões próprias de um processo de jobs (banco + cache compartilhado)"""
+    from infrastructure.database.connection import database_manager
+
+    await database_manager.connect()
+    await shared_cache_backend.connect()
+
+
+# ==================== Job process ====================
+
+_process_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_job_process(setup: Optional[ProcessSetup]) -> None:
+    """Initializer do pool: um event loop por processo (singletons async sobrevivem entre jobs)"""
+    global _process_loop
+    _process_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_process_loop)
+    if setup is None:
+        return
+    try:
+        _process_loop.run_until_complete(setup())
+    except Exception as e:
+        logger.warning(f"⚠️ Backtest job process setup failed: {e}")
+
+
+def _execute_job(work: JobWork, params: Dict[str, Any], progress, cancel_flag) -> Dict[str, Any]:
+    """Roda um job no processo do pool; progresso volta pela fila, cancelamento vem pelo flag"""
+
+    async def report(candles_processed: int, total_candles: int, trades: int) -> None:
+        if cancel_flag.is_set():
+            raise JobCancelled()
+        progress.put((candles_processed, total_candles, trades))
+
+    return _process_loop.run_until_complete(work(params, report))
+
+
+@dataclass
+class BacktestJob:
+    """Estado de um job de backtest"""
+    id: str
+    kind: str
+    cache_key: Optional[str] = None
+    owner_user_id: Optional[str] = None
+    status: str = "queued"  # queued, running, completed, failed, cancelled
+    progress: Dict[str, int] = field(default_factory=lambda: {
+        "candles_processed": 0,
+        "total_candles": 0,
+        "trades": 0,
+        "simulations_completed": 0,
+    })
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cached: bool = False
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    # Exceção original (endpoints síncronos re-levantam para manter os status HTTP)
+    exception: Optional[BaseException] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "error": self.error,
+            "cached": self.cached,
+            "cache_key": self.cache_key,
+            "owner_user_id": self.owner_user_id,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class BacktestJobRunner:
+    """Fila de jobs de backtest com concorrência limitada, executados fora do processo web"""
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_JOBS,
+        results_cache: Optional[SharedCache] = None,
+        jobs_cache: Optional[SharedCache] = None,
+        executor: Optional[Executor] = None,
+        process_setup: Optional[ProcessSetup] = connect_job_process,
+    ):
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._mp_context = multiprocessing.get_context("spawn")
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._process_setup = process_setup
+        self._manager = None
+        self._jobs: Dict[str, BacktestJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancel_flags: Dict[str, Any] = {}
+        self._inflight: Dict[Tuple[str, Optional[str]], str] = {}  # (cache_key, owner) -> job_id
+        self._results = results_cache or SharedCache(
+            "backtest_results", default_ttl=RESULT_CACHE_TTL, broadcast_sets=False, max_local_entries=32
+        )
+        self._snapshots = jobs_cache or SharedCache(
+            "backtest_jobs", default_ttl=JOB_RETENTION_SECONDS, local=False, broadcast_sets=False
+        )
+        self._stats = {"submitted": 0, "cache_hits": 0, "coalesced": 0, "completed": 0, "failed": 0, "cancelled": 0}
+
+    # ==================== Submit ====================
+
+    async def submit(
+        self,
+        kind: str,
+        work: JobWork,
+        params: Dict[str, Any],
+        cache_key: Optional[str] = None,
+        owner_user_id: Optional[str] = None,
+        notify: Optional[JobNotifier] = None,
+    ) -> BacktestJob:
+        """
+        Enfileira um backtest.
+
+        Args:
+            kind: Tipo do job ("basic", "advanced", "optimize")
+            work: Função async de módulo (params, report) -> payload, executada no pool;
+                report(candles_processed, total_candles, trades)
+            params: Argumentos do job (picklable)
+            cache_key: Hash da definição (None = não cacheável)
+            owner_user_id: Usuário autenticado dono do job (recebe o progresso)
+            notify: async (event_type, snapshot) chamado com progresso/conclusão
+
+        Returns:
+            O job (já completo em caso de cache hit; o job existente do mesmo dono se idêntico estiver em andamento)
+        """
+        self._prune()
+        self._stats["submitted"] += 1
+
+        if cache_key:
+            inflight_id = self._inflight.get((cache_key, owner_user_id))
+            if inflight_id and inflight_id in self._jobs:
+                self._stats["coalesced"] += 1
+                return self._jobs[inflight_id]
+
+            cached = await self._results.get(cache_key)
+            if cached is not None:
+                self._stats["cache_hits"] += 1
+                job = self._new_job(kind, cache_key, owner_user_id)
+                job.cached = True
+                job.progress["simulations_completed"] = 1
+                self._finish(job, "completed", result=cached)
+                await self._publish(job, notify, "backtest_completed")
+                return job
+
+        job = self._new_job(kind, cache_key, owner_user_id)
+        if cache_key:
+            self._inflight[(cache_key, owner_user_id)] = job.id
+        await self._store_snapshot(job)
+        self._tasks[job.id] = asyncio.create_task(self._run(job, work, params, notify))
+        logger.info("📥 Backtest job queued", job_id=job.id, kind=kind)
+        return job
+
+    def _new_job(self, kind: str, cache_key: Optional[str], owner_user_id: Optional[str]) -> BacktestJob:
+        job = BacktestJob(id=str(uuid.uuid4()), kind=kind, cache_key=cache_key, owner_user_id=owner_user_id)
+        self._jobs[job.id] = job
+        return job
+
+    # ==================== Execution ====================
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_concurrent,
+                mp_context=self._mp_context,
+                initializer=_init_job_process,
+                initargs=(self._process_setup,),
+            )
+        return self._executor
+
+    def _get_manager(self):
+        """Manager das filas de progresso/flags de cancelamento (proxies picklable para o pool)"""
+        if self._manager is None:
+            self._manager = self._mp_context.Manager()
+        return self._manager
+
+    async def _run(self, job: BacktestJob, work: JobWork, params: Dict[str, Any], notify: Optional[JobNotifier]) -> None:
+        try:
+            async with self._semaphore:
+                if await self._cancel_requested(job.id):
+                    raise JobCancelled()
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                await self._publish(job, notify, "backtest_progress")
+
+                result = await self._execute(job, work, params, notify)
+
+            self._finish(job, "completed", result=result)
+            if job.cache_key:
+                await self._results.set(job.cache_key, result)
+            await self._publish(job, notify, "backtest_completed")
+
+        except (asyncio.CancelledError, JobCancelled):
+            self._finish(job, "cancelled")
+            await self._publish(job, notify, "backtest_failed")
+
+        except Exception as e:
+            logger.error("❌ Backtest job failed", job_id=job.id, error=str(e))
+            job.exception = e
+            self._finish(job, "failed", error=str(e))
+            await self._publish(job, notify, "backtest_failed")
+
+        finally:
+            self._tasks.pop(job.id, None)
+            self._cancel_flags.pop(job.id, None)
+            inflight_key = (job.cache_key, job.owner_user_id)
+            if job.cache_key and self._inflight.get(inflight_key) == job.id:
+                del self._inflight[inflight_key]
+
+    async def _execute(
+        self, job: BacktestJob, work: JobWork, params: Dict[str, Any], notify: Optional[JobNotifier]
+    ) -> Dict[str, Any]:
+        """Roda o job no pool; enquanto isso repassa o progresso e verifica pedidos de cancelamento"""
+        manager = self._get_manager()
+        progress = manager.Queue()
+        cancel_flag = manager.Event()
+        self._cancel_flags[job.id] = cancel_flag
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), _execute_job, work, params, progress, cancel_flag
+            )
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise
+
+        try:
+            while not future.done():
+                await asyncio.wait({future}, timeout=PROGRESS_PUBLISH_INTERVAL)
+                if self._drain_progress(job, progress):
+                    await self._publish(job, notify, "backtest_progress")
+                if not cancel_flag.is_set() and await self._cancel_requested(job.id):
+                    cancel_flag.set()
+            self._drain_progress(job, progress)
+            return future.result()
+        except asyncio.CancelledError:
+            # Task cancelada: o processo para no próximo report
+            try:
+                cancel_flag.set()
+            except Exception:
+                pass
+            raise
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise
+
+    @staticmethod
+    def _drain_progress(job: BacktestJob, progress) -> bool:
+        """Aplica no job os reports pendentes; True se houve algum"""
+        changed = False
+        while True:
+            try:
+                candles_processed, total_candles, trades = progress.get_nowait()
+            except queue.Empty:
+                return changed
+            changed = True
+            job.progress["candles_processed"] = candles_processed
+            job.progress["total_candles"] = total_candles
+            job.progress["trades"] = trades
+            if total_candles and candles_processed >= total_candles:
+                job.progress["simulations_completed"] += 1
+
+    def _reset_executor(self) -> None:
+        """Um processo do pool morreu: o próximo job cria um pool novo"""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _finish(self, job: BacktestJob, status: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        self._stats[status] += 1
+        job.done.set()
+
+    async def _publish(self, job: BacktestJob, notify: Optional[JobNotifier], event_type: str) -> None:
+        await self._store_snapshot(job)
+        if notify is None:
+            return
+        try:
+            await notify(event_type, job.to_dict(include_result=event_type == "backtest_completed"))
+        except Exception as e:
+            logger.debug(f"Backtest job notification failed: {e}")
+
+    async def _store_snapshot(self, job: BacktestJob) -> None:
+        """Espelha o estado no cache compartilhado (consultas vindas de outro worker)"""
+        # Resultado cacheável já fica em backtest_results; não duplica o payload
+        snapshot = job.to_dict(include_result=job.finished and not job.cache_key)
+        try:
+            await self._snapshots.set(job.id, snapshot)
+        except Exception as e:
+            logger.debug(f"Backtest job snapshot failed: {e}")
+
+    # ==================== Queries ====================
+
+    async def wait(self, job_id: str) -> BacktestJob:
+        """Aguarda o job terminar (endpoints síncronos)"""
+        job = self._jobs[job_id]
+        await job.done.wait()
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot do job com resultado (se concluído); procura também em outros workers"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict(include_result=True)
+
+        snapshot = await self._snapshots.get(job_id)
+        if snapshot is None:
+            return None
+        snapshot = dict(snapshot)
+        if snapshot.get("status") == "completed" and snapshot.get("result") is None and snapshot.get("cache_key"):
+            snapshot["result"] = await self._results.get(snapshot["cache_key"])
+        snapshot.setdefault("result", None)
+        return snapshot
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancela um job em andamento (de qualquer worker)"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            if job.finished:
+                return False
+            cancel_flag = self._cancel_flags.get(job_id)
+            if cancel_flag is not None:
+                cancel_flag.set()  # Rodando: o processo para no próximo report
+            else:
+                task = self._tasks.get(job_id)
+                if task is not None:
+                    task.cancel()  # Ainda na fila
+            return True
+
+        # Job de outro worker: deixa o pedido no cache compartilhado
+        snapshot = await self._snapshots.get(job_id)
+        if snapshot is None or snapshot.get("status") in TERMINAL_STATUSES:
+            return False
+        await self._snapshots.set(self._cancel_key(job_id), True)
+        return True
+
+    @staticmethod
+    def _cancel_key(job_id: str) -> str:
+        return f"cancel:{job_id}"
+
+    async def _cancel_requested(self, job_id: str) -> bool:
+        try:
+            return bool(await self._snapshots.get(self._cancel_key(job_id)))
+        except Exception:
+            return False
+
+    def shutdown(self) -> None:
+        """Encerra o pool de processos e o manager (shutdown da aplicação)"""
+        for cancel_flag in list(self._cancel_flags.values()):
+            cancel_flag.set()
+        for task in list(self._tasks.values()):
+            task.cancel()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def _prune(self) -> None:
+        cutoff = datetime.utcnow().timestamp() - JOB_RETENTION_SECONDS
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at and job.finished_at.timestamp() < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "max_concurrent": self.max_concurrent,
+            "running": sum(1 for j in self._jobs.values() if j.status == "running"),
+            "queued": sum(1 for j in self._jobs.values() if j.status == "queued"),
+            "tracked_jobs": len(self._jobs),
+        }
+
+
+# Singleton
+_job_runner: Optional[BacktestJobRunner] = None
+
+
+def get_backtest_job_runner() -> BacktestJobRunner:
+    """Get or create singleton backtest job runner"""
+    global _job_runner
+
+    if _job_runner is None:
+        _job_runner = BacktestJobRunner()
+
+    return _job_runner
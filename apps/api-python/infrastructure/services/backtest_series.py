@@ -0,0 +1,213 @@
+"""
+Backtest Series
+Columnar storage for backtest equity curves and indicator series.
+
+During a run every bar used to become a small dict ({"timestamp", "equity",
+"price"} / {"time", "value"}); long backtests allocated millions of them.
+Here the values live in preallocated NumPy columns and are only turned into
+points at the edges:
+
+- charts: LTTB downsampling (Largest-Triangle-Three-Buckets keeps the visual
+  shape, peaks and drawdowns included) to a fixed number of points
+- persistence: columnar JSON arrays ({"format", "time", "equity", "price"})
+  in strategy_backtest_results.equity_curve; decode_equity_curve() turns both
+  this and the legacy list-of-points format back into points for the API.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+EQUITY_CURVE_FORMAT = "columnar-v1"
+EQUITY_DECIMALS = 4
+PRICE_DECIMALS = 8
+MIN_CAPACITY = 64
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of the `threshold` points that best
+    preserve the shape of y(x). First and last points are always kept.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        # Ponto médio do próximo bucket = terceiro vértice do triângulo
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[a] - avg_x) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+
+class EquityCurve:
+    """
+    Equity per bar as growable NumPy columns (unix seconds, equity, price).
+
+    Capacity can be reserved up front (number of simulated candles); append and
+    extend then never reallocate.
+    """
+
+    __slots__ = ("_times", "_equity", "_price", "_size")
+
+    def __init__(self, capacity: int = 0):
+        self._times = np.empty(capacity, dtype=np.int64)
+        self._equity = np.empty(capacity, dtype=float)
+        self._price = np.empty(capacity, dtype=float)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EquityCurve):
+            return NotImplemented
+        return (
+            len(self) == len(other)
+            and np.array_equal(self.times, other.times)
+            and np.array_equal(self.equities, other.equities)
+            and np.array_equal(self.prices, other.prices)
+        )
+
+    __hash__ = None
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[:self._size]
+
+    @property
+    def equities(self) -> np.ndarray:
+        return self._equity[:self._size]
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._price[:self._size]
+
+    def reserve(self, capacity: int) -> None:
+        """Garante espaço para `capacity` pontos no total"""
+        if capacity <= len(self._times):
+            return
+        for name in ("_times", "_equity", "_price"):
+            current = getattr(self, name)
+            grown = np.empty(capacity, dtype=current.dtype)
+            grown[:self._size] = current[:self._size]
+            setattr(self, name, grown)
+
+    def _grow_for(self, count: int) -> None:
+        needed = self._size + count
+        if needed > len(self._times):
+            self.reserve(max(needed, 2 * len(self._times), MIN_CAPACITY))
+
+    def append(self, time: int, equity: float, price: float) -> None:
+        self._grow_for(1)
+        i = self._size
+        self._times[i] = time
+        self._equity[i] = equity
+        self._price[i] = price
+        self._size = i + 1
+
+    def extend(self, times: Sequence[int], equity: Any, price: Any) -> None:
+        """Appends len(times) points; equity/price may be arrays or a scalar"""
+        count = len(times)
+        if not count:
+            return
+        self._grow_for(count)
+        start, end = self._size, self._size + count
+        self._times[start:end] = times
+        self._equity[start:end] = equity
+        self._price[start:end] = price
+        self._size = end
+
+    def encode(self, max_points: Optional[int] = None) -> Dict[str, Any]:
+        """Compact columnar form (LTTB-downsampled to max_points) for storage/JSON"""
+        times, equities, prices = self.times, self.equities, self.prices
+        if max_points and len(self) > max_points:
+            keep = lttb_indices(times, equities, max_points)
+            times, equities, prices = times[keep], equities[keep], prices[keep]
+
+        return {
+            "format": EQUITY_CURVE_FORMAT,
+            "time": times.tolist(),
+            "equity": np.round(equities, EQUITY_DECIMALS).tolist(),
+            "price": np.round(prices, PRICE_DECIMALS).tolist(),
+        }
+
+
+def decode_equity_curve(stored: Any) -> List[Dict[str, Any]]:
+    """
+    Stored equity curve -> [{"timestamp", "equity", "price"}] (API format).
+    Accepts the columnar format and legacy lists of points.
+    """
+    if not stored:
+        return []
+    if isinstance(stored, list):
+        return stored
+    if stored.get("format") != EQUITY_CURVE_FORMAT:
+        return []
+
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(t, tz=timezone.utc).isoformat(),
+            "equity": equity,
+            "price": price,
+        }
+        for t, equity, price in zip(stored["time"], stored["equity"], stored["price"])
+    ]
+
+
+class IndicatorSeries:
+    """
+    Indicator values per candle: one preallocated float column per key
+    ("rsi.value", ...), NaN where the indicator had no value.
+    """
+
+    __slots__ = ("times", "_columns")
+
+    def __init__(self, times: Sequence[int]):
+        self.times = np.asarray(times, dtype=np.int64)
+        self._columns: Dict[str, np.ndarray] = {}
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return self._columns
+
+    def record(self, key: str, index: int, value: float) -> None:
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = np.full(len(self.times), np.nan)
+        column[index] = value
+
+    def to_chart(self, max_points: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """{key: [{"time", "value"}]} for the chart, LTTB-downsampled above max_points"""
+        chart: Dict[str, List[Dict[str, Any]]] = {}
+        for key, column in self._columns.items():
+            valid = np.flatnonzero(~np.isnan(column))
+            if max_points and len(valid) > max_points:
+                valid = valid[lttb_indices(self.times[valid], column[valid], max_points)]
+            chart[key] = [
+                {"time": t, "value": v}
+                for t, v in zip(self.times[valid].tolist(), column[valid].tolist())
+            ]
+        return chart
@@ -6,12 +6,14 @@ Simulates strategy execution on historical data to evaluate performance.
 """
 
 import asyncio
-from dataclasses import dataclass, field
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-import aiohttp
+import numpy as np
 import structlog
 
 from infrastructure.database.models.strategy import (
@@ -46,9 +48,72 @@ from infrastructure.indicators import (
     EMACalculator,
     ATRCalculator,
 )
+from infrastructure.services.backtest_series import EquityCurve, IndicatorSeries
+from infrastructure.services.candle_service import get_candle_service
+from infrastructure.services.condition_compiler import CompiledConditionSet, compile_condition_sets
 
 logger = structlog.get_logger(__name__)
 
+# Bump when simulation semantics change: invalidates cached results (config_hash)
+BACKTEST_ENGINE_VERSION = 1
+
+# Progress callback cadence (also yields the event loop during long simulations)
+PROGRESS_EVERY_CANDLES = 500
+
+ProgressCallback = Callable[[int, int, int], Awaitable[None]]
+
+# Stored equity curve / chart indicator series sizes (LTTB-downsampled above this)
+EQUITY_CURVE_MAX_POINTS = 500
+CHART_MAX_POINTS = 5000
+
+# Event-driven fast path: first SL/TP/exit search window (doubles while nothing is hit)
+EVENT_SEARCH_WINDOW = 64
+
+SignalMasks = Dict[ConditionType, Any]
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+
+def backtest_config_hash(
+    strategy: Strategy,
+    symbols: List[str],
+    start_date: datetime,
+    end_date: datetime,
+    config: Any,
+    kind: str = "basic",
+) -> str:
+    """
+    Hash of everything that determines a backtest result: strategy definition
+    (timeframe, indicators, conditions), symbols, range, config and engine version.
+    """
+    definition = {
+        "engine": BACKTEST_ENGINE_VERSION,
+        "kind": kind,
+        "timeframe": strategy.timeframe,
+        "indicators": sorted(
+            (
+                [str(_enum_value(ind.indicator_type)), ind.parameters or {}]
+                for ind in strategy.indicators
+            ),
+            key=lambda item: json.dumps(item, sort_keys=True, default=str),
+        ),
+        "conditions": sorted(
+            (
+                [str(_enum_value(cond.condition_type)), cond.get_conditions_list(), str(_enum_value(cond.logic_operator))]
+                for cond in strategy.conditions
+            ),
+            key=lambda item: item[0],
+        ),
+        "symbols": [s.upper() for s in symbols],
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "config": asdict(config),
+    }
+    encoded = json.dumps(definition, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
 
 @dataclass
 class BacktestTrade:
@@ -106,6 +171,44 @@ class BacktestConfig:
     partial_tp_2_percent: Decimal = Decimal("4.0")  # TP2 em +4% (restante)
 
 
+@dataclass
+class CandleArrays:
+    """Columnar view of a candle list (built once per run, shared by simulations)"""
+    open: Any
+    high: Any
+    low: Any
+    close: Any
+    times: Any  # unix seconds (int64), as in the chart candles
+
+    @classmethod
+    def from_candles(cls, candles: List[Candle]) -> "CandleArrays":
+        return cls(
+            open=np.array([float(c.open) for c in candles], dtype=float),
+            high=np.array([float(c.high) for c in candles], dtype=float),
+            low=np.array([float(c.low) for c in candles], dtype=float),
+            close=np.array([float(c.close) for c in candles], dtype=float),
+            times=np.array([int(c.timestamp.timestamp()) for c in candles], dtype=np.int64),
+        )
+
+    def price_columns(self) -> Dict[str, Any]:
+        """Price series under the same keys as the per-bar condition context"""
+        return {"close": self.close, "open": self.open, "high": self.high, "low": self.low}
+
+
+def build_signal_masks(
+    conditions: Dict[ConditionType, List[Dict]],
+    condition_operators: Dict[ConditionType, LogicOperator],
+    columns: Dict[str, Any],
+    length: int,
+) -> SignalMasks:
+    """Entry/exit masks over the whole series (columns: key -> float array, NaN = missing)"""
+    return {
+        condition_type: condition_set.evaluate_mask(columns, length)
+        for condition_type, condition_set in compile_condition_sets(conditions, condition_operators).items()
+        if condition_set
+    }
+
+
 @dataclass
 class BacktestState:
     """State during backtest execution"""
@@ -115,7 +218,7 @@ class BacktestState:
     entry_price: Decimal = Decimal("0")
     entry_time: Optional[datetime] = None
     trades: List[BacktestTrade] = field(default_factory=list)
-    equity_curve: List[Dict[str, Any]] = field(default_factory=list)
+    equity_curve: EquityCurve = field(default_factory=EquityCurve)
 
     # Trailing stop tracking - Fase 2
     trailing_stop_active: bool = False
@@ -175,6 +278,33 @@ class BacktestService:
         self.db = db_pool
         self._strategy_repo = StrategyRepository(db_pool)
         self._backtest_repo = StrategyBacktestResultRepository(db_pool)
+        # Optional async (candles_processed, total_candles, trades) reporter (backtest jobs)
+        self.progress_callback: Optional[ProgressCallback] = None
+
+    async def build_cache_key(
+        self,
+        strategy_id: str,
+        symbols: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        config: Any,
+        kind: str = "basic",
+    ) -> Tuple[Strategy, Optional[str]]:
+        """
+        Load the strategy and hash the backtest definition.
+
+        Returns (strategy, config_hash); config_hash is None when the range reaches
+        the candle still forming (result would change on the next run).
+        """
+        strategy = await self._strategy_repo.get_with_relations(strategy_id)
+        if not strategy:
+            raise ValueError(f"Strategy {strategy_id} not found")
+
+        now = datetime.now(end_date.tzinfo) if end_date.tzinfo else datetime.utcnow()
+        if end_date >= now - timedelta(milliseconds=self._timeframe_to_ms(strategy.timeframe)):
+            return strategy, None
+
+        return strategy, backtest_config_hash(strategy, symbols, start_date, end_date, config, kind)
 
     async def run_backtest(
         self,
@@ -213,6 +343,7 @@ class BacktestService:
         start_date: datetime,
         end_date: datetime,
         config: Optional[BacktestConfig] = None,
+        config_hash: Optional[str] = None,
     ) -> Tuple[StrategyBacktestResult, Dict[str, Any]]:
         """
         Run a backtest for a strategy and return chart data
@@ -223,6 +354,8 @@ class BacktestService:
             start_date: Backtest start date
             end_date: Backtest end date
             config: Backtest configuration
+            config_hash: Definition hash (see build_cache_key). A stored result with the
+                same hash is returned without simulating; new results are saved with it.
 
         Returns:
             Tuple of (StrategyBacktestResult, chart_data dict with candles and indicators)
@@ -255,6 +388,22 @@ class BacktestService:
                 end_date=end_date
             )
 
+            # Identical definition already simulated: reuse the stored result
+            if config_hash:
+                cached = await self._backtest_repo.get_by_config_hash(strategy_id, config_hash)
+                if cached:
+                    logger.info("Backtest result served from cache", strategy_id=strategy_id, config_hash=config_hash)
+                    # Only the simulation is skipped: the chart still gets the indicator series
+                    min_candles, _, indicator_series, indicator_values_at = self._indicator_context(
+                        candles, self._initialize_calculators(strategy)
+                    )
+                    await self._compute_indicator_range(min_candles, len(candles), indicator_values_at)
+                    return cached, {
+                        "candles": self._chart_candles(candles),
+                        "indicators": indicator_series.to_chart(max_points=CHART_MAX_POINTS),
+                        "cached": True
+                    }
+
             if len(candles) < 100:
                 raise ValueError(f"Insufficient data: only {len(candles)} candles")
 
@@ -288,10 +437,10 @@ class BacktestService:
             # Calculate metrics
             metrics = self._calculate_metrics(state, config)
 
-            # Sample equity curve to reduce size (max 500 points for storage)
-            sampled_equity_curve = self._sample_equity_curve(state.equity_curve, max_points=500)
+            # Downsample (LTTB) and encode the equity curve as columnar arrays for storage
+            encoded_equity_curve = state.equity_curve.encode(max_points=EQUITY_CURVE_MAX_POINTS)
             logger.debug(
-                f"Equity curve sampled: {len(state.equity_curve)} -> {len(sampled_equity_curve)} points"
+                f"Equity curve sampled: {len(state.equity_curve)} -> {len(encoded_equity_curve['time'])} points"
             )
 
             # Create result record
@@ -317,7 +466,8 @@ class BacktestService:
                 max_drawdown=metrics["max_drawdown"],
                 sharpe_ratio=metrics["sharpe_ratio"],
                 trades=[t.to_dict() for t in state.trades],
-                equity_curve=sampled_equity_curve
+                equity_curve=encoded_equity_curve,
+                config_hash=config_hash
             )
 
             # Save to database with retry on connection issues
@@ -342,18 +492,8 @@ class BacktestService:
 
             # Prepare chart data
             chart_data = {
-                "candles": [
-                    {
-                        "time": int(c.timestamp.timestamp()),
-                        "open": float(c.open),
-                        "high": float(c.high),
-                        "low": float(c.low),
-                        "close": float(c.close),
-                        "volume": float(c.volume) if c.volume else 0
-                    }
-                    for c in candles
-                ],
-                "indicators": indicator_series
+                "candles": self._chart_candles(candles),
+                "indicators": indicator_series.to_chart(max_points=CHART_MAX_POINTS)
             }
 
             return saved_result, chart_data
@@ -362,6 +502,19 @@ class BacktestService:
             # NOTE: is_backtesting update disabled temporarily
             pass
 
+    def _chart_candles(self, candles: List[Candle]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "time": int(c.timestamp.timestamp()),
+                "open": float(c.open),
+                "high": float(c.high),
+                "low": float(c.low),
+                "close": float(c.close),
+                "volume": float(c.volume) if c.volume else 0
+            }
+            for c in candles
+        ]
+
     async def _fetch_historical_data(
         self,
         symbol: str,
@@ -369,17 +522,13 @@ class BacktestService:
         start_date: datetime,
         end_date: datetime,
     ) -> List[Candle]:
-        """Fetch historical klines from Binance"""
-        candles = []
-
+        """Fetch historical klines via the shared CandleService (DB + Binance)"""
         # Convert timeframe to milliseconds
         tf_ms = self._timeframe_to_ms(timeframe)
 
         start_ts = int(start_date.timestamp() * 1000)
         end_ts = int(end_date.timestamp() * 1000)
 
-        url = "https://fapi.binance.com/fapi/v1/klines"
-
         logger.info(
             f"Fetching candles for {symbol} {timeframe}",
             start_date=start_date.isoformat(),
@@ -388,54 +537,32 @@ class BacktestService:
             end_ts=end_ts
         )
 
-        batch_count = 0
-        async with aiohttp.ClientSession() as session:
-            current_ts = start_ts
-
-            while current_ts < end_ts:
-                params = {
-                    "symbol": symbol.upper(),
-                    "interval": timeframe,
-                    "startTime": current_ts,
-                    "endTime": end_ts,
-                    "limit": 1000
-                }
-
-                async with session.get(url, params=params) as resp:
-                    if resp.status != 200:
-                        error_text = await resp.text()
-                        logger.error(f"Failed to fetch klines: {resp.status} - {error_text}")
-                        raise ValueError(f"Failed to fetch klines: {resp.status}")
-
-                    klines = await resp.json()
-
-                    if not klines:
-                        logger.debug(f"No more klines after batch {batch_count}")
-                        break
-
-                    batch_count += 1
-                    for k in klines:
-                        candle = Candle(
-                            timestamp=datetime.fromtimestamp(k[0] / 1000),
-                            open=Decimal(str(k[1])),
-                            high=Decimal(str(k[2])),
-                            low=Decimal(str(k[3])),
-                            close=Decimal(str(k[4])),
-                            volume=Decimal(str(k[5]))
-                        )
-                        candles.append(candle)
-
-                    # Move to next batch
-                    current_ts = klines[-1][0] + tf_ms
-
-                    if batch_count % 5 == 0:
-                        logger.debug(f"Fetched batch {batch_count}, total candles: {len(candles)}")
+        result = await get_candle_service().get_candles(
+            symbol=symbol,
+            interval=timeframe,
+            limit=max(1, (end_ts - start_ts) // tf_ms + 1),
+            start_time=start_ts,
+            end_time=end_ts,
+        )
 
-                # Rate limiting
-                await asyncio.sleep(0.1)
+        if not result.get("success"):
+            logger.error(f"Failed to fetch klines: {result.get('error')}")
+            raise ValueError(f"Failed to fetch klines: {result.get('error')}")
+
+        candles = [
+            Candle(
+                timestamp=datetime.fromtimestamp(c["time"] / 1000),
+                open=Decimal(str(c["open"])),
+                high=Decimal(str(c["high"])),
+                low=Decimal(str(c["low"])),
+                close=Decimal(str(c["close"])),
+                volume=Decimal(str(c["volume"]))
+            )
+            for c in result["candles"]
+        ]
 
         logger.info(
-            f"Fetched {len(candles)} candles for {symbol} {timeframe} in {batch_count} batches"
+            f"Fetched {len(candles)} candles for {symbol} {timeframe} from {result.get('source')}"
         )
         return candles
 
@@ -519,61 +646,173 @@ class BacktestService:
         )
         return state
 
-    async def _run_simulation_with_indicators(
+    def _indicator_context(
         self,
         candles: List[Candle],
         calculators: Dict[str, BaseIndicatorCalculator],
-        conditions: Dict[ConditionType, List[Dict]],
-        condition_operators: Dict[ConditionType, LogicOperator],
-        config: BacktestConfig,
-        state: BacktestState,
-    ) -> Tuple[BacktestState, Dict[str, List[Dict[str, Any]]]]:
-        """Run the backtest simulation and collect indicator data for charts"""
+    ) -> Tuple[int, CandleArrays, IndicatorSeries, Callable[[int], Dict[str, float]]]:
+        """
+        Indicator state for a run: (min_candles, candle arrays, series, indicator_values_at).
+
+        indicator_values_at(i) returns the condition context for candle i and records
+        the values in the series.
+        """
         min_candles = max(
             (calc.required_candles for calc in calculators.values()),
             default=50
         )
 
-        # Initialize indicator series storage
-        indicator_series: Dict[str, List[Dict[str, Any]]] = {}
+        # Indicator series storage: one preallocated column per indicator value
+        arrays = CandleArrays.from_candles(candles)
+        indicator_series = IndicatorSeries(arrays.times)
+
+        # Indicadores com serie vetorizada: uma passada sobre todo o historico
+        precomputed: Dict[str, Dict[datetime, IndicatorResult]] = {}
+        for name, calculator in calculators.items():
+            if calculator.vectorized_series:
+                try:
+                    precomputed[name] = {r.timestamp: r for r in calculator.calculate_series(candles)}
+                except Exception as e:
+                    logger.warning(f"Series calculation failed for {name}, using per-candle: {e}")
 
-        for i in range(min_candles, len(candles)):
+        def indicator_values_at(i: int) -> Dict[str, float]:
             # Get candle window
             window = candles[:i + 1]
-            current_candle = window[-1]
-            timestamp = int(current_candle.timestamp.timestamp())
 
             # Calculate indicators
             indicator_values = {}
             for name, calculator in calculators.items():
                 try:
-                    result = calculator.calculate(window)
+                    if name in precomputed:
+                        result = precomputed[name].get(candles[i].timestamp)
+                    else:
+                        result = calculator.calculate(window)
                     if result and result.values:
                         for key, value in result.values.items():
                             full_key = f"{name}.{key}"
                             indicator_values[full_key] = float(value)
 
                             # Store in series for chart
-                            if full_key not in indicator_series:
-                                indicator_series[full_key] = []
-                            indicator_series[full_key].append({
-                                "time": timestamp,
-                                "value": float(value)
-                            })
+                            indicator_series.record(full_key, i, float(value))
                 except Exception as e:
                     # Log only on first occurrence to avoid spam
                     if i == min_candles:
                         logger.warning(f"Error calculating {name}: {e}")
                     continue
+            return indicator_values
+
+        return min_candles, arrays, indicator_series, indicator_values_at
+
+    async def _run_simulation_with_indicators(
+        self,
+        candles: List[Candle],
+        calculators: Dict[str, BaseIndicatorCalculator],
+        conditions: Dict[ConditionType, List[Dict]],
+        condition_operators: Dict[ConditionType, LogicOperator],
+        config: BacktestConfig,
+        state: BacktestState,
+    ) -> Tuple[BacktestState, IndicatorSeries]:
+        """Run the backtest simulation and collect indicator data for charts"""
+        min_candles, arrays, indicator_series, indicator_values_at = self._indicator_context(candles, calculators)
+
+        if self._supports_event_driven(config):
+            # Stateless exits: indicator columns first, then signal masks + event walk
+            await self._compute_indicator_range(min_candles, len(candles), indicator_values_at)
+            columns = {**indicator_series.columns, **arrays.price_columns()}
+            state = await self._simulate(
+                candles=candles,
+                start_index=min_candles,
+                indicator_values_at=None,
+                conditions=conditions,
+                condition_operators=condition_operators,
+                config=config,
+                state=state,
+                signal_masks=build_signal_masks(conditions, condition_operators, columns, len(candles)),
+                candle_arrays=arrays
+            )
+            return state, indicator_series
+
+        state = await self._simulate(
+            candles=candles,
+            start_index=min_candles,
+            indicator_values_at=indicator_values_at,
+            conditions=conditions,
+            condition_operators=condition_operators,
+            config=config,
+            state=state
+        )
+        return state, indicator_series
+
+    async def _simulate(
+        self,
+        candles: List[Candle],
+        start_index: int,
+        indicator_values_at: Optional[Callable[[int], Dict[str, float]]],
+        conditions: Dict[ConditionType, List[Dict]],
+        condition_operators: Dict[ConditionType, LogicOperator],
+        config: BacktestConfig,
+        state: BacktestState,
+        end_index: Optional[int] = None,
+        signal_masks: Optional[SignalMasks] = None,
+        candle_arrays: Optional[CandleArrays] = None,
+    ) -> BacktestState:
+        """
+        Trading loop over candles[start_index:end_index].
+
+        indicator_values_at(i) returns the indicator context ("rsi.value", ...) for
+        candle i: computed on the window for a regular backtest, looked up in
+        precomputed columns by the parameter optimizer.
+
+        signal_masks (condition type -> boolean array over all candles, see
+        build_signal_masks) replaces per-bar condition evaluation; the context is
+        then not built at all. When the exits are stateless as well (see
+        _supports_event_driven) the run is delegated to _simulate_events.
+        """
+        end_index = len(candles) if end_index is None else end_index
+        total_steps = max(0, end_index - start_index)
+        state.equity_curve.reserve(len(state.equity_curve) + total_steps)
+
+        if signal_masks is not None and self._supports_event_driven(config):
+            return await self._simulate_events(
+                candles=candles,
+                start_index=start_index,
+                end_index=end_index,
+                signal_masks=signal_masks,
+                config=config,
+                state=state,
+                arrays=candle_arrays
+            )
+
+        # Conditions compiled once for the whole run
+        compiled = compile_condition_sets(conditions, condition_operators)
+        empty = CompiledConditionSet([])
+
+        def condition_met(condition_type: ConditionType, i: int, context: Optional[Dict[str, float]]) -> bool:
+            if signal_masks is not None:
+                mask = signal_masks.get(condition_type)
+                return bool(mask[i]) if mask is not None else False
+            return compiled.get(condition_type, empty).evaluate(context)
+
+        for i in range(start_index, end_index):
+            # Report progress and yield the event loop on long ranges
+            processed = i - start_index
+            if processed and processed % PROGRESS_EVERY_CANDLES == 0:
+                if self.progress_callback:
+                    await self.progress_callback(processed, total_steps, len(state.trades))
+                await asyncio.sleep(0)
+
+            current_candle = candles[i]
 
             # Build context
-            context = {
-                "close": float(current_candle.close),
-                "open": float(current_candle.open),
-                "high": float(current_candle.high),
-                "low": float(current_candle.low),
-                **indicator_values
-            }
+            context = None
+            if signal_masks is None:
+                context = {
+                    "close": float(current_candle.close),
+                    "open": float(current_candle.open),
+                    "high": float(current_candle.high),
+                    "low": float(current_candle.low),
+                    **indicator_values_at(i)
+                }
 
             # Check stop loss / take profit if in position
             if state.position:
@@ -591,11 +830,8 @@ class BacktestService:
                     else ConditionType.EXIT_SHORT
                 )
 
-                exit_cond_list = conditions.get(exit_condition_type, [])
-                exit_operator = condition_operators.get(exit_condition_type, LogicOperator.AND)
-
                 # Evaluate exit conditions
-                if exit_cond_list and self._evaluate_conditions(exit_cond_list, exit_operator, context):
+                if condition_met(exit_condition_type, i, context):
                     self._close_position(
                         state=state,
                         exit_price=current_candle.close,
@@ -615,19 +851,16 @@ class BacktestService:
                 unrealized_pnl = self._calculate_unrealized_pnl(
                     state, current_candle.close, config
                 )
-                state.equity_curve.append({
-                    "timestamp": current_candle.timestamp.isoformat(),
-                    "equity": float(state.capital + unrealized_pnl),
-                    "price": float(current_candle.close)
-                })
+                state.equity_curve.append(
+                    int(current_candle.timestamp.timestamp()),
+                    float(state.capital + unrealized_pnl),
+                    float(current_candle.close)
+                )
                 continue
 
             # Evaluate entry conditions
             for condition_type in [ConditionType.ENTRY_LONG, ConditionType.ENTRY_SHORT]:
-                cond_list = conditions.get(condition_type, [])
-                operator = condition_operators.get(condition_type, LogicOperator.AND)
-
-                if cond_list and self._evaluate_conditions(cond_list, operator, context):
+                if condition_met(condition_type, i, context):
                     signal_type = SignalType.LONG if condition_type == ConditionType.ENTRY_LONG else SignalType.SHORT
 
                     self._open_position(
@@ -640,72 +873,226 @@ class BacktestService:
                     break
 
             # Record equity
-            state.equity_curve.append({
-                "timestamp": current_candle.timestamp.isoformat(),
-                "equity": float(state.capital),
-                "price": float(current_candle.close)
-            })
+            state.equity_curve.append(
+                int(current_candle.timestamp.timestamp()),
+                float(state.capital),
+                float(current_candle.close)
+            )
 
-        return state, indicator_series
+        if self.progress_callback:
+            await self.progress_callback(total_steps, total_steps, len(state.trades))
 
-    def _evaluate_conditions(
-        self,
-        conditions: List[Dict],
-        operator: LogicOperator,
-        context: Dict[str, float]
-    ) -> bool:
-        """Evaluate condition set"""
-        results = []
-
-        for cond in conditions:
-            left_key = cond.get("left", "")
-            right_key = cond.get("right", "")
-            op = cond.get("operator", "")
-
-            left_val = self._get_value(left_key, context)
-            right_val = self._get_value(right_key, context)
-
-            if left_val is None or right_val is None:
-                continue
+        return state
 
-            result = self._compare(left_val, op, right_val)
-            results.append(result)
+    @staticmethod
+    def _supports_event_driven(config: BacktestConfig) -> bool:
+        """
+        Fixed SL/TP exits only: trailing stop, break-even and partial TP depend on
+        the price path bar by bar and keep the regular loop.
+        """
+        return not (config.use_trailing_stop or config.use_break_even or config.use_partial_tp)
 
-        if not results:
-            return False
+    async def _compute_indicator_range(
+        self,
+        start_index: int,
+        end_index: int,
+        indicator_values_at: Callable[[int], Dict[str, float]],
+    ) -> None:
+        """Indicator pass over [start_index, end_index) (values land in the indicator series)"""
+        total_steps = max(0, end_index - start_index)
+
+        for i in range(start_index, end_index):
+            processed = i - start_index
+            if processed and processed % PROGRESS_EVERY_CANDLES == 0:
+                if self.progress_callback:
+                    await self.progress_callback(processed, total_steps, 0)
+                await asyncio.sleep(0)
 
-        return all(results) if operator == LogicOperator.AND else any(results)
+            indicator_values_at(i)
 
-    def _get_value(self, key: str, context: Dict[str, float]) -> Optional[float]:
-        """Get value from context or parse as number"""
-        if key in context:
-            return context[key]
+    async def _simulate_events(
+        self,
+        candles: List[Candle],
+        start_index: int,
+        end_index: int,
+        signal_masks: SignalMasks,
+        config: BacktestConfig,
+        state: BacktestState,
+        arrays: Optional[CandleArrays] = None,
+    ) -> BacktestState:
+        """
+        Event-driven equivalent of the _simulate loop for stateless strategies.
 
-        # Aliases
-        aliases = {
-            "ndy.lower": "nadaraya_watson.lower",
-            "ndy.upper": "nadaraya_watson.upper",
-            "tpo.val": "tpo.val",
-            "tpo.vah": "tpo.vah",
+        Instead of visiting every candle it jumps from event to event: the next
+        entry signal (searchsorted over the entry mask indices), then the first bar
+        where the fixed stop/target is touched (vectorized search over low/high)
+        or the exit mask fires. Trades, capital and the per-bar equity curve are
+        the same as the bar-by-bar loop produces.
+        """
+        arrays = arrays or CandleArrays.from_candles(candles)
+        total_steps = max(0, end_index - start_index)
+        no_signal = np.zeros(len(candles), dtype=bool)
+
+        def mask_for(condition_type: ConditionType):
+            mask = signal_masks.get(condition_type)
+            return no_signal if mask is None else np.asarray(mask, dtype=bool)
+
+        entry_long = mask_for(ConditionType.ENTRY_LONG)
+        exit_masks = {
+            SignalType.LONG: mask_for(ConditionType.EXIT_LONG),
+            SignalType.SHORT: mask_for(ConditionType.EXIT_SHORT),
         }
-        if key in aliases and aliases[key] in context:
-            return context[aliases[key]]
+        entries = np.flatnonzero(
+            (entry_long | mask_for(ConditionType.ENTRY_SHORT))[start_index:end_index]
+        ) + start_index
+
+        i = start_index
+        next_yield = start_index + PROGRESS_EVERY_CANDLES
+        while i < end_index:
+            if i >= next_yield:
+                await asyncio.sleep(0)
+                next_yield = i + PROGRESS_EVERY_CANDLES
+
+            # Flat: next entry signal at or after i (LONG wins, as in the loop)
+            pos = int(np.searchsorted(entries, i))
+            if pos == len(entries):
+                self._record_flat_equity(state, arrays, i, end_index)
+                break
+
+            entry_index = int(entries[pos])
+            self._record_flat_equity(state, arrays, i, entry_index)
+            entry_candle = candles[entry_index]
+            self._open_position(
+                state=state,
+                signal_type=SignalType.LONG if entry_long[entry_index] else SignalType.SHORT,
+                entry_price=entry_candle.close,
+                entry_time=entry_candle.timestamp,
+                config=config
+            )
+            self._record_flat_equity(state, arrays, entry_index, entry_index + 1)
 
-        try:
-            return float(key)
-        except ValueError:
-            return None
+            # In position: SL/TP are checked from the next candle on
+            exit_event = self._find_exit(
+                state, candles, arrays, entry_index + 1, end_index,
+                exit_masks[state.position], config
+            )
+            if exit_event is None:
+                self._record_position_equity(state, candles, arrays, entry_index + 1, end_index, config)
+                self._track_price_extremes(state, candles, entry_index + 1, end_index)
+                break
+
+            exit_index, exit_price, exit_reason = exit_event
+            self._record_position_equity(state, candles, arrays, entry_index + 1, exit_index, config)
+            self._close_position(
+                state=state,
+                exit_price=exit_price,
+                exit_time=candles[exit_index].timestamp,
+                exit_reason=exit_reason,
+                config=config
+            )
+            # Flat again on the exit candle: its entry signal is still evaluated
+            i = exit_index
 
-    def _compare(self, left: float, op: str, right: float) -> bool:
-        """Compare values"""
-        ops = {
-            "<": lambda a, b: a < b,
-            ">": lambda a, b: a > b,
-            "<=": lambda a, b: a <= b,
-            ">=": lambda a, b: a >= b,
-            "==": lambda a, b: abs(a - b) < 0.0001,
-        }
-        return ops.get(op, lambda a, b: False)(left, right)
+        if self.progress_callback:
+            await self.progress_callback(total_steps, total_steps, len(state.trades))
+
+        return state
+
+    def _find_exit(
+        self,
+        state: BacktestState,
+        candles: List[Candle],
+        arrays: CandleArrays,
+        start: int,
+        end: int,
+        exit_mask: Any,
+        config: BacktestConfig,
+    ) -> Optional[Tuple[int, Decimal, str]]:
+        """
+        First candle in [start, end) that closes the open position, as
+        (index, exit_price, exit_reason). Same precedence as the loop: stop loss,
+        take profit, then the exit signal.
+
+        The float search only nominates candidates (float(Decimal) is monotonic, so
+        no real hit is missed); each one is confirmed with the Decimal prices.
+        """
+        sl_distance = state.entry_price * (config.stop_loss_percent / Decimal("100"))
+        tp_distance = state.entry_price * (config.take_profit_percent / Decimal("100"))
+        is_long = state.position == SignalType.LONG
+
+        if is_long:
+            stop_price = state.entry_price - sl_distance
+            take_price = state.entry_price + tp_distance
+        else:
+            stop_price = state.entry_price + sl_distance
+            take_price = state.entry_price - tp_distance
+        stop_f, take_f = float(stop_price), float(take_price)
+
+        window = EVENT_SEARCH_WINDOW
+        while start < end:
+            stop = min(end, start + window)
+            low, high = arrays.low[start:stop], arrays.high[start:stop]
+            if is_long:
+                touched = (low <= stop_f) | (high >= take_f)
+            else:
+                touched = (high >= stop_f) | (low <= take_f)
+
+            for offset in np.flatnonzero(touched | exit_mask[start:stop]):
+                index = start + int(offset)
+                candle = candles[index]
+                if is_long:
+                    if candle.low <= stop_price:
+                        return index, stop_price, "stop_loss"
+                    if candle.high >= take_price:
+                        return index, take_price, "take_profit"
+                else:
+                    if candle.high >= stop_price:
+                        return index, stop_price, "stop_loss"
+                    if candle.low <= take_price:
+                        return index, take_price, "take_profit"
+                if exit_mask[index]:
+                    return index, candle.close, "signal_exit"
+
+            start = stop
+            window *= 2
+
+        return None
+
+    def _record_flat_equity(self, state: BacktestState, arrays: CandleArrays, start: int, end: int) -> None:
+        """Equity points for candles [start, end) without unrealized P&L"""
+        if start >= end:
+            return
+        state.equity_curve.extend(arrays.times[start:end], float(state.capital), arrays.close[start:end])
+
+    def _record_position_equity(
+        self,
+        state: BacktestState,
+        candles: List[Candle],
+        arrays: CandleArrays,
+        start: int,
+        end: int,
+        config: BacktestConfig,
+    ) -> None:
+        """Equity points for candles [start, end) holding the open position"""
+        if start >= end:
+            return
+        # Decimal P&L per bar, exactly as the loop computes it
+        equity = np.fromiter(
+            (
+                float(state.capital + self._calculate_unrealized_pnl(state, candles[j].close, config))
+                for j in range(start, end)
+            ),
+            dtype=float,
+            count=end - start
+        )
+        state.equity_curve.extend(arrays.times[start:end], equity, arrays.close[start:end])
+
+    def _track_price_extremes(self, state: BacktestState, candles: List[Candle], start: int, end: int) -> None:
+        """Price extremes since entry for a position still open at the end of the range"""
+        if start >= end:
+            return
+        state.highest_price_since_entry = max(c.high for c in candles[start:end])
+        state.lowest_price_since_entry = min(c.low for c in candles[start:end])
 
     def _open_position(
         self,
@@ -1163,23 +1550,16 @@ class BacktestService:
             "max_consecutive_losses": max_consecutive_losses,
         }
 
-    def _calculate_max_drawdown(self, equity_curve: List[Dict]) -> Decimal:
+    def _calculate_max_drawdown(self, equity_curve: EquityCurve) -> Decimal:
         """Calculate maximum drawdown from equity curve"""
-        if not equity_curve:
+        if not len(equity_curve):
             return Decimal("0")
 
-        equities = [e["equity"] for e in equity_curve]
-        peak = equities[0]
-        max_dd = 0
-
-        for equity in equities:
-            if equity > peak:
-                peak = equity
-            dd = (peak - equity) / peak * 100
-            if dd > max_dd:
-                max_dd = dd
+        equities = equity_curve.equities
+        peaks = np.maximum.accumulate(equities)
+        max_dd = float(((peaks - equities) / peaks * 100).max())
 
-        return Decimal(str(max_dd))
+        return Decimal(str(max_dd)) if max_dd > 0 else Decimal("0")
 
     def _calculate_sharpe_ratio(self, trades: List[BacktestTrade]) -> Optional[Decimal]:
         """Calculate simplified Sharpe ratio"""
@@ -1244,34 +1624,3 @@ class BacktestService:
         sortino = (avg_return / downside_dev) * (252 ** 0.5)
 
         return Decimal(str(round(sortino, 4)))
-
-    def _sample_equity_curve(
-        self,
-        equity_curve: List[Dict[str, Any]],
-        max_points: int = 500
-    ) -> List[Dict[str, Any]]:
-        """
-        Sample equity curve to reduce data size for storage.
-
-        Keeps first and last points, and samples evenly in between.
-        This preserves the overall shape while reducing storage requirements.
-        """
-        if len(equity_curve) <= max_points:
-            return equity_curve
-
-        # Always include first and last points
-        result = [equity_curve[0]]
-
-        # Calculate step size for sampling
-        step = (len(equity_curve) - 2) / (max_points - 2)
-
-        # Sample intermediate points
-        for i in range(1, max_points - 1):
-            idx = int(i * step)
-            if idx < len(equity_curve) - 1:
-                result.append(equity_curve[idx])
-
-        # Add last point
-        result.append(equity_curve[-1])
-
-        return result
@@ -16,6 +16,8 @@ from infrastructure.exchanges.bybit_connector import BybitConnector
 from infrastructure.exchanges.bingx_connector import BingXConnector
 from infrastructure.exchanges.bitget_connector import BitgetConnector
 from infrastructure.services.bot_trade_tracker_service import BotTradeTrackerService
+from infrastructure.services.bot_routing_table import get_bot_routing_table
+from infrastructure.services.bot_stats_buffer import get_bot_stats_buffer
 
 logger = structlog.get_logger(__name__)
 
@@ -29,6 +31,9 @@ class BotBroadcastService:
     def __init__(self, db_pool):
         self.db = db_pool
         self.trade_tracker = BotTradeTrackerService(db_pool)
+        # Bot config + subscriptions em memória; estatísticas gravadas em lote
+        self.routing = get_bot_routing_table(db_pool)
+        self.stats_buffer = get_bot_stats_buffer(db_pool)
         self.exchange_connectors = {
             "binance": BinanceConnector,
             "bybit": BybitConnector,
@@ -42,7 +47,8 @@ class BotBroadcastService:
         ticker: str,
         action: str,
         source_ip: str = "unknown",
-        payload: Optional[Dict] = None
+        payload: Optional[Dict] = None,
+        signal_id: Optional[UUID] = None
     ) -> Dict:
         """
         Broadcast a trading signal to all active subscriptions of a bot
@@ -53,6 +59,8 @@ class BotBroadcastService:
             action: Trade action ("buy", "sell", "close")
             source_ip: IP address of signal source
             payload: Original payload from TradingView
+            signal_id: Pre-allocated signal id (signal queue). A re-delivery with the
+                same id skips subscriptions that already have an execution.
 
         Returns:
             Dict with broadcast results and statistics
@@ -66,19 +74,15 @@ class BotBroadcastService:
             action=action
         )
 
-        # 1. Get bot configuration to validate allowed_directions
-        bot = await self.db.fetchrow("""
-            SELECT id, name, allowed_directions
-            FROM bots
-            WHERE id = $1
-        """, bot_id)
+        # 1. Get bot configuration to validate allowed_directions (routing table, no DB read)
+        bot = await self.routing.get_bot(bot_id)
 
         if not bot:
             logger.error("Bot not found", bot_id=str(bot_id))
             raise ValueError(f"Bot {bot_id} not found")
 
         # 2. Validate if action is allowed based on bot configuration
-        allowed_directions = bot["allowed_directions"]
+        allowed_directions = bot.allowed_directions
 
         if allowed_directions == "buy_only" and action.lower() not in ["buy", "close", "close_all"]:
             logger.warning(
@@ -96,7 +100,7 @@ class BotBroadcastService:
                 "successful": 0,
                 "failed": 0,
                 "duration_ms": duration_ms,
-                "message": f"Bot '{bot['name']}' only allows BUY orders. Signal ignored."
+                "message": f"Bot '{bot.name}' only allows BUY orders. Signal ignored."
             }
 
         if allowed_directions == "sell_only" and action.lower() not in ["sell", "close", "close_all"]:
@@ -115,7 +119,7 @@ class BotBroadcastService:
                 "successful": 0,
                 "failed": 0,
                 "duration_ms": duration_ms,
-                "message": f"Bot '{bot['name']}' only allows SELL orders. Signal ignored."
+                "message": f"Bot '{bot.name}' only allows SELL orders. Signal ignored."
             }
 
         logger.info(
@@ -125,15 +129,52 @@ class BotBroadcastService:
             allowed_directions=allowed_directions
         )
 
-        # 3. Create signal record
-        signal_id = await self._create_signal_record(
-            bot_id, ticker, action, source_ip, payload
-        )
+        # 3. Create signal record (or resume it on queue re-delivery)
+        executed_subscriptions: Dict[UUID, str] = {}
+        if signal_id is not None and await self._create_signal_record(
+            bot_id, ticker, action, source_ip, payload, signal_id
+        ) is None:
+            # Record already exists: this is a re-delivery from the signal queue
+            existing = await self.db.fetchrow("""
+                SELECT total_subscribers, successful_executions, failed_executions,
+                       broadcast_duration_ms, completed_at
+                FROM bot_signals
+                WHERE id = $1
+            """, signal_id)
+
+            if existing and existing["completed_at"]:
+                logger.info("Signal already broadcast, skipping re-delivery", signal_id=str(signal_id))
+                return {
+                    "success": True,
+                    "signal_id": str(signal_id),
+                    "total_subscribers": existing["total_subscribers"] or 0,
+                    "successful": existing["successful_executions"] or 0,
+                    "failed": existing["failed_executions"] or 0,
+                    "duration_ms": existing["broadcast_duration_ms"],
+                    "already_processed": True
+                }
+
+            executed_subscriptions = await self._get_executed_subscriptions(signal_id)
+        elif signal_id is None:
+            signal_id = await self._create_signal_record(
+                bot_id, ticker, action, source_ip, payload
+            )
 
         # 4. Get all active subscriptions for this bot
         subscriptions = await self._get_active_subscriptions(bot_id)
 
-        if not subscriptions:
+        if executed_subscriptions:
+            logger.info(
+                "Resuming interrupted broadcast",
+                signal_id=str(signal_id),
+                already_executed=len(executed_subscriptions)
+            )
+            subscriptions = [
+                sub for sub in subscriptions
+                if sub["subscription_id"] not in executed_subscriptions
+            ]
+
+        if not subscriptions and not executed_subscriptions:
             logger.warning(
                 "No active subscriptions found for bot",
                 bot_id=str(bot_id)
@@ -171,11 +212,13 @@ class BotBroadcastService:
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         # 4. Count successes and failures
+        # (a resumed broadcast also counts the executions from the interrupted delivery)
         successful = sum(
             1 for r in results
             if not isinstance(r, Exception) and r.get("success")
-        )
-        failed = len(results) - successful
+        ) + sum(1 for status in executed_subscriptions.values() if status == "success")
+        total_subscribers = len(subscriptions) + len(executed_subscriptions)
+        failed = total_subscribers - successful
 
         # 5. Calculate broadcast duration
         end_time = datetime.utcnow()
@@ -184,7 +227,7 @@ class BotBroadcastService:
         # 6. Update signal record with final statistics
         await self._complete_signal(
             signal_id,
-            len(subscriptions),
+            total_subscribers,
             successful,
             failed,
             duration_ms
@@ -193,7 +236,7 @@ class BotBroadcastService:
         logger.info(
             "Signal broadcast completed",
             signal_id=str(signal_id),
-            total=len(subscriptions),
+            total=total_subscribers,
             successful=successful,
             failed=failed,
             duration_ms=duration_ms
@@ -202,7 +245,7 @@ class BotBroadcastService:
         return {
             "success": True,
             "signal_id": str(signal_id),
-            "total_subscribers": len(subscriptions),
+            "total_subscribers": total_subscribers,
             "successful": successful,
             "failed": failed,
             "duration_ms": duration_ms
@@ -214,12 +257,25 @@ class BotBroadcastService:
         ticker: str,
         action: str,
         source_ip: str,
-        payload: Optional[Dict]
-    ) -> UUID:
-        """Create a new signal record in database"""
+        payload: Optional[Dict],
+        signal_id: Optional[UUID] = None
+    ) -> Optional[UUID]:
+        """
+        Create a new signal record in database.
+        With a pre-allocated signal_id, returns None if the record already exists.
+        """
         # Convert payload dict to JSON string for JSONB column
         payload_json = json.dumps(payload or {})
 
+        if signal_id is not None:
+            return await self.db.fetchval("""
+                INSERT INTO bot_signals (
+                    id, bot_id, ticker, action, source_ip, payload, created_at
+                ) VALUES ($1, $2, $3, $4, $5, $6::jsonb, NOW())
+                ON CONFLICT (id) DO NOTHING
+                RETURNING id
+            """, signal_id, bot_id, ticker, action, source_ip, payload_json)
+
         signal_id = await self.db.fetchval("""
             INSERT INTO bot_signals (
                 bot_id, ticker, action, source_ip, payload, created_at
@@ -229,43 +285,19 @@ class BotBroadcastService:
 
         return signal_id
 
-    async def _get_active_subscriptions(self, bot_id: UUID) -> List[Dict]:
-        """Get all active subscriptions for a bot with exchange credentials"""
-        subscriptions = await self.db.fetch("""
-            SELECT
-                bs.id as subscription_id,
-                bs.bot_id,
-                bs.user_id,
-                bs.custom_leverage,
-                bs.custom_margin_usd,
-                bs.custom_stop_loss_pct,
-                bs.custom_take_profit_pct,
-                bs.max_daily_loss_usd,
-                bs.current_daily_loss_usd,
-                bs.max_concurrent_positions,
-                bs.current_positions,
-                ea.id as exchange_account_id,
-                ea.exchange,
-                ea.api_key,
-                ea.secret_key as api_secret,
-                COALESCE(ea.position_mode, 'hedge') as position_mode,
-                b.name as bot_name,
-                b.default_leverage,
-                b.default_margin_usd,
-                b.default_stop_loss_pct,
-                b.default_take_profit_pct,
-                b.market_type,
-                u.email
-            FROM bot_subscriptions bs
-            INNER JOIN exchange_accounts ea ON ea.id = bs.exchange_account_id
-            INNER JOIN bots b ON b.id = bs.bot_id
-            INNER JOIN users u ON u.id = bs.user_id
-            WHERE bs.bot_id = $1
-              AND bs.status = 'active'
-              AND ea.is_active = true
-        """, bot_id)
+    async def _get_executed_subscriptions(self, signal_id: UUID) -> Dict[UUID, str]:
+        """Subscriptions that already have an execution for this signal (-> status)"""
+        rows = await self.db.fetch("""
+            SELECT subscription_id, status
+            FROM bot_signal_executions
+            WHERE signal_id = $1
+        """, signal_id)
 
-        return [dict(sub) for sub in subscriptions]
+        return {row["subscription_id"]: row["status"] for row in rows}
+
+    async def _get_active_subscriptions(self, bot_id: UUID) -> List[Dict]:
+        """Get all active subscriptions for a bot with exchange credentials (routing table snapshot)"""
+        return await self.routing.get_subscriptions(bot_id)
 
     async def _execute_for_subscription(
         self,
@@ -620,8 +652,18 @@ class BotBroadcastService:
         # CHECKS EXISTENTES (NÍVEL 3 e 6 - não modificados)
         # =========================================================
 
+        # Contadores vivos lidos do banco (não fazem parte do snapshot da routing table)
+        live_counters = await self.db.fetchrow("""
+            SELECT
+                bs.current_daily_loss_usd,
+                (SELECT COUNT(*) FROM bot_trades bt
+                 WHERE bt.subscription_id = bs.id AND bt.status = 'open') as open_positions
+            FROM bot_subscriptions bs
+            WHERE bs.id = $1
+        """, subscription_id)
+
         # NÍVEL 3: Subscription Daily Loss (EXISTENTE)
-        current_loss = subscription.get("current_daily_loss_usd", 0) or 0
+        current_loss = (live_counters["current_daily_loss_usd"] if live_counters else 0) or 0
         max_loss = subscription.get("max_daily_loss_usd", 999999) or 999999
 
         if current_loss >= max_loss:
@@ -634,12 +676,8 @@ class BotBroadcastService:
         # NÍVEL 6: Subscription Positions (EXISTENTE)
         max_positions = subscription.get("max_concurrent_positions", 999) or 999
 
-        # Query real open trades count from bot_trades table
-        current_positions = await self.db.fetchval("""
-            SELECT COUNT(*) FROM bot_trades
-            WHERE subscription_id = $1
-              AND status = 'open'
-        """, subscription_id)
+        # Real open trades count from bot_trades table
+        current_positions = (live_counters["open_positions"] if live_counters else 0) or 0
 
         logger.info(
             "Risk check - concurrent positions",
@@ -1119,25 +1157,8 @@ class BotBroadcastService:
     async def _update_subscription_stats(
         self, subscription_id: UUID, success: bool
     ):
-        """Update subscription statistics after execution"""
-        if success:
-            await self.db.execute("""
-                UPDATE bot_subscriptions
-                SET total_signals_received = total_signals_received + 1,
-                    total_orders_executed = total_orders_executed + 1,
-                    last_signal_at = NOW(),
-                    updated_at = NOW()
-                WHERE id = $1
-            """, subscription_id)
-        else:
-            await self.db.execute("""
-                UPDATE bot_subscriptions
-                SET total_signals_received = total_signals_received + 1,
-                    total_orders_failed = total_orders_failed + 1,
-                    last_signal_at = NOW(),
-                    updated_at = NOW()
-                WHERE id = $1
-            """, subscription_id)
+        """Update subscription statistics after execution (batched, see BotStatsBuffer)"""
+        self.stats_buffer.record_subscription_result(subscription_id, success)
 
     async def _create_open_trade_record(
         self,
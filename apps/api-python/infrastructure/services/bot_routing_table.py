@@ -0,0 +1,254 @@
+"""
+Bot Routing Table
+In-memory snapshot of bots (master webhook path -> bot config) and their
+active subscriptions, used by the master webhook and BotBroadcastService so
+routing a signal needs no database reads.
+
+The snapshot is versioned by the `bot_routing_version` counter, which triggers
+bump whenever a routing column of bots / bot_subscriptions / exchange_accounts
+changes. A background task polls the counter (one tiny query per interval,
+off the hot path) and reloads the whole table only when it moved. Live risk
+counters (current_daily_loss_usd, current_positions) are not part of the
+snapshot; BotBroadcastService reads them per signal.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+REFRESH_INTERVAL_SECONDS = 2.0
+MISS_RECHECK_SECONDS = 1.0  # Path desconhecido: no máximo uma verificação de versão por segundo
+UNVERSIONED_MAX_BACKOFF_SECONDS = 300.0  # Sem migration: reload com backoff exponencial até este teto
+
+
+@dataclass
+class BotRoute:
+    """Bot config + snapshot of its active subscriptions"""
+    bot_id: UUID
+    name: str
+    status: str
+    market_type: str
+    allowed_directions: str
+    webhook_path: str
+    subscriptions: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class BotRoutingTable:
+    """Routing table versionada (webhook path / bot id -> BotRoute)"""
+
+    def __init__(self, db_pool, refresh_interval: float = REFRESH_INTERVAL_SECONDS):
+        self.db = db_pool
+        self.refresh_interval = refresh_interval
+        self.version: Optional[int] = None
+        self._by_path: Dict[str, BotRoute] = {}
+        self._by_id: Dict[UUID, BotRoute] = {}
+        self._loaded = False
+        self._stale = False
+        self._last_check = 0.0
+        self._last_load = 0.0
+        self._unversioned_backoff = refresh_interval
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.is_running = False
+        self._stats = {"lookups": 0, "misses": 0, "reloads": 0, "version_checks": 0}
+
+    # ==================== Lifecycle ====================
+
+    async def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        try:
+            await self.refresh(force=True)
+        except Exception as e:
+            logger.error(f"❌ Bot routing table initial load failed: {e}")
+        self._task = asyncio.create_task(self._refresh_loop())
+        logger.info("🧭 Bot routing table started", bots=len(self._by_id), version=self.version)
+
+    async def stop(self):
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _refresh_loop(self):
+        while self.is_running:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Bot routing table refresh failed: {e}")
+
+    # ==================== Refresh ====================
+
+    def invalidate(self) -> None:
+        """Força reload no próximo acesso (mudança feita neste processo)"""
+        self._stale = True
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Recarrega se o contador de versão mudou; retorna True se recarregou"""
+        async with self._lock:
+            self._last_check = time.monotonic()
+            self._stats["version_checks"] += 1
+            try:
+                version = await self.db.fetchval("SELECT version FROM bot_routing_version WHERE id = 1")
+            except Exception as e:
+                # Migration não aplicada: sem contador, recarrega com backoff (não a cada verificação)
+                logger.debug(f"Bot routing version unavailable: {e}")
+                version = None
+
+            if not force and not self._stale and self._loaded:
+                if version is not None and version == self.version:
+                    return False
+                if version is None and time.monotonic() - self._last_load < self._unversioned_backoff:
+                    return False
+
+            await self._load()
+            if version is None:
+                if self._unversioned_backoff == self.refresh_interval:
+                    logger.warning("bot_routing_version table missing; routing table reloads with backoff")
+                self._unversioned_backoff = min(self._unversioned_backoff * 2, UNVERSIONED_MAX_BACKOFF_SECONDS)
+            else:
+                self._unversioned_backoff = self.refresh_interval
+            self.version = version
+            self._stale = False
+            return True
+
+    async def _load(self) -> None:
+        bots = await self.db.fetch("""
+            SELECT id, name, status, market_type, allowed_directions, master_webhook_path
+            FROM bots
+        """)
+
+        subscriptions = await self.db.fetch("""
+            SELECT
+                bs.id as subscription_id,
+                bs.bot_id,
+                bs.user_id,
+                bs.custom_leverage,
+                bs.custom_margin_usd,
+                bs.custom_stop_loss_pct,
+                bs.custom_take_profit_pct,
+                bs.max_daily_loss_usd,
+                bs.max_concurrent_positions,
+                ea.id as exchange_account_id,
+                ea.exchange,
+                ea.api_key,
+                ea.secret_key as api_secret,
+                COALESCE(ea.position_mode, 'hedge') as position_mode,
+                b.name as bot_name,
+                b.default_leverage,
+                b.default_margin_usd,
+                b.default_stop_loss_pct,
+                b.default_take_profit_pct,
+                b.market_type,
+                u.email
+            FROM bot_subscriptions bs
+            INNER JOIN exchange_accounts ea ON ea.id = bs.exchange_account_id
+            INNER JOIN bots b ON b.id = bs.bot_id
+            INNER JOIN users u ON u.id = bs.user_id
+            WHERE bs.status = 'active'
+              AND ea.is_active = true
+        """)
+
+        by_id: Dict[UUID, BotRoute] = {}
+        by_path: Dict[str, BotRoute] = {}
+        for row in bots:
+            route = BotRoute(
+                bot_id=row["id"],
+                name=row["name"],
+                status=row["status"],
+                market_type=row["market_type"] or "futures",
+                allowed_directions=row["allowed_directions"] or "both",
+                webhook_path=row["master_webhook_path"],
+            )
+            by_id[route.bot_id] = route
+            if route.webhook_path:
+                by_path[route.webhook_path] = route
+
+        for row in subscriptions:
+            route = by_id.get(row["bot_id"])
+            if route is not None:
+                route.subscriptions.append(dict(row))
+
+        # Troca atômica: leitores nunca veem uma tabela pela metade
+        self._by_id, self._by_path = by_id, by_path
+        self._loaded = True
+        self._last_load = time.monotonic()
+        self._stats["reloads"] += 1
+        logger.debug(
+            "Bot routing table loaded",
+            bots=len(by_id),
+            subscriptions=len(subscriptions)
+        )
+
+    async def _ensure_loaded(self) -> None:
+        if not self._loaded or self._stale:
+            await self.refresh(force=True)
+
+    # ==================== Lookups ====================
+
+    async def get_by_path(self, webhook_path: str) -> Optional[BotRoute]:
+        """Bot pelo master_webhook_path (None se não existir)"""
+        await self._ensure_loaded()
+        self._stats["lookups"] += 1
+
+        route = self._by_path.get(webhook_path)
+        if route is None and time.monotonic() - self._last_check >= MISS_RECHECK_SECONDS:
+            # Bot criado agora em outro worker: confere a versão antes de responder 404
+            self._stats["misses"] += 1
+            if await self.refresh():
+                route = self._by_path.get(webhook_path)
+        return route
+
+    async def get_bot(self, bot_id: UUID) -> Optional[BotRoute]:
+        await self._ensure_loaded()
+        self._stats["lookups"] += 1
+
+        route = self._by_id.get(bot_id)
+        if route is None and time.monotonic() - self._last_check >= MISS_RECHECK_SECONDS:
+            self._stats["misses"] += 1
+            if await self.refresh():
+                route = self._by_id.get(bot_id)
+        return route
+
+    async def get_subscriptions(self, bot_id: UUID) -> List[Dict[str, Any]]:
+        """Cópias das subscriptions ativas (quem chama pode alterar os dicts)"""
+        route = await self.get_bot(bot_id)
+        if route is None:
+            return []
+        return [dict(sub) for sub in route.subscriptions]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "version": self.version,
+            "bots": len(self._by_id),
+            "subscriptions": sum(len(r.subscriptions) for r in self._by_id.values()),
+            "running": self.is_running,
+        }
+
+
+# Singleton
+_routing_table: Optional[BotRoutingTable] = None
+
+
+def get_bot_routing_table(db_pool) -> BotRoutingTable:
+    """Get or create singleton routing table"""
+    global _routing_table
+
+    if _routing_table is None:
+        _routing_table = BotRoutingTable(db_pool)
+
+    return _routing_table
@@ -0,0 +1,480 @@
+"""
+Bot Signal Queue
+Durable queue between the master webhook and the broadcast.
+
+TradingView gives a webhook only a few seconds to answer and retries on
+timeout. Broadcasting (risk checks, connectors, orders, SL/TP, DB writes for
+every subscriber) can take much longer on large bots, so the webhook now only
+validates and enqueues the signal; BotSignalWorker consumers run the broadcast.
+
+- PostgresSignalQueue: outbox table `bot_signal_queue`, claimed with
+  FOR UPDATE SKIP LOCKED (several workers/processes never take the same row)
+- InMemorySignalQueue: local stand-in with the same API (tests / no database)
+
+Delivery is at-least-once: a row left in 'processing' by a crashed worker is
+re-delivered after VISIBILITY_TIMEOUT_SECONDS. The worker running a broadcast
+renews locked_at every HEARTBEAT_INTERVAL_SECONDS, so a slow broadcast is never
+reclaimed while it is still running. Re-deliveries reuse the pre-allocated
+signal_id, and BotBroadcastService skips subscriptions that already have an
+execution for it, so a retry does not open a second order.
+"""
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import structlog
+
+from infrastructure.services.bot_stats_buffer import get_bot_stats_buffer
+
+logger = structlog.get_logger(__name__)
+
+DEDUPE_WINDOW_SECONDS = 60  # Same payload for the same bot inside this window = TradingView retry
+VISIBILITY_TIMEOUT_SECONDS = 300  # 'processing' rows older than this are re-delivered
+HEARTBEAT_INTERVAL_SECONDS = 30  # Claim renewal while a broadcast runs (well below the timeout)
+RETRY_BASE_DELAY_SECONDS = 2  # Backoff: 2s, 4s, 8s, ...
+MAX_ATTEMPTS = 5
+DONE_RETENTION_HOURS = 72
+
+
+FINGERPRINT_PREFIX = "fp:"
+
+
+def build_dedupe_key(bot_id: Any, ticker: str, action: str, payload: Optional[Dict]) -> str:
+    """
+    Chave de deduplicação de um sinal.
+
+    Se o alerta trouxer um id próprio (signal_id / alert_id / id) ele é usado;
+    senão, fingerprint do payload. O fingerprint só deduplica durante
+    DEDUPE_WINDOW_SECONDS a partir do sinal original (retries do TradingView
+    chegam com o mesmo corpo em poucos segundos); depois a fila libera a chave.
+    """
+    payload = payload or {}
+    explicit_id = payload.get("signal_id") or payload.get("alert_id") or payload.get("id")
+    if explicit_id:
+        return f"id:{bot_id}:{explicit_id}"[:255]
+
+    body = json.dumps(payload, sort_keys=True, default=str)
+    digest = hashlib.sha256(f"{bot_id}|{ticker}|{action}|{body}".encode()).hexdigest()[:32]
+    return f"{FINGERPRINT_PREFIX}{digest}"
+
+
+def _retry_delay(attempts: int) -> int:
+    return RETRY_BASE_DELAY_SECONDS * (2 ** max(0, attempts - 1))
+
+
+class PostgresSignalQueue:
+    """Outbox `bot_signal_queue` consumido com SKIP LOCKED"""
+
+    def __init__(self, db_pool):
+        self.db = db_pool
+
+    async def enqueue(
+        self,
+        bot_id: UUID,
+        ticker: str,
+        action: str,
+        source_ip: str = "unknown",
+        payload: Optional[Dict] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Persiste o sinal. Retorna {queue_id, signal_id, duplicate}; um sinal
+        repetido (mesma dedupe_key) devolve o signal_id do original.
+        """
+        dedupe_key = dedupe_key or build_dedupe_key(bot_id, ticker, action, payload)
+
+        if dedupe_key.startswith(FINGERPRINT_PREFIX):
+            # Fingerprint fora da janela: libera a chave (o sinal antigo fica
+            # com a chave sufixada pelo id) para que um sinal igual legítimo entre
+            await self.db.execute("""
+                UPDATE bot_signal_queue
+                SET dedupe_key = dedupe_key || ':' || id::text
+                WHERE dedupe_key = $1
+                  AND created_at < NOW() - make_interval(secs => $2)
+            """, dedupe_key, DEDUPE_WINDOW_SECONDS)
+
+        row = await self.db.fetchrow("""
+            INSERT INTO bot_signal_queue (
+                signal_id, dedupe_key, bot_id, ticker, action, source_ip, payload, max_attempts
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7::jsonb, $8)
+            ON CONFLICT (dedupe_key) DO NOTHING
+            RETURNING id, signal_id
+        """, uuid.uuid4(), dedupe_key, bot_id, ticker, action, source_ip,
+            json.dumps(payload or {}), MAX_ATTEMPTS)
+
+        if row:
+            return {"queue_id": row["id"], "signal_id": row["signal_id"], "duplicate": False}
+
+        existing = await self.db.fetchrow("""
+            SELECT id, signal_id FROM bot_signal_queue WHERE dedupe_key = $1
+        """, dedupe_key)
+        return {"queue_id": existing["id"], "signal_id": existing["signal_id"], "duplicate": True}
+
+    async def claim(self, worker_id: str, limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        Reserva até `limit` sinais (pending vencidos ou processing abandonados).
+        Um único UPDATE ... SKIP LOCKED: seguro com pgBouncer em transaction mode.
+        """
+        rows = await self.db.fetch("""
+            UPDATE bot_signal_queue q
+            SET status = 'processing',
+                attempts = q.attempts + 1,
+                locked_at = NOW(),
+                locked_by = $1
+            WHERE q.id IN (
+                SELECT id FROM bot_signal_queue
+                WHERE (status = 'pending' AND available_at <= NOW())
+                   OR (status = 'processing' AND locked_at < NOW() - make_interval(secs => $3))
+                ORDER BY available_at
+                LIMIT $2
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING q.id, q.signal_id, q.bot_id, q.ticker, q.action, q.source_ip,
+                      q.payload, q.attempts, q.max_attempts, q.locked_by
+        """, worker_id, limit, VISIBILITY_TIMEOUT_SECONDS)
+
+        items = []
+        for row in rows:
+            item = dict(row)
+            if isinstance(item.get("payload"), str):
+                item["payload"] = json.loads(item["payload"])
+            items.append(item)
+        return items
+
+    async def heartbeat(self, item: Dict[str, Any]) -> bool:
+        """Renova a reserva de um sinal em processamento; False se ela foi perdida"""
+        result = await self.db.execute("""
+            UPDATE bot_signal_queue
+            SET locked_at = NOW()
+            WHERE id = $1 AND status = 'processing' AND locked_by = $2
+        """, item["id"], item["locked_by"])
+        return str(result).endswith(" 1")
+
+    async def complete(self, item: Dict[str, Any], result: Optional[Dict] = None) -> None:
+        await self.db.execute("""
+            UPDATE bot_signal_queue
+            SET status = 'done',
+                result = $2::jsonb,
+                last_error = NULL,
+                locked_by = NULL,
+                completed_at = NOW()
+            WHERE id = $1
+        """, item["id"], json.dumps(result or {}, default=str))
+
+    async def fail(self, item: Dict[str, Any], error: str, permanent: bool = False) -> str:
+        """Devolve para a fila com backoff, ou marca 'failed' ao esgotar as tentativas"""
+        status = "failed" if permanent or item["attempts"] >= item["max_attempts"] else "pending"
+        await self.db.execute("""
+            UPDATE bot_signal_queue
+            SET status = $2,
+                last_error = $3,
+                locked_by = NULL,
+                available_at = NOW() + make_interval(secs => $4),
+                completed_at = CASE WHEN $2 = 'failed' THEN NOW() ELSE NULL END
+            WHERE id = $1
+        """, item["id"], status, error[:2000], _retry_delay(item["attempts"]))
+        return status
+
+    async def cleanup(self, retention_hours: int = DONE_RETENTION_HOURS) -> int:
+        """Remove sinais concluídos antigos (os 'failed' ficam para análise)"""
+        result = await self.db.execute("""
+            DELETE FROM bot_signal_queue
+            WHERE status = 'done' AND completed_at < NOW() - make_interval(hours => $1)
+        """, retention_hours)
+        try:
+            return int(str(result).split()[-1])
+        except (ValueError, IndexError):
+            return 0
+
+    async def get_stats(self) -> Dict[str, int]:
+        rows = await self.db.fetch("""
+            SELECT status, COUNT(*) AS total FROM bot_signal_queue GROUP BY status
+        """)
+        return {row["status"]: row["total"] for row in rows}
+
+
+class InMemorySignalQueue:
+    """Stand-in local da fila (mesma API), para testes e ambiente sem banco"""
+
+    def __init__(self):
+        self._items: Dict[UUID, Dict[str, Any]] = {}
+        self._by_key: Dict[str, UUID] = {}
+        self._lock = asyncio.Lock()
+
+    async def enqueue(
+        self,
+        bot_id: UUID,
+        ticker: str,
+        action: str,
+        source_ip: str = "unknown",
+        payload: Optional[Dict] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        dedupe_key = dedupe_key or build_dedupe_key(bot_id, ticker, action, payload)
+        async with self._lock:
+            existing_id = self._by_key.get(dedupe_key)
+            if existing_id and dedupe_key.startswith(FINGERPRINT_PREFIX):
+                window_start = datetime.utcnow() - timedelta(seconds=DEDUPE_WINDOW_SECONDS)
+                if self._items[existing_id]["created_at"] < window_start:
+                    del self._by_key[dedupe_key]
+
+            if dedupe_key in self._by_key:
+                item = self._items[self._by_key[dedupe_key]]
+                return {"queue_id": item["id"], "signal_id": item["signal_id"], "duplicate": True}
+
+            item = {
+                "id": uuid.uuid4(),
+                "signal_id": uuid.uuid4(),
+                "bot_id": bot_id,
+                "ticker": ticker,
+                "action": action,
+                "source_ip": source_ip,
+                "payload": payload or {},
+                "status": "pending",
+                "attempts": 0,
+                "max_attempts": MAX_ATTEMPTS,
+                "available_at": datetime.utcnow(),
+                "locked_at": None,
+                "locked_by": None,
+                "last_error": None,
+                "result": None,
+                "created_at": datetime.utcnow(),
+            }
+            self._items[item["id"]] = item
+            self._by_key[dedupe_key] = item["id"]
+            return {"queue_id": item["id"], "signal_id": item["signal_id"], "duplicate": False}
+
+    async def claim(self, worker_id: str, limit: int = 1) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=VISIBILITY_TIMEOUT_SECONDS)
+        claimed = []
+        async with self._lock:
+            candidates = sorted(self._items.values(), key=lambda i: i["available_at"])
+            for item in candidates:
+                if len(claimed) >= limit:
+                    break
+                claimable = (
+                    (item["status"] == "pending" and item["available_at"] <= now)
+                    or (item["status"] == "processing" and item["locked_at"] < stale_before)
+                )
+                if not claimable:
+                    continue
+                item.update(status="processing", attempts=item["attempts"] + 1, locked_at=now, locked_by=worker_id)
+                claimed.append(dict(item))
+        return claimed
+
+    async def heartbeat(self, item: Dict[str, Any]) -> bool:
+        stored = self._items[item["id"]]
+        if stored["status"] != "processing" or stored["locked_by"] != item["locked_by"]:
+            return False
+        stored["locked_at"] = datetime.utcnow()
+        return True
+
+    async def complete(self, item: Dict[str, Any], result: Optional[Dict] = None) -> None:
+        self._items[item["id"]].update(status="done", result=result or {}, last_error=None)
+
+    async def fail(self, item: Dict[str, Any], error: str, permanent: bool = False) -> str:
+        stored = self._items[item["id"]]
+        status = "failed" if permanent or stored["attempts"] >= stored["max_attempts"] else "pending"
+        stored.update(
+            status=status,
+            last_error=error,
+            available_at=datetime.utcnow() + timedelta(seconds=_retry_delay(stored["attempts"])),
+        )
+        return status
+
+    async def cleanup(self, retention_hours: int = DONE_RETENTION_HOURS) -> int:
+        return 0
+
+    async def get_stats(self) -> Dict[str, int]:
+        stats: Dict[str, int] = {}
+        for item in self._items.values():
+            stats[item["status"]] = stats.get(item["status"], 0) + 1
+        return stats
+
+
+class BotSignalWorker:
+    """
+    Consumidores da fila de sinais: N tasks por processo, cada uma reserva um
+    sinal por vez e executa BotBroadcastService.broadcast_signal.
+    """
+
+    def __init__(
+        self,
+        db_pool,
+        queue=None,
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        broadcast_service=None,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL_SECONDS,
+    ):
+        self.db = db_pool
+        self.queue = queue or PostgresSignalQueue(db_pool)
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._broadcast_service = broadcast_service
+        self.worker_id = f"signal-worker-{uuid.uuid4().hex[:8]}"
+        self.is_running = False
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._last_cleanup = 0.0
+        self._stats = {"processed": 0, "succeeded": 0, "retried": 0, "failed": 0}
+
+    @property
+    def broadcast_service(self):
+        if self._broadcast_service is None:
+            from infrastructure.services.bot_broadcast_service import BotBroadcastService
+            self._broadcast_service = BotBroadcastService(self.db)
+        return self._broadcast_service
+
+    async def start(self):
+        if self.is_running:
+            logger.warning("Bot signal worker already running")
+            return
+
+        self.is_running = True
+        self._tasks = [
+            asyncio.create_task(self._consume_loop(n)) for n in range(self.concurrency)
+        ]
+        logger.info("📬 Bot signal worker started", worker_id=self.worker_id, concurrency=self.concurrency)
+
+    async def stop(self):
+        self.is_running = False
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
+        logger.info("🛑 Bot signal worker stopped", worker_id=self.worker_id)
+
+    def notify(self) -> None:
+        """Acorda os consumidores (sinal enfileirado neste processo)"""
+        self._wakeup.set()
+
+    async def _consume_loop(self, index: int):
+        while self.is_running:
+            try:
+                processed = await self.run_once()
+                if processed:
+                    continue
+
+                if index == 0:
+                    await self._maybe_cleanup()
+
+                # Fila vazia: espera novo sinal local ou o próximo poll (outros processos / retries)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Bot signal worker loop error", error=str(e), exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+
+    async def run_once(self) -> int:
+        """Reserva e processa um sinal; retorna quantos foram processados"""
+        items = await self.queue.claim(self.worker_id, 1)
+        for item in items:
+            await self._process(item)
+        return len(items)
+
+    async def _heartbeat(self, item: Dict[str, Any]) -> None:
+        """Mantém a reserva viva enquanto o broadcast roda"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if not await self.queue.heartbeat(item):
+                    logger.warning("Signal claim lost during broadcast", signal_id=str(item["signal_id"]))
+                    return
+            except Exception as e:
+                logger.warning(f"Signal heartbeat failed: {e}", signal_id=str(item["signal_id"]))
+
+    async def _broadcast(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """broadcast_signal com a reserva renovada enquanto ele roda"""
+        heartbeat = asyncio.create_task(self._heartbeat(item))
+        try:
+            return await self.broadcast_service.broadcast_signal(
+                bot_id=item["bot_id"],
+                ticker=item["ticker"],
+                action=item["action"],
+                source_ip=item.get("source_ip") or "unknown",
+                payload=item.get("payload"),
+                signal_id=item["signal_id"],
+            )
+        finally:
+            heartbeat.cancel()
+
+    async def _process(self, item: Dict[str, Any]) -> None:
+        self._stats["processed"] += 1
+        try:
+            result = await self._broadcast(item)
+        except ValueError as e:
+            # Bot removido/inválido: não adianta tentar de novo
+            self._stats["failed"] += 1
+            await self.queue.fail(item, str(e), permanent=True)
+            logger.error("Signal dropped", signal_id=str(item["signal_id"]), error=str(e))
+            return
+        except Exception as e:
+            status = await self.queue.fail(item, str(e))
+            self._stats["failed" if status == "failed" else "retried"] += 1
+            logger.error(
+                "Signal broadcast failed",
+                signal_id=str(item["signal_id"]),
+                attempt=item["attempts"],
+                next_status=status,
+                error=str(e),
+            )
+            return
+
+        if not result.get("already_processed"):
+            # Update bot statistics (batched)
+            get_bot_stats_buffer(self.db).record_bot_signal(item["bot_id"])
+
+        await self.queue.complete(item, result)
+        self._stats["succeeded"] += 1
+
+    async def _maybe_cleanup(self) -> None:
+        now = time.monotonic()
+        if now - self._last_cleanup < 3600:
+            return
+        self._last_cleanup = now
+        try:
+            removed = await self.queue.cleanup()
+            if removed:
+                logger.info(f"🧹 Removed {removed} processed signals from queue")
+        except Exception as e:
+            logger.warning(f"Signal queue cleanup failed: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": self.is_running,
+            "concurrency": self.concurrency,
+            **self._stats,
+        }
+
+
+# Singleton
+_signal_worker: Optional[BotSignalWorker] = None
+
+
+def get_bot_signal_worker(db_pool) -> BotSignalWorker:
+    """Get or create singleton signal worker (and its queue)"""
+    global _signal_worker
+
+    if _signal_worker is None:
+        _signal_worker = BotSignalWorker(db_pool)
+
+    return _signal_worker
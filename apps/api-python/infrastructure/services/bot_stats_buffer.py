@@ -0,0 +1,154 @@
+"""
+Bot Stats Buffer
+Batched statistics counters for the signal hot path.
+
+Every signal used to run `UPDATE bots SET total_signals_sent = ...` plus one
+`UPDATE bot_subscriptions SET total_signals_received = ...` per subscriber.
+These counters are only read by dashboards, so deltas are accumulated in
+memory and flushed periodically with one set-based UPDATE per table.
+"""
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 5.0
+
+
+class BotStatsBuffer:
+    """Acumula deltas de estatísticas de bots/subscriptions e grava em lote"""
+
+    def __init__(self, db_pool, flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        self.db = db_pool
+        self.flush_interval = flush_interval
+        self._bot_signals: Dict[UUID, int] = defaultdict(int)
+        # subscription_id -> [received, executed, failed, last_signal_at]
+        self._subscriptions: Dict[UUID, list] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.is_running = False
+        self._stats = {"flushes": 0, "rows_written": 0, "flush_errors": 0}
+
+    # ==================== Counters ====================
+
+    def record_bot_signal(self, bot_id: UUID) -> None:
+        self._bot_signals[bot_id] += 1
+
+    def record_subscription_result(self, subscription_id: UUID, success: bool) -> None:
+        entry = self._subscriptions.get(subscription_id)
+        if entry is None:
+            entry = self._subscriptions[subscription_id] = [0, 0, 0, None]
+        entry[0] += 1
+        entry[1 if success else 2] += 1
+        entry[3] = datetime.utcnow()
+
+    @property
+    def pending(self) -> int:
+        return len(self._bot_signals) + len(self._subscriptions)
+
+    # ==================== Flush ====================
+
+    async def flush(self) -> int:
+        """Grava os deltas acumulados; em caso de erro eles voltam para o buffer"""
+        async with self._lock:
+            bot_signals, self._bot_signals = self._bot_signals, defaultdict(int)
+            subscriptions, self._subscriptions = self._subscriptions, {}
+
+            if not bot_signals and not subscriptions:
+                return 0
+
+            try:
+                if bot_signals:
+                    await self.db.execute("""
+                        UPDATE bots b
+                        SET total_signals_sent = COALESCE(b.total_signals_sent, 0) + d.signals,
+                            updated_at = NOW()
+                        FROM unnest($1::uuid[], $2::int[]) AS d(id, signals)
+                        WHERE b.id = d.id
+                    """, list(bot_signals.keys()), list(bot_signals.values()))
+
+                if subscriptions:
+                    ids = list(subscriptions.keys())
+                    values = list(subscriptions.values())
+                    await self.db.execute("""
+                        UPDATE bot_subscriptions s
+                        SET total_signals_received = COALESCE(s.total_signals_received, 0) + d.received,
+                            total_orders_executed = COALESCE(s.total_orders_executed, 0) + d.executed,
+                            total_orders_failed = COALESCE(s.total_orders_failed, 0) + d.failed,
+                            last_signal_at = GREATEST(s.last_signal_at, d.last_signal_at),
+                            updated_at = NOW()
+                        FROM unnest($1::uuid[], $2::int[], $3::int[], $4::int[], $5::timestamp[])
+                             AS d(id, received, executed, failed, last_signal_at)
+                        WHERE s.id = d.id
+                    """, ids, [v[0] for v in values], [v[1] for v in values],
+                        [v[2] for v in values], [v[3] for v in values])
+            except Exception as e:
+                self._stats["flush_errors"] += 1
+                self._merge_back(bot_signals, subscriptions)
+                logger.warning(f"Bot stats flush failed, will retry: {e}")
+                return 0
+
+            written = len(bot_signals) + len(subscriptions)
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += written
+            return written
+
+    def _merge_back(self, bot_signals: Dict[UUID, int], subscriptions: Dict[UUID, list]) -> None:
+        for bot_id, count in bot_signals.items():
+            self._bot_signals[bot_id] += count
+        for subscription_id, (received, executed, failed, last_at) in subscriptions.items():
+            entry = self._subscriptions.get(subscription_id)
+            if entry is None:
+                self._subscriptions[subscription_id] = [received, executed, failed, last_at]
+                continue
+            entry[0] += received
+            entry[1] += executed
+            entry[2] += failed
+            entry[3] = max(d for d in (entry[3], last_at) if d is not None)
+
+    # ==================== Lifecycle ====================
+
+    async def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Para o loop e grava o que restou"""
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while self.is_running:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": self.pending}
+
+
+# Singleton
+_stats_buffer: Optional[BotStatsBuffer] = None
+
+
+def get_bot_stats_buffer(db_pool) -> BotStatsBuffer:
+    """Get or create singleton stats buffer"""
+    global _stats_buffer
+
+    if _stats_buffer is None:
+        _stats_buffer = BotStatsBuffer(db_pool)
+
+    return _stats_buffer
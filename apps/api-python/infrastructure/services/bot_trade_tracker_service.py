@@ -10,6 +10,8 @@ from uuid import UUID
 
 import structlog
 
+from infrastructure.services.pnl_rollup_service import PnlRollupService
+
 logger = structlog.get_logger(__name__)
 
 
@@ -21,6 +23,7 @@ class BotTradeTrackerService:
 
     def __init__(self, db_pool):
         self.db = db_pool
+        self.rollups = PnlRollupService(db_pool)
 
     async def record_trade_close(
         self,
@@ -161,6 +164,19 @@ class BotTradeTrackerService:
             # 3. Update or create today's P&L history entry
             await self._update_daily_pnl(subscription_id, pnl_usd, is_win)
 
+            # 4. Keep the bot's aggregate metrics current (incremental)
+            await self._apply_trade_to_bot_metrics(subscription_id, pnl_usd, pnl_pct, is_win)
+
+            # 5. Hourly/daily P&L rollups (subscription, bot, account) for performance charts
+            try:
+                await self.rollups.record_trade(subscription_id, pnl_usd, is_win)
+            except Exception as e:
+                logger.warning(
+                    "Failed to update P&L rollups",
+                    subscription_id=str(subscription_id),
+                    error=str(e)
+                )
+
             logger.info(
                 "Trade recorded successfully",
                 trade_id=str(trade_id),
@@ -190,6 +206,116 @@ class BotTradeTrackerService:
                 "error": str(e)
             }
 
+    async def _apply_trade_to_bot_metrics(
+        self,
+        subscription_id: UUID,
+        pnl_usd: float,
+        pnl_pct: Optional[float],
+        is_win: bool
+    ):
+        """
+        Apply one closed trade to the bot's running aggregates and derived
+        avg_win_rate / avg_pnl_pct (same formulas as recompute_bot_metrics).
+        SET expressions read the pre-update values, so one statement is enough.
+        Like the recompute, closed_trades_count / pnl_pct_sum only take trades
+        with a known pnl_pct.
+        """
+        try:
+            await self.db.execute("""
+                UPDATE bots
+                SET total_wins = total_wins + $2,
+                    total_losses = total_losses + $3,
+                    total_pnl_usd = total_pnl_usd + $4,
+                    closed_trades_count = closed_trades_count + ($5::numeric IS NOT NULL)::int,
+                    pnl_pct_sum = pnl_pct_sum + COALESCE($5::numeric, 0),
+                    avg_win_rate = (total_wins + $2) * 100.0
+                        / NULLIF(total_wins + total_losses + 1, 0),
+                    avg_pnl_pct = NULLIF(
+                        (pnl_pct_sum + COALESCE($5::numeric, 0))
+                        / NULLIF(closed_trades_count + ($5::numeric IS NOT NULL)::int, 0),
+                        0
+                    ),
+                    updated_at = NOW()
+                WHERE id = (SELECT bot_id FROM bot_subscriptions WHERE id = $1)
+            """, subscription_id, 1 if is_win else 0, 0 if is_win else 1, pnl_usd, pnl_pct)
+        except Exception as e:
+            # Métricas derivadas: recompute_bot_metrics corrige qualquer desvio
+            logger.warning(
+                "Failed to update bot metrics incrementally",
+                subscription_id=str(subscription_id),
+                error=str(e)
+            )
+
+    async def recompute_bot_metrics(self) -> List[Dict]:
+        """
+        Rebuild metrics of all non-archived bots in a single round trip: one
+        aggregate per table grouped by bot, then one UPDATE ... FROM.
+
+        - Win Rate: total wins / (wins + losses) * 100 across all subscriptions
+        - Avg P&L %: average pnl_pct of closed trades
+        - total_subscribers: active subscriptions
+
+        Returns:
+            One row per updated bot
+        """
+        rows = await self.db.fetch("""
+            WITH subscription_totals AS (
+                SELECT
+                    bot_id,
+                    COUNT(*) FILTER (WHERE status = 'active') AS active_subscribers,
+                    COALESCE(SUM(win_count), 0) AS total_wins,
+                    COALESCE(SUM(loss_count), 0) AS total_losses,
+                    COALESCE(SUM(total_pnl_usd), 0) AS total_pnl_usd
+                FROM bot_subscriptions
+                GROUP BY bot_id
+            ),
+            trade_totals AS (
+                SELECT
+                    bs.bot_id,
+                    COUNT(*) AS closed_trades_count,
+                    SUM(bt.pnl_pct) AS pnl_pct_sum
+                FROM bot_trades bt
+                JOIN bot_subscriptions bs ON bt.subscription_id = bs.id
+                WHERE bt.status = 'closed' AND bt.pnl_pct IS NOT NULL
+                GROUP BY bs.bot_id
+            ),
+            metrics AS (
+                SELECT
+                    b.id AS bot_id,
+                    b.name,
+                    COALESCE(s.active_subscribers, 0) AS active_subscribers,
+                    COALESCE(s.total_wins, 0) AS total_wins,
+                    COALESCE(s.total_losses, 0) AS total_losses,
+                    COALESCE(s.total_pnl_usd, 0) AS total_pnl_usd,
+                    COALESCE(t.closed_trades_count, 0) AS closed_trades_count,
+                    COALESCE(t.pnl_pct_sum, 0) AS pnl_pct_sum
+                FROM bots b
+                LEFT JOIN subscription_totals s ON s.bot_id = b.id
+                LEFT JOIN trade_totals t ON t.bot_id = b.id
+                WHERE b.status != 'archived'
+            ),
+            updated AS (
+                UPDATE bots
+                SET total_subscribers = m.active_subscribers,
+                    total_wins = m.total_wins,
+                    total_losses = m.total_losses,
+                    total_pnl_usd = m.total_pnl_usd,
+                    closed_trades_count = m.closed_trades_count,
+                    pnl_pct_sum = m.pnl_pct_sum,
+                    avg_win_rate = m.total_wins * 100.0 / NULLIF(m.total_wins + m.total_losses, 0),
+                    avg_pnl_pct = NULLIF(m.pnl_pct_sum / NULLIF(m.closed_trades_count, 0), 0),
+                    updated_at = NOW()
+                FROM metrics m
+                WHERE bots.id = m.bot_id
+                RETURNING bots.id, bots.avg_win_rate, bots.avg_pnl_pct
+            )
+            SELECT m.*, u.avg_win_rate, u.avg_pnl_pct
+            FROM metrics m
+            JOIN updated u ON u.id = m.bot_id
+        """)
+
+        return [dict(row) for row in rows]
+
     async def _update_daily_pnl(
         self,
         subscription_id: UUID,
@@ -623,6 +749,9 @@ class BotTradeTrackerService:
                     )
                     snapshots_created += 1
 
+            # Hourly rollups are only kept for short windows
+            await self.rollups.prune_hourly()
+
             logger.info(
                 "Daily snapshots generated",
                 date=str(today),
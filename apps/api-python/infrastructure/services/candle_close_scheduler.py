@@ -0,0 +1,383 @@
+"""
+Candle Close Scheduler
+
+Agenda a avaliacao de grupos (symbol, timeframe) no fechamento do candle,
+em vez de loops com sleep fixo de 30s que recalculam tudo a cada volta
+(um grupo 1h era avaliado ~120 vezes por candle).
+
+How it works:
+1. Each group sits in the slot of its next close boundary (ms, UTC);
+   slots are kept in a heap, so one timer covers every group
+2. The run loop sleeps until the earliest boundary (+ a small grace for the
+   exchange to publish the closed candle) and fires the callback with all
+   groups closing at that instant, then moves them to their next boundary
+3. Intrabar mode (optional): groups also follow the Binance kline stream;
+   updates fire the callback (debounced per group) and a streamed close
+   fires it immediately, ahead of the timer
+
+Boundaries follow the exchange candles: sub-day timeframes restart at
+00:00 UTC (same alignment as custom_timeframe_aggregator.period_start_ms),
+1d/3d are epoch aligned, 1w starts on Monday and 1M on the first day of the
+month. Plain intervals (e.g. "30s") can be scheduled the same way for
+periodic jobs.
+"""
+
+import asyncio
+import heapq
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+SECOND_MS = 1000
+MINUTE_MS = 60 * SECOND_MS
+DAY_MS = 24 * 60 * MINUTE_MS
+# Epoch (1970-01-01) foi quinta; candles semanais da Binance abrem na segunda
+WEEK_OFFSET_MS = 4 * DAY_MS
+
+# Espera apos o fechamento para a exchange publicar o candle fechado
+CLOSE_GRACE_SECONDS = 1.5
+# Intervalo minimo entre avaliacoes intrabar do mesmo grupo
+INTRABAR_MIN_INTERVAL_SECONDS = 1.0
+# Teto do sleep (recupera de saltos de relogio)
+MAX_SLEEP_SECONDS = 60.0
+
+# Modo intrabar global (env); cada servico pode sobrescrever no construtor
+INTRABAR_ENABLED = os.getenv("SIGNAL_INTRABAR", "false").lower() in ("1", "true", "yes")
+
+# Timeframes com stream de kline nativo na Binance
+STREAM_INTERVALS = {"1m", "3m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "8h", "12h", "1d", "3d", "1w", "1M"}
+
+GroupKey = Tuple[str, str]  # (symbol, timeframe) - ou (job, intervalo)
+GroupCallback = Callable[[List[GroupKey], str], Awaitable[None]]
+
+_UNIT_MS = {"s": SECOND_MS, "m": MINUTE_MS, "h": 60 * MINUTE_MS, "d": DAY_MS, "w": 7 * DAY_MS}
+
+
+def timeframe_ms(timeframe: str) -> int:
+    """Duration of a timeframe/interval in ms ("30s", "12m", "4h", "1d", "1w"); "1M" is calendar based"""
+    timeframe = timeframe.strip()
+    if timeframe.endswith("M"):
+        raise ValueError("Monthly timeframes have no fixed duration")
+    unit = timeframe[-1].lower()
+    if unit not in _UNIT_MS:
+        raise ValueError(f"Unknown timeframe: {timeframe}")
+    amount = int(timeframe[:-1])
+    if amount <= 0:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+    return amount * _UNIT_MS[unit]
+
+
+def next_close_ms(timeframe: str, now_ms: int) -> int:
+    """First candle close boundary strictly after now_ms (UTC, ms)"""
+    timeframe = timeframe.strip()
+    if timeframe.endswith("M"):
+        months = int(timeframe[:-1] or 1)
+        now = datetime.fromtimestamp(now_ms / 1000, tz=timezone.utc)
+        index = now.year * 12 + now.month - 1
+        index += months - index % months
+        boundary = datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+        return int(boundary.timestamp() * 1000)
+
+    period = timeframe_ms(timeframe)
+    if timeframe.endswith("w"):
+        return now_ms - (now_ms - WEEK_OFFSET_MS) % period + period
+    if period >= DAY_MS:
+        return now_ms - now_ms % period + period
+
+    # Abaixo de 1 dia: periodos reiniciam a 00:00 UTC; o ultimo do dia fecha na virada
+    day_start = now_ms - now_ms % DAY_MS
+    boundary = day_start + ((now_ms - day_start) // period + 1) * period
+    return min(boundary, day_start + DAY_MS)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class CandleCloseScheduler:
+    """
+    Fires `callback(keys, reason)` for (symbol, timeframe) groups when their
+    candle closes (reason "close") or, in intrabar mode, when the kline
+    stream updates them (reason "update").
+
+    Usage:
+        scheduler = CandleCloseScheduler(self._on_groups)
+        await scheduler.set_groups([("BTCUSDT", "1h"), ("ETHUSDT", "4h")])
+        await scheduler.start()
+    """
+
+    def __init__(
+        self,
+        callback: GroupCallback,
+        grace_seconds: float = CLOSE_GRACE_SECONDS,
+        intrabar: Optional[bool] = None,
+        intrabar_min_interval: float = INTRABAR_MIN_INTERVAL_SECONDS,
+        clock: Callable[[], int] = _now_ms,
+        name: str = "CandleCloseScheduler"
+    ):
+        self._callback = callback
+        self._grace_ms = int(grace_seconds * 1000)
+        self.intrabar = INTRABAR_ENABLED if intrabar is None else intrabar
+        self._intrabar_min_ms = int(intrabar_min_interval * 1000)
+        self._clock = clock
+        self.name = name
+
+        # close_ms -> grupos que fecham nesse instante; heap com os close_ms
+        self._slots: Dict[int, Set[GroupKey]] = {}
+        self._heap: List[int] = []
+        self._key_slot: Dict[GroupKey, int] = {}
+
+        # Intrabar: grupos com update pendente e ultima avaliacao por grupo
+        self._pending_updates: Set[GroupKey] = set()
+        # Fechamentos recebidos pelo stream, disparados no proximo ciclo
+        self._streamed_closes: Set[GroupKey] = set()
+        self._last_update_ms: Dict[GroupKey, int] = {}
+        # Ultimo candle recebido pelo stream nativo do grupo (time em ms)
+        self._latest_candles: Dict[GroupKey, Dict[str, Any]] = {}
+        self._stream_keys: Dict[str, Set[GroupKey]] = {}
+
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stats = {"wakeups": 0, "close_batches": 0, "closes": 0, "update_batches": 0, "updates": 0}
+
+    # ==================== Groups ====================
+
+    def add(self, symbol: str, timeframe: str) -> None:
+        """Schedule a group at its next close (no-op if already scheduled)"""
+        key = (symbol, timeframe)
+        if key not in self._key_slot:
+            self._schedule(key, next_close_ms(timeframe, self._clock()))
+
+    def remove(self, symbol: str, timeframe: str) -> None:
+        key = (symbol, timeframe)
+        self._unschedule(key)
+        self._pending_updates.discard(key)
+        self._streamed_closes.discard(key)
+        self._last_update_ms.pop(key, None)
+        self._latest_candles.pop(key, None)
+
+    async def set_groups(self, groups: Iterable[GroupKey]) -> None:
+        """Replace the scheduled groups (keeps the slot of groups that stay)"""
+        groups = set(groups)
+        for key in set(self._key_slot) - groups:
+            self.remove(*key)
+        for key in groups:
+            self.add(*key)
+        if self.intrabar:
+            await self._sync_streams()
+        self._wakeup.set()
+
+    @property
+    def groups(self) -> Set[GroupKey]:
+        return set(self._key_slot)
+
+    def latest_candle(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        """Last streamed candle of the group (None for custom timeframes or without intrabar)"""
+        return self._latest_candles.get((symbol, timeframe))
+
+    def _schedule(self, key: GroupKey, close_ms: int) -> None:
+        slot = self._slots.get(close_ms)
+        if slot is None:
+            slot = self._slots[close_ms] = set()
+            heapq.heappush(self._heap, close_ms)
+        slot.add(key)
+        self._key_slot[key] = close_ms
+
+    def _unschedule(self, key: GroupKey) -> None:
+        close_ms = self._key_slot.pop(key, None)
+        if close_ms is None:
+            return
+        slot = self._slots.get(close_ms)
+        if slot is not None:
+            slot.discard(key)
+            if not slot:
+                # Entrada no heap fica orfa e e descartada em _next_close
+                del self._slots[close_ms]
+
+    def _next_close(self) -> Optional[int]:
+        while self._heap and self._heap[0] not in self._slots:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    # ==================== Due groups ====================
+
+    def pop_due(self, now_ms: Optional[int] = None) -> List[GroupKey]:
+        """Groups whose close (+ grace) has passed; each one moves to its next boundary"""
+        now_ms = self._clock() if now_ms is None else now_ms
+        due: List[GroupKey] = []
+        while True:
+            close_ms = self._next_close()
+            if close_ms is None or close_ms + self._grace_ms > now_ms:
+                break
+            heapq.heappop(self._heap)
+            keys = self._slots.pop(close_ms)
+            for key in keys:
+                del self._key_slot[key]
+                # Atrasado varios candles: pula direto para o proximo fechamento
+                self._schedule(key, next_close_ms(key[1], max(close_ms, now_ms - self._grace_ms)))
+            due.extend(sorted(keys))
+        return due
+
+    def notify_update(self, symbol: str, timeframe: str, closed: bool = False, candle_time_ms: Optional[int] = None) -> None:
+        """
+        Streamed kline update for a group. A closed candle fires the group now
+        (and skips the timer for that boundary); other updates fire it only in
+        intrabar mode, at most once per intrabar_min_interval.
+        """
+        key = (symbol, timeframe)
+        if key not in self._key_slot:
+            return
+
+        now_ms = self._clock()
+        if closed:
+            boundary = next_close_ms(timeframe, now_ms if candle_time_ms is None else candle_time_ms)
+            if self._key_slot[key] > boundary:
+                return  # O timer ja disparou este fechamento
+            # Avalia agora e pula o timer deste fechamento
+            self._unschedule(key)
+            self._schedule(key, next_close_ms(timeframe, boundary))
+            self._streamed_closes.add(key)
+            self._wakeup.set()
+            return
+
+        if not self.intrabar:
+            return
+        if now_ms - self._last_update_ms.get(key, 0) < self._intrabar_min_ms:
+            return
+        self._last_update_ms[key] = now_ms
+        self._pending_updates.add(key)
+        self._wakeup.set()
+
+    def seconds_until_next(self, now_ms: Optional[int] = None) -> float:
+        if self._pending_updates or self._streamed_closes:
+            return 0.0
+        close_ms = self._next_close()
+        if close_ms is None:
+            return MAX_SLEEP_SECONDS
+        now_ms = self._clock() if now_ms is None else now_ms
+        return min(max((close_ms + self._grace_ms - now_ms) / 1000, 0.0), MAX_SLEEP_SECONDS)
+
+    async def run_due(self, now_ms: Optional[int] = None) -> Dict[str, List[GroupKey]]:
+        """Fire every due group (closes first, then intrabar updates)"""
+        closes = self.pop_due(now_ms)
+        streamed = [key for key in sorted(self._streamed_closes) if key not in closes]
+        self._streamed_closes.clear()
+        closes.extend(streamed)
+
+        updates = sorted(self._pending_updates - set(closes))
+        self._pending_updates.clear()
+
+        if closes:
+            self._stats["close_batches"] += 1
+            self._stats["closes"] += len(closes)
+            await self._callback(closes, "close")
+        if updates:
+            self._stats["update_batches"] += 1
+            self._stats["updates"] += len(updates)
+            await self._callback(updates, "update")
+        return {"close": closes, "update": updates}
+
+    # ==================== Loop ====================
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"{self.name} started", groups=len(self._key_slot), intrabar=self.intrabar)
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._stream_keys:
+            await self._release_streams(list(self._stream_keys))
+
+    async def _run(self) -> None:
+        while self._running:
+            try:
+                self._wakeup.clear()
+                delay = self.seconds_until_next()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                self._stats["wakeups"] += 1
+                await self.run_due()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in {self.name} loop: {e}")
+                await asyncio.sleep(1)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        next_close = self._next_close()
+        return {
+            **self._stats,
+            "groups": len(self._key_slot),
+            "slots": len(self._slots),
+            "streams": len(self._stream_keys),
+            "intrabar": self.intrabar,
+            "next_close_ms": next_close,
+        }
+
+    # ==================== Kline streams (intrabar) ====================
+
+    @staticmethod
+    def stream_interval(timeframe: str) -> str:
+        """Native kline stream for a timeframe; custom timeframes follow the 1m stream"""
+        return timeframe if timeframe in STREAM_INTERVALS else "1m"
+
+    async def _sync_streams(self) -> None:
+        """Subscribe / release Binance kline streams to match the scheduled groups"""
+        from infrastructure.exchanges.binance_websocket import get_binance_ws_manager
+
+        manager = get_binance_ws_manager(use_futures=True)
+        wanted: Dict[str, Set[GroupKey]] = {}
+        for symbol, timeframe in self._key_slot:
+            stream = f"{symbol.lower()}@kline_{self.stream_interval(timeframe)}"
+            wanted.setdefault(stream, set()).add((symbol, timeframe))
+
+        released = [stream for stream in self._stream_keys if stream not in wanted]
+        if released:
+            await self._release_streams(released)
+
+        for stream, keys in wanted.items():
+            if stream not in self._stream_keys:
+                symbol, timeframe = next(iter(keys))
+                await manager.subscribe_kline(symbol, self.stream_interval(timeframe), self._on_kline)
+            self._stream_keys[stream] = keys
+
+        if self._stream_keys and not manager.running:
+            await manager.start()
+
+    async def _release_streams(self, streams: List[str]) -> None:
+        from infrastructure.exchanges.binance_websocket import get_binance_ws_manager
+
+        manager = get_binance_ws_manager(use_futures=True)
+        for stream in streams:
+            self._stream_keys.pop(stream, None)
+            # Remove so o nosso callback: o stream pode ser compartilhado
+            await manager.remove_kline_callback(stream, self._on_kline)
+
+    async def _on_kline(self, kline) -> None:
+        stream = f"{kline.symbol.lower()}@kline_{kline.interval}"
+        candle = kline.to_dict()
+        for symbol, timeframe in list(self._stream_keys.get(stream, ())):
+            # Stream de 1m para timeframe custom: fechamento do 1m nao fecha o grupo
+            native = timeframe == kline.interval
+            if native:
+                self._latest_candles[(symbol, timeframe)] = candle
+            self.notify_update(symbol, timeframe, closed=kline.is_closed and native, candle_time_ms=candle['time'])
@@ -0,0 +1,491 @@
+"""
+Candle Service
+Single in-process path for OHLCV candles used by the market API, charts,
+indicator alerts, strategy engines and backtests.
+
+Lookup order: memory cache (CandlesCache) -> database (candles table via
+CandleRepository) -> Binance public REST API. Concurrent requests for the same
+key share one fetch (request coalescing), so a burst of alerts/strategies on the
+same market never turns into a burst of exchange calls.
+
+Timeframes Binance does not serve (12m, 90m, 3h...) are aggregated from the 1m
+series of the same market (history and live tail).
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Any, Tuple
+
+import aiohttp
+import structlog
+
+from infrastructure.cache.candles_cache import INTERVAL_MS, candles_cache, interval_to_ms
+from infrastructure.services.custom_timeframe_aggregator import (
+    MINUTE_MS,
+    CustomTimeframeAggregator,
+    aggregate_candles,
+    period_start_ms,
+)
+
+logger = structlog.get_logger(__name__)
+
+BINANCE_FUTURES_KLINES_URL = "https://fapi.binance.com/fapi/v1/klines"
+BINANCE_SPOT_KLINES_URL = "https://api.binance.com/api/v3/klines"
+BINANCE_MAX_LIMIT = 1000
+MAX_PAGES = 20  # Limite de segurança para paginação (20k candles)
+
+
+def kline_to_candle(kline: List[Any]) -> Dict[str, Any]:
+    """Binance kline [open_time, open, high, low, close, volume, ...] -> candle dict (time em ms)"""
+    return {
+        "time": int(kline[0]),
+        "open": float(kline[1]),
+        "high": float(kline[2]),
+        "low": float(kline[3]),
+        "close": float(kline[4]),
+        "volume": float(kline[5]),
+    }
+
+
+class CandleService:
+    """
+    Serviço único de candles (memória -> banco -> exchange) com coalescing
+    de requisições concorrentes para a mesma chave
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "memory_hits": 0,
+            "database_hits": 0,
+            "exchange_fetches": 0,
+            "tail_refreshes": 0,
+        }
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Sessão HTTP compartilhada (reutiliza conexões com a exchange)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        return self._session
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def get_candles(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 500,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        market_type: str = "futures",
+        use_database: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Busca candles para (symbol, interval).
+
+        Sem start_time: retorna os últimos `limit` candles até end_time (ou agora).
+        Com start_time: retorna candles de start_time até end_time (máx `limit`).
+
+        Args:
+            symbol: Par (ex: BTCUSDT)
+            interval: Timeframe (1m, 5m, 1h, 4h, 1d... ou customizado: 12m, 90m, 3h)
+            limit: Quantidade máxima de candles (pagina acima de 1000)
+            start_time: Início em ms (opcional)
+            end_time: Fim em ms (opcional)
+            market_type: futures, spot ou auto (auto = futures com fallback para spot)
+            use_database: Consultar/gravar a tabela candles
+
+        Returns:
+            Dict com success, candles (time em ms, ordenados), market_type e source
+        """
+        symbol = symbol.upper().replace("/", "")
+        if market_type == "auto":
+            market_type = "futures"
+
+        key = (symbol, interval, limit, start_time, end_time, market_type, use_database)
+        self._stats["requests"] += 1
+
+        while (inflight := self._inflight.get(key)) is not None:
+            # 🤝 Coalescing: mesma chave já está sendo buscada, aguarda o mesmo resultado
+            self._stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Só o líder foi cancelado: este chamador assume a busca
+                if not inflight.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._load(symbol, interval, limit, start_time, end_time, market_type, use_database)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Líder cancelado (cliente desconectou, timeout, shutdown): libera quem aguarda
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita "Future exception was never retrieved" quando ninguém mais aguarda
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: Optional[int],
+        end_time: Optional[int],
+        market_type: str,
+        use_database: bool,
+    ) -> Dict[str, Any]:
+        if interval not in INTERVAL_MS:
+            return await self._load_aggregated(
+                symbol, interval, limit, start_time, end_time, market_type, use_database
+            )
+
+        latest_window = start_time is None and end_time is None
+
+        # 1. Memória - qualquer limit/intervalo é uma fatia da série do mercado
+        if latest_window:
+            cached = await candles_cache.get(symbol, interval, limit, market_type)
+            if cached is None:
+                cached = await self._refresh_tail(symbol, interval, limit, market_type)
+        else:
+            cached = await candles_cache.get_range(symbol, interval, limit, start_time, end_time, market_type)
+        if cached:
+            self._stats["memory_hits"] += 1
+            return {**cached, "source": "memory"}
+
+        # 2. Banco - apenas para intervalos fechados no passado (candles não mudam mais)
+        if use_database and not latest_window:
+            stored = await self._load_from_database(symbol, interval, limit, start_time, end_time)
+            if stored is not None:
+                self._stats["database_hits"] += 1
+                await candles_cache.set(symbol, interval, stored, market_type)
+                return {
+                    "success": True,
+                    "candles": stored,
+                    "market_type": market_type,
+                    "source": "database",
+                }
+
+        # 3. Exchange
+        result = await self._fetch_from_exchange(symbol, interval, limit, start_time, end_time, market_type)
+        if not result["success"]:
+            return result
+
+        await candles_cache.set(
+            symbol,
+            interval,
+            result["candles"],
+            market_type,
+            source_market_type=result["market_type"],
+            is_latest=end_time is None and self._reaches_now(interval, result["candles"]),
+        )
+
+        if use_database and result["candles"]:
+            # Persistir em background: não atrasa quem pediu
+            asyncio.create_task(self._save_to_database(symbol, interval, result["candles"]))
+
+        return result
+
+    async def _load_aggregated(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: Optional[int],
+        end_time: Optional[int],
+        market_type: str,
+        use_database: bool,
+    ) -> Dict[str, Any]:
+        """
+        Timeframe não nativo: busca a série 1m (cache -> banco -> exchange) e agrega.
+        Levanta ValueError se o intervalo não for um período válido (os endpoints devolvem 400).
+        """
+        try:
+            target_minutes = CustomTimeframeAggregator.parse_timeframe(interval)
+        except ValueError:
+            target_minutes = 0
+        if target_minutes <= 0:
+            raise ValueError(f"Unsupported interval: {interval}")
+        period_ms = target_minutes * MINUTE_MS
+        now_ms = int(time.time() * 1000)
+
+        if start_time is not None:
+            # Para frente a partir do início do período que contém start_time
+            base_start = int(period_start_ms(start_time, target_minutes))
+            base_end = end_time if end_time is not None else now_ms
+            base_limit = min(limit * target_minutes, (base_end - base_start) // MINUTE_MS + 1)
+        else:
+            # Os `limit` períodos que terminam em end_time (ou agora, incluindo o período em formação)
+            anchor = end_time if end_time is not None else now_ms
+            base_start = int(period_start_ms(anchor, target_minutes)) - (limit - 1) * period_ms
+            base_limit = (anchor - base_start) // MINUTE_MS + 1
+
+        base = await self.get_candles(
+            symbol=symbol,
+            interval="1m",
+            limit=max(1, base_limit),
+            start_time=base_start if start_time is not None else None,
+            end_time=end_time,
+            market_type=market_type,
+            use_database=use_database,
+        )
+        if not base.get("success"):
+            return base
+
+        candles = aggregate_candles(base["candles"], target_minutes)
+        candles = candles[:limit] if start_time is not None else candles[-limit:]
+
+        return {
+            "success": True,
+            "candles": candles,
+            "market_type": base.get("market_type", market_type),
+            "source": f"aggregated_1m:{base.get('source')}",
+        }
+
+    def _reaches_now(self, interval: str, candles: List[Dict[str, Any]]) -> bool:
+        """True se o último candle é o candle em formação"""
+        return bool(candles) and candles[-1]["time"] + interval_to_ms(interval) > time.time() * 1000
+
+    async def _refresh_tail(
+        self, symbol: str, interval: str, limit: int, market_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cauda expirada mas histórico em cache: busca apenas os candles desde o
+        último em cache (1 request pequena) e mescla na série
+        """
+        last_time = await candles_cache.get_stale_tail(symbol, interval, limit, market_type)
+        if last_time is None:
+            return None
+
+        missing = (int(time.time() * 1000) - last_time) // interval_to_ms(interval) + 1
+        if missing > BINANCE_MAX_LIMIT:
+            return None
+
+        page = await self._fetch_page(symbol, interval, market_type, missing, last_time)
+        if not page["success"] or not page["data"]:
+            return None
+
+        self._stats["tail_refreshes"] += 1
+        await candles_cache.set(
+            symbol,
+            interval,
+            [kline_to_candle(k) for k in page["data"]],
+            market_type,
+            source_market_type=page["market_type"],
+            is_latest=True,
+        )
+        return await candles_cache.get(symbol, interval, limit, market_type)
+
+    def _expected_count(self, interval: str, limit: int, start_time: Optional[int], end_time: Optional[int]) -> int:
+        if start_time is None or end_time is None:
+            return limit
+        return min(limit, max(0, (end_time - start_time) // interval_to_ms(interval) + 1))
+
+    async def _load_from_database(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: Optional[int],
+        end_time: Optional[int],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Retorna candles do banco se o intervalo pedido estiver (quase) completo"""
+        now_ms = int(time.time() * 1000)
+        if end_time is None or end_time >= now_ms - interval_to_ms(interval):
+            # Janela inclui o candle em formação - precisa da exchange
+            return None
+        if start_time is None:
+            # Somente end_time: os `limit` candles imediatamente anteriores
+            start_time = end_time - (limit - 1) * interval_to_ms(interval)
+
+        try:
+            from infrastructure.database.connection import get_async_session
+            from infrastructure.database.repositories.candle_repository import CandleRepository
+
+            async with get_async_session() as session:
+                repo = CandleRepository(session)
+                rows = await repo.get_candles(
+                    symbol=symbol,
+                    interval=interval,
+                    start_time=start_time,
+                    end_time=end_time,
+                    limit=limit,
+                )
+        except Exception as e:
+            logger.debug(f"Candle DB lookup skipped: {e}")
+            return None
+
+        expected = self._expected_count(interval, limit, start_time, end_time)
+        if not rows or len(rows) < expected * 0.95:
+            return None
+
+        return [
+            {"time": int(c.time), "open": c.open, "high": c.high, "low": c.low, "close": c.close, "volume": c.volume}
+            for c in rows
+        ]
+
+    async def _save_to_database(self, symbol: str, interval: str, candles: List[Dict[str, Any]]) -> None:
+        """Grava apenas candles fechados (o candle em formação ainda muda)"""
+        now_ms = int(time.time() * 1000)
+        interval_ms = interval_to_ms(interval)
+        closed = [c for c in candles if c["time"] + interval_ms <= now_ms]
+        if not closed:
+            return
+
+        try:
+            from infrastructure.database.connection import get_async_session
+            from infrastructure.database.models.candle import Candle as CandleModel
+            from infrastructure.database.repositories.candle_repository import CandleRepository
+
+            async with get_async_session() as session:
+                repo = CandleRepository(session)
+                for i in range(0, len(closed), BINANCE_MAX_LIMIT):
+                    await repo.save_candles([
+                        CandleModel(
+                            symbol=symbol,
+                            interval=interval,
+                            time=c["time"],
+                            open=c["open"],
+                            high=c["high"],
+                            low=c["low"],
+                            close=c["close"],
+                            volume=c["volume"],
+                            created_at=now_ms,
+                            updated_at=now_ms,
+                        )
+                        for c in closed[i:i + BINANCE_MAX_LIMIT]
+                    ])
+        except Exception as e:
+            logger.debug(f"Candle DB save skipped: {e}")
+
+    async def _fetch_page(
+        self,
+        symbol: str,
+        interval: str,
+        market_type: str,
+        limit: int,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Uma página de klines da API pública (futures com fallback para spot)"""
+        url = BINANCE_FUTURES_KLINES_URL if market_type == "futures" else BINANCE_SPOT_KLINES_URL
+        params = {"symbol": symbol, "interval": interval, "limit": min(limit, BINANCE_MAX_LIMIT)}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+
+        self._stats["exchange_fetches"] += 1
+        try:
+            session = await self._get_session()
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    if market_type == "futures" and "Invalid symbol" in error_text:
+                        logger.info(f"Symbol {symbol} not found in futures, trying spot...")
+                        return await self._fetch_page(symbol, interval, "spot", limit, start_time, end_time)
+                    return {"success": False, "error": f"Binance API error: {response.status} - {error_text}", "data": []}
+
+                data = await response.json()
+                return {"success": True, "data": data, "market_type": market_type}
+
+        except Exception as e:
+            logger.error(f"❌ Binance public API error: {e}")
+            if market_type == "futures":
+                return await self._fetch_page(symbol, interval, "spot", limit, start_time, end_time)
+            return {"success": False, "error": str(e), "data": []}
+
+    async def _fetch_from_exchange(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: Optional[int],
+        end_time: Optional[int],
+        market_type: str,
+    ) -> Dict[str, Any]:
+        """Busca paginada: para frente a partir de start_time, ou para trás a partir de end_time"""
+        interval_ms = interval_to_ms(interval)
+        all_data: List[List[Any]] = []
+        pages = 0
+        actual_market = market_type
+
+        # O próprio limit já limita a paginação (ex: backtest, 1m base de um timeframe agregado)
+        max_pages = max(MAX_PAGES, -(-limit // BINANCE_MAX_LIMIT))
+
+        if start_time is not None:
+            cursor = start_time
+            while len(all_data) < limit and pages < max_pages:
+                page = await self._fetch_page(
+                    symbol, interval, actual_market, min(limit - len(all_data), BINANCE_MAX_LIMIT), cursor, end_time
+                )
+                if not page["success"]:
+                    if pages == 0:
+                        return {"success": False, "error": page.get("error"), "candles": []}
+                    break
+                actual_market = page["market_type"]
+                data = page["data"]
+                if not data:
+                    break
+                all_data.extend(data)
+                pages += 1
+                cursor = data[-1][0] + interval_ms
+                if len(data) < BINANCE_MAX_LIMIT or (end_time is not None and cursor > end_time):
+                    break
+                await asyncio.sleep(0.1)
+        else:
+            cursor = end_time
+            while len(all_data) < limit and pages < max_pages:
+                batch = min(limit - len(all_data), BINANCE_MAX_LIMIT)
+                page = await self._fetch_page(symbol, interval, actual_market, batch, None, cursor)
+                if not page["success"]:
+                    if pages == 0:
+                        return {"success": False, "error": page.get("error"), "candles": []}
+                    break
+                actual_market = page["market_type"]
+                data = page["data"]
+                if not data:
+                    break
+                all_data = data + all_data
+                pages += 1
+                cursor = data[0][0] - 1
+                if len(data) < batch:
+                    break
+                await asyncio.sleep(0.1)
+
+        logger.debug(f"Fetched {len(all_data)} candles for {symbol} {interval} in {pages} pages")
+
+        return {
+            "success": True,
+            "candles": [kline_to_candle(k) for k in all_data],
+            "market_type": actual_market,
+            "source": "binance_public_paginated" if pages > 1 else "binance_public",
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self._stats, "inflight": len(self._inflight)}
+
+
+# Singleton instance
+candle_service = None
+
+
+def get_candle_service() -> CandleService:
+    """Get or create the CandleService singleton"""
+    global candle_service
+    if candle_service is None:
+        candle_service = CandleService()
+    return candle_service
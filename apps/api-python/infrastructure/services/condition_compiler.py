@@ -0,0 +1,280 @@
+"""
+Condition Compiler
+Compiles strategy condition sets ({"left", "operator", "right"} dicts combined
+with AND/OR) once, instead of interpreting them on every bar/tick.
+
+- Operands are resolved at compile time: numeric literals become constants,
+  indicator keys become a fixed list of context keys (key + alias).
+- Operators become `operator` module functions (no dict/lambda per call).
+- `evaluate(context)` is the scalar path used by the live engines and the
+  bar-by-bar backtest; `evaluate_mask(columns)` evaluates the same set over
+  whole series (NumPy arrays, NaN = missing) as a boolean mask.
+
+Semantics (shared by backtest, StrategyEngineService and
+StrategyWebSocketMonitor): a condition whose operand is missing is skipped;
+a set with no evaluable condition is False.
+"""
+
+import operator as _operator
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+EQUALITY_TOLERANCE = 0.0001
+
+# Aliases usados pelo frontend/YAML -> chave "indicador.valor" do contexto
+CONDITION_ALIASES: Dict[str, str] = {
+    # Nadaraya-Watson
+    "ndy.lower": "nadaraya_watson.lower",
+    "ndy.upper": "nadaraya_watson.upper",
+    "ndy.value": "nadaraya_watson.value",
+    # RSI
+    "rsi": "rsi.value",
+    # MACD
+    "macd.signal": "macd.signal_line",
+    # Bollinger
+    "bb.upper": "bollinger.upper",
+    "bb.lower": "bollinger.lower",
+    "bb.middle": "bollinger.middle",
+    "bb.bandwidth": "bollinger.bandwidth",
+    "bb.percent_b": "bollinger.percent_b",
+    # ADX
+    "adx": "adx.adx",
+    "+di": "adx.plus_di",
+    "-di": "adx.minus_di",
+    # SuperTrend
+    "st.trend": "supertrend.trend",
+    "st.value": "supertrend.value",
+    # Ichimoku
+    "ichi.tenkan": "ichimoku.tenkan",
+    "ichi.kijun": "ichimoku.kijun",
+    "ichi.cloud_top": "ichimoku.cloud_top",
+    "ichi.cloud_bottom": "ichimoku.cloud_bottom",
+    # OBV
+    "obv": "obv.obv",
+    # EMA cross
+    "ema.fast": "ema_cross.fast_ema",
+    "ema.slow": "ema_cross.slow_ema",
+}
+
+
+def _approx_equal(a: float, b: float) -> bool:
+    return abs(a - b) < EQUALITY_TOLERANCE
+
+
+def _approx_not_equal(a: float, b: float) -> bool:
+    return abs(a - b) >= EQUALITY_TOLERANCE
+
+
+# crosses_above/crosses_below: avaliados no candle atual (mesmo comportamento de antes)
+SCALAR_OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    "<": _operator.lt,
+    ">": _operator.gt,
+    "<=": _operator.le,
+    ">=": _operator.ge,
+    "==": _approx_equal,
+    "!=": _approx_not_equal,
+    "crosses_above": _operator.gt,
+    "crosses_below": _operator.lt,
+}
+
+
+def _never(a: Any, b: Any) -> bool:
+    return False
+
+
+class Operand:
+    """Lado de uma condição: constante ou chave(s) do contexto"""
+
+    __slots__ = ("constant", "keys")
+
+    def __init__(self, raw: Any, aliases: Mapping[str, str]):
+        self.constant: Optional[float] = None
+        self.keys: Tuple[str, ...] = ()
+
+        if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+            self.constant = float(raw)
+            return
+
+        key = str(raw or "")
+        try:
+            self.constant = float(key)
+            return
+        except ValueError:
+            pass
+
+        alias = aliases.get(key)
+        self.keys = (key, alias) if alias and alias != key else (key,)
+
+    @property
+    def is_constant(self) -> bool:
+        return self.constant is not None
+
+    def resolve(self, context: Mapping[str, Any]) -> Optional[Any]:
+        if self.constant is not None:
+            return self.constant
+        for key in self.keys:
+            value = context.get(key)
+            if value is not None:
+                return value
+        return None
+
+    def column(self, columns: Mapping[str, Any], length: int):
+        """Série do operando (array float, NaN onde faltar valor)"""
+        if self.constant is not None:
+            return np.full(length, self.constant, dtype=float)
+        for key in self.keys:
+            values = columns.get(key)
+            if values is not None:
+                return np.asarray(values, dtype=float)
+        return np.full(length, np.nan, dtype=float)
+
+
+class CompiledCondition:
+    """Uma comparação compilada"""
+
+    __slots__ = ("left", "right", "op", "compare")
+
+    def __init__(self, condition: Mapping[str, Any], aliases: Mapping[str, str]):
+        self.left = Operand(condition.get("left", ""), aliases)
+        self.right = Operand(condition.get("right", ""), aliases)
+        self.op = condition.get("operator", "")
+        self.compare = SCALAR_OPERATORS.get(self.op, _never)
+
+    def mask(self, columns: Mapping[str, Any], length: int) -> Tuple[Any, Any]:
+        """(resultado, válido) para toda a série"""
+        left = self.left.column(columns, length)
+        right = self.right.column(columns, length)
+        valid = ~(np.isnan(left) | np.isnan(right))
+
+        with np.errstate(invalid="ignore"):
+            if self.op in ("<", "crosses_below"):
+                result = left < right
+            elif self.op in (">", "crosses_above"):
+                result = left > right
+            elif self.op == "<=":
+                result = left <= right
+            elif self.op == ">=":
+                result = left >= right
+            elif self.op == "==":
+                result = np.abs(left - right) < EQUALITY_TOLERANCE
+            elif self.op == "!=":
+                result = np.abs(left - right) >= EQUALITY_TOLERANCE
+            else:
+                result = np.zeros(length, dtype=bool)
+
+        return result & valid, valid
+
+
+class CompiledConditionSet:
+    """
+    Conjunto de condições (AND/OR) compilado uma vez por estratégia.
+
+    Args:
+        conditions: Lista de {"left", "operator", "right"}
+        logic_operator: "AND" / "OR" (str ou LogicOperator)
+        aliases: Mapa de aliases de chaves (default: CONDITION_ALIASES)
+    """
+
+    __slots__ = ("conditions", "is_and")
+
+    def __init__(
+        self,
+        conditions: Optional[Sequence[Mapping[str, Any]]],
+        logic_operator: Any = "AND",
+        aliases: Optional[Mapping[str, str]] = None,
+    ):
+        aliases = CONDITION_ALIASES if aliases is None else aliases
+        self.conditions: List[CompiledCondition] = [
+            CompiledCondition(cond, aliases) for cond in (conditions or [])
+        ]
+        operator_value = getattr(logic_operator, "value", logic_operator)
+        self.is_and = str(operator_value or "AND").upper() != "OR"
+
+    def __bool__(self) -> bool:
+        return bool(self.conditions)
+
+    @property
+    def keys(self) -> List[str]:
+        """Chaves de contexto/colunas referenciadas"""
+        keys = []
+        for cond in self.conditions:
+            for operand in (cond.left, cond.right):
+                keys.extend(k for k in operand.keys if k not in keys)
+        return keys
+
+    def evaluate(self, context: Mapping[str, Any]) -> bool:
+        """Avalia no contexto atual (um candle/tick)"""
+        evaluated = False
+        for cond in self.conditions:
+            left = cond.left.resolve(context)
+            if left is None:
+                continue
+            right = cond.right.resolve(context)
+            if right is None:
+                continue
+
+            evaluated = True
+            if cond.compare(left, right):
+                if not self.is_and:
+                    return True
+            elif self.is_and:
+                return False
+
+        # AND: todas as avaliadas passaram; OR: nenhuma passou
+        return evaluated and self.is_and
+
+    def evaluate_mask(self, columns: Mapping[str, Any], length: int):
+        """
+        Avalia sobre séries inteiras.
+
+        Args:
+            columns: chave -> sequência/array de floats (NaN ou None = ausente)
+            length: Número de candles
+
+        Returns:
+            Array booleano (True onde o conjunto é satisfeito)
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for vectorized condition evaluation")
+
+        if not self.conditions:
+            return np.zeros(length, dtype=bool)
+
+        any_valid = np.zeros(length, dtype=bool)
+        combined = np.ones(length, dtype=bool) if self.is_and else np.zeros(length, dtype=bool)
+
+        for cond in self.conditions:
+            result, valid = cond.mask(columns, length)
+            any_valid |= valid
+            if self.is_and:
+                combined &= result | ~valid  # condição sem valor é ignorada
+            else:
+                combined |= result
+
+        return combined & any_valid
+
+
+def compile_condition_sets(
+    conditions: Mapping[Any, Sequence[Mapping[str, Any]]],
+    operators: Mapping[Any, Any],
+    aliases: Optional[Mapping[str, str]] = None,
+) -> Dict[Any, CompiledConditionSet]:
+    """Compila {condition_type: conditions} de uma estratégia"""
+    return {
+        condition_type: CompiledConditionSet(cond_list, operators.get(condition_type, "AND"), aliases)
+        for condition_type, cond_list in conditions.items()
+    }
+
+
+def columns_to_arrays(columns: Mapping[str, Sequence[Optional[float]]]) -> Dict[str, Any]:
+    """Listas com None -> arrays float com NaN (entrada de evaluate_mask)"""
+    return {
+        key: np.array([np.nan if v is None else v for v in values], dtype=float)
+        for key, values in columns.items()
+    }
@@ -7,12 +7,16 @@ that are not natively supported by Binance.
 This is essential for strategies that require non-standard timeframes
 like TPO + Nadaraya-Watson which operates on 12-minute candles.
 
-How it works:
+How it works (live):
 1. Subscribe to 1-minute WebSocket stream
 2. Buffer 1-minute candles
 3. Aggregate N candles into 1 custom timeframe candle
 4. Emit aggregated candle when complete
 
+History / live tail from a stored 1m series: aggregate_ohlcv() does the same
+aggregation vectorized (NumPy segment reduce), used by CandleService for
+charts, backtests and strategy engines.
+
 Reference: https://atekihcan.com/blog/codeortrading/changing-timeframe-of-ohlc-candlestick-data-in-pandas/
 """
 
@@ -22,10 +26,101 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Any, Callable, Dict, List, Optional, Set
+import numpy as np
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+MINUTE_MS = 60 * 1000
+DAY_MS = 24 * 60 * MINUTE_MS
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def period_start_ms(times, target_minutes: int):
+    """
+    Start of the aggregation period for timestamp(s) in ms (int or np.ndarray).
+    Periods restart at 00:00 UTC (00:00, 00:12, 00:24...); periods of one day
+    or more are aligned to the epoch.
+    """
+    period_ms = target_minutes * MINUTE_MS
+    if period_ms >= DAY_MS:
+        return times - times % period_ms
+    day_start = times - times % DAY_MS
+    return day_start + ((times - day_start) // period_ms) * period_ms
+
+
+def aggregate_ohlcv(
+    times: np.ndarray,
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    volumes: np.ndarray,
+    target_minutes: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate a 1m OHLCV series (sorted by time) into N-minute candles.
+
+    Segment reduce: one boundary per period change, then first/max/min/last/sum
+    per segment with ufunc.reduceat - no per-candle Python loop.
+
+    Returns:
+        Dict of arrays: time, open, high, low, close, volume, count (1m candles per period)
+    """
+    times = np.asarray(times, dtype=np.int64)
+    if times.size == 0:
+        empty = {name: np.empty(0) for name in OHLCV_COLUMNS}
+        return {"time": np.empty(0, dtype=np.int64), **empty, "count": np.empty(0, dtype=np.int64)}
+
+    buckets = period_start_ms(times, target_minutes)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], times.size)
+
+    return {
+        "time": buckets[starts],
+        "open": np.asarray(opens, dtype=np.float64)[starts],
+        "high": np.maximum.reduceat(np.asarray(highs, dtype=np.float64), starts),
+        "low": np.minimum.reduceat(np.asarray(lows, dtype=np.float64), starts),
+        "close": np.asarray(closes, dtype=np.float64)[ends - 1],
+        "volume": np.add.reduceat(np.asarray(volumes, dtype=np.float64), starts),
+        "count": ends - starts,
+    }
+
+
+def aggregate_candles(
+    candles: List[Dict[str, Any]],
+    target_minutes: int,
+    drop_partial_first: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate 1m candle dicts (time in ms, sorted) into N-minute candle dicts.
+
+    Args:
+        candles: 1m candles (time, open, high, low, close, volume)
+        target_minutes: Target timeframe in minutes (e.g. 12)
+        drop_partial_first: Drop the first period when the series starts mid-period
+
+    Returns:
+        Aggregated candles; the last one may be the in-progress period (live tail)
+    """
+    if not candles:
+        return []
+
+    n = len(candles)
+    times = np.fromiter((c["time"] for c in candles), dtype=np.int64, count=n)
+    columns = {
+        name: np.fromiter((c[name] for c in candles), dtype=np.float64, count=n)
+        for name in OHLCV_COLUMNS
+    }
+    aggregated = aggregate_ohlcv(times, *(columns[name] for name in OHLCV_COLUMNS), target_minutes)
+
+    first = 1 if drop_partial_first and times[0] != aggregated["time"][0] else 0
+    rows = zip(*(aggregated[name][first:].tolist() for name in ("time",) + OHLCV_COLUMNS))
+    return [
+        {"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for t, o, h, l, c, v in rows
+    ]
+
 
 @dataclass
 class AggregatedCandle:
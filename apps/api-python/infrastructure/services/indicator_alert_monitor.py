@@ -4,20 +4,29 @@ Monitors configured indicators and triggers alerts when signals are detected
 """
 
 import asyncio
+import json
 import structlog
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import uuid as uuid_module
 
+from infrastructure.services.candle_close_scheduler import CandleCloseScheduler
+from infrastructure.services.candle_service import get_candle_service
+
 logger = structlog.get_logger(__name__)
 
+# Intervalo do poll do contador de versão dos alertas (SELECT de uma linha)
+ALERT_VERSION_POLL_SECONDS = 10
+
 # Try to import numpy, but don't fail if not available
 try:
     import numpy as np
+    from infrastructure.indicators import classic
     NUMPY_AVAILABLE = True
 except ImportError:
     NUMPY_AVAILABLE = False
     np = None
+    classic = None
     logger.warning("NumPy not available - Indicator Alert Monitor will be disabled")
 
 
@@ -26,10 +35,15 @@ class IndicatorAlertMonitor:
     Background service that monitors indicator signals and triggers alerts.
 
     This service:
-    1. Fetches active indicator alerts from the database
-    2. Gets candle data for each symbol/timeframe combination
-    3. Calculates indicator values and checks for signals
+    1. Keeps the active indicator alerts in memory, grouped by symbol/timeframe
+       (reloaded when the indicator_alert_version counter changes)
+    2. Gets candle data once for each symbol/timeframe combination
+    3. Calculates each distinct (indicator, params) once per group, only when
+       the group's candles changed, and matches every alert against it
     4. Triggers notifications when signals are detected (respecting cooldown)
+
+    Groups are evaluated when their candle closes (CandleCloseScheduler), not
+    on a fixed timer; new or changed groups are evaluated right after reload.
     """
 
     def __init__(self, db):
@@ -38,6 +52,19 @@ class IndicatorAlertMonitor:
         self._task = None
         # Cache for last signal per alert (to avoid duplicate triggers)
         self._last_signals: Dict[str, Dict[str, Any]] = {}
+        # Active alerts in memory, grouped by (symbol, timeframe); reloaded only
+        # when the indicator_alert_version counter moves
+        self._alert_groups: Dict[Tuple[str, str], List[dict]] = {}
+        self._alerts_version: Optional[int] = None
+        self._alerts_loaded = False
+        self._alerts_stale = False
+        # Signals per group, reused while the group's candles do not change
+        self._group_signals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._stats = {
+            "version_checks": 0, "alert_reloads": 0,
+            "groups_evaluated": 0, "groups_unchanged": 0, "calculations": 0,
+        }
+        self._scheduler = CandleCloseScheduler(self._on_groups_due, name="IndicatorAlertMonitor")
 
     async def start(self):
         """Start the monitor service"""
@@ -55,8 +82,8 @@ class IndicatorAlertMonitor:
 
         self.is_running = True
         self._task = asyncio.create_task(self._monitor_loop())
-        print("✅ [IndicatorAlertMonitor] Started successfully - checking signals every 30 seconds")
-        logger.info("🔔 Indicator Alert Monitor started successfully - checking signals every 30 seconds")
+        print("✅ [IndicatorAlertMonitor] Started successfully - checking signals on candle close")
+        logger.info("🔔 Indicator Alert Monitor started successfully - checking signals on candle close")
 
     async def stop(self):
         """Stop the monitor service"""
@@ -67,128 +94,251 @@ class IndicatorAlertMonitor:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        await self._scheduler.stop()
         logger.info("⏹️ Indicator Alert Monitor stopped")
 
     async def _monitor_loop(self):
-        """Main monitoring loop"""
+        """
+        Main monitoring loop: evaluates every group once, then the scheduler
+        fires each group on its candle close. This loop only polls the alert
+        version counter and evaluates groups that were added or changed.
+        """
+        await self._check_all_alerts()
+        await self._scheduler.set_groups(self._alert_groups.keys())
+        await self._scheduler.start()
+
         while self.is_running:
             try:
-                await self._check_all_alerts()
-                await asyncio.sleep(30)  # Check every 30 seconds
+                await asyncio.sleep(ALERT_VERSION_POLL_SECONDS)
+                await self._apply_alert_changes()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error in indicator alert monitor loop: {e}")
                 await asyncio.sleep(10)  # Wait before retry
 
+    async def _apply_alert_changes(self) -> List[Tuple[str, str]]:
+        """Reload alerts if they changed; evaluates added or edited groups now instead of at the next close"""
+        previous = {group: self._group_signature(alerts) for group, alerts in self._alert_groups.items()}
+        if not await self._refresh_alerts():
+            return []
+
+        await self._scheduler.set_groups(self._alert_groups.keys())
+        changed = [
+            group for group, alerts in self._alert_groups.items()
+            if previous.get(group) != self._group_signature(alerts)
+        ]
+        if changed:
+            await self._check_groups(changed)
+        return changed
+
+    async def _on_groups_due(self, groups: List[Tuple[str, str]], reason: str) -> None:
+        """Scheduler callback; alerts only look at closed candles, so intrabar updates are ignored"""
+        if reason == "close":
+            await self._check_groups(groups)
+
     async def _check_all_alerts(self):
         """Check all active alerts for signals"""
         try:
-            # Fetch all active alerts
-            alerts = await self.db.fetch("""
-                SELECT
-                    ia.id, ia.user_id, ia.indicator_type, ia.symbol, ia.timeframe,
-                    ia.signal_type, ia.indicator_params, ia.message_template,
-                    ia.push_enabled, ia.email_enabled, ia.sound_type,
-                    ia.cooldown_seconds, ia.last_triggered_at
-                FROM indicator_alerts ia
-                WHERE ia.is_active = true
-            """)
-
-            print(f"🔍 [IndicatorAlertMonitor] Found {len(alerts) if alerts else 0} active alerts")
-
-            if not alerts:
-                print("⚠️ [IndicatorAlertMonitor] No active alerts configured in database")
-                return
+            await self._refresh_alerts()
+        except Exception as e:
+            logger.error(f"Error fetching alerts: {e}")
+            return
 
-            logger.debug(f"🔍 Checking {len(alerts)} active indicator alerts")
+        if not self._alert_groups:
+            print("⚠️ [IndicatorAlertMonitor] No active alerts configured in database")
+            return
 
-            # Group alerts by symbol/timeframe to minimize API calls
-            grouped_alerts: Dict[str, List[dict]] = {}
-            for alert in alerts:
-                key = f"{alert['symbol']}_{alert['timeframe']}"
-                if key not in grouped_alerts:
-                    grouped_alerts[key] = []
-                grouped_alerts[key].append(dict(alert))
+        await self._check_groups(list(self._alert_groups))
 
-            # Process each group
-            for key, alert_group in grouped_alerts.items():
-                try:
-                    symbol = alert_group[0]['symbol']
-                    timeframe = alert_group[0]['timeframe']
+    async def _check_groups(self, groups: List[Tuple[str, str]]) -> None:
+        """Evaluate the given symbol/timeframe groups (one candle fetch per group)"""
+        for symbol, timeframe in groups:
+            alert_group = self._alert_groups.get((symbol, timeframe))
+            if not alert_group:
+                continue
+            try:
+                print(f"📈 [IndicatorAlertMonitor] Processing {symbol} {timeframe} ({len(alert_group)} alerts)")
 
-                    print(f"📈 [IndicatorAlertMonitor] Processing {symbol} {timeframe} ({len(alert_group)} alerts)")
+                # Fetch candle data for this symbol/timeframe
+                candles = await self._fetch_candles(symbol, timeframe)
 
-                    # Fetch candle data for this symbol/timeframe
-                    candles = await self._fetch_candles(symbol, timeframe)
+                if not candles or len(candles) < 50:
+                    print(f"⚠️ [IndicatorAlertMonitor] Not enough candles for {symbol} {timeframe} (need 50, got {len(candles) if candles else 0})")
+                    continue
 
-                    print(f"📊 [IndicatorAlertMonitor] Got {len(candles) if candles else 0} candles for {symbol}")
+                signals = await self._evaluate_group((symbol, timeframe), alert_group, candles)
 
-                    if not candles or len(candles) < 50:
-                        print(f"⚠️ [IndicatorAlertMonitor] Not enough candles for {symbol} {timeframe} (need 50, got {len(candles) if candles else 0})")
-                        continue
+                # Match every alert against the shared results
+                for alert in alert_group:
+                    await self._check_alert_signal(alert, signals.get(self._calculation_key(alert)))
 
-                    # Check each alert in this group
-                    for alert in alert_group:
-                        await self._check_alert_signal(alert, candles)
+            except Exception as e:
+                logger.error(f"Error checking alerts for {symbol}_{timeframe}: {e}")
 
-                except Exception as e:
-                    logger.error(f"Error checking alerts for {key}: {e}")
+    # ==================== Alert set (in memory) ====================
 
+    def invalidate_alerts(self) -> None:
+        """Força reload dos alertas no próximo ciclo (mudança feita neste processo)"""
+        self._alerts_stale = True
+
+    async def _refresh_alerts(self, force: bool = False) -> bool:
+        """Recarrega os alertas se o contador de versão mudou; retorna True se recarregou"""
+        self._stats["version_checks"] += 1
+        try:
+            version = await self.db.fetchval("SELECT version FROM indicator_alert_version WHERE id = 1")
         except Exception as e:
-            logger.error(f"Error fetching alerts: {e}")
+            # Migration não aplicada: sem contador, recarrega a cada ciclo
+            logger.debug(f"Indicator alert version unavailable: {e}")
+            version = None
+
+        if not force and not self._alerts_stale and self._alerts_loaded and version is not None and version == self._alerts_version:
+            return False
+
+        await self._load_alerts()
+        self._alerts_version = version
+        self._alerts_stale = False
+        return True
+
+    async def _load_alerts(self) -> None:
+        alerts = await self.db.fetch("""
+            SELECT
+                ia.id, ia.user_id, ia.indicator_type, ia.symbol, ia.timeframe,
+                ia.signal_type, ia.indicator_params, ia.message_template,
+                ia.push_enabled, ia.email_enabled, ia.sound_type,
+                ia.cooldown_seconds, ia.last_triggered_at
+            FROM indicator_alerts ia
+            WHERE ia.is_active = true
+        """)
+
+        grouped: Dict[Tuple[str, str], List[dict]] = {}
+        for alert in alerts or []:
+            grouped.setdefault((alert['symbol'], alert['timeframe']), []).append(dict(alert))
+
+        # Troca atômica; descarta estado de alertas / grupos removidos
+        self._alert_groups = grouped
+        self._alerts_loaded = True
+        active_ids = {str(alert['id']) for group in grouped.values() for alert in group}
+        self._last_signals = {k: v for k, v in self._last_signals.items() if k in active_ids}
+        self._group_signals = {k: v for k, v in self._group_signals.items() if k in grouped}
+        self._stats["alert_reloads"] += 1
+
+        print(f"🔍 [IndicatorAlertMonitor] Loaded {len(active_ids)} active alerts in {len(grouped)} symbol/timeframe groups")
+
+    # ==================== Group evaluation ====================
+
+    @staticmethod
+    def _calculation_key(alert: dict) -> Tuple[str, str]:
+        """(indicator_type, params) - alerts with the same key share one calculation"""
+        params = alert.get('indicator_params') or {}
+        if isinstance(params, str):
+            params = json.loads(params)
+        return alert['indicator_type'], json.dumps(params, sort_keys=True, default=str)
+
+    @classmethod
+    def _group_signature(cls, alerts: List[dict]) -> frozenset:
+        """What a group evaluates: alerts, their (indicator, params) and signal_type - edits in place change it"""
+        return frozenset(
+            (str(alert['id']), cls._calculation_key(alert), alert.get('signal_type'))
+            for alert in alerts
+        )
+
+    @staticmethod
+    def _candle_fingerprint(candles: List[Dict]) -> Tuple:
+        """
+        Identifies the group's candle state. get_candles includes the still-forming
+        candle, so besides the window (length, first/last time) the fingerprint
+        carries that candle's full OHLCV: any tick that moves it re-evaluates.
+        """
+        first, last = candles[0], candles[-1]
+        return (
+            len(candles),
+            first.get('time', first.get('t')),
+            last.get('time', last.get('t')),
+            last.get('open', last.get('o')),
+            last.get('high', last.get('h')),
+            last.get('low', last.get('l')),
+            last.get('close', last.get('c')),
+            last.get('volume', last.get('v')),
+        )
+
+    async def _evaluate_group(
+        self,
+        group: Tuple[str, str],
+        alert_group: List[dict],
+        candles: List[Dict]
+    ) -> Dict[Tuple[str, str], Optional[Dict]]:
+        """
+        Calculate each distinct (indicator, params) of the group once.
+        While the candles are unchanged the previous results are reused and
+        only calculations for newly added configurations run.
+        """
+        fingerprint = self._candle_fingerprint(candles)
+        cached = self._group_signals.get(group)
+        if cached and cached['fingerprint'] == fingerprint:
+            signals = cached['signals']
+            self._stats["groups_unchanged"] += 1
+        else:
+            signals = {}
+            self._stats["groups_evaluated"] += 1
+
+        for key in {self._calculation_key(alert) for alert in alert_group}:
+            if key in signals:
+                continue
+            indicator_type, params = key
+            signals[key] = await self._calculate_indicator_signal(indicator_type, candles, json.loads(params))
+            self._stats["calculations"] += 1
+
+        self._group_signals[group] = {'fingerprint': fingerprint, 'signals': signals}
+        return signals
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "version": self._alerts_version,
+            "groups": len(self._alert_groups),
+            "alerts": sum(len(group) for group in self._alert_groups.values()),
+            "running": self.is_running,
+            "scheduler": self._scheduler.get_metrics(),
+        }
 
     async def _fetch_candles(self, symbol: str, timeframe: str, limit: int = 200) -> List[Dict]:
-        """Fetch candle data from the market API"""
+        """Fetch candle data from the in-process CandleService (no loopback HTTP)"""
         try:
-            import httpx
-            import os
-
-            api_port = os.getenv('PORT', '8001')
-            url = f"http://localhost:{api_port}/api/v1/market/candles"
-
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.get(
-                    url,
-                    params={
-                        "symbol": symbol,
-                        "interval": timeframe,
-                        "limit": limit
-                    }
-                )
-
-                print(f"📡 [IndicatorAlertMonitor] Candles API response: status={response.status_code}, url={url}")
-
-                if response.status_code == 200:
-                    data = response.json()
-                    print(f"📦 [IndicatorAlertMonitor] Response keys: {list(data.keys()) if isinstance(data, dict) else type(data)}, success={data.get('success') if isinstance(data, dict) else 'N/A'}")
-                    if data.get("success"):
-                        # API returns candles under "candles" key, not "data"
-                        candles = data.get("candles", [])
-                        print(f"📊 [IndicatorAlertMonitor] Parsed {len(candles)} candles from response")
-                        return candles
-                    else:
-                        print(f"⚠️ [IndicatorAlertMonitor] API returned success=False: {data}")
-                else:
-                    print(f"❌ [IndicatorAlertMonitor] API error {response.status_code}: {response.text[:200]}")
+            result = await get_candle_service().get_candles(
+                symbol=symbol,
+                interval=timeframe,
+                limit=limit
+            )
 
+            if not result.get("success"):
+                print(f"⚠️ [IndicatorAlertMonitor] CandleService returned success=False: {result.get('error')}")
                 return []
 
+            # Mesmo formato do /api/v1/market/candles (time em segundos)
+            candles = [{**c, "time": int(c["time"] / 1000)} for c in result["candles"]]
+            print(f"📊 [IndicatorAlertMonitor] Got {len(candles)} candles from CandleService ({result.get('source')})")
+            return candles
+
         except Exception as e:
             print(f"❌ [IndicatorAlertMonitor] Exception fetching candles for {symbol}: {e}")
             logger.error(f"Error fetching candles for {symbol}: {e}")
             return []
 
-    async def _check_alert_signal(self, alert: dict, candles: List[Dict]):
-        """Check if alert conditions are met and trigger if necessary"""
+    async def _check_alert_signal(self, alert: dict, detected_signal: Optional[Dict]):
+        """Check if alert conditions are met for the group's signal and trigger if necessary"""
         try:
             alert_id = str(alert['id'])
-            indicator_type = alert['indicator_type']
             signal_type = alert['signal_type']  # 'buy', 'sell', or 'both'
             cooldown = alert['cooldown_seconds']
             last_triggered = alert['last_triggered_at']
 
-            print(f"🔎 [IndicatorAlertMonitor] Checking alert {alert_id[:8]}... indicator={indicator_type}, signal_type={signal_type}")
+            if not detected_signal:
+                return
+
+            # Check if this signal type matches alert configuration
+            if signal_type != 'both' and detected_signal['type'] != signal_type:
+                return
 
             # Check cooldown
             if last_triggered:
@@ -197,23 +347,6 @@ class IndicatorAlertMonitor:
                     print(f"⏳ [IndicatorAlertMonitor] Alert {alert_id[:8]} in cooldown ({int(time_since_trigger)}s / {cooldown}s)")
                     return  # Still in cooldown
 
-            # Calculate indicator and check for signals
-            detected_signal = await self._calculate_indicator_signal(
-                indicator_type,
-                candles,
-                alert.get('indicator_params') or {}
-            )
-
-            print(f"📉 [IndicatorAlertMonitor] Signal calculation result: {detected_signal}")
-
-            if not detected_signal:
-                print(f"❌ [IndicatorAlertMonitor] No signal detected for alert {alert_id[:8]}")
-                return
-
-            # Check if this signal type matches alert configuration
-            if signal_type != 'both' and detected_signal['type'] != signal_type:
-                return
-
             # Check if this is a new signal (not same as last)
             last_signal = self._last_signals.get(alert_id, {})
             if (last_signal.get('type') == detected_signal['type'] and
@@ -222,18 +355,21 @@ class IndicatorAlertMonitor:
 
             # NEW SIGNAL DETECTED! Trigger alert
             logger.info(
-                f"🔔 SIGNAL DETECTED: {alert['symbol']} {indicator_type} {detected_signal['type'].upper()}",
+                f"🔔 SIGNAL DETECTED: {alert['symbol']} {alert['indicator_type']} {detected_signal['type'].upper()}",
                 alert_id=alert_id,
                 price=detected_signal.get('price')
             )
 
             # Update last signal cache
+            now = datetime.now(timezone.utc)
             self._last_signals[alert_id] = {
                 'type': detected_signal['type'],
                 'candle_time': detected_signal.get('candle_time'),
                 'price': detected_signal.get('price'),
-                'triggered_at': datetime.now(timezone.utc)
+                'triggered_at': now
             }
+            # Cooldown vale já no próximo ciclo, sem esperar o reload
+            alert['last_triggered_at'] = now
 
             # Create notification and update alert
             await self._trigger_alert(alert, detected_signal)
@@ -299,30 +435,10 @@ class IndicatorAlertMonitor:
         bandwidth = params.get('bandwidth', 8)
         mult = params.get('mult', 3.0)
 
-        n = len(closes)
-        if n < bandwidth * 2:
+        if len(closes) < bandwidth * 2:
             return None
 
-        # Gaussian Kernel Regression
-        y_hat = np.zeros(n)
-
-        for i in range(n):
-            sum_weights = 0.0
-            sum_weighted = 0.0
-
-            for j in range(n):
-                # Gaussian kernel
-                distance = (i - j) / bandwidth
-                weight = np.exp(-0.5 * distance * distance)
-                sum_weights += weight
-                sum_weighted += weight * closes[j]
-
-            y_hat[i] = sum_weighted / sum_weights if sum_weights > 0 else closes[i]
-
-        # Calculate MAE for bands
-        mae = np.mean(np.abs(closes - y_hat))
-        upper = y_hat + mult * mae
-        lower = y_hat - mult * mae
+        y_hat, upper, lower = classic.nadaraya_watson_envelope(closes, bandwidth, mult)
 
         # Check last completed candle (not current)
         idx = -2  # Second to last candle (completed)
@@ -367,25 +483,7 @@ class IndicatorAlertMonitor:
         if len(closes) < period + 1:
             return None
 
-        # Calculate RSI
-        deltas = np.diff(closes)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-
-        avg_gain = np.zeros(len(deltas))
-        avg_loss = np.zeros(len(deltas))
-
-        # Initial SMA
-        avg_gain[period-1] = np.mean(gains[:period])
-        avg_loss[period-1] = np.mean(losses[:period])
-
-        # EMA
-        for i in range(period, len(deltas)):
-            avg_gain[i] = (avg_gain[i-1] * (period-1) + gains[i]) / period
-            avg_loss[i] = (avg_loss[i-1] * (period-1) + losses[i]) / period
-
-        rs = np.where(avg_loss != 0, avg_gain / avg_loss, 100)
-        rsi = 100 - (100 / (1 + rs))
+        rsi = classic.rsi(closes, period)
 
         # Check last completed candle
         idx = -2
@@ -426,43 +524,8 @@ class IndicatorAlertMonitor:
         if len(closes) < slow + signal_period:
             return None
 
-        # Calculate EMAs
-        def ema(data, period):
-            alpha = 2 / (period + 1)
-            result = np.zeros(len(data))
-            result[0] = data[0]
-            for i in range(1, len(data)):
-                result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
-            return result
-
-        ema_fast = ema(closes, fast)
-        ema_slow = ema(closes, slow)
-        macd_line = ema_fast - ema_slow
-        signal_line = ema(macd_line, signal_period)
-
-        # Check for crossover on last completed candle
-        idx = -2
-        prev_idx = -3
-
-        # Bullish cross (MACD crosses above signal)
-        if macd_line[prev_idx] < signal_line[prev_idx] and macd_line[idx] > signal_line[idx]:
-            return {
-                'type': 'buy',
-                'price': closes[idx],
-                'candle_time': times[idx],
-                'indicator_value': macd_line[idx]
-            }
-
-        # Bearish cross (MACD crosses below signal)
-        if macd_line[prev_idx] > signal_line[prev_idx] and macd_line[idx] < signal_line[idx]:
-            return {
-                'type': 'sell',
-                'price': closes[idx],
-                'candle_time': times[idx],
-                'indicator_value': macd_line[idx]
-            }
-
-        return None
+        macd_line, signal_line, _ = classic.macd(closes, fast, slow, signal_period)
+        return self._crossover_signal(closes, times, macd_line, signal_line)
 
     def _calc_bollinger_signal(
         self,
@@ -480,17 +543,8 @@ class IndicatorAlertMonitor:
         if len(closes) < period:
             return None
 
-        # Calculate Bollinger Bands
-        sma = np.zeros(len(closes))
-        upper = np.zeros(len(closes))
-        lower = np.zeros(len(closes))
-
-        for i in range(period - 1, len(closes)):
-            window = closes[i - period + 1:i + 1]
-            sma[i] = np.mean(window)
-            std = np.std(window)
-            upper[i] = sma[i] + stddev * std
-            lower[i] = sma[i] - stddev * std
+        bands = classic.bollinger(closes, period, stddev)
+        sma, upper, lower = bands['middle'], bands['upper'], bands['lower']
 
         # Check last completed candle
         idx = -2
@@ -532,45 +586,25 @@ class IndicatorAlertMonitor:
         if len(closes) < slow_period + 2:
             return None
 
-        def ema(data, period):
-            alpha = 2 / (period + 1)
-            result = np.zeros(len(data))
-            result[0] = data[0]
-            for i in range(1, len(data)):
-                result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
-            return result
+        ema_fast, ema_slow = classic.ema_cross(closes, fast_period, slow_period)
+        return self._crossover_signal(closes, times, ema_fast, ema_slow)
 
-        ema_fast = ema(closes, fast_period)
-        ema_slow = ema(closes, slow_period)
-
-        # Check for crossover on last completed candle
+    def _crossover_signal(self, closes, times: List, fast_line, slow_line) -> Optional[Dict]:
+        """BUY when fast_line crosses above slow_line on the last completed candle, SELL when it crosses below"""
         idx = -2
-        prev_idx = -3
-
-        # Golden cross (fast crosses above slow)
-        if ema_fast[prev_idx] < ema_slow[prev_idx] and ema_fast[idx] > ema_slow[idx]:
-            return {
-                'type': 'buy',
-                'price': closes[idx],
-                'candle_time': times[idx],
-                'indicator_value': ema_fast[idx]
-            }
-
-        # Death cross (fast crosses below slow)
-        if ema_fast[prev_idx] > ema_slow[prev_idx] and ema_fast[idx] < ema_slow[idx]:
-            return {
-                'type': 'sell',
-                'price': closes[idx],
-                'candle_time': times[idx],
-                'indicator_value': ema_fast[idx]
-            }
+        cross = classic.crossover(fast_line[-3:-1], slow_line[-3:-1], strict=True)[-1]
+        if cross == 0:
+            return None
 
-        return None
+        return {
+            'type': 'buy' if cross > 0 else 'sell',
+            'price': closes[idx],
+            'candle_time': times[idx],
+            'indicator_value': fast_line[idx]
+        }
 
     async def _trigger_alert(self, alert: dict, signal: dict):
         """Trigger the alert - create notification and update database"""
-        import json
-
         try:
             alert_id = alert['id']
             user_id = alert['user_id']
@@ -675,6 +709,12 @@ class IndicatorAlertMonitor:
 _indicator_alert_monitor = None
 
 
+def invalidate_indicator_alerts() -> None:
+    """Alert CRUD in this process: reload the running monitor's alerts on its next poll"""
+    if _indicator_alert_monitor is not None:
+        _indicator_alert_monitor.invalidate_alerts()
+
+
 def get_indicator_alert_monitor(db) -> IndicatorAlertMonitor:
     """Get or create the indicator alert monitor instance"""
     global _indicator_alert_monitor
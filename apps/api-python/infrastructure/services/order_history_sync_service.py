@@ -0,0 +1,481 @@
+"""
+Order History Sync Service
+Incremental sync of exchange orders (SPOT + FUTURES) into exchange_order_history
+
+Each (account, symbol, market) keeps a watermark in order_sync_watermarks with the
+newest order already stored. A sync only asks the exchange for orders after the
+watermark, so after the first run exchange calls are deltas and the orders page
+is served straight from the database. Orders stored while still open are
+re-polled one by one until they reach a final status.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import structlog
+
+from infrastructure.services.spot_cost_basis_ledger import get_spot_cost_basis_ledger
+
+logger = structlog.get_logger(__name__)
+
+# Status finais - ordens nesses estados não mudam mais na exchange
+FINAL_ORDER_STATUSES = {
+    "FILLED", "CANCELED", "CANCELLED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH"
+}
+
+DEFAULT_LOOKBACK_DAYS = 90          # Primeiro sync: últimos 3 meses (igual ao /orders antigo)
+FUTURES_MAX_WINDOW_MS = 7 * 24 * 60 * 60 * 1000  # Binance futures allOrders: janela máx 7 dias
+FETCH_LIMIT = 500                   # Máximo de ordens por chamada
+CHUNK_SIZE = 20                     # Símbolos em paralelo por lote
+EMPTY_SYMBOL_RECHECK_SECONDS = 3600  # Símbolos sem nenhuma ordem: re-checar 1x por hora
+EMPTY_SYMBOL_MARGIN_MS = 60 * 1000   # Símbolo vazio: próximo check começa 1 min antes do último
+
+SYMBOLS_BLACKLIST = {"NEOUSDT", "IOTAUSDT"}  # Símbolos deslistados
+
+
+def _first(order: Dict[str, Any], *keys, default=None):
+    """Retorna o primeiro campo presente (formatos diferentes por exchange)"""
+    for key in keys:
+        value = order.get(key)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def normalize_order(order: Dict[str, Any], market_type: str) -> Optional[Dict[str, Any]]:
+    """
+    Converte uma ordem crua da exchange para o formato da tabela exchange_order_history.
+    Retorna None se a ordem não tiver id ou timestamp.
+    """
+    order_id = _first(order, "orderId", "id", "order_id")
+    order_time = _first(order, "time", "cTime", "createTime", "updateTime")
+    if order_id is None or order_time is None:
+        return None
+
+    update_time = _first(order, "updateTime", "uTime", "time", default=order_time)
+    price = _first(order, "price")
+    average_price = _first(order, "avgPrice", "fillPrice", "price")
+    filled_quantity = float(_first(order, "executedQty", "fillSize", "cumExecQty", default=0))
+    quote_quantity = _first(order, "cummulativeQuoteQty", "cumQuote", "cumExecValue")
+
+    return {
+        "exchange_order_id": str(order_id),
+        "symbol": str(order.get("symbol", "")).replace("-", "").replace("_SPBL", ""),
+        "side": str(order.get("side", "")).lower(),
+        "order_type": str(_first(order, "type", "orderType", default="market")).lower(),
+        "status": str(order.get("status", "unknown")).upper(),
+        "quantity": float(_first(order, "origQty", "size", "qty", "executedQty", default=0)),
+        "price": float(price) if price is not None and float(price) > 0 else None,
+        "filled_quantity": filled_quantity,
+        "average_price": float(average_price) if average_price is not None and float(average_price) > 0 else None,
+        "quote_quantity": float(quote_quantity) if quote_quantity is not None else None,
+        "order_time": int(order_time),
+        "update_time": int(update_time),
+        "market_type": market_type,
+        "raw": order,
+    }
+
+
+def compute_watermark(
+    orders: List[Dict[str, Any]],
+    previous_order_id: Optional[str],
+    previous_order_time: Optional[int],
+) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Calcula o novo watermark (last_order_id, last_order_time) após um sync.
+
+    - last_order_id: ordem mais recente já armazenada
+    - last_order_time: de onde o próximo sync começa (horário da ordem mais recente).
+      Ordens ainda abertas não seguram o watermark: são re-consultadas à parte
+      (ver OrderHistorySyncService._refresh_open_orders).
+    """
+    if not orders:
+        return previous_order_id, previous_order_time
+
+    newest = max(orders, key=lambda o: (o["order_time"], o["exchange_order_id"]))
+    next_time = newest["order_time"]
+    if previous_order_time is not None:
+        next_time = max(next_time, previous_order_time)
+
+    return newest["exchange_order_id"], next_time
+
+
+def stored_order_to_raw(row) -> Dict[str, Any]:
+    """Converte linha de exchange_order_history para o formato cru (Binance) usado no /orders"""
+    filled = float(row["filled_quantity"] or 0)
+    average_price = float(row["average_price"]) if row["average_price"] is not None else None
+    quote = row["quote_quantity"]
+    if quote is None and average_price is not None:
+        quote = filled * average_price
+
+    return {
+        "orderId": row["exchange_order_id"],
+        "symbol": row["symbol"],
+        "side": row["side"].upper(),
+        "type": row["order_type"].upper(),
+        "origQty": str(row["quantity"]),
+        "price": str(row["price"]) if row["price"] is not None else None,
+        "status": row["status"].upper(),
+        "executedQty": str(filled),
+        "avgPrice": str(average_price) if average_price is not None else None,
+        "cummulativeQuoteQty": str(quote) if quote is not None else None,
+        "time": int(row["order_time"]),
+        "updateTime": int(row["update_time"]),
+        "_market_type": row["market_type"],
+        "_source": "DATABASE",
+    }
+
+
+class OrderHistorySyncService:
+    """
+    Sincroniza histórico de ordens de forma incremental usando watermarks
+    por (conta, símbolo, mercado) e serve as ordens direto do banco
+    """
+
+    def __init__(self, db_pool):
+        self.db = db_pool
+        # Evita dois syncs simultâneos da mesma conta (request + background job)
+        self._account_locks: Dict[str, asyncio.Lock] = {}
+
+    def _get_lock(self, account_id: str) -> asyncio.Lock:
+        lock = self._account_locks.get(account_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._account_locks[account_id] = lock
+        return lock
+
+    async def has_synced(self, account_id: str) -> bool:
+        """True se a conta já teve pelo menos um sync de ordens (mesmo sem nenhum símbolo)"""
+        value = await self.db.fetchval("""
+            SELECT 1 FROM order_sync_accounts
+            WHERE exchange_account_id = $1
+        """, str(account_id))
+        return value is not None
+
+    async def _load_watermarks(self, account_id: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        rows = await self.db.fetch("""
+            SELECT symbol, market_type, last_order_id, last_order_time, last_synced_at
+            FROM order_sync_watermarks
+            WHERE exchange_account_id = $1
+        """, account_id)
+        return {(row["symbol"], row["market_type"]): dict(row) for row in rows}
+
+    async def _discover_symbols(self, account_id: str) -> List[str]:
+        """Símbolos com saldo ou posição aberta (dados já sincronizados no banco)"""
+        try:
+            rows = await self.db.fetch("""
+                SELECT DISTINCT asset || 'USDT' AS symbol
+                FROM exchange_account_balances
+                WHERE exchange_account_id = $1
+                  AND total_balance > 0
+                  AND asset != 'USDT'
+                UNION
+                SELECT DISTINCT symbol
+                FROM positions
+                WHERE exchange_account_id = $1
+                  AND status = 'open'
+            """, account_id)
+            return [row["symbol"] for row in rows if row["symbol"]]
+        except Exception as e:
+            logger.warning(f"⚠️ Error discovering symbols for account {account_id}: {e}")
+            return []
+
+    def _should_fetch(self, watermark: Optional[Dict[str, Any]], now: float, force: bool) -> bool:
+        """Símbolos que nunca tiveram ordens são re-checados com menos frequência"""
+        if force or watermark is None or watermark.get("last_order_id") is not None:
+            return True
+        last_synced_at = watermark.get("last_synced_at")
+        if last_synced_at is None:
+            return True
+        return (now - last_synced_at.timestamp()) >= EMPTY_SYMBOL_RECHECK_SECONDS
+
+    async def _fetch_range(
+        self,
+        connector,
+        symbol: str,
+        market_type: str,
+        start_time: int,
+        end_time: Optional[int],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Busca todas as ordens de [start_time, end_time], paginando de FETCH_LIMIT em
+        FETCH_LIMIT. Retorna None se a exchange falhar.
+        """
+        fetch = connector.get_account_orders if market_type == "SPOT" else connector.get_futures_orders
+        orders: Dict[str, Dict[str, Any]] = {}
+
+        while True:
+            try:
+                result = await fetch(symbol=symbol, limit=FETCH_LIMIT, start_time=start_time, end_time=end_time)
+            except Exception as e:
+                if "Symbol is closed" not in str(e) and "Invalid symbol" not in str(e):
+                    logger.warning(f"⚠️ Error fetching {market_type} orders for {symbol}: {str(e)[:80]}")
+                return None
+
+            if not result.get("success", True):
+                return None
+
+            page = result.get("orders", []) or []
+            for order in page:
+                try:
+                    row = normalize_order(order, market_type)
+                except (ValueError, TypeError):
+                    row = None
+                if row and row["symbol"]:
+                    orders[row["exchange_order_id"]] = row
+
+            if len(page) < FETCH_LIMIT or not orders:
+                return list(orders.values())
+
+            # Página cheia: continua do horário da última ordem (inclusivo, ids duplicados somem no dict)
+            newest_time = max(o["order_time"] for o in orders.values())
+            if newest_time <= start_time:
+                logger.warning(f"⚠️ More than {FETCH_LIMIT} {market_type} orders for {symbol} in the same ms")
+                return list(orders.values())
+            start_time = newest_time
+
+    async def _fetch_delta(
+        self,
+        connector,
+        symbol: str,
+        market_type: str,
+        watermark: Optional[Dict[str, Any]],
+        default_start_ms: int,
+        now_ms: int,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Busca na exchange apenas as ordens posteriores ao watermark (None se a exchange falhar)"""
+        start_time = watermark.get("last_order_time") if watermark else None
+        if start_time is None:
+            start_time = default_start_ms
+
+        if market_type == "SPOT":
+            return await self._fetch_range(connector, symbol, market_type, start_time, None)
+
+        if not hasattr(connector, "get_futures_orders"):
+            return []
+
+        # Futures: a exchange limita a janela a 7 dias, então pagina janela a janela
+        fetched: List[Dict[str, Any]] = []
+        window_start = start_time
+        while window_start <= now_ms:
+            window_end = min(window_start + FUTURES_MAX_WINDOW_MS - 1, now_ms)
+            orders = await self._fetch_range(connector, symbol, market_type, window_start, window_end)
+            if orders is None:
+                return None
+            fetched.extend(orders)
+            window_start = window_end + 1
+        return fetched
+
+    async def _refresh_open_orders(self, account_id: str, connector) -> List[Dict[str, Any]]:
+        """Re-consulta as ordens armazenadas ainda abertas (uma janela exata por horário de ordem)"""
+        rows = await self.db.fetch("""
+            SELECT DISTINCT symbol, market_type, order_time
+            FROM exchange_order_history
+            WHERE exchange_account_id = $1
+              AND status <> ALL($2::text[])
+        """, account_id, sorted(FINAL_ORDER_STATUSES))
+        jobs = [
+            (row["symbol"], row["market_type"], int(row["order_time"]))
+            for row in rows
+            if row["market_type"] == "SPOT" or hasattr(connector, "get_futures_orders")
+        ]
+
+        refreshed: List[Dict[str, Any]] = []
+        for i in range(0, len(jobs), CHUNK_SIZE):
+            chunk = jobs[i:i + CHUNK_SIZE]
+            results = await asyncio.gather(*[
+                self._fetch_range(connector, symbol, market_type, order_time, order_time)
+                for symbol, market_type, order_time in chunk
+            ], return_exceptions=True)
+            for orders in results:
+                if orders and not isinstance(orders, Exception):
+                    refreshed.extend(orders)
+        return refreshed
+
+    async def _store_orders(self, account_id: str, exchange: str, orders: List[Dict[str, Any]]) -> None:
+        if not orders:
+            return
+        await self.db.executemany("""
+            INSERT INTO exchange_order_history (
+                exchange_account_id, exchange, market_type, exchange_order_id,
+                symbol, side, order_type, status, quantity, price,
+                filled_quantity, average_price, quote_quantity,
+                order_time, update_time, raw_response
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16::jsonb)
+            ON CONFLICT (exchange_account_id, market_type, exchange_order_id) DO UPDATE SET
+                status = EXCLUDED.status,
+                filled_quantity = EXCLUDED.filled_quantity,
+                average_price = EXCLUDED.average_price,
+                quote_quantity = EXCLUDED.quote_quantity,
+                update_time = EXCLUDED.update_time,
+                raw_response = EXCLUDED.raw_response,
+                updated_at = NOW()
+        """, [
+            (
+                account_id, exchange, o["market_type"], o["exchange_order_id"],
+                o["symbol"], o["side"], o["order_type"], o["status"], o["quantity"], o["price"],
+                o["filled_quantity"], o["average_price"], o["quote_quantity"],
+                o["order_time"], o["update_time"], json.dumps(o["raw"], default=str)
+            )
+            for o in orders
+        ])
+
+    async def _update_cost_basis(self, account_id: str, orders: List[Dict[str, Any]]) -> None:
+        """Aplica os fills SPOT novos no ledger de custo (primeira vez: reconstrói do histórico)"""
+        try:
+            ledger = get_spot_cost_basis_ledger(self.db)
+            if await ledger.is_initialized(account_id):
+                await ledger.apply_orders(account_id, orders)
+            else:
+                await ledger.rebuild(account_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Error updating spot cost basis for account {account_id}: {e}")
+
+    async def _store_watermarks(self, account_id: str, watermarks: Iterable[Tuple[str, str, Optional[str], Optional[int]]]) -> None:
+        watermarks = list(watermarks)
+        if not watermarks:
+            return
+        await self.db.executemany("""
+            INSERT INTO order_sync_watermarks (
+                exchange_account_id, symbol, market_type, last_order_id, last_order_time, last_synced_at
+            ) VALUES ($1, $2, $3, $4, $5, NOW())
+            ON CONFLICT (exchange_account_id, symbol, market_type) DO UPDATE SET
+                last_order_id = EXCLUDED.last_order_id,
+                last_order_time = EXCLUDED.last_order_time,
+                last_synced_at = NOW()
+        """, [(account_id, symbol, market, order_id, order_time) for symbol, market, order_id, order_time in watermarks])
+
+    async def _mark_account_synced(self, account_id: str) -> None:
+        await self.db.execute("""
+            INSERT INTO order_sync_accounts (exchange_account_id, last_synced_at)
+            VALUES ($1, NOW())
+            ON CONFLICT (exchange_account_id) DO UPDATE SET last_synced_at = NOW()
+        """, account_id)
+
+    async def sync_account(
+        self,
+        account_id: str,
+        connector,
+        symbols: Optional[List[str]] = None,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Sincroniza as ordens novas de uma conta.
+
+        Args:
+            account_id: ID da exchange account
+            connector: Connector já autenticado da exchange
+            symbols: Símbolos extras a considerar (além dos que já têm watermark)
+            force: Ignora o intervalo de re-check de símbolos sem ordens
+
+        Returns:
+            Dict com success, fetched_count, stored_count, symbols_checked
+        """
+        account_id = str(account_id)
+        lock = self._get_lock(account_id)
+        if lock.locked():
+            return {"success": False, "reason": "already_running"}
+
+        async with lock:
+            start = time.time()
+            exchange = connector.__class__.__name__.replace("Connector", "").lower()
+            watermarks = await self._load_watermarks(account_id)
+
+            candidate_symbols = list(dict.fromkeys(
+                [symbol for symbol, _ in watermarks.keys()]
+                + (symbols or [])
+                + await self._discover_symbols(account_id)
+            ))
+            candidate_symbols = [s for s in candidate_symbols if s not in SYMBOLS_BLACKLIST and " " not in s]
+
+            now = time.time()
+            now_ms = int(now * 1000)
+            default_start_ms = int((datetime.now() - timedelta(days=DEFAULT_LOOKBACK_DAYS)).timestamp() * 1000)
+
+            jobs = []
+            for symbol in candidate_symbols:
+                for market_type in ("SPOT", "FUTURES"):
+                    watermark = watermarks.get((symbol, market_type))
+                    if self._should_fetch(watermark, now, force):
+                        jobs.append((symbol, market_type, watermark))
+
+            # Ordens abertas de syncs anteriores: status/fills atualizados à parte
+            fetched: List[Dict[str, Any]] = await self._refresh_open_orders(account_id, connector)
+            new_watermarks = []
+
+            for i in range(0, len(jobs), CHUNK_SIZE):
+                chunk = jobs[i:i + CHUNK_SIZE]
+                results = await asyncio.gather(*[
+                    self._fetch_delta(connector, symbol, market_type, watermark, default_start_ms, now_ms)
+                    for symbol, market_type, watermark in chunk
+                ], return_exceptions=True)
+
+                for (symbol, market_type, watermark), orders in zip(chunk, results):
+                    if orders is None or isinstance(orders, Exception):
+                        # Falha na exchange: mantém o watermark antigo
+                        continue
+                    previous_id = watermark.get("last_order_id") if watermark else None
+                    previous_time = watermark.get("last_order_time") if watermark else None
+                    if previous_time is None and not orders:
+                        # Nada no lookback inteiro: o re-check não precisa varrer tudo de novo
+                        previous_time = now_ms - EMPTY_SYMBOL_MARGIN_MS
+                    order_id, order_time = compute_watermark(orders, previous_id, previous_time)
+                    new_watermarks.append((symbol, market_type, order_id, order_time))
+                    fetched.extend(orders)
+
+            # Ordem aberta re-consultada pode ter vindo também no delta
+            fetched = list({(o["market_type"], o["exchange_order_id"]): o for o in fetched}.values())
+
+            await self._store_orders(account_id, exchange, fetched)
+            await self._store_watermarks(account_id, new_watermarks)
+            await self._mark_account_synced(account_id)
+            await self._update_cost_basis(account_id, fetched)
+
+            duration_ms = int((time.time() - start) * 1000)
+            logger.info(
+                f"📥 Order history sync: {len(fetched)} orders from {len(jobs)} symbol/market pairs",
+                account_id=account_id,
+                duration_ms=duration_ms
+            )
+
+            return {
+                "success": True,
+                "fetched_count": len(fetched),
+                "symbols_checked": len(jobs),
+                "duration_ms": duration_ms,
+            }
+
+    async def get_orders(
+        self,
+        account_id: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Ordens armazenadas (mais recentes primeiro) no formato cru usado pelo /orders"""
+        rows = await self.db.fetch("""
+            SELECT exchange_order_id, symbol, side, order_type, status, quantity, price,
+                   filled_quantity, average_price, quote_quantity, order_time, update_time,
+                   market_type
+            FROM exchange_order_history
+            WHERE exchange_account_id = $1
+              AND ($2::bigint IS NULL OR order_time >= $2)
+              AND ($3::bigint IS NULL OR order_time <= $3)
+            ORDER BY update_time DESC
+            LIMIT $4
+        """, str(account_id), start_time, end_time, limit)
+        return [stored_order_to_raw(row) for row in rows]
+
+
+# Singleton instance
+order_history_sync_service = None
+
+
+def get_order_history_sync_service(db_pool) -> OrderHistorySyncService:
+    """Get or create the OrderHistorySyncService singleton"""
+    global order_history_sync_service
+    if order_history_sync_service is None:
+        order_history_sync_service = OrderHistorySyncService(db_pool)
+    return order_history_sync_service
@@ -0,0 +1,176 @@
+"""
+P&L Rollup Service
+Hourly/daily realized P&L buckets per subscription, bot and exchange account.
+
+Buckets (table pnl_rollups) are updated incrementally when a trade closes, so
+performance charts read at most one row per bucket in the requested window,
+independent of how many trades the history has.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+SCOPES = ("subscription", "bot", "account")
+GRANULARITIES = ("hour", "day")
+
+# Buckets horários são úteis só para janelas curtas
+HOURLY_RETENTION_DAYS = 90
+
+
+class PnlRollupService:
+    """
+    Maintains and reads the pnl_rollups table
+    """
+
+    def __init__(self, db_pool):
+        self.db = db_pool
+
+    async def record_trade(
+        self,
+        subscription_id: UUID,
+        pnl_usd: float,
+        is_win: bool,
+        closed_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Add one closed trade to the hour and day buckets of its subscription,
+        bot and exchange account (6 upserts in a single statement).
+        """
+        await self.db.execute("""
+            INSERT INTO pnl_rollups (
+                scope, scope_id, granularity, bucket_start,
+                pnl_usd, trades_count, wins, losses, updated_at
+            )
+            SELECT
+                s.scope, s.scope_id, g.granularity,
+                date_trunc(g.granularity, COALESCE($2::timestamptz, NOW())),
+                $3, 1, $4, $5, NOW()
+            FROM bot_subscriptions bs
+            CROSS JOIN LATERAL (
+                VALUES ('subscription', bs.id), ('bot', bs.bot_id), ('account', bs.exchange_account_id)
+            ) AS s(scope, scope_id)
+            CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+            WHERE bs.id = $1 AND s.scope_id IS NOT NULL
+            ON CONFLICT (scope, scope_id, granularity, bucket_start) DO UPDATE
+            SET pnl_usd = pnl_rollups.pnl_usd + EXCLUDED.pnl_usd,
+                trades_count = pnl_rollups.trades_count + 1,
+                wins = pnl_rollups.wins + EXCLUDED.wins,
+                losses = pnl_rollups.losses + EXCLUDED.losses,
+                updated_at = NOW()
+        """, subscription_id, closed_at, pnl_usd, 1 if is_win else 0, 0 if is_win else 1)
+
+    async def get_buckets(
+        self,
+        scope: str,
+        scope_ids: Sequence[Any],
+        granularity: str = "day",
+        start: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Buckets since `start`, summed over scope_ids (e.g. all accounts of a user)
+
+        Returns:
+            [{"bucket_start", "pnl_usd", "trades_count", "wins", "losses"}] ascending
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"Invalid scope: {scope}")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Invalid granularity: {granularity}")
+        if not scope_ids:
+            return []
+
+        rows = await self.db.fetch("""
+            SELECT
+                bucket_start,
+                SUM(pnl_usd) AS pnl_usd,
+                SUM(trades_count) AS trades_count,
+                SUM(wins) AS wins,
+                SUM(losses) AS losses
+            FROM pnl_rollups
+            WHERE scope = $1
+              AND scope_id = ANY($2::uuid[])
+              AND granularity = $3
+              AND ($4::timestamptz IS NULL OR bucket_start >= $4)
+            GROUP BY bucket_start
+            ORDER BY bucket_start ASC
+        """, scope, [str(scope_id) for scope_id in scope_ids], granularity, start)
+
+        return [dict(row) for row in rows]
+
+    async def get_history(
+        self,
+        scope: str,
+        scope_ids: Sequence[Any],
+        granularity: str = "day",
+        start: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Buckets as chart points with running totals (see build_history)"""
+        return self.build_history(await self.get_buckets(scope, scope_ids, granularity, start), granularity)
+
+    @staticmethod
+    def build_history(buckets: List[Dict[str, Any]], granularity: str = "day") -> List[Dict[str, Any]]:
+        """
+        Chart points in the format of the subscription performance history:
+        daily values plus cumulative values since the start of the window.
+        """
+        history = []
+        cumulative_pnl = 0.0
+        cumulative_trades = 0
+        cumulative_wins = 0
+        cumulative_losses = 0
+
+        for bucket in buckets:
+            daily_pnl = float(bucket["pnl_usd"] or 0)
+            daily_trades = int(bucket["trades_count"] or 0)
+            daily_wins = int(bucket["wins"] or 0)
+            daily_losses = int(bucket["losses"] or 0)
+
+            cumulative_pnl += daily_pnl
+            cumulative_trades += daily_trades
+            cumulative_wins += daily_wins
+            cumulative_losses += daily_losses
+
+            total_trades = cumulative_wins + cumulative_losses
+            win_rate = (cumulative_wins / total_trades * 100) if total_trades > 0 else 0
+
+            bucket_start = bucket["bucket_start"]
+            history.append({
+                "date": str(bucket_start.date()) if granularity == "day" else bucket_start.isoformat(),
+                "daily_pnl": round(daily_pnl, 2),
+                "cumulative_pnl": round(cumulative_pnl, 2),
+                "daily_trades": daily_trades,
+                "cumulative_trades": cumulative_trades,
+                "daily_wins": daily_wins,
+                "daily_losses": daily_losses,
+                "cumulative_wins": cumulative_wins,
+                "cumulative_losses": cumulative_losses,
+                "win_rate": round(win_rate, 2)
+            })
+
+        return history
+
+    @staticmethod
+    def summarize(history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Window totals from a history built by build_history"""
+        if not history:
+            return {"total_pnl_usd": 0.0, "total_trades": 0, "wins": 0, "losses": 0, "win_rate": 0}
+
+        last = history[-1]
+        return {
+            "total_pnl_usd": last["cumulative_pnl"],
+            "total_trades": last["cumulative_trades"],
+            "wins": last["cumulative_wins"],
+            "losses": last["cumulative_losses"],
+            "win_rate": last["win_rate"]
+        }
+
+    async def prune_hourly(self, retention_days: int = HOURLY_RETENTION_DAYS) -> None:
+        """Drop hourly buckets older than retention_days (daily buckets are kept)"""
+        await self.db.execute("""
+            DELETE FROM pnl_rollups
+            WHERE granularity = 'hour' AND bucket_start < $1
+        """, datetime.now() - timedelta(days=retention_days))
@@ -0,0 +1,349 @@
+"""
+Spot Cost-Basis Ledger
+Per-(exchange account, asset) cost basis of spot holdings: average cost plus
+FIFO lots, stored in spot_cost_basis.
+
+The ledger is updated incrementally with the SPOT fills stored by
+OrderHistorySyncService. spot_cost_basis_fills remembers how much of each order
+was already applied, so re-synced or partially filled orders only apply the
+new quantity. Reads (dashboard, SpotPnlService) are a primary-key lookup.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Quote assets tratados como USD no custo
+USD_QUOTES = ("USDT", "USDC", "FDUSD", "BUSD")
+
+QTY_EPSILON = 1e-12
+
+
+def base_asset(symbol: str) -> Optional[str]:
+    """BTCUSDT / BTC-USDT -> BTC; None for non-USD quotes (e.g. ETHBTC)"""
+    symbol = symbol.replace("-", "").replace("/", "").upper()
+    for quote in USD_QUOTES:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            base = symbol[:-len(quote)]
+            return None if base in USD_QUOTES else base
+    return None
+
+
+def fill_price(order: Dict[str, Any]) -> Optional[float]:
+    """Execution price of an order: average price, then quote/filled, then limit price"""
+    average_price = order.get("average_price")
+    if average_price:
+        return float(average_price)
+    filled = float(order.get("filled_quantity") or 0)
+    quote = order.get("quote_quantity")
+    if quote and filled > 0:
+        return float(quote) / filled
+    price = order.get("price")
+    return float(price) if price else None
+
+
+def empty_position(asset: str) -> Dict[str, Any]:
+    return {
+        "asset": asset,
+        "quantity": 0.0,
+        "total_cost": 0.0,
+        "realized_pnl": 0.0,
+        "realized_pnl_fifo": 0.0,
+        "lots": [],
+        "fills_count": 0,
+        "last_fill_time": None,
+    }
+
+
+def apply_fill(position: Dict[str, Any], side: str, quantity: float, price: float, fill_time: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Apply one fill to a position (in place).
+
+    Buy: adds a lot and its cost. Sell: realizes P&L against the average cost
+    and consumes lots oldest first. Sells larger than the tracked quantity
+    (assets deposited or bought before the history) only close what is tracked.
+    """
+    if side == "buy":
+        position["quantity"] += quantity
+        position["total_cost"] += quantity * price
+        position["lots"].append([quantity, price])
+    else:
+        sold = min(quantity, position["quantity"])
+        if sold > 0:
+            avg_cost = position["total_cost"] / position["quantity"]
+            position["realized_pnl"] += (price - avg_cost) * sold
+            position["total_cost"] -= avg_cost * sold
+            position["quantity"] -= sold
+
+            remaining = sold
+            lots = position["lots"]
+            while remaining > QTY_EPSILON and lots:
+                lot_qty, lot_price = lots[0]
+                take = min(lot_qty, remaining)
+                position["realized_pnl_fifo"] += (price - lot_price) * take
+                remaining -= take
+                if lot_qty - take > QTY_EPSILON:
+                    lots[0] = [lot_qty - take, lot_price]
+                else:
+                    lots.pop(0)
+
+        if position["quantity"] <= QTY_EPSILON:
+            position["quantity"] = 0.0
+            position["total_cost"] = 0.0
+            position["lots"] = []
+
+    position["fills_count"] += 1
+    if fill_time is not None:
+        position["last_fill_time"] = max(position["last_fill_time"] or 0, int(fill_time))
+    return position
+
+
+def position_summary(position: Dict[str, Any]) -> Dict[str, Any]:
+    quantity = position["quantity"]
+    return {
+        **position,
+        "avg_cost": position["total_cost"] / quantity if quantity > QTY_EPSILON else 0.0,
+        "fifo_cost": sum(qty * price for qty, price in position["lots"]),
+    }
+
+
+class SpotCostBasisLedger:
+    """
+    Maintains and reads spot_cost_basis / spot_cost_basis_fills
+    """
+
+    def __init__(self, db_pool):
+        self.db = db_pool
+
+    # ==================== Reads ====================
+
+    async def get_positions(self, account_id: str) -> Dict[str, Dict[str, Any]]:
+        """Cost basis of every asset of an account (asset -> row)"""
+        rows = await self.db.fetch("""
+            SELECT asset, quantity, total_cost, avg_cost, fifo_cost,
+                   realized_pnl, realized_pnl_fifo, lots, fills_count, last_fill_time
+            FROM spot_cost_basis
+            WHERE exchange_account_id = $1
+        """, str(account_id))
+        return {row["asset"]: self._row_to_position(row) for row in rows}
+
+    async def get_position(self, account_id: str, asset: str) -> Optional[Dict[str, Any]]:
+        row = await self.db.fetchrow("""
+            SELECT asset, quantity, total_cost, avg_cost, fifo_cost,
+                   realized_pnl, realized_pnl_fifo, lots, fills_count, last_fill_time
+            FROM spot_cost_basis
+            WHERE exchange_account_id = $1 AND asset = $2
+        """, str(account_id), asset.upper())
+        return self._row_to_position(row) if row else None
+
+    async def get_average_costs(self, account_id: str) -> Dict[str, float]:
+        """asset -> average cost (USD) of the assets still held"""
+        average_costs, _ = await self.get_cost_references(account_id)
+        return average_costs
+
+    async def get_cost_references(self, account_id: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        (asset -> average cost, asset -> last buy price) of the assets still held.
+        The last buy price is the newest open lot, the fallback cost when the
+        average is not usable.
+        """
+        positions = await self.get_positions(account_id)
+        average_costs = {}
+        last_buy_prices = {}
+        for asset, position in positions.items():
+            if position["quantity"] <= QTY_EPSILON:
+                continue
+            if position["avg_cost"] > 0:
+                average_costs[asset] = position["avg_cost"]
+            if position["lots"]:
+                last_buy_prices[asset] = position["lots"][-1][1]
+        return average_costs, last_buy_prices
+
+    async def is_initialized(self, account_id: str) -> bool:
+        """True once the ledger was built for the account (at least one fill applied)"""
+        value = await self.db.fetchval("""
+            SELECT 1 FROM spot_cost_basis_fills
+            WHERE exchange_account_id = $1
+            LIMIT 1
+        """, str(account_id))
+        return value is not None
+
+    # ==================== Updates ====================
+
+    async def apply_orders(self, account_id: str, orders: Iterable[Dict[str, Any]]) -> int:
+        """
+        Apply the new fills of synced orders (exchange_order_history format).
+        Returns how many orders changed the ledger.
+        """
+        account_id = str(account_id)
+        candidates = self._spot_fills(orders)
+        if not candidates:
+            return 0
+
+        applied_rows = await self.db.fetch("""
+            SELECT exchange_order_id, applied_quantity
+            FROM spot_cost_basis_fills
+            WHERE exchange_account_id = $1 AND exchange_order_id = ANY($2::text[])
+        """, account_id, [o["exchange_order_id"] for o in candidates])
+        applied = {row["exchange_order_id"]: float(row["applied_quantity"]) for row in applied_rows}
+
+        fills = []
+        for order in candidates:
+            delta = order["filled_quantity"] - applied.get(order["exchange_order_id"], 0.0)
+            if delta > QTY_EPSILON:
+                fills.append((order, delta))
+        if not fills:
+            return 0
+
+        positions = await self.get_positions(account_id)
+        changed = self._apply(positions, fills)
+        await self._save(account_id, [positions[asset] for asset in changed], [order for order, _ in fills])
+        return len(fills)
+
+    async def rebuild(self, account_id: str) -> int:
+        """Rebuild an account from every SPOT fill already in exchange_order_history"""
+        account_id = str(account_id)
+        rows = await self.db.fetch("""
+            SELECT exchange_order_id, symbol, side, status, market_type,
+                   filled_quantity, average_price, price, quote_quantity, update_time
+            FROM exchange_order_history
+            WHERE exchange_account_id = $1
+              AND market_type = 'SPOT'
+              AND filled_quantity > 0
+            ORDER BY update_time, exchange_order_id
+        """, account_id)
+        fills = [(order, order["filled_quantity"]) for order in self._spot_fills(dict(row) for row in rows)]
+
+        await self.db.execute("DELETE FROM spot_cost_basis_fills WHERE exchange_account_id = $1", account_id)
+        await self.db.execute("DELETE FROM spot_cost_basis WHERE exchange_account_id = $1", account_id)
+        if not fills:
+            return 0
+
+        positions: Dict[str, Dict[str, Any]] = {}
+        changed = self._apply(positions, fills)
+        await self._save(account_id, [positions[asset] for asset in changed], [order for order, _ in fills])
+        logger.info(f"📒 Spot cost basis rebuilt: {len(fills)} fills, {len(changed)} assets", account_id=account_id)
+        return len(fills)
+
+    # ==================== Internals ====================
+
+    @staticmethod
+    def _spot_fills(orders: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """SPOT buy/sell orders with executed quantity and a USD-quoted symbol, normalized"""
+        fills = {}
+        for order in orders:
+            if order.get("market_type") != "SPOT":
+                continue
+            side = str(order.get("side", "")).lower()
+            filled = float(order.get("filled_quantity") or 0)
+            asset = base_asset(str(order.get("symbol", "")))
+            price = fill_price(order)
+            if side not in ("buy", "sell") or filled <= 0 or not asset or not price:
+                continue
+            order_id = str(order["exchange_order_id"])
+            fills[order_id] = {
+                "exchange_order_id": order_id,
+                "asset": asset,
+                "side": side,
+                "filled_quantity": filled,
+                "price": price,
+                "update_time": int(order.get("update_time") or 0),
+            }
+        return list(fills.values())
+
+    @staticmethod
+    def _apply(positions: Dict[str, Dict[str, Any]], fills) -> List[str]:
+        """Apply fills in execution order; returns the assets that changed"""
+        changed = []
+        for order, quantity in sorted(fills, key=lambda f: (f[0]["update_time"], f[0]["exchange_order_id"])):
+            asset = order["asset"]
+            position = positions.get(asset)
+            if position is None:
+                position = positions[asset] = empty_position(asset)
+            apply_fill(position, order["side"], quantity, order["price"], order["update_time"])
+            if asset not in changed:
+                changed.append(asset)
+        return changed
+
+    async def _save(self, account_id: str, positions: List[Dict[str, Any]], orders: List[Dict[str, Any]]) -> None:
+        """Positions and applied quantities in ONE statement (both or neither)"""
+        summaries = [position_summary(p) for p in positions]
+        await self.db.execute("""
+            WITH applied AS (
+                INSERT INTO spot_cost_basis_fills (exchange_account_id, exchange_order_id, asset, applied_quantity)
+                SELECT $1, f.order_id, f.asset, f.quantity
+                FROM UNNEST($2::text[], $3::text[], $4::float8[]) AS f(order_id, asset, quantity)
+                ON CONFLICT (exchange_account_id, exchange_order_id) DO UPDATE SET
+                    applied_quantity = EXCLUDED.applied_quantity,
+                    updated_at = NOW()
+            )
+            INSERT INTO spot_cost_basis (
+                exchange_account_id, asset, quantity, total_cost, avg_cost, fifo_cost,
+                realized_pnl, realized_pnl_fifo, lots, fills_count, last_fill_time, updated_at
+            )
+            SELECT $1, p.asset, p.quantity, p.total_cost, p.avg_cost, p.fifo_cost,
+                   p.realized_pnl, p.realized_pnl_fifo, p.lots::jsonb, p.fills_count, p.last_fill_time, NOW()
+            FROM UNNEST(
+                $5::text[], $6::float8[], $7::float8[], $8::float8[], $9::float8[],
+                $10::float8[], $11::float8[], $12::text[], $13::int[], $14::bigint[]
+            ) AS p(asset, quantity, total_cost, avg_cost, fifo_cost,
+                   realized_pnl, realized_pnl_fifo, lots, fills_count, last_fill_time)
+            ON CONFLICT (exchange_account_id, asset) DO UPDATE SET
+                quantity = EXCLUDED.quantity,
+                total_cost = EXCLUDED.total_cost,
+                avg_cost = EXCLUDED.avg_cost,
+                fifo_cost = EXCLUDED.fifo_cost,
+                realized_pnl = EXCLUDED.realized_pnl,
+                realized_pnl_fifo = EXCLUDED.realized_pnl_fifo,
+                lots = EXCLUDED.lots,
+                fills_count = EXCLUDED.fills_count,
+                last_fill_time = EXCLUDED.last_fill_time,
+                updated_at = NOW()
+        """,
+            account_id,
+            [o["exchange_order_id"] for o in orders],
+            [o["asset"] for o in orders],
+            [o["filled_quantity"] for o in orders],
+            [s["asset"] for s in summaries],
+            [s["quantity"] for s in summaries],
+            [s["total_cost"] for s in summaries],
+            [s["avg_cost"] for s in summaries],
+            [s["fifo_cost"] for s in summaries],
+            [s["realized_pnl"] for s in summaries],
+            [s["realized_pnl_fifo"] for s in summaries],
+            [json.dumps(s["lots"]) for s in summaries],
+            [s["fills_count"] for s in summaries],
+            [s["last_fill_time"] for s in summaries],
+        )
+
+    @staticmethod
+    def _row_to_position(row) -> Dict[str, Any]:
+        lots = row["lots"]
+        if isinstance(lots, str):
+            lots = json.loads(lots)
+        return {
+            "asset": row["asset"],
+            "quantity": float(row["quantity"]),
+            "total_cost": float(row["total_cost"]),
+            "avg_cost": float(row["avg_cost"]),
+            "fifo_cost": float(row["fifo_cost"]),
+            "realized_pnl": float(row["realized_pnl"]),
+            "realized_pnl_fifo": float(row["realized_pnl_fifo"]),
+            "lots": [[float(qty), float(price)] for qty, price in lots or []],
+            "fills_count": row["fills_count"],
+            "last_fill_time": row["last_fill_time"],
+        }
+
+
+# Singleton instance
+spot_cost_basis_ledger = None
+
+
+def get_spot_cost_basis_ledger(db_pool) -> SpotCostBasisLedger:
+    """Get or create the SpotCostBasisLedger singleton"""
+    global spot_cost_basis_ledger
+    if spot_cost_basis_ledger is None:
+        spot_cost_basis_ledger = SpotCostBasisLedger(db_pool)
+    return spot_cost_basis_ledger
@@ -11,6 +11,7 @@ are done via the shared IndicatorAlertMonitor instance.
 """
 
 import asyncio
+import time
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -33,15 +34,20 @@ from infrastructure.database.repositories.strategy_sql import (
     StrategySignalRepositorySQL,
 )
 from infrastructure.services.bot_broadcast_service import BotBroadcastService
+from infrastructure.services.candle_close_scheduler import CandleCloseScheduler, next_close_ms
+from infrastructure.services.candle_service import get_candle_service
+from infrastructure.services.condition_compiler import CompiledConditionSet, compile_condition_sets
 from infrastructure.services.indicator_alert_monitor import IndicatorAlertMonitor
 
 # Try to import numpy
 try:
     import numpy as np
+    from infrastructure.indicators import classic
     NUMPY_AVAILABLE = True
 except ImportError:
     NUMPY_AVAILABLE = False
     np = None
+    classic = None
 
 # Lazy import for modular indicators
 MODULAR_INDICATORS_AVAILABLE = False
@@ -95,6 +101,8 @@ class StrategyState:
     # Conditions (loaded from strategy)
     conditions: Dict[ConditionType, List[Dict]] = field(default_factory=dict)
     condition_operators: Dict[ConditionType, LogicOperator] = field(default_factory=dict)
+    # Compiled once on load (evaluated on every closed candle)
+    compiled_conditions: Dict[ConditionType, CompiledConditionSet] = field(default_factory=dict)
 
     # Buffer settings
     max_candles: int = 500
@@ -108,7 +116,8 @@ class StrategyEngineService:
 
     Responsibilities:
     - Load and monitor active strategies
-    - Fetch market data periodically (polling)
+    - Fetch market data when each (symbol, timeframe) candle closes
+      (CandleCloseScheduler; also on streamed updates in intrabar mode)
     - Calculate indicators using IndicatorAlertMonitor methods (NO DUPLICATION)
     - Evaluate entry/exit conditions
     - Generate and forward signals to bot_broadcast_service
@@ -151,8 +160,8 @@ class StrategyEngineService:
         # Indicator calculator - REUSES IndicatorAlertMonitor methods
         self._indicator_monitor: Optional[IndicatorAlertMonitor] = None
 
-        # Background tasks
-        self._monitor_task: Optional[asyncio.Task] = None
+        # Evaluation per (symbol, timeframe) on candle close
+        self._scheduler = CandleCloseScheduler(self._on_groups_due, name="StrategyEngineService")
 
         logger.info("StrategyEngineService initialized")
 
@@ -182,8 +191,8 @@ class StrategyEngineService:
         # Load active strategies
         await self.reload_strategies()
 
-        # Start monitoring task (polls candles periodically)
-        self._monitor_task = asyncio.create_task(self._monitoring_loop())
+        # Start close-driven evaluation (groups are synced by reload_strategies)
+        await self._scheduler.start()
 
         logger.info("Strategy Engine Service started")
 
@@ -193,13 +202,8 @@ class StrategyEngineService:
 
         self._running = False
 
-        # Cancel monitor task
-        if self._monitor_task:
-            self._monitor_task.cancel()
-            try:
-                await self._monitor_task
-            except asyncio.CancelledError:
-                pass
+        # Stop close-driven evaluation
+        await self._scheduler.stop()
 
         # Clear state
         self._strategies.clear()
@@ -231,6 +235,12 @@ class StrategyEngineService:
                 # Update existing strategy
                 await self._update_strategy(strategy)
 
+        await self._scheduler.set_groups(
+            (symbol, state.timeframe)
+            for state in self._strategies.values()
+            for symbol in state.symbols
+        )
+
         logger.info(
             f"Strategy reload complete",
             active_count=len(self._strategies)
@@ -288,6 +298,8 @@ class StrategyEngineService:
             state.conditions[cond_type] = cond_list
             state.condition_operators[cond_type] = condition.get("logic_operator", "AND")
 
+        state.compiled_conditions = compile_condition_sets(state.conditions, state.condition_operators)
+
         # Store state
         self._strategies[strategy_id] = state
 
@@ -318,35 +330,19 @@ class StrategyEngineService:
     ) -> None:
         """Load historical candles for indicator warmup"""
         try:
-            import aiohttp
-
-            url = "https://fapi.binance.com/fapi/v1/klines"
-            params = {
-                "symbol": symbol.upper(),
-                "interval": state.timeframe,
-                "limit": state.max_candles
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as resp:
-                    if resp.status == 200:
-                        klines = await resp.json()
-                    else:
-                        logger.error(f"Failed to fetch klines: {resp.status}")
-                        return
-
-            # Convert to dict format (compatible with IndicatorAlertMonitor)
-            candles = []
-            for k in klines:
-                candle = {
-                    'time': k[0],
-                    'open': float(k[1]),
-                    'high': float(k[2]),
-                    'low': float(k[3]),
-                    'close': float(k[4]),
-                    'volume': float(k[5])
-                }
-                candles.append(candle)
+            result = await get_candle_service().get_candles(
+                symbol=symbol,
+                interval=state.timeframe,
+                limit=state.max_candles
+            )
+
+            if not result.get("success"):
+                logger.error(f"Failed to fetch klines: {result.get('error')}")
+                return
+
+            # Candle dicts (time em ms) - compatible with IndicatorAlertMonitor
+            # Copia: o buffer é mutado e a lista pode vir do cache compartilhado
+            candles = list(result["candles"])
 
             state.candle_buffers[symbol] = candles
 
@@ -637,143 +633,23 @@ class StrategyEngineService:
 
     def _get_nadaraya_watson_values(self, closes, params) -> Optional[Dict]:
         """Get Nadaraya-Watson values for condition evaluation (when no signal)"""
-        bandwidth = params.get('bandwidth', 8)
-        mult = params.get('mult', 3.0)
-
-        n = len(closes)
-        if n < bandwidth * 2:
-            return None
-
-        # Gaussian Kernel Regression (same logic as IndicatorAlertMonitor)
-        y_hat = np.zeros(n)
-        for i in range(n):
-            sum_weights = 0.0
-            sum_weighted = 0.0
-            for j in range(n):
-                distance = (i - j) / bandwidth
-                weight = np.exp(-0.5 * distance * distance)
-                sum_weights += weight
-                sum_weighted += weight * closes[j]
-            y_hat[i] = sum_weighted / sum_weights if sum_weights > 0 else closes[i]
-
-        mae = np.mean(np.abs(closes - y_hat))
-        upper = y_hat + mult * mae
-        lower = y_hat - mult * mae
-
-        idx = -1
-        return {
-            'value': float(y_hat[idx]),
-            'upper': float(upper[idx]),
-            'lower': float(lower[idx])
-        }
+        return classic.nadaraya_watson_snapshot(closes, params)
 
     def _get_rsi_values(self, closes, params) -> Optional[Dict]:
         """Get RSI value for condition evaluation (when no signal)"""
-        period = params.get('period', 14)
-        if len(closes) < period + 1:
-            return None
-
-        deltas = np.diff(closes)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-
-        avg_gain = np.zeros(len(deltas))
-        avg_loss = np.zeros(len(deltas))
-        avg_gain[period-1] = np.mean(gains[:period])
-        avg_loss[period-1] = np.mean(losses[:period])
-
-        for i in range(period, len(deltas)):
-            avg_gain[i] = (avg_gain[i-1] * (period-1) + gains[i]) / period
-            avg_loss[i] = (avg_loss[i-1] * (period-1) + losses[i]) / period
-
-        rs = np.where(avg_loss != 0, avg_gain / avg_loss, 100)
-        rsi = 100 - (100 / (1 + rs))
-
-        return {'value': float(rsi[-1])}
+        return classic.rsi_snapshot(closes, params)
 
     def _get_macd_values(self, closes, params) -> Optional[Dict]:
         """Get MACD values for condition evaluation (when no signal)"""
-        fast = params.get('fast', 12)
-        slow = params.get('slow', 26)
-        signal_period = params.get('signal', 9)
-
-        if len(closes) < slow + signal_period:
-            return None
-
-        def ema(data, period):
-            alpha = 2 / (period + 1)
-            result = np.zeros(len(data))
-            result[0] = data[0]
-            for i in range(1, len(data)):
-                result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
-            return result
-
-        ema_fast = ema(closes, fast)
-        ema_slow = ema(closes, slow)
-        macd_line = ema_fast - ema_slow
-        signal_line = ema(macd_line, signal_period)
-
-        return {
-            'macd': float(macd_line[-1]),
-            'signal_line': float(signal_line[-1]),
-            'histogram': float(macd_line[-1] - signal_line[-1])
-        }
+        return classic.macd_snapshot(closes, params)
 
     def _get_bollinger_values(self, closes, params) -> Optional[Dict]:
         """Get Bollinger Bands values for condition evaluation (when no signal)"""
-        period = params.get('period', 20)
-        stddev = params.get('stddev', 2.0)
-
-        if len(closes) < period:
-            return None
-
-        window = closes[-period:]
-        sma = np.mean(window)
-        std = np.std(window)
-        upper = sma + stddev * std
-        lower = sma - stddev * std
-
-        # Calculate bandwidth (percentage of middle band)
-        bandwidth = ((upper - lower) / sma) * 100 if sma > 0 else 0
-
-        # Calculate %B (where price is within the bands)
-        percent_b = (closes[-1] - lower) / (upper - lower) if (upper - lower) > 0 else 0.5
-
-        return {
-            'middle': float(sma),
-            'upper': float(upper),
-            'lower': float(lower),
-            'bandwidth': float(bandwidth),
-            'percent_b': float(percent_b)
-        }
+        return classic.bollinger_snapshot(closes, params)
 
     def _get_ema_cross_values(self, closes, params) -> Optional[Dict]:
         """Get EMA Cross values for condition evaluation"""
-        fast_period = params.get('fast_period', 9)
-        slow_period = params.get('slow_period', 21)
-
-        if len(closes) < slow_period:
-            return None
-
-        def ema(data, period):
-            alpha = 2 / (period + 1)
-            result = np.zeros(len(data))
-            result[0] = data[0]
-            for i in range(1, len(data)):
-                result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
-            return result
-
-        fast_ema = ema(closes, fast_period)
-        slow_ema = ema(closes, slow_period)
-
-        # Determine trend: 1 = bullish (fast > slow), -1 = bearish
-        trend = 1 if fast_ema[-1] > slow_ema[-1] else -1
-
-        return {
-            'fast_ema': float(fast_ema[-1]),
-            'slow_ema': float(slow_ema[-1]),
-            'trend': trend
-        }
+        return classic.ema_cross_snapshot(closes, params)
 
     async def _evaluate_conditions(
         self,
@@ -818,10 +694,9 @@ class StrategyEngineService:
 
         # Check entry conditions
         for condition_type in [ConditionType.ENTRY_LONG, ConditionType.ENTRY_SHORT]:
-            conditions = state.conditions.get(condition_type, [])
-            operator = state.condition_operators.get(condition_type, LogicOperator.AND)
+            condition_set = state.compiled_conditions.get(condition_type)
 
-            if conditions and self._evaluate_condition_set(conditions, operator, context):
+            if condition_set and condition_set.evaluate(context):
                 signal_type = SignalType.LONG if condition_type == ConditionType.ENTRY_LONG else SignalType.SHORT
                 action = "buy" if signal_type == SignalType.LONG else "sell"
 
@@ -838,79 +713,6 @@ class StrategyEngineService:
                 state.last_signal_time[symbol] = datetime.utcnow()
                 break  # Only one signal per evaluation
 
-    def _evaluate_condition_set(
-        self,
-        conditions: List[Dict],
-        operator: LogicOperator,
-        context: Dict[str, float]
-    ) -> bool:
-        """Evaluate a set of conditions with AND/OR logic"""
-        results = []
-
-        for cond in conditions:
-            left_key = cond.get("left", "")
-            right_key = cond.get("right", "")
-            op = cond.get("operator", "")
-
-            # Get values from context
-            left_val = self._get_context_value(left_key, context)
-            right_val = self._get_context_value(right_key, context)
-
-            if left_val is None or right_val is None:
-                continue
-
-            # Evaluate operator
-            result = self._compare(left_val, op, right_val)
-            results.append(result)
-
-        if not results:
-            return False
-
-        if operator == LogicOperator.AND:
-            return all(results)
-        else:  # OR
-            return any(results)
-
-    def _get_context_value(self, key: str, context: Dict[str, float]) -> Optional[float]:
-        """Get a value from context, handling nested keys like 'ndy.lower'"""
-        if key in context:
-            return context[key]
-
-        # Try to parse as number
-        try:
-            return float(key)
-        except ValueError:
-            pass
-
-        # Map common aliases
-        aliases = {
-            "ndy.lower": "nadaraya_watson.lower",
-            "ndy.upper": "nadaraya_watson.upper",
-            "ndy.value": "nadaraya_watson.value",
-            "tpo.val": "tpo.val",
-            "tpo.vah": "tpo.vah",
-            "tpo.poc": "tpo.poc",
-        }
-
-        if key in aliases:
-            return context.get(aliases[key])
-
-        return None
-
-    def _compare(self, left: float, op: str, right: float) -> bool:
-        """Compare two values with given operator"""
-        ops = {
-            "<": lambda a, b: a < b,
-            ">": lambda a, b: a > b,
-            "<=": lambda a, b: a <= b,
-            ">=": lambda a, b: a >= b,
-            "==": lambda a, b: abs(a - b) < 0.0001,
-            "!=": lambda a, b: abs(a - b) >= 0.0001,
-            "crosses_above": lambda a, b: a > b,
-            "crosses_below": lambda a, b: a < b,
-        }
-        return ops.get(op, lambda a, b: False)(left, right)
-
     async def _generate_signal(
         self,
         state: StrategyState,
@@ -995,93 +797,91 @@ class StrategyEngineService:
                 strategy_id=state.strategy_id
             )
 
-    async def _monitoring_loop(self) -> None:
-        """Background task for periodic monitoring, polling candles and evaluating conditions"""
-        while self._running:
-            try:
-                # Poll interval (30 seconds)
-                await asyncio.sleep(30)
+    async def _on_groups_due(self, groups: List[tuple], reason: str) -> None:
+        """
+        Scheduler callback for (symbol, timeframe) groups.
 
-                # For each active strategy, fetch latest candles and evaluate
-                for strategy_id, state in self._strategies.items():
-                    for symbol in state.symbols:
-                        try:
-                            # Fetch latest candles
-                            await self._refresh_candles(state, symbol)
+        "close": the group's candle just closed - merge the closed candles and
+        evaluate every strategy on that group. "update" (intrabar mode): merge
+        the streamed forming candle and evaluate.
+        """
+        for symbol, timeframe in groups:
+            streamed = self._scheduler.latest_candle(symbol, timeframe) if reason == "update" else None
 
-                            # Calculate indicators using IndicatorAlertMonitor methods
-                            await self._calculate_indicators(state, symbol)
+            for strategy_id, state in list(self._strategies.items()):
+                if state.timeframe != timeframe or symbol not in state.symbols:
+                    continue
+                try:
+                    if streamed:
+                        self._merge_candles(state, symbol, [streamed])
+                    else:
+                        # CandleService coalesces / caches: one exchange call per group
+                        await self._refresh_candles(state, symbol, closed_only=reason == "close")
 
-                            # Evaluate conditions
-                            await self._evaluate_conditions(state, symbol)
+                    # Calculate indicators using IndicatorAlertMonitor methods
+                    await self._calculate_indicators(state, symbol)
 
-                        except Exception as e:
-                            logger.error(f"Error processing {symbol}: {e}", strategy_id=strategy_id)
+                    # Evaluate conditions
+                    await self._evaluate_conditions(state, symbol)
 
-                logger.debug(
-                    "Strategy Engine status",
-                    active_strategies=len(self._strategies)
-                )
+                except Exception as e:
+                    logger.error(f"Error processing {symbol}: {e}", strategy_id=strategy_id)
 
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
+        logger.debug(
+            "Strategy Engine evaluation",
+            reason=reason,
+            groups=len(groups),
+            active_strategies=len(self._strategies)
+        )
 
-    async def _refresh_candles(self, state: StrategyState, symbol: str) -> None:
-        """Fetch latest candles and update buffer"""
+    async def _refresh_candles(self, state: StrategyState, symbol: str, closed_only: bool = False) -> None:
+        """Fetch latest candles and update buffer (closed_only: leave the just-opened candle out)"""
         try:
-            import aiohttp
-
-            url = "https://fapi.binance.com/fapi/v1/klines"
-            params = {
-                "symbol": symbol.upper(),
-                "interval": state.timeframe,
-                "limit": 10
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as resp:
-                    if resp.status != 200:
-                        return
-                    klines = await resp.json()
-
-            buffer = state.candle_buffers.get(symbol, [])
-
-            for k in klines:
-                candle = {
-                    'time': k[0],
-                    'open': float(k[1]),
-                    'high': float(k[2]),
-                    'low': float(k[3]),
-                    'close': float(k[4]),
-                    'volume': float(k[5])
-                }
-
-                existing_idx = None
-                for i, c in enumerate(buffer):
-                    if c['time'] == candle['time']:
-                        existing_idx = i
-                        break
-
-                if existing_idx is not None:
-                    buffer[existing_idx] = candle
-                else:
-                    buffer.append(candle)
+            result = await get_candle_service().get_candles(
+                symbol=symbol,
+                interval=state.timeframe,
+                limit=10
+            )
+            if not result.get("success"):
+                return
 
-            if len(buffer) > state.max_candles:
-                buffer = buffer[-state.max_candles:]
+            candles = result["candles"]
+            if closed_only:
+                now_ms = int(time.time() * 1000)
+                candles = [c for c in candles if next_close_ms(state.timeframe, c['time']) <= now_ms]
 
-            state.candle_buffers[symbol] = buffer
+            self._merge_candles(state, symbol, candles)
 
         except Exception as e:
             logger.error(f"Error refreshing candles: {e}", symbol=symbol)
 
+    def _merge_candles(self, state: StrategyState, symbol: str, candles: List[Dict]) -> None:
+        """Replace candles already in the buffer (same time) and append new ones"""
+        buffer = state.candle_buffers.get(symbol, [])
+
+        for candle in candles:
+            existing_idx = None
+            for i, c in enumerate(buffer):
+                if c['time'] == candle['time']:
+                    existing_idx = i
+                    break
+
+            if existing_idx is not None:
+                buffer[existing_idx] = candle
+            else:
+                buffer.append(candle)
+
+        if len(buffer) > state.max_candles:
+            buffer = buffer[-state.max_candles:]
+
+        state.candle_buffers[symbol] = buffer
+
     def get_status(self) -> Dict[str, Any]:
         """Get current engine status"""
         return {
             "running": self._running,
             "active_strategies": len(self._strategies),
+            "scheduler": self._scheduler.get_metrics(),
             "strategies": [
                 {
                     "id": s.strategy_id,
@@ -0,0 +1,706 @@
+"""
+Strategy Optimizer Service
+
+Parameter sweep (grid / random / Bayesian) over a strategy's indicator
+parameters, built on BacktestService.
+
+- Candles are fetched once per sweep.
+- Indicator series are precomputed once per distinct (indicator, parameters)
+  pair: candidates that share an indicator configuration share its columns.
+  Indicators are causal (value at i depends on candles[:i + 1]), so the same
+  columns also serve every walk-forward sub-range.
+- Distinct indicator sets are computed in parallel in a process pool. The
+  pool is reused while the candle set is the same, and the candles are
+  shipped once per worker via the pool initializer (tasks only carry the
+  indicator parameters).
+  Entry/exit conditions are compiled once and evaluated per candidate as
+  NumPy masks over the whole series; the trading loop only reads the masks.
+- Walk-forward re-optimizes on each in-sample window (best of every evaluated
+  candidate on that window only) and scores just that winner out-of-sample.
+"""
+
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from infrastructure.database.models.strategy import ConditionType, IndicatorType, LogicOperator
+from infrastructure.indicators.base import Candle
+from infrastructure.services.backtest_service import (
+    BacktestConfig,
+    BacktestService,
+    BacktestState,
+    CandleArrays,
+    SignalMasks,
+)
+from infrastructure.services.condition_compiler import (
+    CompiledConditionSet,
+    columns_to_arrays,
+    compile_condition_sets,
+)
+
+logger = structlog.get_logger(__name__)
+
+SWEEP_METHODS = ("grid", "random", "bayesian")
+OBJECTIVES = ("sharpe_ratio", "sortino_ratio", "total_pnl_percent", "profit_factor", "win_rate", "expectancy")
+MAX_CANDIDATES = 500
+MAX_RANKED_ROWS = 100
+
+# Bayesian (TPE sobre espaço discreto)
+BAYESIAN_INITIAL_POINTS = 8
+BAYESIAN_BATCH_SIZE = 4
+BAYESIAN_POOL_SIZE = 64
+TPE_GAMMA = 0.25  # fração dos melhores candidatos usada como densidade "boa"
+
+IndicatorColumns = Dict[str, List[Optional[float]]]
+
+
+@dataclass
+class ParameterRange:
+    """Valores candidatos de um parâmetro de indicador (ex.: rsi.period)"""
+    indicator: str
+    name: str
+    values: List[Any]
+
+    @property
+    def key(self) -> str:
+        return f"{self.indicator}.{self.name}"
+
+    @classmethod
+    def from_spec(
+        cls,
+        indicator: str,
+        name: str,
+        values: Optional[List[Any]] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        step: Optional[float] = None,
+    ) -> "ParameterRange":
+        """Lista explícita ou intervalo min..max (inclusive) com passo"""
+        if values:
+            return cls(indicator=indicator, name=name, values=list(dict.fromkeys(values)))
+
+        if min_value is None or max_value is None or not step or step <= 0 or max_value < min_value:
+            raise ValueError(f"Parameter {indicator}.{name} needs values or min/max/step")
+
+        integral = all(float(v).is_integer() for v in (min_value, max_value, step))
+        count = int(math.floor((max_value - min_value) / step + 1e-9)) + 1
+        expanded = [min_value + k * step for k in range(count)]
+        expanded = [int(round(v)) for v in expanded] if integral else [round(v, 10) for v in expanded]
+        return cls(indicator=indicator, name=name, values=expanded)
+
+
+@dataclass
+class OptimizationConfig:
+    """Configuração do sweep de parâmetros"""
+    parameters: List[ParameterRange]
+    method: str = "grid"
+    objective: str = "sharpe_ratio"
+    max_candidates: int = 100
+    walk_forward_folds: int = 3
+    in_sample_ratio: float = 0.7
+    min_trades: int = 5  # Abaixo disso o candidato fica sem score (ranqueado por último)
+    seed: int = 42
+    max_workers: Optional[int] = None
+    backtest: BacktestConfig = field(default_factory=BacktestConfig)
+
+
+@dataclass
+class CandidateResult:
+    """Resultado de um candidato do sweep"""
+    parameters: Dict[str, Any]
+    metrics: Dict[str, Any]
+    score: Optional[float]
+
+    def to_dict(self, rank: int) -> Dict[str, Any]:
+        return {
+            "rank": rank,
+            "parameters": self.parameters,
+            "score": self.score,
+            "metrics": self.metrics,
+        }
+
+
+def compute_indicator_columns(
+    indicator_type: str,
+    parameters: Dict[str, Any],
+    candles: List[Candle],
+) -> Tuple[int, IndicatorColumns]:
+    """
+    Série completa de um indicador (executa no process pool).
+
+    Returns:
+        (required_candles, {value_key: [value or None per candle]})
+    """
+    calculator = BacktestService.INDICATOR_CALCULATORS[IndicatorType(indicator_type)](parameters=parameters)
+    n = len(candles)
+    columns: IndicatorColumns = {}
+
+    series = None
+    if calculator.vectorized_series:
+        try:
+            series = {r.timestamp: r for r in calculator.calculate_series(candles)}
+        except Exception:
+            series = None
+
+    for i in range(calculator.required_candles, n):
+        try:
+            result = series.get(candles[i].timestamp) if series is not None else calculator.calculate(candles[:i + 1])
+        except Exception:
+            continue
+        if not result or not result.values:
+            continue
+        for key, value in result.values.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * n
+            column[i] = float(value)
+
+    return calculator.required_candles, columns
+
+
+# Pool de indicadores reaproveitado entre sweeps do mesmo conjunto de candles
+_indicator_pool: Optional[ProcessPoolExecutor] = None
+_indicator_pool_key: Optional[Tuple] = None
+_worker_candles: List[Candle] = []
+
+
+def _init_indicator_worker(candles: List[Candle]) -> None:
+    """Initializer do pool: os candles chegam uma vez por worker"""
+    global _worker_candles
+    _worker_candles = candles
+
+
+def _compute_worker_columns(indicator_type: str, parameters: Dict[str, Any]) -> Tuple[int, IndicatorColumns]:
+    return compute_indicator_columns(indicator_type, parameters, _worker_candles)
+
+
+def _candles_key(candles: List[Candle]) -> Tuple:
+    first, last = candles[0], candles[-1]
+    return len(candles), first.timestamp, last.timestamp, last.close, last.volume
+
+
+def get_indicator_pool(candles: List[Candle], max_workers: int) -> ProcessPoolExecutor:
+    """Get or create the indicator process pool for this candle set"""
+    global _indicator_pool, _indicator_pool_key
+    key = (_candles_key(candles), max_workers)
+    if _indicator_pool is not None and _indicator_pool_key == key:
+        return _indicator_pool
+
+    shutdown_indicator_pool()
+    _indicator_pool = ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_indicator_worker,
+        initargs=(candles,)
+    )
+    _indicator_pool_key = key
+    return _indicator_pool
+
+
+def shutdown_indicator_pool() -> None:
+    global _indicator_pool, _indicator_pool_key
+    if _indicator_pool is not None:
+        _indicator_pool.shutdown(wait=False, cancel_futures=True)
+    _indicator_pool = None
+    _indicator_pool_key = None
+
+
+def _params_key(indicator_type: str, parameters: Dict[str, Any]) -> Tuple[str, str]:
+    return indicator_type, json.dumps(parameters, sort_keys=True, default=str)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    return float(value) if isinstance(value, (Decimal, int, float)) else value
+
+
+class StrategyOptimizerService(BacktestService):
+    """
+    Sweep de parâmetros de indicadores sobre o simulador do BacktestService
+    """
+
+    async def optimize(
+        self,
+        strategy_id: str,
+        symbol: str,
+        start_date: datetime,
+        end_date: datetime,
+        optimization: OptimizationConfig,
+    ) -> Dict[str, Any]:
+        """
+        Executa o sweep e retorna a tabela ranqueada
+
+        Args:
+            strategy_id: ID da estratégia
+            symbol: Símbolo (ex.: "BTCUSDT")
+            start_date: Data inicial
+            end_date: Data final
+            optimization: Espaço de parâmetros, método e objetivo
+
+        Returns:
+            Dict com ranking, melhor candidato e walk-forward dos top N
+        """
+        self._validate(optimization)
+
+        strategy = await self._strategy_repo.get_with_relations(strategy_id)
+        if not strategy:
+            raise ValueError(f"Strategy {strategy_id} not found")
+
+        base_parameters = self._base_parameters(strategy)
+        for parameter in optimization.parameters:
+            if parameter.indicator not in base_parameters:
+                raise ValueError(f"Indicator {parameter.indicator} is not part of strategy {strategy_id}")
+
+        candles = await self._fetch_historical_data(
+            symbol=symbol,
+            timeframe=strategy.timeframe,
+            start_date=start_date,
+            end_date=end_date
+        )
+        if len(candles) < 100:
+            raise ValueError(f"Insufficient data: only {len(candles)} candles")
+
+        conditions, condition_operators = self._load_conditions(strategy)
+        compiled = compile_condition_sets(conditions, condition_operators)
+        arrays = CandleArrays.from_candles(candles)
+        price_columns = arrays.price_columns()
+
+        logger.info(
+            "Starting parameter sweep",
+            strategy_id=strategy_id,
+            symbol=symbol,
+            method=optimization.method,
+            objective=optimization.objective,
+            space_size=self._space_size(optimization)
+        )
+
+        # Progresso do sweep = candidatos avaliados; o loop de trading não reporta por candle
+        report, self.progress_callback = self.progress_callback, None
+        column_cache: Dict[Tuple[str, str], Tuple[int, Dict[str, Any]]] = {}
+        results: List[CandidateResult] = []
+        seen = set()
+        rng = random.Random(optimization.seed)
+        total = min(optimization.max_candidates, self._space_size(optimization))
+
+        executor = get_indicator_pool(candles, optimization.max_workers or os.cpu_count() or 1)
+        try:
+            while len(results) < total:
+                batch = self._next_batch(optimization, results, seen, rng, total - len(results))
+                if not batch:
+                    break
+
+                await self._precompute(batch, base_parameters, candles, column_cache, executor)
+
+                for parameters in batch:
+                    masks, start_index = self._candidate_masks(
+                        parameters, base_parameters, column_cache, compiled, price_columns, len(candles)
+                    )
+                    metrics = await self._run_candidate(
+                        candles, masks, start_index, len(candles),
+                        conditions, condition_operators, optimization.backtest, arrays
+                    )
+                    results.append(CandidateResult(
+                        parameters=parameters,
+                        metrics=metrics,
+                        score=self._score(metrics, optimization)
+                    ))
+                    if report:
+                        await report(len(results), total, int(metrics["total_trades"]))
+                    await asyncio.sleep(0)
+
+            ranked = sorted(results, key=lambda r: (r.score is None, -(r.score or 0.0)))
+
+            walk_forward = await self._walk_forward(
+                results, base_parameters, column_cache, compiled, price_columns,
+                candles, conditions, condition_operators, optimization, arrays
+            )
+        finally:
+            self.progress_callback = report
+
+        logger.info(
+            "Parameter sweep completed",
+            strategy_id=strategy_id,
+            candidates=len(results),
+            distinct_indicator_sets=len(column_cache),
+            best_score=ranked[0].score if ranked else None
+        )
+
+        return {
+            "strategy_id": str(strategy_id),
+            "symbol": symbol,
+            "timeframe": strategy.timeframe,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "method": optimization.method,
+            "objective": optimization.objective,
+            "candles": len(candles),
+            "space_size": self._space_size(optimization),
+            "candidates_evaluated": len(results),
+            "distinct_indicator_sets": len(column_cache),
+            "best": ranked[0].to_dict(1) if ranked else None,
+            "walk_forward": walk_forward,
+            "ranked": [c.to_dict(rank) for rank, c in enumerate(ranked[:MAX_RANKED_ROWS], start=1)],
+        }
+
+    # ==================== Search space ====================
+
+    def _validate(self, optimization: OptimizationConfig) -> None:
+        if optimization.method not in SWEEP_METHODS:
+            raise ValueError(f"Unknown sweep method: {optimization.method}")
+        if optimization.objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {optimization.objective}")
+        if not optimization.parameters:
+            raise ValueError("At least one parameter range is required")
+        if not 0 < optimization.in_sample_ratio < 1:
+            raise ValueError("in_sample_ratio must be between 0 and 1")
+        optimization.max_candidates = max(1, min(optimization.max_candidates, MAX_CANDIDATES))
+
+    def _space_size(self, optimization: OptimizationConfig) -> int:
+        return math.prod(len(p.values) for p in optimization.parameters)
+
+    def _base_parameters(self, strategy) -> Dict[str, Dict[str, Any]]:
+        """indicator type -> parâmetros salvos na estratégia (só indicadores com calculator)"""
+        base = {}
+        for indicator in strategy.indicators:
+            ind_type = indicator.indicator_type
+            if isinstance(ind_type, str):
+                try:
+                    ind_type = IndicatorType(ind_type)
+                except ValueError:
+                    continue
+            if ind_type in self.INDICATOR_CALCULATORS:
+                base[ind_type.value] = dict(indicator.parameters or {})
+        return base
+
+    def _next_batch(
+        self,
+        optimization: OptimizationConfig,
+        results: List[CandidateResult],
+        seen: set,
+        rng: random.Random,
+        remaining: int,
+    ) -> List[Dict[str, Any]]:
+        space = optimization.parameters
+
+        if optimization.method == "grid":
+            batch = []
+            for combo in itertools.product(*(p.values for p in space)):
+                if len(batch) >= remaining:
+                    break
+                candidate = {p.key: v for p, v in zip(space, combo)}
+                if self._mark_seen(candidate, seen):
+                    batch.append(candidate)
+            return batch
+
+        if optimization.method == "random" or len(results) < BAYESIAN_INITIAL_POINTS:
+            size = remaining if optimization.method == "random" else min(remaining, BAYESIAN_INITIAL_POINTS - len(results))
+            return self._sample(space, seen, rng, size)
+
+        return self._propose_tpe(space, results, seen, rng, min(remaining, BAYESIAN_BATCH_SIZE))
+
+    def _mark_seen(self, candidate: Dict[str, Any], seen: set) -> bool:
+        key = tuple(sorted((k, json.dumps(v, default=str)) for k, v in candidate.items()))
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    def _sample(self, space: List[ParameterRange], seen: set, rng: random.Random, size: int) -> List[Dict[str, Any]]:
+        batch = []
+        attempts = 0
+        while len(batch) < size and attempts < size * 50:
+            attempts += 1
+            candidate = {p.key: rng.choice(p.values) for p in space}
+            if self._mark_seen(candidate, seen):
+                batch.append(candidate)
+        return batch
+
+    def _propose_tpe(
+        self,
+        space: List[ParameterRange],
+        results: List[CandidateResult],
+        seen: set,
+        rng: random.Random,
+        size: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Tree-structured Parzen estimator sobre valores discretos: sorteia um pool
+        e escolhe os candidatos com maior razão l(x)/g(x) entre a densidade dos
+        melhores (gamma) e a dos demais.
+        """
+        ranked = sorted(results, key=lambda r: (r.score is None, -(r.score or 0.0)))
+        n_good = max(1, int(math.ceil(TPE_GAMMA * len(ranked))))
+        good, bad = ranked[:n_good], ranked[n_good:]
+
+        def density(group: List[CandidateResult], parameter: ParameterRange, value: Any) -> float:
+            hits = sum(1 for r in group if r.parameters.get(parameter.key) == value)
+            return (hits + 1) / (len(group) + len(parameter.values))  # suavização de Laplace
+
+        pool = []
+        local_seen = set(seen)
+        attempts = 0
+        while len(pool) < BAYESIAN_POOL_SIZE and attempts < BAYESIAN_POOL_SIZE * 20:
+            attempts += 1
+            candidate = {p.key: rng.choice(p.values) for p in space}
+            if self._mark_seen(candidate, local_seen):
+                pool.append(candidate)
+
+        def expected_improvement(candidate: Dict[str, Any]) -> float:
+            return sum(
+                math.log(density(good, p, candidate[p.key])) - math.log(density(bad, p, candidate[p.key]))
+                for p in space
+            )
+
+        pool.sort(key=expected_improvement, reverse=True)
+        batch = pool[:size]
+        for candidate in batch:
+            self._mark_seen(candidate, seen)
+        return batch
+
+    # ==================== Indicator precompute ====================
+
+    def _resolved_parameters(
+        self,
+        candidate: Dict[str, Any],
+        base_parameters: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Any]]:
+        resolved = {ind: dict(params) for ind, params in base_parameters.items()}
+        for key, value in candidate.items():
+            indicator, name = key.split(".", 1)
+            resolved[indicator][name] = value
+        return resolved
+
+    async def _precompute(
+        self,
+        batch: List[Dict[str, Any]],
+        base_parameters: Dict[str, Dict[str, Any]],
+        candles: List[Candle],
+        column_cache: Dict[Tuple[str, str], Tuple[int, Dict[str, Any]]],
+        executor: ProcessPoolExecutor,
+    ) -> None:
+        """Calcula (em paralelo) as séries dos pares indicador/parâmetros ainda não vistos"""
+        missing: Dict[Tuple[str, str], Tuple[str, Dict[str, Any]]] = {}
+        for candidate in batch:
+            for indicator, params in self._resolved_parameters(candidate, base_parameters).items():
+                key = _params_key(indicator, params)
+                if key not in column_cache:
+                    missing[key] = (indicator, params)
+
+        if not missing:
+            return
+
+        loop = asyncio.get_running_loop()
+        keys = list(missing.keys())
+        try:
+            computed = await asyncio.gather(*(
+                loop.run_in_executor(executor, _compute_worker_columns, indicator, params)
+                for indicator, params in missing.values()
+            ))
+        except Exception as e:
+            # Pool indisponível (ex.: sandbox sem fork): calcula no processo atual
+            logger.warning(f"Indicator process pool failed, computing inline: {e}")
+            shutdown_indicator_pool()
+            computed = []
+            for indicator, params in missing.values():
+                computed.append(compute_indicator_columns(indicator, params, candles))
+                await asyncio.sleep(0)
+
+        for key, (required_candles, columns) in zip(keys, computed):
+            column_cache[key] = (required_candles, columns_to_arrays(columns))
+
+    def _candidate_masks(
+        self,
+        candidate: Dict[str, Any],
+        base_parameters: Dict[str, Dict[str, Any]],
+        column_cache: Dict[Tuple[str, str], Tuple[int, Dict[str, Any]]],
+        compiled: Dict[ConditionType, CompiledConditionSet],
+        price_columns: Dict[str, Any],
+        length: int,
+    ) -> Tuple[SignalMasks, int]:
+        """
+        Máscaras de entrada/saída do candidato sobre toda a série + índice
+        inicial (mesmo min_candles do backtest)
+        """
+        columns = dict(price_columns)
+        for indicator, params in self._resolved_parameters(candidate, base_parameters).items():
+            _, indicator_columns = column_cache[_params_key(indicator, params)]
+            for key, column in indicator_columns.items():
+                columns[f"{indicator}.{key}"] = column
+
+        masks = {
+            condition_type: condition_set.evaluate_mask(columns, length)
+            for condition_type, condition_set in compiled.items()
+            if condition_set
+        }
+        return masks, self._candidate_start(candidate, base_parameters, column_cache)
+
+    def _candidate_start(
+        self,
+        candidate: Dict[str, Any],
+        base_parameters: Dict[str, Dict[str, Any]],
+        column_cache: Dict[Tuple[str, str], Tuple[int, Dict[str, Any]]],
+    ) -> int:
+        """Primeiro candle simulado do candidato (maior warm-up entre seus indicadores)"""
+        required = [
+            column_cache[_params_key(indicator, params)][0]
+            for indicator, params in self._resolved_parameters(candidate, base_parameters).items()
+        ]
+        return max(required, default=50)
+
+    # ==================== Evaluation ====================
+
+    async def _run_candidate(
+        self,
+        candles: List[Candle],
+        masks: SignalMasks,
+        start_index: int,
+        end_index: int,
+        conditions: Dict[ConditionType, List[Dict]],
+        condition_operators: Dict[ConditionType, LogicOperator],
+        config: BacktestConfig,
+        arrays: Optional[CandleArrays] = None,
+    ) -> Dict[str, Any]:
+        """
+        Simula candles[start_index:end_index] com máscaras de sinal precomputadas
+        (caminho orientado a eventos quando a config permite)
+        """
+        state = await self._simulate(
+            candles=candles,
+            start_index=start_index,
+            indicator_values_at=None,
+            conditions=conditions,
+            condition_operators=condition_operators,
+            config=config,
+            state=BacktestState(capital=config.initial_capital),
+            end_index=end_index,
+            signal_masks=masks,
+            candle_arrays=arrays
+        )
+
+        if state.position:
+            last = candles[end_index - 1]
+            self._close_position(
+                state=state,
+                exit_price=last.close,
+                exit_time=last.timestamp,
+                exit_reason="end_of_backtest",
+                config=config
+            )
+
+        metrics = self._calculate_metrics(state, config)
+        return {key: _to_float(value) for key, value in metrics.items()}
+
+    def _score(self, metrics: Dict[str, Any], optimization: OptimizationConfig) -> Optional[float]:
+        if (metrics.get("total_trades") or 0) < optimization.min_trades:
+            return None
+        return metrics.get(optimization.objective)
+
+    async def _walk_forward(
+        self,
+        results: List[CandidateResult],
+        base_parameters: Dict[str, Dict[str, Any]],
+        column_cache: Dict[Tuple[str, str], Tuple[int, Dict[str, Any]]],
+        compiled: Dict[ConditionType, CompiledConditionSet],
+        price_columns: Dict[str, Any],
+        candles: List[Candle],
+        conditions: Dict[ConditionType, List[Dict]],
+        condition_operators: Dict[ConditionType, LogicOperator],
+        optimization: OptimizationConfig,
+        arrays: Optional[CandleArrays] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Walk-forward com re-otimização: divide o período (após o warm-up mais
+        longo entre os candidatos) em folds; em cada fold o vencedor é escolhido
+        entre todos os candidatos avaliados usando só o trecho in-sample, e só
+        esse vencedor é medido no out-of-sample seguinte. Assim a escolha nunca
+        vê os dados em que é avaliada.
+        """
+        if not results:
+            return None
+
+        start_index = max(
+            self._candidate_start(r.parameters, base_parameters, column_cache) for r in results
+        )
+        folds = max(1, optimization.walk_forward_folds)
+        fold_size = (len(candles) - start_index) // folds
+        if fold_size < 20:
+            return None
+
+        windows = []
+        for k in range(folds):
+            fold_start = start_index + k * fold_size
+            fold_end = len(candles) if k == folds - 1 else fold_start + fold_size
+            split = fold_start + int((fold_end - fold_start) * optimization.in_sample_ratio)
+            windows.append((fold_start, split, fold_end))
+
+        # Re-otimização: melhor candidato de cada janela in-sample
+        best: List[Optional[Tuple[float, CandidateResult]]] = [None] * folds
+        for candidate in results:
+            masks, _ = self._candidate_masks(
+                candidate.parameters, base_parameters, column_cache, compiled, price_columns, len(candles)
+            )
+            for k, (fold_start, split, _) in enumerate(windows):
+                in_sample = await self._run_candidate(
+                    candles, masks, fold_start, split, conditions, condition_operators, optimization.backtest, arrays
+                )
+                score = self._score(in_sample, optimization)
+                if score is not None and (best[k] is None or score > best[k][0]):
+                    best[k] = (score, candidate)
+            await asyncio.sleep(0)
+
+        fold_results = []
+        for k, (fold_start, split, fold_end) in enumerate(windows):
+            fold = {
+                "fold": k + 1,
+                "in_sample_start": candles[fold_start].timestamp.isoformat(),
+                "out_of_sample_start": candles[split].timestamp.isoformat(),
+                "out_of_sample_end": candles[fold_end - 1].timestamp.isoformat(),
+                "parameters": None,
+                "in_sample_score": None,
+                "out_of_sample_score": None,
+                "out_of_sample_trades": None,
+                "out_of_sample_pnl_percent": None,
+            }
+            if best[k] is not None:
+                in_sample_score, winner = best[k]
+                masks, _ = self._candidate_masks(
+                    winner.parameters, base_parameters, column_cache, compiled, price_columns, len(candles)
+                )
+                out_of_sample = await self._run_candidate(
+                    candles, masks, split, fold_end, conditions, condition_operators, optimization.backtest, arrays
+                )
+                fold.update(
+                    parameters=winner.parameters,
+                    in_sample_score=in_sample_score,
+                    out_of_sample_score=out_of_sample.get(optimization.objective),
+                    out_of_sample_trades=out_of_sample.get("total_trades"),
+                    out_of_sample_pnl_percent=out_of_sample.get("total_pnl_percent"),
+                )
+            fold_results.append(fold)
+
+        def mean(key: str) -> Optional[float]:
+            values = [f[key] for f in fold_results if f[key] is not None]
+            return sum(values) / len(values) if values else None
+
+        is_score = mean("in_sample_score")
+        oos_score = mean("out_of_sample_score")
+        degradation = None
+        if is_score and oos_score is not None and is_score > 0:
+            degradation = (is_score - oos_score) / abs(is_score) * 100
+
+        return {
+            "in_sample_score": is_score,
+            "out_of_sample_score": oos_score,
+            "degradation_percent": degradation,
+            "folds": fold_results,
+        }
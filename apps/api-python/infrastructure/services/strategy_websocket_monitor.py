@@ -43,14 +43,25 @@ from infrastructure.database.repositories.strategy_sql import (
     StrategySignalRepositorySQL,
 )
 from infrastructure.services.bot_broadcast_service import BotBroadcastService
+from infrastructure.cache.candles_cache import INTERVAL_MS
+from infrastructure.services.candle_service import get_candle_service
+from infrastructure.services.condition_compiler import CompiledConditionSet, compile_condition_sets
+from infrastructure.services.custom_timeframe_aggregator import (
+    MINUTE_MS,
+    CustomTimeframeAggregator,
+    aggregate_candles,
+    period_start_ms,
+)
 from infrastructure.services.indicator_alert_monitor import IndicatorAlertMonitor
 
 try:
     import numpy as np
+    from infrastructure.indicators import classic
     NUMPY_AVAILABLE = True
 except ImportError:
     NUMPY_AVAILABLE = False
     np = None
+    classic = None
 
 # Lazy import for modular indicators
 MODULAR_INDICATORS_AVAILABLE = False
@@ -98,12 +109,17 @@ class StrategyRuntimeState:
     # Candle buffers per symbol
     candle_buffers: Dict[str, List[Dict]] = field(default_factory=lambda: defaultdict(list))
 
+    # Custom timeframe (e.g. 12m): 1m candles of the period in progress, per symbol
+    pending_minutes: Dict[str, Dict[int, Dict]] = field(default_factory=lambda: defaultdict(dict))
+
     # Latest indicator values per symbol
     latest_indicators: Dict[str, Dict[str, Any]] = field(default_factory=lambda: defaultdict(dict))
 
     # Conditions (loaded from strategy)
     conditions: Dict[ConditionType, List[Dict]] = field(default_factory=dict)
     condition_operators: Dict[ConditionType, LogicOperator] = field(default_factory=dict)
+    # Compiled once on load (evaluated on every closed candle)
+    compiled_conditions: Dict[ConditionType, CompiledConditionSet] = field(default_factory=dict)
 
     # Last signal time per symbol (cooldown)
     last_signal_time: Dict[str, datetime] = field(default_factory=dict)
@@ -322,6 +338,8 @@ class StrategyWebSocketMonitor:
             state.conditions[cond_type] = cond_list
             state.condition_operators[cond_type] = condition.get("logic_operator", "AND")
 
+        state.compiled_conditions = compile_condition_sets(state.conditions, state.condition_operators)
+
         # Store state
         self._strategies[strategy_id] = state
 
@@ -330,8 +348,8 @@ class StrategyWebSocketMonitor:
             # Load historical candles first
             await self._load_historical_candles(state, symbol)
 
-            # Subscribe to real-time kline stream
-            stream_id = await self._subscribe_kline(symbol, state.timeframe, strategy_id)
+            # Subscribe to real-time kline stream (1m for custom timeframes, aggregated here)
+            stream_id = await self._subscribe_kline(symbol, self._stream_interval(state.timeframe), strategy_id)
             state.stream_ids.append(stream_id)
 
         logger.info(
@@ -359,6 +377,11 @@ class StrategyWebSocketMonitor:
                     await self._ws_manager.unsubscribe(stream_id)
                     del self._subscriptions[stream_id]
 
+    @staticmethod
+    def _stream_interval(timeframe: str) -> str:
+        """Binance only streams native intervals; custom timeframes are built from 1m"""
+        return timeframe if timeframe in INTERVAL_MS else "1m"
+
     async def _subscribe_kline(self, symbol: str, timeframe: str, strategy_id: str) -> str:
         """Subscribe to kline stream and track subscription"""
         stream_id = f"{symbol.lower()}@kline_{timeframe}"
@@ -391,16 +414,20 @@ class StrategyWebSocketMonitor:
         for strategy_id, state in self._strategies.items():
             if symbol not in state.symbols:
                 continue
-            if state.timeframe != timeframe:
+            if self._stream_interval(state.timeframe) != timeframe:
                 continue
 
             try:
                 # Update candle buffer
-                self._update_candle_buffer(state, symbol, kline)
+                if state.timeframe == timeframe:
+                    self._update_candle_buffer(state, symbol, kline)
+                    candle_closed = kline.is_closed
+                else:
+                    candle_closed = self._update_aggregated_buffer(state, symbol, kline)
 
                 # Only evaluate on candle close (most important moment)
-                if kline.is_closed:
-                    print(f"🕯️ [StrategyWSMonitor] Candle closed: {symbol} {timeframe} @ {float(kline.close):.2f}")
+                if candle_closed:
+                    print(f"🕯️ [StrategyWSMonitor] Candle closed: {symbol} {state.timeframe} @ {float(kline.close):.2f}")
                     logger.debug(
                         f"Candle closed - evaluating strategy",
                         strategy=state.strategy_name,
@@ -450,41 +477,77 @@ class StrategyWebSocketMonitor:
         if len(buffer) > state.max_candles:
             state.candle_buffers[symbol] = buffer[-state.max_candles:]
 
+    def _update_aggregated_buffer(self, state: StrategyRuntimeState, symbol: str, kline: KlineData) -> bool:
+        """
+        Custom timeframe: fold a 1m kline into the period in progress.
+        Only the current period's 1m candles are re-aggregated (<= N candles).
+
+        Returns:
+            True when the 1m kline that closes the period is closed
+        """
+        target_minutes = CustomTimeframeAggregator.parse_timeframe(state.timeframe)
+        minute = kline.to_dict()
+        period_start = int(period_start_ms(minute['time'], target_minutes))
+
+        pending = state.pending_minutes[symbol]
+        if any(t < period_start for t in pending):
+            pending.clear()
+        pending[minute['time']] = minute
+
+        aggregated = aggregate_candles(
+            [pending[t] for t in sorted(pending)], target_minutes, drop_partial_first=False
+        )[-1]
+
+        buffer = state.candle_buffers[symbol]
+        if buffer and buffer[-1]['time'] == aggregated['time']:
+            buffer[-1] = aggregated
+        else:
+            buffer.append(aggregated)
+
+        if len(buffer) > state.max_candles:
+            state.candle_buffers[symbol] = buffer[-state.max_candles:]
+
+        return kline.is_closed and minute['time'] + MINUTE_MS >= period_start + target_minutes * MINUTE_MS
+
+    async def _seed_pending_minutes(self, state: StrategyRuntimeState, symbol: str, period_start: int) -> None:
+        """
+        Custom timeframe: load the 1m candles of the period in progress, so the first
+        WebSocket minute re-aggregates the whole period instead of replacing it
+        """
+        target_minutes = CustomTimeframeAggregator.parse_timeframe(state.timeframe)
+        result = await get_candle_service().get_candles(
+            symbol=symbol,
+            interval="1m",
+            limit=target_minutes,
+            start_time=period_start
+        )
+        if not result.get("success"):
+            logger.warning(f"Failed to seed 1m candles of the current period: {result.get('error')}", symbol=symbol)
+            return
+        state.pending_minutes[symbol] = {
+            c['time']: c for c in result["candles"] if c['time'] >= period_start
+        }
+
     async def _load_historical_candles(self, state: StrategyRuntimeState, symbol: str) -> None:
         """Load historical candles for indicator warmup"""
         try:
-            import aiohttp
-
-            url = "https://fapi.binance.com/fapi/v1/klines"
-            params = {
-                "symbol": symbol.upper(),
-                "interval": state.timeframe,
-                "limit": state.max_candles
-            }
-
             print(f"📊 [StrategyWSMonitor] Loading historical candles: {symbol} {state.timeframe}")
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as resp:
-                    if resp.status != 200:
-                        print(f"❌ [StrategyWSMonitor] Failed to fetch historical klines: {resp.status}")
-                        logger.error(f"Failed to fetch historical klines: {resp.status}")
-                        return
-                    klines = await resp.json()
-
-            # Convert to candle format
-            candles = []
-            for k in klines:
-                candle = {
-                    'time': k[0],
-                    'open': float(k[1]),
-                    'high': float(k[2]),
-                    'low': float(k[3]),
-                    'close': float(k[4]),
-                    'volume': float(k[5])
-                }
-                candles.append(candle)
+            result = await get_candle_service().get_candles(
+                symbol=symbol,
+                interval=state.timeframe,
+                limit=state.max_candles
+            )
+            if not result.get("success"):
+                print(f"❌ [StrategyWSMonitor] Failed to fetch historical klines: {result.get('error')}")
+                logger.error(f"Failed to fetch historical klines: {result.get('error')}")
+                return
+
+            # Copia: o buffer recebe os klines do WebSocket e a lista pode vir do cache compartilhado
+            candles = list(result["candles"])
 
             state.candle_buffers[symbol] = candles
+            if candles and self._stream_interval(state.timeframe) != state.timeframe:
+                await self._seed_pending_minutes(state, symbol, candles[-1]['time'])
 
             # Calculate initial indicators
             await self._calculate_indicators(state, symbol)
@@ -733,141 +796,23 @@ class StrategyWebSocketMonitor:
 
     def _get_nadaraya_watson_values(self, closes, params) -> Optional[Dict]:
         """Get NDY values for condition evaluation when no signal"""
-        bandwidth = params.get('bandwidth', 8)
-        mult = params.get('mult', 3.0)
-
-        n = len(closes)
-        if n < bandwidth * 2:
-            return None
-
-        y_hat = np.zeros(n)
-        for i in range(n):
-            sum_weights = 0.0
-            sum_weighted = 0.0
-            for j in range(n):
-                distance = (i - j) / bandwidth
-                weight = np.exp(-0.5 * distance * distance)
-                sum_weights += weight
-                sum_weighted += weight * closes[j]
-            y_hat[i] = sum_weighted / sum_weights if sum_weights > 0 else closes[i]
-
-        mae = np.mean(np.abs(closes - y_hat))
-        upper = y_hat + mult * mae
-        lower = y_hat - mult * mae
-
-        return {
-            'value': float(y_hat[-1]),
-            'upper': float(upper[-1]),
-            'lower': float(lower[-1])
-        }
+        return classic.nadaraya_watson_snapshot(closes, params)
 
     def _get_rsi_values(self, closes, params) -> Optional[Dict]:
         """Get RSI value for condition evaluation"""
-        period = params.get('period', 14)
-        if len(closes) < period + 1:
-            return None
-
-        deltas = np.diff(closes)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-
-        avg_gain = np.zeros(len(deltas))
-        avg_loss = np.zeros(len(deltas))
-        avg_gain[period-1] = np.mean(gains[:period])
-        avg_loss[period-1] = np.mean(losses[:period])
-
-        for i in range(period, len(deltas)):
-            avg_gain[i] = (avg_gain[i-1] * (period-1) + gains[i]) / period
-            avg_loss[i] = (avg_loss[i-1] * (period-1) + losses[i]) / period
-
-        rs = np.where(avg_loss != 0, avg_gain / avg_loss, 100)
-        rsi = 100 - (100 / (1 + rs))
-
-        return {'value': float(rsi[-1])}
+        return classic.rsi_snapshot(closes, params)
 
     def _get_macd_values(self, closes, params) -> Optional[Dict]:
         """Get MACD values for condition evaluation"""
-        fast = params.get('fast', 12)
-        slow = params.get('slow', 26)
-        signal_period = params.get('signal', 9)
-
-        if len(closes) < slow + signal_period:
-            return None
-
-        def ema(data, period):
-            alpha = 2 / (period + 1)
-            result = np.zeros(len(data))
-            result[0] = data[0]
-            for i in range(1, len(data)):
-                result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
-            return result
-
-        ema_fast = ema(closes, fast)
-        ema_slow = ema(closes, slow)
-        macd_line = ema_fast - ema_slow
-        signal_line = ema(macd_line, signal_period)
-
-        return {
-            'macd': float(macd_line[-1]),
-            'signal_line': float(signal_line[-1]),
-            'histogram': float(macd_line[-1] - signal_line[-1])
-        }
+        return classic.macd_snapshot(closes, params)
 
     def _get_bollinger_values(self, closes, params) -> Optional[Dict]:
         """Get Bollinger values for condition evaluation"""
-        period = params.get('period', 20)
-        stddev = params.get('stddev', 2.0)
-
-        if len(closes) < period:
-            return None
-
-        window = closes[-period:]
-        sma = np.mean(window)
-        std = np.std(window)
-        upper = sma + stddev * std
-        lower = sma - stddev * std
-
-        # Calculate bandwidth (percentage of middle band)
-        bandwidth = ((upper - lower) / sma) * 100 if sma > 0 else 0
-
-        # Calculate %B (where price is within the bands)
-        percent_b = (closes[-1] - lower) / (upper - lower) if (upper - lower) > 0 else 0.5
-
-        return {
-            'middle': float(sma),
-            'upper': float(upper),
-            'lower': float(lower),
-            'bandwidth': float(bandwidth),
-            'percent_b': float(percent_b)
-        }
+        return classic.bollinger_snapshot(closes, params)
 
     def _get_ema_cross_values(self, closes, params) -> Optional[Dict]:
         """Get EMA Cross values for condition evaluation"""
-        fast_period = params.get('fast_period', 9)
-        slow_period = params.get('slow_period', 21)
-
-        if len(closes) < slow_period:
-            return None
-
-        def ema(data, period):
-            alpha = 2 / (period + 1)
-            result = np.zeros(len(data))
-            result[0] = data[0]
-            for i in range(1, len(data)):
-                result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
-            return result
-
-        fast_ema = ema(closes, fast_period)
-        slow_ema = ema(closes, slow_period)
-
-        # Determine trend: 1 = bullish (fast > slow), -1 = bearish
-        trend = 1 if fast_ema[-1] > slow_ema[-1] else -1
-
-        return {
-            'fast_ema': float(fast_ema[-1]),
-            'slow_ema': float(slow_ema[-1]),
-            'trend': trend
-        }
+        return classic.ema_cross_snapshot(closes, params)
 
     async def _evaluate_conditions(self, state: StrategyRuntimeState, symbol: str) -> None:
         """Evaluate entry/exit conditions and generate signals"""
@@ -907,10 +852,9 @@ class StrategyWebSocketMonitor:
 
         # Check entry conditions
         for condition_type in [ConditionType.ENTRY_LONG, ConditionType.ENTRY_SHORT]:
-            conditions = state.conditions.get(condition_type, [])
-            operator = state.condition_operators.get(condition_type, LogicOperator.AND)
+            condition_set = state.compiled_conditions.get(condition_type)
 
-            if conditions and self._evaluate_condition_set(conditions, operator, context):
+            if condition_set and condition_set.evaluate(context):
                 signal_type = SignalType.LONG if condition_type == ConditionType.ENTRY_LONG else SignalType.SHORT
                 action = "buy" if signal_type == SignalType.LONG else "sell"
 
@@ -929,108 +873,6 @@ class StrategyWebSocketMonitor:
                 print(f"✅ [StrategyWSMonitor] Signal sent for {symbol}!")
                 break
 
-    def _evaluate_condition_set(
-        self,
-        conditions: List[Dict],
-        operator: LogicOperator,
-        context: Dict[str, float]
-    ) -> bool:
-        """Evaluate a set of conditions with AND/OR logic"""
-        results = []
-
-        for cond in conditions:
-            left_key = cond.get("left", "")
-            right_key = cond.get("right", "")
-            op = cond.get("operator", "")
-
-            left_val = self._get_context_value(left_key, context)
-            right_val = self._get_context_value(right_key, context)
-
-            if left_val is None or right_val is None:
-                print(f"⚠️ [StrategyWSMonitor] Condition skip: {left_key}={left_val} {op} {right_key}={right_val}")
-                continue
-
-            result = self._compare(left_val, op, right_val)
-            print(f"🔍 [StrategyWSMonitor] Condition: {left_key}={left_val:.4f} {op} {right_key}={right_val:.4f} => {result}")
-            results.append(result)
-
-        if not results:
-            print(f"⚠️ [StrategyWSMonitor] No valid conditions evaluated (all skipped)")
-            return False
-
-        final_result = all(results) if operator == LogicOperator.AND else any(results)
-        print(f"✅ [StrategyWSMonitor] Condition set result: {results} with {operator} => {final_result}")
-        return final_result
-
-    def _get_context_value(self, key: str, context: Dict[str, float]) -> Optional[float]:
-        """Get value from context, handling nested keys"""
-        if key in context:
-            return context[key]
-
-        try:
-            return float(key)
-        except ValueError:
-            pass
-
-        # Map common aliases to full indicator names
-        aliases = {
-            # Nadaraya-Watson aliases
-            "ndy.lower": "nadaraya_watson.lower",
-            "ndy.upper": "nadaraya_watson.upper",
-            "ndy.value": "nadaraya_watson.value",
-            # TPO aliases (already correct format, but map for consistency)
-            "tpo.val": "tpo.val",
-            "tpo.vah": "tpo.vah",
-            "tpo.poc": "tpo.poc",
-            # RSI aliases
-            "rsi": "rsi.value",
-            # MACD aliases
-            "macd.signal": "macd.signal_line",
-            # Bollinger aliases
-            "bb.upper": "bollinger.upper",
-            "bb.lower": "bollinger.lower",
-            "bb.middle": "bollinger.middle",
-            "bb.bandwidth": "bollinger.bandwidth",
-            "bb.percent_b": "bollinger.percent_b",
-            # ADX aliases
-            "adx": "adx.adx",
-            "+di": "adx.plus_di",
-            "-di": "adx.minus_di",
-            # SuperTrend aliases
-            "st.trend": "supertrend.trend",
-            "st.value": "supertrend.value",
-            # Ichimoku aliases
-            "ichi.tenkan": "ichimoku.tenkan",
-            "ichi.kijun": "ichimoku.kijun",
-            "ichi.cloud_top": "ichimoku.cloud_top",
-            "ichi.cloud_bottom": "ichimoku.cloud_bottom",
-            # OBV aliases
-            "obv": "obv.obv",
-            "obv.trend": "obv.trend",
-            # EMA cross aliases
-            "ema.fast": "ema_cross.fast_ema",
-            "ema.slow": "ema_cross.slow_ema",
-        }
-
-        if key in aliases:
-            return context.get(aliases[key])
-
-        return None
-
-    def _compare(self, left: float, op: str, right: float) -> bool:
-        """Compare two values"""
-        ops = {
-            "<": lambda a, b: a < b,
-            ">": lambda a, b: a > b,
-            "<=": lambda a, b: a <= b,
-            ">=": lambda a, b: a >= b,
-            "==": lambda a, b: abs(a - b) < 0.0001,
-            "!=": lambda a, b: abs(a - b) >= 0.0001,
-            "crosses_above": lambda a, b: a > b,
-            "crosses_below": lambda a, b: a < b,
-        }
-        return ops.get(op, lambda a, b: False)(left, right)
-
     async def _generate_signal(
         self,
         state: StrategyRuntimeState,
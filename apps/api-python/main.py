@@ -50,6 +50,7 @@ from infrastructure.security.encryption_service import EncryptionService
 from infrastructure.pricing.binance_price_service import BinancePriceService
 from infrastructure.cache import start_cache_cleanup_task
 from infrastructure.cache.candles_cache import start_candles_cache_cleanup
+from infrastructure.cache.shared_cache import SharedCache, shared_cache_backend
 from infrastructure.services.indicator_alert_monitor import get_indicator_alert_monitor
 from infrastructure.services.strategy_websocket_monitor import get_strategy_ws_monitor
 from infrastructure.services.strategy_engine_service import start_strategy_engine
@@ -59,6 +60,13 @@ from infrastructure.config.settings import get_settings
 from infrastructure.database.connection_transaction_mode import transaction_db
 from infrastructure.database.connection import database_manager
 from infrastructure.services.order_processor import order_processor
+from infrastructure.services.order_history_sync_service import get_order_history_sync_service
+from infrastructure.services.candle_service import get_candle_service
+from infrastructure.services.bot_signal_queue import get_bot_signal_worker
+from infrastructure.services.bot_routing_table import get_bot_routing_table
+from infrastructure.services.bot_stats_buffer import get_bot_stats_buffer
+from infrastructure.services.backtest_job_runner import get_backtest_job_runner
+from infrastructure.pricing.price_oracle import PRICE_FEEDS_STARTED_AT_BOOT, get_price_oracle, get_running_oracles
 from infrastructure.di import cleanup_container
 
 
@@ -109,6 +117,20 @@ async def lifespan(app: FastAPI):
         # await redis_manager.connect()
         logger.info("Redis connection skipped for integration testing")
 
+        # Shared cache L2 (Redis) - caches degradam para L1 (memória) se indisponível
+        await shared_cache_backend.connect()
+
+        # Bot routing table (webhook path -> bot + subscriptions in memory) and batched bot stats
+        await get_bot_routing_table(transaction_db).start()
+        await get_bot_stats_buffer(transaction_db).start()
+
+        # Shared price oracles (one bulk ticker request per feed every few seconds)
+        for feed in PRICE_FEEDS_STARTED_AT_BOOT:
+            await get_price_oracle(feed).start()
+
+        # Start master webhook signal workers (consume bot_signal_queue)
+        await get_bot_signal_worker(transaction_db).start()
+
         # Start background sync scheduler
         logger.info("🚀 Starting background sync scheduler with real prices (30s interval)")
         await sync_scheduler.start()  # Habilitado para dados em tempo real
@@ -173,6 +195,15 @@ async def lifespan(app: FastAPI):
         logger.info("🛑 Stopping background sync scheduler")
         await sync_scheduler.stop()
 
+        # Stop signal workers (unfinished signals stay in the queue)
+        await get_bot_signal_worker(transaction_db).stop()
+        await get_bot_routing_table(transaction_db).stop()
+        await get_bot_stats_buffer(transaction_db).stop()  # flush pending counters
+
+        # Stop price oracle refresh loops
+        for oracle in get_running_oracles():
+            await oracle.stop()
+
         # Stop indicator alert monitor
         await indicator_alert_monitor.stop()
 
@@ -184,6 +215,15 @@ async def lifespan(app: FastAPI):
         if strategy_engine:
             await strategy_engine.stop()
 
+        # Stop backtest job processes (running jobs are cancelled)
+        get_backtest_job_runner().shutdown()
+
+        # Close shared candle HTTP session
+        await get_candle_service().close()
+
+        # Close shared cache L2 (Redis + pub/sub listener)
+        await shared_cache_backend.disconnect()
+
         # Close connections
         await transaction_db.disconnect()
         await database_manager.disconnect()
@@ -694,13 +734,12 @@ async def get_all_relevant_symbols(exchange_account_id: str) -> list:
 
 
 # 🚀 SISTEMA DE CACHE SIMPLES PARA ORDERS
-import asyncio
-from typing import Dict, List, Any, Optional
+from typing import Dict, Any, Optional
 from time import time
 
-# Cache global para orders (em memória)
-orders_cache: Dict[str, Dict[str, Any]] = {}
+# Cache de orders compartilhado entre workers (L1 em memória + L2 Redis)
 CACHE_DURATION = 60  # 60 segundos
+orders_cache = SharedCache("orders", default_ttl=CACHE_DURATION)
 
 def get_cache_key(account_id: str, date_from: Optional[str], date_to: Optional[str]) -> str:
     """Gera chave única para o cache baseada nos parâmetros"""
@@ -712,95 +751,18 @@ def is_cache_valid(cache_entry: Dict[str, Any]) -> bool:
         return False
     return (time() - cache_entry.get('timestamp', 0)) < CACHE_DURATION
 
-async def fetch_orders_for_symbol(connector, symbol: str, start_time: Optional[int], end_time: Optional[int]) -> List[Dict]:
-    """Busca ordens para um símbolo específico (SPOT + FUTURES) com tratamento de erros"""
-    orders = []
-
-    try:
-        # SPOT Orders
-        try:
-            spot_result = await connector.get_account_orders(
-                symbol=symbol,
-                limit=500,
-                start_time=start_time,
-                end_time=end_time
-            )
-            if spot_result.get('success', True):
-                spot_orders = spot_result.get('orders', [])
-                for order in spot_orders:
-                    order['_market_type'] = 'SPOT'
-                orders.extend(spot_orders)
-        except Exception as e:
-            if "Symbol is closed" not in str(e) and "Invalid symbol" not in str(e):
-                print(f"⚠️ Erro SPOT {symbol}: {str(e)[:50]}")
-
-        # FUTURES Orders (últimos 7 dias apenas)
-        try:
-            futures_result = await connector.get_futures_orders(
-                symbol=symbol,
-                limit=500,
-                start_time=None,  # Limitação: apenas 7 dias
-                end_time=None
-            )
-            if futures_result.get('success', True):
-                futures_orders = futures_result.get('orders', [])
-                for order in futures_orders:
-                    order['_market_type'] = 'FUTURES'
-                orders.extend(futures_orders)
-        except Exception as e:
-            if "Symbol is closed" not in str(e) and "Invalid symbol" not in str(e):
-                print(f"⚠️ Erro FUTURES {symbol}: {str(e)[:50]}")
-
-    except Exception as e:
-        print(f"❌ Erro geral para {symbol}: {str(e)[:50]}")
-
-    if orders:
-        print(f"✅ {symbol}: {len(orders)} ordens encontradas")
-
-    return orders
-
-async def fetch_orders_parallel(connector, symbols: List[str], start_time: Optional[int], end_time: Optional[int]) -> List[Dict]:
-    """Busca ordens para múltiplos símbolos em paralelo (chunks de 10)"""
-    all_orders = []
-
-    # 🚀 PERFORMANCE: Chunks maiores para paralelização mais eficiente
-    chunk_size = 20  # Aumentado de 10 para 20 (Binance suporta até ~50 req/s)
-    chunks = [symbols[i:i+chunk_size] for i in range(0, len(symbols), chunk_size)]
-
-    print(f"🚀 Processando {len(symbols)} símbolos em {len(chunks)} lotes paralelos de até {chunk_size} símbolos")
-
-    for i, chunk in enumerate(chunks):
-        print(f"📦 Lote {i+1}/{len(chunks)}: {len(chunk)} símbolos")
-
-        # Criar tasks para buscar em paralelo
-        tasks = [
-            fetch_orders_for_symbol(connector, symbol, start_time, end_time)
-            for symbol in chunk
-        ]
-
-        # Executar em paralelo e coletar resultados
-        chunk_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Processar resultados
-        for result in chunk_results:
-            if isinstance(result, list):
-                all_orders.extend(result)
-            elif isinstance(result, Exception):
-                print(f"⚠️ Erro em lote: {str(result)[:50]}")
-
-    return all_orders
-
 # 📊 ENDPOINTS PARA FRONTEND - VISUALIZAÇÃO DE ORDENS
 @app.get("/api/v1/orders")
 async def get_orders(
     limit: int = Query(default=50, description="Limite de ordens a retornar"),
     exchange_account_id: str = Query(default=None, description="ID da conta de exchange"),
     date_from: str = Query(default=None, description="Data inicial (YYYY-MM-DD)"),
-    date_to: str = Query(default=None, description="Data final (YYYY-MM-DD)")
+    date_to: str = Query(default=None, description="Data final (YYYY-MM-DD)"),
+    refresh: bool = Query(default=False, description="Sincroniza ordens novas (delta) antes de responder")
 ):
-    """Lista ordens com filtros para o frontend - COM CACHE E PARALELIZAÇÃO"""
+    """Lista ordens com filtros para o frontend - servidas do banco (sync incremental)"""
     try:
-        print(f"🔍 FASE 2: Buscando ordens com CACHE + PARALELIZAÇÃO")
+        print(f"🔍 Buscando ordens do banco (sync incremental por watermark)")
         print(f"🔍 Filtros: account_id={exchange_account_id}, date_from={date_from}, date_to={date_to}, limit={limit}")
 
         # FASE 1: Se não especificar conta, usar conta principal
@@ -824,16 +786,13 @@ async def get_orders(
 
         # CACHE: Verificar se temos dados em cache válidos
         cache_key = get_cache_key(account_id_to_use, date_from, date_to)
-        cached_data = orders_cache.get(cache_key)
+        cached_data = None if refresh else await orders_cache.get(cache_key)
 
-        if cached_data and is_cache_valid(cached_data):
+        if cached_data and is_cache_valid(cached_data) and not refresh:
             print(f"✨ CACHE HIT! Retornando {len(cached_data['data'])} ordens do cache (idade: {int(time() - cached_data['timestamp'])}s)")
             return {"success": True, "data": cached_data['data'][:limit], "total": len(cached_data['data']), "cached": True}
 
-        print(f"🔄 CACHE MISS - Buscando dados frescos da API...")
-
-        # Buscar ordens direto da Binance via connector
-        connector = await get_exchange_connector(account_id_to_use)
+        print(f"🔄 CACHE MISS - Buscando ordens do banco...")
 
         # Configurar filtros de tempo - PADRÃO: Últimos 3 meses se não especificado
         start_time = None
@@ -859,113 +818,26 @@ async def get_orders(
             start_time = int(three_months_ago.timestamp() * 1000)
             print(f"🗓️ Aplicando filtro padrão: últimos 3 meses (desde {three_months_ago.strftime('%Y-%m-%d')})")
 
-        # SISTEMA HÍBRIDO: Buscar símbolos dinamicamente para MÁXIMA cobertura
-        all_symbols = await get_all_relevant_symbols(exchange_account_id)
-
-        # Filtrar símbolos problemáticos conhecidos
-        symbols_blacklist = ['NEOUSDT', 'IOTAUSDT']  # Símbolos deslistados
-        all_symbols = [s for s in all_symbols if s not in symbols_blacklist and ' ' not in s]
+        # 📥 SYNC INCREMENTAL: ordens ficam no banco (exchange_order_history) e o
+        # background job mantém atualizadas via watermarks. Só vai na exchange aqui
+        # no primeiro acesso da conta ou quando refresh=true (apenas delta).
+        order_sync = get_order_history_sync_service(transaction_db)
 
-        print(f"🎯 Sistema Híbrido: {len(all_symbols)} símbolos válidos para busca paralela")
+        if refresh or not await order_sync.has_synced(account_id_to_use):
+            connector = await get_exchange_connector(account_id_to_use)
+            # Primeiro sync: descoberta híbrida de símbolos para cobertura completa
+            all_symbols = await get_all_relevant_symbols(account_id_to_use)
+            sync_result = await order_sync.sync_account(account_id_to_use, connector, symbols=all_symbols)
+            print(f"📥 Sync incremental: {sync_result}")
 
-        # 🚀 PARALELIZAÇÃO: Buscar ordens em paralelo (muito mais rápido!)
         start_fetch_time = time()
-        all_raw_orders = await fetch_orders_parallel(connector, all_symbols, start_time, end_time)
-        fetch_duration = time() - start_fetch_time
-
-        print(f"⚡ Busca paralela completada em {fetch_duration:.2f}s (vs ~{len(all_symbols)*2}s sequencial)")
-
-        # Ordenar por data (mais recentes primeiro) - CRUCIAL para mostrar ordens atuais
-        all_raw_orders.sort(key=lambda x: int(x.get('updateTime', x.get('time', 0))), reverse=True)
-
-        # 🧠 BUSCA HÍBRIDA: Complementar com ordens históricas do banco se necessário
-        if len(all_raw_orders) < limit and limit > 100:
-            print(f"🔍 BUSCA HÍBRIDA: API retornou {len(all_raw_orders)} ordens, buscando {limit - len(all_raw_orders)} do banco...")
-
-            try:
-                # Buscar ordens históricas do banco (mais antigas que as da API)
-                oldest_api_time = None
-                if all_raw_orders:
-                    oldest_api_time = min([int(order.get('updateTime', order.get('time', 0))) for order in all_raw_orders])
-                    oldest_api_date = datetime.fromtimestamp(oldest_api_time / 1000)
-                    print(f"📅 Ordem mais antiga da API: {oldest_api_date}")
-
-                # Query para buscar ordens do banco anteriores às da API
-                historical_limit = min(limit - len(all_raw_orders), 500)  # Limite de segurança
-
-                if oldest_api_time:
-                    historical_orders_query = """
-                        SELECT
-                            id, symbol, side, 'market' as order_type, quantity, price, status,
-                            exchange, exchange_order_id, filled_quantity, average_price,
-                            created_at, updated_at, operation_type, entry_exit,
-                            margin_usdt, profit_loss, order_id
-                        FROM orders
-                        WHERE created_at < $1 AND exchange_account_id = $2
-                        ORDER BY created_at DESC
-                        LIMIT $3
-                    """
-                    historical_orders_db = await transaction_db.fetch(
-                        historical_orders_query,
-                        oldest_api_date,
-                        account_id_to_use,
-                        historical_limit
-                    )
-                else:
-                    # Se não há ordens da API, buscar as mais recentes do banco
-                    historical_orders_query = """
-                        SELECT
-                            id, symbol, side, 'market' as order_type, quantity, price, status,
-                            exchange, exchange_order_id, filled_quantity, average_price,
-                            created_at, updated_at, operation_type, entry_exit,
-                            margin_usdt, profit_loss, order_id
-                        FROM orders
-                        WHERE exchange_account_id = $1
-                        ORDER BY created_at DESC
-                        LIMIT $2
-                    """
-                    historical_orders_db = await transaction_db.fetch(
-                        historical_orders_query,
-                        account_id_to_use,
-                        historical_limit
-                    )
-
-                # Converter ordens do banco para formato compatível
-                historical_orders = []
-                for order in historical_orders_db:
-                    historical_order = {
-                        'orderId': str(order['exchange_order_id']),
-                        'symbol': order['symbol'],
-                        'side': order['side'].upper(),
-                        'type': order['order_type'].upper(),
-                        'origQty': str(order['quantity']),
-                        'price': str(order['price']),
-                        'status': order['status'].upper(),
-                        'executedQty': str(order['filled_quantity']),
-                        'cummulativeQuoteQty': str(float(order['filled_quantity']) * float(order['average_price'])),
-                        'time': int(order['created_at'].timestamp() * 1000),
-                        'updateTime': int(order['updated_at'].timestamp() * 1000),
-                        '_market_type': order['operation_type'].upper(),
-                        '_source': 'DATABASE',
-                        '_order_id': order['order_id'],
-                        '_profit_loss': order['profit_loss']
-                    }
-                    historical_orders.append(historical_order)
-
-                print(f"✅ BUSCA HÍBRIDA: {len(historical_orders)} ordens históricas encontradas no banco")
-
-                # Mesclar ordens da API + banco
-                all_raw_orders.extend(historical_orders)
-
-                # Re-ordenar por data após mesclar
-                all_raw_orders.sort(key=lambda x: int(x.get('updateTime', x.get('time', 0))), reverse=True)
-
-                print(f"🔗 TOTAL APÓS BUSCA HÍBRIDA: {len(all_raw_orders)} ordens (API + Banco)")
-
-            except Exception as e:
-                print(f"⚠️ Erro na busca híbrida: {e}")
-        else:
-            print(f"✅ API forneceu {len(all_raw_orders)} ordens suficientes, sem necessidade de busca no banco")
+        all_raw_orders = await order_sync.get_orders(
+            account_id_to_use,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit if limit < 1000 else None
+        )
+        print(f"⚡ {len(all_raw_orders)} ordens lidas do banco em {(time() - start_fetch_time) * 1000:.0f}ms")
 
         # FASE 1: Aplicar limite inteligente - se muito dados, pegar só os mais recentes
         if len(all_raw_orders) > limit and limit < 1000:
@@ -1246,10 +1118,10 @@ async def get_orders(
         print(f"✅ Processadas {len(orders_list)} ordens com sucesso")
 
         # CACHE: Salvar resultado no cache para próximas requisições
-        orders_cache[cache_key] = {
+        await orders_cache.set(cache_key, {
             'data': orders_list,
             'timestamp': time()
-        }
+        })
         print(f"💾 Resultado salvo no cache (válido por {CACHE_DURATION}s)")
 
         return {"success": True, "data": orders_list, "total": len(orders_list)}
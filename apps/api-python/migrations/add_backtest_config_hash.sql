@@ -0,0 +1,11 @@
+-- Migration: Result cache key for strategy backtests
+-- config_hash = sha256 of strategy definition (timeframe, indicators, conditions),
+-- symbol(s), date range, backtest config and engine version. Identical backtests
+-- over closed candles reuse the stored result instead of re-simulating.
+
+ALTER TABLE strategy_backtest_results
+    ADD COLUMN IF NOT EXISTS config_hash VARCHAR(64);
+
+CREATE INDEX IF NOT EXISTS idx_strategy_backtest_results_config_hash
+    ON strategy_backtest_results (strategy_id, config_hash, created_at DESC)
+    WHERE config_hash IS NOT NULL;
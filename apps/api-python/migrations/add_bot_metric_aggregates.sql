@@ -0,0 +1,59 @@
+-- Migration: Running aggregates for bot win rate / P&L metrics
+-- bots.avg_win_rate and bots.avg_pnl_pct are kept current incrementally on every
+-- trade close (BotTradeTrackerService.record_trade_close) from these counters;
+-- GET /admin/bots/metrics/calculate rebuilds all of them in one set-based statement.
+-- The counters are backfilled below with the same formulas, so the incremental
+-- updates start from the history already in bot_trades / bot_subscriptions.
+
+ALTER TABLE bots
+    ADD COLUMN IF NOT EXISTS total_wins INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_losses INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_pnl_usd DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    -- Closed trades with a known pnl_pct (denominator of avg_pnl_pct)
+    ADD COLUMN IF NOT EXISTS closed_trades_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS pnl_pct_sum DECIMAL(20, 6) NOT NULL DEFAULT 0;
+
+-- Backfill (same aggregation as BotTradeTrackerService.recompute_bot_metrics)
+WITH subscription_totals AS (
+    SELECT
+        bot_id,
+        COALESCE(SUM(win_count), 0) AS total_wins,
+        COALESCE(SUM(loss_count), 0) AS total_losses,
+        COALESCE(SUM(total_pnl_usd), 0) AS total_pnl_usd
+    FROM bot_subscriptions
+    GROUP BY bot_id
+),
+trade_totals AS (
+    SELECT
+        bs.bot_id,
+        COUNT(*) AS closed_trades_count,
+        SUM(bt.pnl_pct) AS pnl_pct_sum
+    FROM bot_trades bt
+    JOIN bot_subscriptions bs ON bt.subscription_id = bs.id
+    WHERE bt.status = 'closed' AND bt.pnl_pct IS NOT NULL
+    GROUP BY bs.bot_id
+),
+metrics AS (
+    SELECT
+        b.id AS bot_id,
+        COALESCE(s.total_wins, 0) AS total_wins,
+        COALESCE(s.total_losses, 0) AS total_losses,
+        COALESCE(s.total_pnl_usd, 0) AS total_pnl_usd,
+        COALESCE(t.closed_trades_count, 0) AS closed_trades_count,
+        COALESCE(t.pnl_pct_sum, 0) AS pnl_pct_sum
+    FROM bots b
+    LEFT JOIN subscription_totals s ON s.bot_id = b.id
+    LEFT JOIN trade_totals t ON t.bot_id = b.id
+    WHERE b.status != 'archived'
+)
+UPDATE bots
+SET total_wins = m.total_wins,
+    total_losses = m.total_losses,
+    total_pnl_usd = m.total_pnl_usd,
+    closed_trades_count = m.closed_trades_count,
+    pnl_pct_sum = m.pnl_pct_sum,
+    avg_win_rate = m.total_wins * 100.0 / NULLIF(m.total_wins + m.total_losses, 0),
+    avg_pnl_pct = NULLIF(m.pnl_pct_sum / NULLIF(m.closed_trades_count, 0), 0),
+    updated_at = NOW()
+FROM metrics m
+WHERE bots.id = m.bot_id;
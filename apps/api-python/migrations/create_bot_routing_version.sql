@@ -0,0 +1,60 @@
+-- Migration: Change counter for the in-memory bot routing table
+-- BotRoutingTable keeps bots (webhook path -> config) and their active
+-- subscriptions in memory. Workers poll this single-row counter (LISTEN does
+-- not survive pgBouncer transaction mode) and reload only when it changes.
+-- Triggers bump it when a column the routing table uses changes; statistics
+-- columns (total_signals_sent, last_signal_at, ...) and the live risk counters
+-- (current_daily_loss_usd, current_positions) do not bump it - they change on
+-- every fill, so BotBroadcastService reads them from the database instead.
+
+CREATE TABLE IF NOT EXISTS bot_routing_version (
+    id SMALLINT PRIMARY KEY DEFAULT 1,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    CONSTRAINT check_bot_routing_version_single_row CHECK (id = 1)
+);
+
+INSERT INTO bot_routing_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+-- Trigger arguments = watched columns. UPDATEs that touch none of them are ignored.
+CREATE OR REPLACE FUNCTION bump_bot_routing_version() RETURNS TRIGGER AS $$
+DECLARE
+    unchanged BOOLEAN;
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        SELECT bool_and((to_jsonb(OLD) -> col) IS NOT DISTINCT FROM (to_jsonb(NEW) -> col))
+          INTO unchanged
+          FROM unnest(TG_ARGV) AS col;
+        IF unchanged THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    UPDATE bot_routing_version SET version = version + 1, updated_at = NOW() WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_bots_routing_version ON bots;
+CREATE TRIGGER trg_bots_routing_version
+    AFTER INSERT OR UPDATE OR DELETE ON bots
+    FOR EACH ROW EXECUTE FUNCTION bump_bot_routing_version(
+        'name', 'status', 'market_type', 'master_webhook_path', 'allowed_directions',
+        'default_leverage', 'default_margin_usd', 'default_stop_loss_pct', 'default_take_profit_pct'
+    );
+
+DROP TRIGGER IF EXISTS trg_bot_subscriptions_routing_version ON bot_subscriptions;
+CREATE TRIGGER trg_bot_subscriptions_routing_version
+    AFTER INSERT OR UPDATE OR DELETE ON bot_subscriptions
+    FOR EACH ROW EXECUTE FUNCTION bump_bot_routing_version(
+        'status', 'bot_id', 'user_id', 'exchange_account_id',
+        'custom_leverage', 'custom_margin_usd', 'custom_stop_loss_pct', 'custom_take_profit_pct',
+        'max_daily_loss_usd', 'max_concurrent_positions'
+    );
+
+DROP TRIGGER IF EXISTS trg_exchange_accounts_routing_version ON exchange_accounts;
+CREATE TRIGGER trg_exchange_accounts_routing_version
+    AFTER UPDATE OR DELETE ON exchange_accounts
+    FOR EACH ROW EXECUTE FUNCTION bump_bot_routing_version(
+        'exchange', 'api_key', 'secret_key', 'position_mode', 'is_active'
+    );
@@ -0,0 +1,42 @@
+-- Migration: Durable queue for master webhook signals (outbox)
+-- The master webhook only validates + enqueues here and answers TradingView
+-- immediately; BotSignalWorker instances consume the queue with
+-- FOR UPDATE SKIP LOCKED and run the broadcast (at-least-once).
+
+CREATE TABLE IF NOT EXISTS bot_signal_queue (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+
+    -- Pre-allocated bot_signals.id: re-deliveries reuse it so executions are deduplicated
+    signal_id UUID NOT NULL UNIQUE,
+    -- Dedupe key: alert id sent by the client or a fingerprint of the payload
+    dedupe_key VARCHAR(255) NOT NULL UNIQUE,
+
+    bot_id UUID NOT NULL REFERENCES bots(id) ON DELETE CASCADE,
+    ticker VARCHAR(50) NOT NULL,
+    action VARCHAR(50) NOT NULL,
+    source_ip VARCHAR(50),
+    payload JSONB,
+
+    -- pending -> processing -> done | failed (pending again on retry)
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    locked_at TIMESTAMP WITH TIME ZONE,
+    locked_by VARCHAR(100),
+    last_error TEXT,
+    result JSONB,
+
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    completed_at TIMESTAMP WITH TIME ZONE,
+
+    CONSTRAINT check_bot_signal_queue_status CHECK (status IN ('pending', 'processing', 'done', 'failed'))
+);
+
+-- Consumers only scan claimable rows
+CREATE INDEX IF NOT EXISTS idx_bot_signal_queue_claimable
+    ON bot_signal_queue(available_at)
+    WHERE status IN ('pending', 'processing');
+
+CREATE INDEX IF NOT EXISTS idx_bot_signal_queue_created_at
+    ON bot_signal_queue(created_at);
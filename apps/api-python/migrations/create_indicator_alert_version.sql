@@ -0,0 +1,44 @@
+-- Migration: Change counter for the in-memory indicator alert set
+-- IndicatorAlertMonitor keeps the active alerts in memory, grouped by
+-- symbol/timeframe, and polls this single-row counter instead of re-reading
+-- every alert on each cycle (same scheme as bot_routing_version).
+-- Trigger bookkeeping (last_triggered_at, trigger_count, updated_at) does not
+-- bump it: it changes on every alert fired, and the monitor already keeps the
+-- cooldown in memory (loaded from last_triggered_at on each reload).
+
+CREATE TABLE IF NOT EXISTS indicator_alert_version (
+    id SMALLINT PRIMARY KEY DEFAULT 1,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    CONSTRAINT check_indicator_alert_version_single_row CHECK (id = 1)
+);
+
+INSERT INTO indicator_alert_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+-- Trigger arguments = watched columns. UPDATEs that touch none of them are ignored.
+CREATE OR REPLACE FUNCTION bump_indicator_alert_version() RETURNS TRIGGER AS $$
+DECLARE
+    unchanged BOOLEAN;
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        SELECT bool_and((to_jsonb(OLD) -> col) IS NOT DISTINCT FROM (to_jsonb(NEW) -> col))
+          INTO unchanged
+          FROM unnest(TG_ARGV) AS col;
+        IF unchanged THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    UPDATE indicator_alert_version SET version = version + 1, updated_at = NOW() WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_indicator_alerts_version ON indicator_alerts;
+CREATE TRIGGER trg_indicator_alerts_version
+    AFTER INSERT OR UPDATE OR DELETE ON indicator_alerts
+    FOR EACH ROW EXECUTE FUNCTION bump_indicator_alert_version(
+        'is_active', 'user_id', 'indicator_type', 'symbol', 'timeframe', 'signal_type',
+        'indicator_params', 'message_template', 'push_enabled', 'email_enabled',
+        'sound_type', 'cooldown_seconds'
+    );
@@ -0,0 +1,67 @@
+-- Migration: Incremental order-history sync
+-- Stores exchange orders locally and tracks a per-(account, symbol, market) watermark
+-- so each sync only pulls orders newer than the last one already stored.
+
+-- Local copy of exchange orders (SPOT + FUTURES), served by GET /api/v1/orders
+CREATE TABLE IF NOT EXISTS exchange_order_history (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    exchange_account_id UUID NOT NULL REFERENCES exchange_accounts(id) ON DELETE CASCADE,
+    exchange VARCHAR(20) NOT NULL,
+    market_type VARCHAR(10) NOT NULL, -- 'SPOT' or 'FUTURES'
+
+    -- Order identity
+    exchange_order_id VARCHAR(100) NOT NULL,
+    symbol VARCHAR(50) NOT NULL,
+    side VARCHAR(10) NOT NULL,
+    order_type VARCHAR(30) NOT NULL DEFAULT 'market',
+    status VARCHAR(30) NOT NULL,
+
+    -- Quantities / prices
+    quantity DECIMAL(30, 12) NOT NULL DEFAULT 0,
+    price DECIMAL(30, 12),
+    filled_quantity DECIMAL(30, 12) NOT NULL DEFAULT 0,
+    average_price DECIMAL(30, 12),
+    quote_quantity DECIMAL(30, 12),
+
+    -- Exchange timestamps (ms since epoch, as returned by the exchange)
+    order_time BIGINT NOT NULL,
+    update_time BIGINT NOT NULL,
+
+    raw_response JSONB,
+
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    UNIQUE(exchange_account_id, market_type, exchange_order_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_exchange_order_history_account_time
+    ON exchange_order_history(exchange_account_id, update_time DESC);
+CREATE INDEX IF NOT EXISTS idx_exchange_order_history_account_symbol
+    ON exchange_order_history(exchange_account_id, symbol, market_type);
+
+-- Sync watermark per (account, symbol, market)
+CREATE TABLE IF NOT EXISTS order_sync_watermarks (
+    exchange_account_id UUID NOT NULL REFERENCES exchange_accounts(id) ON DELETE CASCADE,
+    symbol VARCHAR(50) NOT NULL,
+    market_type VARCHAR(10) NOT NULL,
+
+    -- Newest order already stored (NULL = symbol never had orders)
+    last_order_id VARCHAR(100),
+    -- Next sync starts from here (ms): time of the newest order stored. Orders
+    -- still open are re-polled separately until they reach a final status.
+    last_order_time BIGINT,
+
+    last_synced_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (exchange_account_id, symbol, market_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_order_sync_watermarks_synced_at
+    ON order_sync_watermarks(last_synced_at);
+
+-- Accounts that completed at least one sync (even with no symbols to track)
+CREATE TABLE IF NOT EXISTS order_sync_accounts (
+    exchange_account_id UUID PRIMARY KEY REFERENCES exchange_accounts(id) ON DELETE CASCADE,
+    last_synced_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
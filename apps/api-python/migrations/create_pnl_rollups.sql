@@ -0,0 +1,51 @@
+-- Migration: Materialized P&L rollups (hourly/daily buckets)
+-- One row per (scope, scope_id, granularity, bucket) with realized P&L and trade
+-- counts of closed bot trades. Scopes: subscription, bot, account (exchange
+-- account). Maintained incrementally by BotTradeTrackerService.record_trade_close
+-- (PnlRollupService.record_trade); performance charts read a bounded number of
+-- buckets instead of scanning bot_trades or calling the exchange API.
+
+CREATE TABLE IF NOT EXISTS pnl_rollups (
+    scope VARCHAR(20) NOT NULL,
+    scope_id UUID NOT NULL,
+    granularity VARCHAR(10) NOT NULL,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    pnl_usd DECIMAL(20, 8) NOT NULL DEFAULT 0,
+    trades_count INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    PRIMARY KEY (scope, scope_id, granularity, bucket_start),
+    CONSTRAINT check_pnl_rollups_scope CHECK (scope IN ('subscription', 'bot', 'account')),
+    CONSTRAINT check_pnl_rollups_granularity CHECK (granularity IN ('hour', 'day'))
+);
+
+-- Backfill from closed trades (idempotent: rebuilds every bucket)
+INSERT INTO pnl_rollups (scope, scope_id, granularity, bucket_start, pnl_usd, trades_count, wins, losses)
+SELECT
+    s.scope,
+    s.scope_id,
+    g.granularity,
+    date_trunc(g.granularity, bt.exit_time) AS bucket_start,
+    COALESCE(SUM(bt.pnl_usd), 0),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE bt.is_winner = true),
+    COUNT(*) FILTER (WHERE bt.is_winner = false)
+FROM bot_trades bt
+JOIN bot_subscriptions bs ON bs.id = bt.subscription_id
+CROSS JOIN LATERAL (
+    VALUES ('subscription', bs.id), ('bot', bs.bot_id), ('account', bs.exchange_account_id)
+) AS s(scope, scope_id)
+CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+WHERE bt.status = 'closed'
+  AND bt.exit_time IS NOT NULL
+  AND bt.pnl_usd IS NOT NULL
+  AND s.scope_id IS NOT NULL
+GROUP BY s.scope, s.scope_id, g.granularity, date_trunc(g.granularity, bt.exit_time)
+ON CONFLICT (scope, scope_id, granularity, bucket_start) DO UPDATE
+SET pnl_usd = EXCLUDED.pnl_usd,
+    trades_count = EXCLUDED.trades_count,
+    wins = EXCLUDED.wins,
+    losses = EXCLUDED.losses,
+    updated_at = NOW();
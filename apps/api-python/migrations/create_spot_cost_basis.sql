@@ -0,0 +1,38 @@
+-- Migration: Spot cost-basis ledger
+-- One row per (exchange account, asset) with the running average cost and the
+-- open FIFO lots of spot buys. Maintained incrementally by SpotCostBasisLedger
+-- every time OrderHistorySyncService stores new SPOT fills, so spot P&L is a
+-- primary-key lookup instead of a scan over the whole order history.
+
+CREATE TABLE IF NOT EXISTS spot_cost_basis (
+    exchange_account_id UUID NOT NULL REFERENCES exchange_accounts(id) ON DELETE CASCADE,
+    asset VARCHAR(20) NOT NULL,
+
+    -- Tracked position (fills synced from the exchange)
+    quantity DECIMAL(30, 12) NOT NULL DEFAULT 0,
+    total_cost DECIMAL(30, 12) NOT NULL DEFAULT 0,  -- average-cost method (USD)
+    avg_cost DECIMAL(30, 12) NOT NULL DEFAULT 0,
+    fifo_cost DECIMAL(30, 12) NOT NULL DEFAULT 0,   -- cost of the open FIFO lots (USD)
+    realized_pnl DECIMAL(30, 12) NOT NULL DEFAULT 0,
+    realized_pnl_fifo DECIMAL(30, 12) NOT NULL DEFAULT 0,
+
+    -- Open lots, oldest first: [[quantity, price], ...]
+    lots JSONB NOT NULL DEFAULT '[]'::jsonb,
+
+    fills_count INTEGER NOT NULL DEFAULT 0,
+    last_fill_time BIGINT,  -- ms since epoch (exchange update_time)
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (exchange_account_id, asset)
+);
+
+-- Quantity of each order already applied to the ledger (partial fills apply only the delta)
+CREATE TABLE IF NOT EXISTS spot_cost_basis_fills (
+    exchange_account_id UUID NOT NULL REFERENCES exchange_accounts(id) ON DELETE CASCADE,
+    exchange_order_id VARCHAR(100) NOT NULL,
+    asset VARCHAR(20) NOT NULL,
+    applied_quantity DECIMAL(30, 12) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (exchange_account_id, exchange_order_id)
+);
@@ -0,0 +1,60 @@
+"""Add news dedupe index and source fetch state
+
+Revision ID: 20251227_0002
+Revises: 20251227_0001
+Create Date: 2025-12-27 00:02:00.000000
+
+Tables:
+- news_article_index: URL/title hashes of articles already collected
+- news_source_state: ETag/Last-Modified per source URL (conditional requests)
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20251227_0002"
+down_revision: Union[str, None] = "20251227_0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create news_article_index and news_source_state tables"""
+
+    op.create_table(
+        "news_article_index",
+        sa.Column("key_hash", sa.String(length=40), nullable=False),  # sha1 of url:/title: key
+        sa.Column("source", sa.String(length=32), nullable=False),
+        sa.Column("first_seen_at", sa.DateTime(timezone=True), nullable=False,
+                  server_default=sa.text("NOW()")),
+        sa.PrimaryKeyConstraint("key_hash"),
+    )
+
+    # Index for retention cleanup
+    op.create_index(
+        "ix_news_article_index_first_seen_at",
+        "news_article_index",
+        ["first_seen_at"]
+    )
+
+    op.create_table(
+        "news_source_state",
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column("source", sa.String(length=32), nullable=False),
+        sa.Column("etag", sa.Text(), nullable=True),
+        sa.Column("last_modified", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False,
+                  server_default=sa.text("NOW()")),
+        sa.PrimaryKeyConstraint("url"),
+    )
+
+
+def downgrade() -> None:
+    """Remove news_article_index and news_source_state tables"""
+
+    op.drop_table("news_source_state")
+
+    op.drop_index("ix_news_article_index_first_seen_at", table_name="news_article_index")
+    op.drop_table("news_article_index")
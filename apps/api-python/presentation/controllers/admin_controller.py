@@ -6,10 +6,13 @@ from fastapi import APIRouter, Request, HTTPException, Depends
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from uuid import UUID
+from datetime import datetime, timedelta
 import structlog
 import secrets
 
 from infrastructure.database.connection_transaction_mode import transaction_db
+from infrastructure.services.pnl_rollup_service import PnlRollupService
+from infrastructure.cache.principal_cache import get_principal_cache
 
 logger = structlog.get_logger(__name__)
 
@@ -76,31 +79,16 @@ async def verify_admin(request: Request):
     if not user_id:
         raise HTTPException(status_code=401, detail="Admin authentication required")
 
-    # Check if user is admin - first try admins table, then fallback to users.is_admin
-    is_admin = await transaction_db.fetchval("""
-        SELECT EXISTS(
-            SELECT 1 FROM admins a
-            INNER JOIN users u ON u.id = a.user_id
-            WHERE a.user_id = $1 AND a.is_active = true AND u.is_admin = true
-        )
-    """, user_id)
-
-    # Fallback: Check if user has is_admin flag in users table (simpler check)
-    if not is_admin:
-        is_admin = await transaction_db.fetchval("""
-            SELECT EXISTS(
-                SELECT 1 FROM users WHERE id = $1 AND is_admin = true
-            )
-        """, user_id)
+    # Admin flag (users.is_admin) and admins row come from the cached principal:
+    # one query per TTL instead of up to three per request
+    principal = await get_principal_cache().get(user_id)
+    is_admin = principal["is_admin"]
 
     # DEV ONLY: Allow any authenticated user in development
     env = os.environ.get('ENV', 'dev').lower()
     if not is_admin and env in ('dev', 'development'):
         # Check if user exists at all
-        user_exists = await transaction_db.fetchval("""
-            SELECT EXISTS(SELECT 1 FROM users WHERE id = $1)
-        """, user_id)
-        if user_exists:
+        if principal["exists"]:
             logger.warning("DEV MODE: Allowing non-admin user for admin endpoint", user_id=user_id)
             is_admin = True
 
@@ -719,6 +707,32 @@ async def get_bot_stats(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/bots/{bot_id}/performance")
+async def get_bot_performance(
+    bot_id: str,
+    days: int = 30,
+    granularity: str = "day",
+    admin_user_id: str = Depends(verify_admin)
+):
+    """Realized P&L history of a bot (all subscriptions) from the hourly/daily rollups"""
+    try:
+        rollups = PnlRollupService(transaction_db)
+        history = await rollups.get_history(
+            "bot", [bot_id], granularity, datetime.now() - timedelta(days=days)
+        )
+
+        return {
+            "success": True,
+            "data": {"history": history, "summary": rollups.summarize(history)}
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error getting bot performance", bot_id=bot_id, error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ============================================================================
 # EXCHANGES MANAGEMENT (Admin)
 # ============================================================================
@@ -885,75 +899,33 @@ async def calculate_bot_metrics(
     - Win Rate: (total wins / total trades) * 100 across all subscriptions
     - Avg P&L %: Average P&L percentage from closed trades
     - Also updates total_subscribers count
+
+    Full set-based recomputation (one statement for all bots). Metrics are also
+    kept current incrementally on every trade close, so this only corrects drift.
     """
     try:
-        # Get all active bots
-        bots = await transaction_db.fetch("""
-            SELECT id, name FROM bots WHERE status != 'archived'
-        """)
+        from infrastructure.services.bot_trade_tracker_service import BotTradeTrackerService
 
-        updated_bots = []
+        tracker = BotTradeTrackerService(transaction_db)
+        rows = await tracker.recompute_bot_metrics()
 
-        for bot in bots:
-            bot_id = str(bot["id"])
-
-            # Calculate metrics from bot_subscriptions
-            subscription_metrics = await transaction_db.fetchrow("""
-                SELECT
-                    COUNT(*) FILTER (WHERE status = 'active') as active_subscribers,
-                    COALESCE(SUM(win_count), 0) as total_wins,
-                    COALESCE(SUM(loss_count), 0) as total_losses,
-                    COALESCE(SUM(total_pnl_usd), 0) as total_pnl_usd,
-                    COALESCE(SUM(total_orders_executed), 0) as total_orders
-                FROM bot_subscriptions
-                WHERE bot_id = $1
-            """, bot_id)
-
-            total_wins = int(subscription_metrics["total_wins"] or 0)
-            total_losses = int(subscription_metrics["total_losses"] or 0)
-            total_trades = total_wins + total_losses
-            active_subscribers = int(subscription_metrics["active_subscribers"] or 0)
-            total_pnl_usd = float(subscription_metrics["total_pnl_usd"] or 0)
-            total_orders = int(subscription_metrics["total_orders"] or 0)
-
-            # Calculate Win Rate
-            win_rate = (total_wins / total_trades * 100) if total_trades > 0 else None
-
-            # Calculate Average P&L % from bot_trades if available
-            avg_pnl_pct = await transaction_db.fetchval("""
-                SELECT AVG(pnl_pct)
-                FROM bot_trades bt
-                JOIN bot_subscriptions bs ON bt.subscription_id = bs.id
-                WHERE bs.bot_id = $1 AND bt.status = 'closed' AND bt.pnl_pct IS NOT NULL
-            """, bot_id)
-
-            # If no trades in bot_trades, estimate from total P&L
-            if avg_pnl_pct is None and total_orders > 0 and total_pnl_usd != 0:
-                # Rough estimate: assume average trade size and calculate %
-                # This is a fallback when detailed trade data isn't available
-                avg_pnl_pct = None  # Keep null if we can't calculate properly
-
-            # Update the bot record
-            await transaction_db.execute("""
-                UPDATE bots
-                SET
-                    total_subscribers = $2,
-                    avg_win_rate = $3,
-                    avg_pnl_pct = $4,
-                    updated_at = NOW()
-                WHERE id = $1
-            """, bot_id, active_subscribers, win_rate, float(avg_pnl_pct) if avg_pnl_pct else None)
+        updated_bots = []
+        for row in rows:
+            total_wins = int(row["total_wins"])
+            total_losses = int(row["total_losses"])
+            win_rate = row["avg_win_rate"]
+            avg_pnl_pct = row["avg_pnl_pct"]
 
             updated_bots.append({
-                "bot_id": bot_id,
-                "name": bot["name"],
-                "active_subscribers": active_subscribers,
+                "bot_id": str(row["bot_id"]),
+                "name": row["name"],
+                "active_subscribers": int(row["active_subscribers"]),
                 "total_wins": total_wins,
                 "total_losses": total_losses,
-                "total_trades": total_trades,
-                "win_rate": round(win_rate, 2) if win_rate else None,
+                "total_trades": total_wins + total_losses,
+                "win_rate": round(float(win_rate), 2) if win_rate else None,
                 "avg_pnl_pct": round(float(avg_pnl_pct), 2) if avg_pnl_pct else None,
-                "total_pnl_usd": round(total_pnl_usd, 2)
+                "total_pnl_usd": round(float(row["total_pnl_usd"]), 2)
             })
 
         logger.info("Bot metrics calculated", updated_count=len(updated_bots), admin_user_id=admin_user_id)
@@ -12,6 +12,7 @@ import structlog
 
 from infrastructure.database.connection_transaction_mode import transaction_db
 from infrastructure.services.bot_trade_tracker_service import BotTradeTrackerService
+from infrastructure.services.pnl_rollup_service import PnlRollupService
 
 logger = structlog.get_logger(__name__)
 
@@ -1182,7 +1183,8 @@ async def unsubscribe_from_bot(subscription_id: str, user_id: str):
 async def get_subscription_performance(
     subscription_id: str,
     user_id: str,
-    days: int = Query(default=30, ge=1, le=365, description="Number of days to fetch history")
+    days: int = Query(default=30, ge=1, le=365, description="Number of days to fetch history"),
+    live: bool = Query(default=False, description="Reconcile P&L with the exchange API (slow)")
 ):
     """
     Get performance metrics and P&L history for a subscription.
@@ -1190,8 +1192,9 @@ async def get_subscription_performance(
     ALL statistics are filtered by the date range (days parameter).
 
     P&L Source Priority:
-    1. Try to fetch from exchange API (BingX/Binance) - most accurate
-    2. Fallback to database (bot_trades table) if exchange fails
+    1. Exchange API (BingX/Binance) - only when live=true
+    2. Daily P&L rollups (pnl_rollups, updated on every trade close)
+    3. Fallback to database (bot_pnl_history / bot_trades tables)
     """
     try:
         # Verify subscription exists and belongs to user - include exchange account info
@@ -1254,7 +1257,9 @@ async def get_subscription_performance(
                 logger.warning(f"No trading_symbol configured and couldn't extract from bot name '{bot_name}' - P&L will be unfiltered!")
 
         # =====================================================
-        # TRY EXCHANGE P&L FIRST (Primary Source)
+        # EXCHANGE P&L (opt-in via live=true)
+        # Paginates the exchange income history on every call, so chart
+        # refreshes read the rollups instead
         # =====================================================
         exchange_pnl_result = None
         pnl_source = "database"  # Track where P&L came from
@@ -1265,7 +1270,7 @@ async def get_subscription_performance(
             api_secret = subscription["secret_key"]
             is_testnet = subscription["testnet"] or False
 
-            if exchange_type and api_key and api_secret:
+            if live and exchange_type and api_key and api_secret:
                 logger.info(f"Fetching P&L from {exchange_type} for symbols: {bot_symbols}")
 
                 exchange_pnl_result = await fetch_pnl_from_exchange(
@@ -1414,6 +1419,17 @@ async def get_subscription_performance(
             pnl_history = exchange_pnl_result["pnl_history"]
             logger.info(f"Using EXCHANGE P&L history: {len(pnl_history)} days")
         else:
+            # Daily rollups: one row per day in the window
+            try:
+                pnl_history = await PnlRollupService(transaction_db).get_history(
+                    "subscription", [subscription_id], "day", start_date
+                )
+                if pnl_history:
+                    logger.info(f"Using P&L rollups history: {len(pnl_history)} days")
+            except Exception as e:
+                logger.warning(f"Could not fetch P&L rollups: {e}")
+
+        if not pnl_history:
             # Fallback: Try to get P&L history from bot_pnl_history table
             try:
                 history_records = await transaction_db.fetch("""
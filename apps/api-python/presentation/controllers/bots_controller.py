@@ -14,7 +14,8 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from infrastructure.database.connection_transaction_mode import transaction_db
-from infrastructure.services.bot_broadcast_service import BotBroadcastService
+from infrastructure.services.bot_routing_table import get_bot_routing_table
+from infrastructure.services.bot_signal_queue import get_bot_signal_worker
 
 logger = structlog.get_logger(__name__)
 
@@ -362,15 +363,19 @@ async def delete_bot(bot_id: str):
 # MASTER WEBHOOK ENDPOINT (TradingView)
 # ============================================================================
 
-@router.post("/webhook/master/{webhook_path}")
+@router.post("/webhook/master/{webhook_path}", status_code=202)
 @limiter.limit("10/minute")  # Max 10 signals per minute per IP
 async def master_webhook(webhook_path: str, request: Request):
     """
     Master webhook endpoint for receiving TradingView signals
-    This endpoint broadcasts signals to all active bot subscriptions
+    This endpoint validates the signal, persists it to the signal queue and answers
+    immediately (TradingView times out quickly); BotSignalWorker broadcasts it to
+    all active bot subscriptions.
 
     Authentication: The webhook_path itself is unique and secret (no password needed in payload)
     Rate Limit: 10 requests per minute per IP address
+    Deduplication: an optional "signal_id"/"alert_id" in the payload identifies the alert;
+    otherwise identical payloads within 60s are treated as TradingView retries
 
     Args:
         webhook_path: Unique secret path identifying the bot (acts as authentication token)
@@ -452,58 +457,48 @@ async def master_webhook(webhook_path: str, request: Request):
             )
 
         # Get bot by webhook path (webhook_path itself is the authentication)
-        bot = await transaction_db.fetchrow("""
-            SELECT id, name, status
-            FROM bots
-            WHERE master_webhook_path = $1
-        """, webhook_path)
+        # In-memory routing table: no DB read on the hot path
+        bot = await get_bot_routing_table(transaction_db).get_by_path(webhook_path)
 
         if not bot:
             logger.warning("Bot not found for webhook path", webhook_path=webhook_path)
             raise HTTPException(status_code=404, detail="Invalid webhook path")
 
         # Check if bot is active
-        if bot["status"] != "active":
+        if bot.status != "active":
             logger.warning(
                 "Bot is not active",
                 webhook_path=webhook_path,
-                bot_id=str(bot["id"]),
-                status=bot["status"]
+                bot_id=str(bot.bot_id),
+                status=bot.status
             )
             raise HTTPException(
                 status_code=400,
-                detail=f"Bot is {bot['status']}, cannot process signals"
+                detail=f"Bot is {bot.status}, cannot process signals"
             )
 
-        # Broadcast signal to all active subscriptions
-        broadcast_service = BotBroadcastService(transaction_db)
+        # Enqueue for broadcast (workers execute for all active subscriptions)
+        signal_worker = get_bot_signal_worker(transaction_db)
 
-        result = await broadcast_service.broadcast_signal(
-            bot_id=bot["id"],
+        queued = await signal_worker.queue.enqueue(
+            bot_id=bot.bot_id,
             ticker=ticker,
             action=action,
             source_ip=request.client.host if request.client else "unknown",
             payload=payload
         )
 
-        # Update bot statistics
-        await transaction_db.execute("""
-            UPDATE bots
-            SET total_signals_sent = total_signals_sent + 1,
-                updated_at = NOW()
-            WHERE id = $1
-        """, bot["id"])
+        if queued["duplicate"]:
+            logger.info("Duplicate signal ignored", bot_id=str(bot.bot_id), signal_id=str(queued["signal_id"]))
+        else:
+            signal_worker.notify()
 
         return {
             "success": True,
-            "bot_name": bot["name"],
-            "signal_id": result["signal_id"],
-            "broadcast_stats": {
-                "total_subscribers": result["total_subscribers"],
-                "successful_executions": result["successful"],
-                "failed_executions": result["failed"],
-                "duration_ms": result["duration_ms"]
-            },
+            "queued": True,
+            "duplicate": queued["duplicate"],
+            "bot_name": bot.name,
+            "signal_id": str(queued["signal_id"]),
             "timestamp": datetime.utcnow().isoformat()
         }
 
@@ -12,9 +12,9 @@ import json
 from decimal import Decimal
 
 from infrastructure.database.connection import get_db_session
-from infrastructure.database.models.candle import Candle as CandleModel
 from infrastructure.database.repositories.candle_repository import CandleRepository
-from presentation.middleware.auth import get_current_user
+from infrastructure.services.candle_service import get_candle_service
+from presentation.middleware.auth import get_current_principal
 from infrastructure.exchanges.bingx_connector import BingXConnector
 from infrastructure.config.settings import get_settings
 
@@ -50,8 +50,7 @@ async def get_historical_data(
     end_time: Optional[int] = Query(None, description="End time in milliseconds"),
     limit: int = Query(1000, ge=1, le=1000, description="Number of candles to fetch"),
     use_cache: bool = Query(True, description="Use cached data if available"),
-    session: AsyncSession = Depends(get_db_session),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_principal)
 ) -> Dict[str, Any]:
     """
     Obtém dados históricos de candles
@@ -67,85 +66,34 @@ async def get_historical_data(
             interval_ms = get_interval_milliseconds(interval)
             start_time = end_time - (interval_ms * limit)
 
-        # Inicializar repository
-        repo = CandleRepository(session)
-        cached_candles = []
-
-        # Verificar cache se habilitado
-        if use_cache:
-            cached_candles = await repo.get_candles(
-                symbol=symbol,
-                interval=interval,
-                start_time=start_time,
-                end_time=end_time,
-                limit=limit
-            )
-
-            if cached_candles and len(cached_candles) >= limit * 0.8:  # Se tem 80% dos dados pedidos
-                # Converter para formato de resposta
-                candles = [
-                    {
-                        "time": c.time,
-                        "open": c.open,
-                        "high": c.high,
-                        "low": c.low,
-                        "close": c.close,
-                        "volume": c.volume
-                    }
-                    for c in cached_candles
-                ]
-
-                return {
-                    "success": True,
-                    "symbol": symbol,
-                    "interval": interval,
-                    "candles": candles,
-                    "count": len(candles),
-                    "cached": True,
-                    "start_time": start_time,
-                    "end_time": end_time
-                }
-
-        # Buscar dados da Binance
-        candles = await fetch_binance_klines(symbol, interval, start_time, end_time, limit)
-
-        # Salvar no cache para próximas requisições
-        if candles and use_cache:
-            try:
-                now_ms = int(datetime.now().timestamp() * 1000)
-                candles_to_save = [
-                    CandleModel(
-                        symbol=symbol,
-                        interval=interval,
-                        time=candle["time"],
-                        open=candle["open"],
-                        high=candle["high"],
-                        low=candle["low"],
-                        close=candle["close"],
-                        volume=candle["volume"],
-                        created_at=now_ms,
-                        updated_at=now_ms
-                    )
-                    for candle in candles
-                ]
-
-                inserted = await repo.save_candles(candles_to_save)
-                print(f"✅ Cached {inserted} candles for {symbol} {interval}")
-            except Exception as cache_error:
-                print(f"⚠️ Error caching candles: {cache_error}")
-                # Não falhar a requisição se o cache falhar
+        # CandleService: memória -> banco (candles) -> Binance, com gravação dos candles fechados
+        result = await get_candle_service().get_candles(
+            symbol=symbol,
+            interval=interval,
+            limit=limit,
+            start_time=start_time,
+            end_time=end_time,
+            market_type="spot",
+            use_database=use_cache
+        )
+
+        if not result["success"]:
+            raise Exception(result.get("error", "Failed to fetch candles"))
 
         return {
             "success": True,
             "symbol": symbol,
             "interval": interval,
-            "candles": candles,
-            "count": len(candles),
-            "cached": False,
+            "candles": result["candles"],
+            "count": len(result["candles"]),
+            "cached": result.get("source") in ("memory", "database"),
             "start_time": start_time,
             "end_time": end_time
         }
 
+    except ValueError as e:
+        # Intervalo inválido (não nativo e não agregável)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error fetching historical data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -155,7 +103,7 @@ async def get_historical_data(
 async def get_websocket_config(
     symbol: str = Query(..., description="Trading pair symbol"),
     testnet: bool = Query(False, description="Use testnet"),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_principal)
 ) -> Dict[str, Any]:
     """
     Retorna configuração para conexão WebSocket
@@ -194,7 +142,7 @@ async def get_websocket_config(
 async def get_available_symbols(
     exchange: str = Query("binance", description="Exchange name"),
     market_type: str = Query("spot", description="Market type (spot/futures)"),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_principal)
 ) -> Dict[str, Any]:
     """
     Lista símbolos disponíveis para trading
@@ -224,7 +172,7 @@ async def clear_cache(
     symbol: Optional[str] = Query(None, description="Clear specific symbol or all"),
     interval: Optional[str] = Query(None, description="Clear specific interval"),
     session: AsyncSession = Depends(get_db_session),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_principal)
 ) -> Dict[str, Any]:
     """
     Limpa cache de candles do banco de dados
@@ -261,7 +209,7 @@ async def validate_candles(
     symbol: str = Query(..., description="Trading pair symbol"),
     interval: str = Query("1m", description="Kline interval"),
     session: AsyncSession = Depends(get_db_session),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_principal)
 ) -> Dict[str, Any]:
     """
     Valida integridade dos dados de candles no cache
@@ -303,46 +251,6 @@ def get_interval_milliseconds(interval: str) -> int:
     return intervals.get(interval, 60000)
 
 
-async def fetch_binance_klines(
-    symbol: str,
-    interval: str,
-    start_time: int,
-    end_time: int,
-    limit: int
-) -> List[Dict[str, Any]]:
-    """Busca klines da API da Binance"""
-
-    url = "https://api.binance.com/api/v3/klines"
-    params = {
-        "symbol": symbol.upper().replace("/", ""),
-        "interval": interval,
-        "startTime": start_time,
-        "endTime": end_time,
-        "limit": min(limit, 1000)
-    }
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                raise Exception(f"Binance API error: {response.status} - {error_text}")
-
-            data = await response.json()
-
-            candles = []
-            for kline in data:
-                candles.append({
-                    "time": kline[0],
-                    "open": float(kline[1]),
-                    "high": float(kline[2]),
-                    "low": float(kline[3]),
-                    "close": float(kline[4]),
-                    "volume": float(kline[5])
-                })
-
-            return candles
-
-
 async def fetch_binance_symbols(market_type: str) -> List[str]:
     """Busca símbolos disponíveis da Binance"""
 
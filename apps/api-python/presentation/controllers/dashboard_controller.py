@@ -9,12 +9,15 @@ import jwt
 import uuid as uuid_module
 
 from infrastructure.database.connection_transaction_mode import transaction_db
-from infrastructure.cache import get_positions_cache
+from infrastructure.cache import get_positions_cache, get_principal_cache
+from infrastructure.services.pnl_rollup_service import PnlRollupService
+from infrastructure.services.spot_cost_basis_ledger import get_spot_cost_basis_ledger
 from infrastructure.exchanges.binance_connector import BinanceConnector
 from infrastructure.exchanges.bybit_connector import BybitConnector
 from infrastructure.exchanges.bingx_connector import BingXConnector
 from infrastructure.exchanges.bitget_connector import BitgetConnector
 from infrastructure.pricing.binance_price_service import BinancePriceService
+from infrastructure.pricing.price_oracle import get_price_oracle, get_running_oracles
 import os
 
 logger = structlog.get_logger(__name__)
@@ -243,6 +246,41 @@ def create_dashboard_router() -> APIRouter:
             logger.error("Error getting P&L chart", error=str(e), exc_info=True)
             raise HTTPException(status_code=500, detail="Failed to get P&L chart data")
 
+    @router.get("/performance")
+    async def get_performance(request: Request, days: int = 30, granularity: str = "day"):
+        """Realized bot P&L of the user's accounts from the hourly/daily rollups"""
+        try:
+            user_uuid = get_user_uuid_from_request(request)
+            if not user_uuid:
+                return {"success": True, "data": {"history": [], "summary": PnlRollupService.summarize([])}}
+
+            if granularity not in ("hour", "day"):
+                raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+
+            account_ids = await transaction_db.fetch("""
+                SELECT id FROM exchange_accounts
+                WHERE user_id = $1 AND testnet = false
+            """, user_uuid)
+
+            rollups = PnlRollupService(transaction_db)
+            history = await rollups.get_history(
+                "account",
+                [row["id"] for row in account_ids],
+                granularity,
+                datetime.now() - timedelta(days=days)
+            )
+
+            return {
+                "success": True,
+                "data": {"history": history, "summary": rollups.summarize(history)}
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Error getting performance", error=str(e), exc_info=True)
+            raise HTTPException(status_code=500, detail="Failed to get performance data")
+
     @router.get("/balances")
     async def get_balances_summary(request: Request):
         """Get futures and spot balances summary with cache - filtered by authenticated user"""
@@ -379,48 +417,49 @@ def create_dashboard_router() -> APIRouter:
                                 if spot_balances_result.get('success'):
                                     raw_balances = spot_balances_result.get('balances', [])
 
-                                    # Get all BUY orders for this account to calculate average cost
-                                    buy_orders_query = await transaction_db.fetch("""
-                                        SELECT symbol, quantity, price, created_at
-                                        FROM orders
-                                        WHERE exchange_account_id = $1
-                                          AND LOWER(side::text) = 'buy'
-                                          AND status = 'filled'
-                                        ORDER BY created_at ASC
-                                    """, str(main_account['id']))
-
-                                    # Calculate average buy price for each asset
+                                    # Average cost per asset from the spot cost-basis ledger (indexed lookup)
                                     avg_buy_prices = {}
                                     last_buy_prices = {}
-
-                                    for order in buy_orders_query:
-                                        symbol = order['symbol']
-                                        asset = symbol.replace('USDT', '').replace('-', '')
-
-                                        if asset not in avg_buy_prices:
-                                            avg_buy_prices[asset] = {'total_qty': 0, 'total_cost': 0}
-
-                                        qty = float(order['quantity'])
-                                        price = float(order['price'])
-                                        avg_buy_prices[asset]['total_qty'] += qty
-                                        avg_buy_prices[asset]['total_cost'] += (qty * price)
-                                        last_buy_prices[asset] = price
-
-                                    for asset in avg_buy_prices:
-                                        if avg_buy_prices[asset]['total_qty'] > 0:
-                                            avg_buy_prices[asset]['avg_price'] = avg_buy_prices[asset]['total_cost'] / avg_buy_prices[asset]['total_qty']
-
-                                    # Get current prices from BingX
+                                    ledger = get_spot_cost_basis_ledger(transaction_db)
+                                    if await ledger.is_initialized(str(main_account['id'])):
+                                        ledger_costs, last_buy_prices = await ledger.get_cost_references(str(main_account['id']))
+                                        for asset, avg_cost in ledger_costs.items():
+                                            avg_buy_prices[asset] = {'avg_price': avg_cost}
+                                    else:
+                                        # Ledger not built yet for this account: scan the BUY orders
+                                        buy_orders_query = await transaction_db.fetch("""
+                                            SELECT symbol, quantity, price, created_at
+                                            FROM orders
+                                            WHERE exchange_account_id = $1
+                                              AND LOWER(side::text) = 'buy'
+                                              AND status = 'filled'
+                                            ORDER BY created_at ASC
+                                        """, str(main_account['id']))
+
+                                        for order in buy_orders_query:
+                                            symbol = order['symbol']
+                                            asset = symbol.replace('USDT', '').replace('-', '')
+
+                                            if asset not in avg_buy_prices:
+                                                avg_buy_prices[asset] = {'total_qty': 0, 'total_cost': 0}
+
+                                            qty = float(order['quantity'])
+                                            price = float(order['price'])
+                                            avg_buy_prices[asset]['total_qty'] += qty
+                                            avg_buy_prices[asset]['total_cost'] += (qty * price)
+                                            last_buy_prices[asset] = price
+
+                                        for asset in avg_buy_prices:
+                                            if avg_buy_prices[asset]['total_qty'] > 0:
+                                                avg_buy_prices[asset]['avg_price'] = avg_buy_prices[asset]['total_cost'] / avg_buy_prices[asset]['total_qty']
+
+                                    # Get current prices from the shared BingX price oracle (memory read)
                                     price_cache = {'USDT': 1.0, 'USDC': 1.0}
-                                    all_prices_result = await connector.get_all_ticker_prices()
-                                    if all_prices_result.get('success'):
-                                        for ticker in all_prices_result.get('data', []):
-                                            symbol = ticker.get('symbol', '')
-                                            if 'USDT' in symbol:
-                                                asset = symbol.replace('-USDT', '').replace('USDT', '')
-                                                price = float(ticker.get('lastPrice', 0))
-                                                if price > 0:
-                                                    price_cache[asset] = price
+                                    bingx_prices = await get_price_oracle("bingx").ensure_fresh()
+                                    for bal in raw_balances:
+                                        price = bingx_prices.get(f"{bal['asset']}USDT")
+                                        if price:
+                                            price_cache[bal['asset']] = price
 
                                     # Calculate P&L for each spot asset
                                     for bal in raw_balances:
@@ -765,6 +804,8 @@ def create_dashboard_router() -> APIRouter:
         try:
             metrics = cache.get_metrics()
             logger.info("📊 Cache metrics retrieved", **metrics)
+            metrics["price_oracles"] = [oracle.get_status() for oracle in get_running_oracles()]
+            metrics["principals"] = get_principal_cache().get_metrics()
             return {"success": True, "data": metrics}
         except Exception as e:
             logger.error("Error getting cache metrics", error=str(e), exc_info=True)
@@ -852,40 +893,46 @@ def create_dashboard_router() -> APIRouter:
 
                 raw_balances = balances_result.get('balances', [])
 
-                # Get all BUY orders for this account to calculate average cost
-                buy_orders_query = await transaction_db.fetch("""
-                    SELECT symbol, quantity, price, created_at
-                    FROM orders
-                    WHERE exchange_account_id = $1
-                      AND LOWER(side::text) = 'buy'
-                      AND status = 'filled'
-                    ORDER BY created_at ASC
-                """, exchange_account_id)
-
-                # Calculate average buy price for each asset + store last buy price
+                # Average cost per asset from the spot cost-basis ledger (indexed lookup,
+                # maintained by the order history sync)
                 avg_buy_prices = {}
                 last_buy_prices = {}  # Store the most recent buy price as fallback
-
-                for order in buy_orders_query:
-                    symbol = order['symbol']
-                    # Extract asset from symbol (e.g., LINKUSDT -> LINK)
-                    asset = symbol.replace('USDT', '').replace('-', '')
-
-                    if asset not in avg_buy_prices:
-                        avg_buy_prices[asset] = {'total_qty': 0, 'total_cost': 0}
-
-                    qty = float(order['quantity'])
-                    price = float(order['price'])
-                    avg_buy_prices[asset]['total_qty'] += qty
-                    avg_buy_prices[asset]['total_cost'] += (qty * price)
-
-                    # Store last buy price (will be overwritten with most recent)
-                    last_buy_prices[asset] = price
-
-                # Calculate average prices
-                for asset in avg_buy_prices:
-                    if avg_buy_prices[asset]['total_qty'] > 0:
-                        avg_buy_prices[asset]['avg_price'] = avg_buy_prices[asset]['total_cost'] / avg_buy_prices[asset]['total_qty']
+                ledger = get_spot_cost_basis_ledger(transaction_db)
+                if await ledger.is_initialized(exchange_account_id):
+                    ledger_costs, last_buy_prices = await ledger.get_cost_references(exchange_account_id)
+                    for asset, avg_cost in ledger_costs.items():
+                        avg_buy_prices[asset] = {'avg_price': avg_cost}
+                else:
+                    # Ledger not built yet for this account: scan the BUY orders
+                    buy_orders_query = await transaction_db.fetch("""
+                        SELECT symbol, quantity, price, created_at
+                        FROM orders
+                        WHERE exchange_account_id = $1
+                          AND LOWER(side::text) = 'buy'
+                          AND status = 'filled'
+                        ORDER BY created_at ASC
+                    """, exchange_account_id)
+
+                    for order in buy_orders_query:
+                        symbol = order['symbol']
+                        # Extract asset from symbol (e.g., LINKUSDT -> LINK)
+                        asset = symbol.replace('USDT', '').replace('-', '')
+
+                        if asset not in avg_buy_prices:
+                            avg_buy_prices[asset] = {'total_qty': 0, 'total_cost': 0}
+
+                        qty = float(order['quantity'])
+                        price = float(order['price'])
+                        avg_buy_prices[asset]['total_qty'] += qty
+                        avg_buy_prices[asset]['total_cost'] += (qty * price)
+
+                        # Store last buy price (will be overwritten with most recent)
+                        last_buy_prices[asset] = price
+
+                    # Calculate average prices
+                    for asset in avg_buy_prices:
+                        if avg_buy_prices[asset]['total_qty'] > 0:
+                            avg_buy_prices[asset]['avg_price'] = avg_buy_prices[asset]['total_cost'] / avg_buy_prices[asset]['total_qty']
 
                 # PERFORMANCE OPTIMIZATION: Fetch all prices in batch (1 API call instead of N)
                 # Extract unique assets that need price lookup
@@ -895,17 +942,25 @@ def create_dashboard_router() -> APIRouter:
                 price_cache = {}
                 if assets_needing_prices:
                     try:
-                        # Get all BingX ticker prices in ONE call
-                        all_prices_result = await connector.get_all_ticker_prices()
-                        if all_prices_result.get('success'):
-                            for ticker in all_prices_result.get('data', []):
-                                symbol = ticker.get('symbol', '')
-                                # Extract base asset (e.g., AERO-USDT -> AERO)
-                                if 'USDT' in symbol:
-                                    asset = symbol.replace('-USDT', '').replace('USDT', '')
-                                    price = float(ticker.get('lastPrice', 0))
-                                    if price > 0:
-                                        price_cache[asset] = price
+                        if not testnet:
+                            # Shared BingX price oracle: memory read, no API call per request
+                            bingx_prices = await get_price_oracle("bingx").ensure_fresh()
+                            for asset in assets_needing_prices:
+                                price = bingx_prices.get(f"{asset}USDT")
+                                if price:
+                                    price_cache[asset] = price
+                        else:
+                            # Get all BingX ticker prices in ONE call
+                            all_prices_result = await connector.get_all_ticker_prices()
+                            if all_prices_result.get('success'):
+                                for ticker in all_prices_result.get('data', []):
+                                    symbol = ticker.get('symbol', '')
+                                    # Extract base asset (e.g., AERO-USDT -> AERO)
+                                    if 'USDT' in symbol:
+                                        asset = symbol.replace('-USDT', '').replace('USDT', '')
+                                        price = float(ticker.get('lastPrice', 0))
+                                        if price > 0:
+                                            price_cache[asset] = price
                     except Exception as e:
                         logger.warning(f"Failed to fetch batch prices from BingX: {e}")
 
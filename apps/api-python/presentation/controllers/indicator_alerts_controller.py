@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from enum import Enum
 
 from infrastructure.database.connection_transaction_mode import transaction_db
+from infrastructure.services.indicator_alert_monitor import invalidate_indicator_alerts
 from presentation.middleware.auth import get_current_user_id
 
 logger = structlog.get_logger(__name__)
@@ -402,6 +403,7 @@ def create_indicator_alerts_router() -> APIRouter:
                alert.signal_type.value, alert.indicator_params, message_template,
                alert.push_enabled, alert.email_enabled, alert.sound_type.value,
                alert.cooldown_seconds)
+            invalidate_indicator_alerts()
 
             logger.info("Indicator alert created",
                        alert_id=str(alert_id),
@@ -503,6 +505,7 @@ def create_indicator_alerts_router() -> APIRouter:
                 SET {", ".join(update_fields)}
                 WHERE id = ${param_count} AND user_id = ${param_count + 1}
             """, *params)
+            invalidate_indicator_alerts()
 
             logger.info("Indicator alert updated", alert_id=alert_id)
 
@@ -529,6 +532,7 @@ def create_indicator_alerts_router() -> APIRouter:
                 DELETE FROM indicator_alerts
                 WHERE id = $1 AND user_id = $2
             """, alert_id, current_user_id)
+            invalidate_indicator_alerts()
 
             logger.info("Indicator alert deleted", alert_id=alert_id)
 
@@ -560,6 +564,7 @@ def create_indicator_alerts_router() -> APIRouter:
 
             if not result:
                 raise HTTPException(status_code=404, detail="Alert not found")
+            invalidate_indicator_alerts()
 
             logger.info("Indicator alert toggled", alert_id=alert_id, is_active=result["is_active"])
 
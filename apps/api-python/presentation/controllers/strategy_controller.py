@@ -3,12 +3,12 @@ Strategy Controller
 Handles all strategy-related endpoints (CRUD, backtest, signals, engine status)
 """
 
-import asyncio
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 
 import structlog
@@ -22,6 +22,7 @@ from infrastructure.database.models.strategy import (
 )
 from infrastructure.services.strategy_service import StrategyService
 from infrastructure.services.backtest_service import BacktestService, BacktestConfig
+from infrastructure.services.backtest_series import decode_equity_curve
 from infrastructure.services.advanced_backtest_service import (
     AdvancedBacktestService,
     AdvancedBacktestConfig,
@@ -31,7 +32,15 @@ from infrastructure.services.advanced_backtest_service import (
     MonteCarloConfig,
     DataSource,
 )
+from infrastructure.services.strategy_optimizer_service import (
+    OptimizationConfig,
+    ParameterRange,
+    StrategyOptimizerService,
+)
 from infrastructure.services.strategy_engine_service import get_strategy_engine
+from infrastructure.services.backtest_job_runner import BacktestJob, get_backtest_job_runner
+from presentation.controllers.websocket_controller import notify_backtest_update
+from presentation.middleware.auth import get_current_user_id
 
 logger = structlog.get_logger(__name__)
 
@@ -999,6 +1008,105 @@ async def get_recent_signals(
 # Backtest Endpoints
 # ============================================================================
 
+def _backtest_config(payload: BacktestRequest) -> BacktestConfig:
+    return BacktestConfig(
+        initial_capital=Decimal(str(payload.initial_capital)),
+        leverage=payload.leverage,
+        margin_percent=Decimal(str(payload.margin_percent)),
+        stop_loss_percent=Decimal(str(payload.stop_loss_percent)),
+        take_profit_percent=Decimal(str(payload.take_profit_percent)),
+        include_fees=payload.include_fees,
+        include_slippage=payload.include_slippage
+    )
+
+
+def _backtest_response_data(result, chart_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(result.id),
+        "strategy_id": str(result.strategy_id),
+        "symbol": result.symbol,
+        "start_date": result.start_date.isoformat(),
+        "end_date": result.end_date.isoformat(),
+        "metrics": {
+            "total_trades": result.total_trades,
+            "winning_trades": result.winning_trades,
+            "losing_trades": result.losing_trades,
+            "win_rate": float(result.win_rate) if result.win_rate else None,
+            "profit_factor": float(result.profit_factor) if result.profit_factor else None,
+            "total_pnl": float(result.total_pnl) if result.total_pnl else None,
+            "total_pnl_percent": float(result.total_pnl_percent) if result.total_pnl_percent else None,
+            "max_drawdown": float(result.max_drawdown) if result.max_drawdown else None,
+            "sharpe_ratio": float(result.sharpe_ratio) if result.sharpe_ratio else None,
+        },
+        "trades": result.trades if result.trades else [],
+        "equity_curve": decode_equity_curve(result.equity_curve),
+        "candles": chart_data.get("candles", []),
+        "indicators": chart_data.get("indicators", {}),
+        "cached": chart_data.get("cached", False)
+    }
+
+
+def _job_notifier(user_id: Optional[str]):
+    """Progresso do job via websocket para o usuário (None se não houver destinatário)"""
+    if not user_id:
+        return None
+
+    async def notify(event_type: str, job_data: Dict[str, Any]) -> None:
+        await notify_backtest_update(str(user_id), event_type, job_data)
+
+    return notify
+
+
+async def _submit_backtest_job(
+    strategy_id: str, payload: BacktestRequest, owner_user_id: Optional[str] = None
+) -> BacktestJob:
+    """owner_user_id: usuário autenticado que acompanha o job (None = endpoint síncrono)"""
+    config = _backtest_config(payload)
+
+    async with database_manager.get_session() as session:
+        _, cache_key = await BacktestService(session).build_cache_key(
+            strategy_id, [payload.symbol], payload.start_date, payload.end_date, config
+        )
+
+    return await get_backtest_job_runner().submit(
+        "basic",
+        _run_backtest_job,
+        {"strategy_id": strategy_id, "payload": payload, "config": config, "cache_key": cache_key},
+        cache_key=cache_key,
+        owner_user_id=owner_user_id,
+        notify=_job_notifier(owner_user_id),
+    )
+
+
+async def _run_backtest_job(params: Dict[str, Any], report) -> Dict[str, Any]:
+    """Job de backtest básico (roda no processo de jobs do runner)"""
+    payload = params["payload"]
+    async with database_manager.get_session() as session:
+        service = BacktestService(session)
+        service.progress_callback = report
+
+        # Run backtest with chart data
+        result, chart_data = await service.run_backtest_with_chart_data(
+            strategy_id=params["strategy_id"],
+            symbol=payload.symbol,
+            start_date=payload.start_date,
+            end_date=payload.end_date,
+            config=params["config"],
+            config_hash=params["cache_key"]
+        )
+        return _backtest_response_data(result, chart_data)
+
+
+async def _await_job_result(job: BacktestJob) -> Dict[str, Any]:
+    """Aguarda o job e re-levanta a exceção original (mesmos status HTTP dos endpoints síncronos)"""
+    job = await get_backtest_job_runner().wait(job.id)
+    if job.status == "completed":
+        return job.result
+    if job.exception is not None:
+        raise job.exception
+    raise HTTPException(status_code=409, detail=f"Backtest job {job.status}")
+
+
 @router.post("/{strategy_id}/backtest")
 async def run_backtest(strategy_id: str, payload: BacktestRequest):
     """
@@ -1006,56 +1114,19 @@ async def run_backtest(strategy_id: str, payload: BacktestRequest):
 
     This will simulate the strategy on historical data and return performance metrics,
     including trades, candles and indicator data for chart visualization.
+
+    Runs through the backtest job runner and waits for the result; use
+    POST /{strategy_id}/backtest/jobs to get a job id and follow progress instead.
     """
     try:
-        async with database_manager.get_session() as session:
-            service = BacktestService(session)
-
-            config = BacktestConfig(
-                initial_capital=Decimal(str(payload.initial_capital)),
-                leverage=payload.leverage,
-                margin_percent=Decimal(str(payload.margin_percent)),
-                stop_loss_percent=Decimal(str(payload.stop_loss_percent)),
-                take_profit_percent=Decimal(str(payload.take_profit_percent)),
-                include_fees=payload.include_fees,
-                include_slippage=payload.include_slippage
-            )
-
-            # Run backtest with chart data
-            result, chart_data = await service.run_backtest_with_chart_data(
-                strategy_id=strategy_id,
-                symbol=payload.symbol,
-                start_date=payload.start_date,
-                end_date=payload.end_date,
-                config=config
-            )
-
-            return {
-                "success": True,
-                "data": {
-                    "id": str(result.id),
-                    "strategy_id": str(result.strategy_id),
-                    "symbol": result.symbol,
-                    "start_date": result.start_date.isoformat(),
-                    "end_date": result.end_date.isoformat(),
-                    "metrics": {
-                        "total_trades": result.total_trades,
-                        "winning_trades": result.winning_trades,
-                        "losing_trades": result.losing_trades,
-                        "win_rate": float(result.win_rate) if result.win_rate else None,
-                        "profit_factor": float(result.profit_factor) if result.profit_factor else None,
-                        "total_pnl": float(result.total_pnl) if result.total_pnl else None,
-                        "total_pnl_percent": float(result.total_pnl_percent) if result.total_pnl_percent else None,
-                        "max_drawdown": float(result.max_drawdown) if result.max_drawdown else None,
-                        "sharpe_ratio": float(result.sharpe_ratio) if result.sharpe_ratio else None,
-                    },
-                    "trades": result.trades if result.trades else [],
-                    "equity_curve": result.equity_curve if result.equity_curve else [],
-                    "candles": chart_data.get("candles", []),
-                    "indicators": chart_data.get("indicators", {})
-                }
-            }
+        job = await _submit_backtest_job(strategy_id, payload)
+        return {
+            "success": True,
+            "data": await _await_job_result(job)
+        }
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1065,6 +1136,65 @@ async def run_backtest(strategy_id: str, payload: BacktestRequest):
         raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {str(e) or 'Unknown error'}")
 
 
+@router.post("/{strategy_id}/backtest/jobs", status_code=202)
+async def submit_backtest_job(
+    strategy_id: str,
+    payload: BacktestRequest,
+    current_user_id: UUID = Depends(get_current_user_id),
+):
+    """
+    Queue a backtest and return immediately with a job id
+
+    Progress is pushed over the caller's websocket (backtest_progress / backtest_completed /
+    backtest_failed) and can be polled with GET /backtest/jobs/{job_id}.
+    Identical backtests over closed candles are answered from cache.
+    """
+    try:
+        job = await _submit_backtest_job(strategy_id, payload, owner_user_id=str(current_user_id))
+        return {
+            "success": True,
+            "data": job.to_dict(include_result=job.finished)
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting backtest job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _get_owned_job(job_id: str, user_id: UUID) -> Dict[str, Any]:
+    """Job do usuário autenticado (404 também para jobs de outros usuários)"""
+    job = await get_backtest_job_runner().get_job(job_id)
+    if job is None or job.get("owner_user_id") != str(user_id):
+        raise HTTPException(status_code=404, detail="Backtest job not found")
+    return job
+
+
+@router.get("/backtest/jobs/{job_id}")
+async def get_backtest_job(job_id: str, current_user_id: UUID = Depends(get_current_user_id)):
+    """Get backtest job status, progress and (when completed) result"""
+    job = await _get_owned_job(job_id, current_user_id)
+
+    return {
+        "success": True,
+        "data": job
+    }
+
+
+@router.delete("/backtest/jobs/{job_id}")
+async def cancel_backtest_job(job_id: str, current_user_id: UUID = Depends(get_current_user_id)):
+    """Cancel a queued or running backtest job"""
+    await _get_owned_job(job_id, current_user_id)
+    if not await get_backtest_job_runner().cancel(job_id):
+        raise HTTPException(status_code=404, detail="Backtest job not found or already finished")
+
+    return {
+        "success": True,
+        "data": {"job_id": job_id, "status": "cancelling"}
+    }
+
+
 @router.get("/{strategy_id}/backtest/results")
 async def get_backtest_results(
     strategy_id: str,
@@ -1145,7 +1275,7 @@ async def get_backtest_result_detail(strategy_id: str, result_id: str):
                         "sharpe_ratio": float(result.sharpe_ratio) if result.sharpe_ratio else None,
                     },
                     "trades": result.trades,
-                    "equity_curve": result.equity_curve,
+                    "equity_curve": decode_equity_curve(result.equity_curve),
                     "created_at": result.created_at.isoformat() if result.created_at else None
                 }
             }
@@ -1340,6 +1470,124 @@ class AdvancedBacktestRequest(BaseModel):
     monte_carlo_simulations: int = Field(default=1000, ge=100, le=10000)
 
 
+
+def _advanced_backtest_config(payload: AdvancedBacktestRequest) -> AdvancedBacktestConfig:
+    # Build stress test config
+    stress_config = StressTestConfig(
+        enabled=payload.enable_stress_test,
+        scenarios=[StressScenario(s) for s in payload.stress_scenarios if s in [e.value for e in StressScenario]]
+    )
+
+    # Build walk-forward config
+    wf_config = WalkForwardConfig(
+        enabled=payload.enable_walk_forward,
+        in_sample_ratio=payload.in_sample_ratio,
+        num_folds=payload.walk_forward_folds
+    )
+
+    # Build Monte Carlo config
+    mc_config = MonteCarloConfig(
+        enabled=payload.enable_monte_carlo,
+        num_simulations=payload.monte_carlo_simulations
+    )
+
+    return AdvancedBacktestConfig(
+        initial_capital=Decimal(str(payload.initial_capital)),
+        leverage=payload.leverage,
+        margin_percent=Decimal(str(payload.margin_percent)),
+        stop_loss_percent=Decimal(str(payload.stop_loss_percent)),
+        take_profit_percent=Decimal(str(payload.take_profit_percent)),
+        data_source=DataSource.AUTO,
+        symbols=payload.symbols,
+        portfolio_mode=payload.portfolio_mode,
+        equal_weight=payload.equal_weight,
+        stress_test=stress_config,
+        walk_forward=wf_config,
+        monte_carlo=mc_config
+    )
+
+
+def _advanced_backtest_response_data(result, payload: AdvancedBacktestRequest) -> Dict[str, Any]:
+    return {
+        "summary": {
+            "total_pnl": float(result.total_pnl),
+            "total_pnl_percent": float(result.total_pnl_percent),
+            "portfolio_sharpe": float(result.portfolio_sharpe) if result.portfolio_sharpe else None,
+            "portfolio_sortino": float(result.portfolio_sortino) if result.portfolio_sortino else None,
+            "portfolio_max_drawdown": float(result.portfolio_max_drawdown),
+            "assets_tested": len(result.asset_results),
+        },
+        "per_asset": [
+            {
+                "symbol": ar.symbol,
+                "total_trades": ar.metrics.get("total_trades"),
+                "win_rate": ar.metrics.get("win_rate"),
+                "profit_factor": ar.metrics.get("profit_factor"),
+                "sharpe_ratio": ar.metrics.get("sharpe_ratio"),
+                "max_drawdown": ar.metrics.get("max_drawdown"),
+            }
+            for ar in result.asset_results
+        ],
+        "walk_forward": {
+            "enabled": payload.enable_walk_forward,
+            "results": result.walk_forward_results,
+            "degradation_percent": result.walk_forward_degradation,
+            "is_robust": (result.walk_forward_degradation or 0) < 30  # <30% degradation is good
+        } if payload.enable_walk_forward else None,
+        "monte_carlo": {
+            "enabled": payload.enable_monte_carlo,
+            "simulations": payload.monte_carlo_simulations,
+            "var_95": float(result.var_95) if result.var_95 else None,
+            "var_99": float(result.var_99) if result.var_99 else None,
+            "details": result.monte_carlo_results
+        } if payload.enable_monte_carlo else None,
+        "stress_test": {
+            "enabled": payload.enable_stress_test,
+            "scenarios_tested": payload.stress_scenarios,
+            "worst_case_drawdown": float(result.worst_case_drawdown) if result.worst_case_drawdown else None,
+            "survival_rate": result.survival_rate,
+            "details": result.stress_test_results
+        } if payload.enable_stress_test else None,
+    }
+
+
+async def _submit_advanced_backtest_job(
+    strategy_id: str, payload: AdvancedBacktestRequest, owner_user_id: Optional[str] = None
+) -> BacktestJob:
+    """owner_user_id: usuário autenticado que acompanha o job (None = endpoint síncrono)"""
+    config = _advanced_backtest_config(payload)
+
+    async with database_manager.get_session() as session:
+        _, cache_key = await AdvancedBacktestService(session).build_cache_key(
+            strategy_id, payload.symbols, payload.start_date, payload.end_date, config, kind="advanced"
+        )
+
+    return await get_backtest_job_runner().submit(
+        "advanced",
+        _run_advanced_backtest_job,
+        {"strategy_id": strategy_id, "payload": payload, "config": config},
+        cache_key=cache_key,
+        owner_user_id=owner_user_id,
+        notify=_job_notifier(owner_user_id),
+    )
+
+
+async def _run_advanced_backtest_job(params: Dict[str, Any], report) -> Dict[str, Any]:
+    """Job de backtest avançado (roda no processo de jobs do runner)"""
+    payload = params["payload"]
+    async with database_manager.get_session() as session:
+        service = AdvancedBacktestService(session)
+        service.progress_callback = report
+
+        result = await service.run_advanced_backtest(
+            strategy_id=params["strategy_id"],
+            start_date=payload.start_date,
+            end_date=payload.end_date,
+            config=params["config"]
+        )
+        return _advanced_backtest_response_data(result, payload)
+
+
 @router.post("/{strategy_id}/backtest/advanced")
 async def run_advanced_backtest(strategy_id: str, payload: AdvancedBacktestRequest):
     """
@@ -1357,106 +1605,183 @@ async def run_advanced_backtest(strategy_id: str, payload: AdvancedBacktestReque
     - Walk-forward degradation analysis
     - VaR 95% and VaR 99%
     - Stress test survival rate
+
+    Runs through the backtest job runner and waits for the result; use
+    POST /{strategy_id}/backtest/advanced/jobs to follow progress instead.
     """
     try:
-        async with database_manager.get_session() as session:
-            service = AdvancedBacktestService(session)
+        job = await _submit_advanced_backtest_job(strategy_id, payload)
+        return {
+            "success": True,
+            "data": await _await_job_result(job)
+        }
 
-            # Build stress test config
-            stress_config = StressTestConfig(
-                enabled=payload.enable_stress_test,
-                scenarios=[StressScenario(s) for s in payload.stress_scenarios if s in [e.value for e in StressScenario]]
-            )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running advanced backtest: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-            # Build walk-forward config
-            wf_config = WalkForwardConfig(
-                enabled=payload.enable_walk_forward,
-                in_sample_ratio=payload.in_sample_ratio,
-                num_folds=payload.walk_forward_folds
-            )
 
-            # Build Monte Carlo config
-            mc_config = MonteCarloConfig(
-                enabled=payload.enable_monte_carlo,
-                num_simulations=payload.monte_carlo_simulations
-            )
+@router.post("/{strategy_id}/backtest/advanced/jobs", status_code=202)
+async def submit_advanced_backtest_job(
+    strategy_id: str,
+    payload: AdvancedBacktestRequest,
+    current_user_id: UUID = Depends(get_current_user_id),
+):
+    """
+    Queue an advanced backtest and return immediately with a job id
 
-            # Build advanced config
-            config = AdvancedBacktestConfig(
-                initial_capital=Decimal(str(payload.initial_capital)),
-                leverage=payload.leverage,
-                margin_percent=Decimal(str(payload.margin_percent)),
-                stop_loss_percent=Decimal(str(payload.stop_loss_percent)),
-                take_profit_percent=Decimal(str(payload.take_profit_percent)),
-                data_source=DataSource.AUTO,
-                symbols=payload.symbols,
-                portfolio_mode=payload.portfolio_mode,
-                equal_weight=payload.equal_weight,
-                stress_test=stress_config,
-                walk_forward=wf_config,
-                monte_carlo=mc_config
-            )
+    Progress (candles processed, trades, simulations completed) is pushed over the
+    websocket and can be polled with GET /backtest/jobs/{job_id}.
+    """
+    try:
+        job = await _submit_advanced_backtest_job(strategy_id, payload, owner_user_id=str(current_user_id))
+        return {
+            "success": True,
+            "data": job.to_dict(include_result=job.finished)
+        }
 
-            result = await service.run_advanced_backtest(
-                strategy_id=strategy_id,
-                start_date=payload.start_date,
-                end_date=payload.end_date,
-                config=config
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting advanced backtest job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============================================================================
+# Parameter Optimization Endpoints
+# ============================================================================
+
+class ParameterRangeRequest(BaseModel):
+    """Values to sweep for one indicator parameter (explicit list or min/max/step)"""
+    indicator: str = Field(..., description="Indicator type, e.g. rsi")
+    name: str = Field(..., description="Parameter name, e.g. period")
+    values: Optional[List[Union[int, float, str]]] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    step: Optional[float] = Field(None, gt=0)
+
+
+class OptimizationRequest(BaseModel):
+    """Model for a parameter sweep"""
+    symbol: str = Field(..., min_length=1)
+    start_date: datetime
+    end_date: datetime
+    initial_capital: float = Field(default=10000, ge=100)
+    leverage: int = Field(default=10, ge=1, le=125)
+    margin_percent: float = Field(default=5.0, ge=1, le=100)
+    stop_loss_percent: float = Field(default=2.0, ge=0.1, le=50)
+    take_profit_percent: float = Field(default=4.0, ge=0.1, le=100)
+    include_fees: bool = True
+    include_slippage: bool = True
+
+    parameters: List[ParameterRangeRequest] = Field(..., min_items=1)
+    method: str = Field(default="grid", pattern="^(grid|random|bayesian)$")
+    objective: str = Field(
+        default="sharpe_ratio",
+        pattern="^(sharpe_ratio|sortino_ratio|total_pnl_percent|profit_factor|win_rate|expectancy)$"
+    )
+    max_candidates: int = Field(default=100, ge=1, le=500)
+    walk_forward_folds: int = Field(default=3, ge=1, le=10)
+    in_sample_ratio: float = Field(default=0.7, ge=0.5, le=0.9)
+    min_trades: int = Field(default=5, ge=0)
+    seed: int = 42
+
+
+
+def _optimization_config(payload: OptimizationRequest) -> OptimizationConfig:
+    return OptimizationConfig(
+        parameters=[
+            ParameterRange.from_spec(
+                indicator=p.indicator,
+                name=p.name,
+                values=p.values,
+                min_value=p.min,
+                max_value=p.max,
+                step=p.step
             )
+            for p in payload.parameters
+        ],
+        method=payload.method,
+        objective=payload.objective,
+        max_candidates=payload.max_candidates,
+        walk_forward_folds=payload.walk_forward_folds,
+        in_sample_ratio=payload.in_sample_ratio,
+        min_trades=payload.min_trades,
+        seed=payload.seed,
+        backtest=BacktestConfig(
+            initial_capital=Decimal(str(payload.initial_capital)),
+            leverage=payload.leverage,
+            margin_percent=Decimal(str(payload.margin_percent)),
+            stop_loss_percent=Decimal(str(payload.stop_loss_percent)),
+            take_profit_percent=Decimal(str(payload.take_profit_percent)),
+            include_fees=payload.include_fees,
+            include_slippage=payload.include_slippage
+        )
+    )
 
-            # Format response
-            return {
-                "success": True,
-                "data": {
-                    "summary": {
-                        "total_pnl": float(result.total_pnl),
-                        "total_pnl_percent": float(result.total_pnl_percent),
-                        "portfolio_sharpe": float(result.portfolio_sharpe) if result.portfolio_sharpe else None,
-                        "portfolio_sortino": float(result.portfolio_sortino) if result.portfolio_sortino else None,
-                        "portfolio_max_drawdown": float(result.portfolio_max_drawdown),
-                        "assets_tested": len(result.asset_results),
-                    },
-                    "per_asset": [
-                        {
-                            "symbol": ar.symbol,
-                            "total_trades": ar.metrics.get("total_trades"),
-                            "win_rate": ar.metrics.get("win_rate"),
-                            "profit_factor": ar.metrics.get("profit_factor"),
-                            "sharpe_ratio": ar.metrics.get("sharpe_ratio"),
-                            "max_drawdown": ar.metrics.get("max_drawdown"),
-                        }
-                        for ar in result.asset_results
-                    ],
-                    "walk_forward": {
-                        "enabled": payload.enable_walk_forward,
-                        "results": result.walk_forward_results,
-                        "degradation_percent": result.walk_forward_degradation,
-                        "is_robust": (result.walk_forward_degradation or 0) < 30  # <30% degradation is good
-                    } if payload.enable_walk_forward else None,
-                    "monte_carlo": {
-                        "enabled": payload.enable_monte_carlo,
-                        "simulations": payload.monte_carlo_simulations,
-                        "var_95": float(result.var_95) if result.var_95 else None,
-                        "var_99": float(result.var_99) if result.var_99 else None,
-                        "details": result.monte_carlo_results
-                    } if payload.enable_monte_carlo else None,
-                    "stress_test": {
-                        "enabled": payload.enable_stress_test,
-                        "scenarios_tested": payload.stress_scenarios,
-                        "worst_case_drawdown": float(result.worst_case_drawdown) if result.worst_case_drawdown else None,
-                        "survival_rate": result.survival_rate,
-                        "details": result.stress_test_results
-                    } if payload.enable_stress_test else None,
-                }
-            }
+
+@router.post("/{strategy_id}/backtest/optimize/jobs", status_code=202)
+async def submit_optimization_job(
+    strategy_id: str,
+    payload: OptimizationRequest,
+    current_user_id: UUID = Depends(get_current_user_id),
+):
+    """
+    Queue a parameter sweep (grid, random or Bayesian) over the strategy's indicator parameters
+
+    Candles are loaded once and each distinct indicator configuration is computed
+    once. The job result is a table ranked by the objective plus a walk-forward
+    that re-optimizes on each in-sample window and scores only that window's
+    winner out-of-sample. Progress = candidates evaluated.
+    """
+    try:
+        optimization = _optimization_config(payload)
+
+        async with database_manager.get_session() as session:
+            _, cache_key = await StrategyOptimizerService(session).build_cache_key(
+                strategy_id, [payload.symbol], payload.start_date, payload.end_date, optimization, kind="optimize"
+            )
+        owner_user_id = str(current_user_id)
+
+        job = await get_backtest_job_runner().submit(
+            "optimize",
+            _run_optimization_job,
+            {"strategy_id": strategy_id, "payload": payload, "optimization": optimization},
+            cache_key=cache_key,
+            owner_user_id=owner_user_id,
+            notify=_job_notifier(owner_user_id),
+        )
+        return {
+            "success": True,
+            "data": job.to_dict(include_result=job.finished)
+        }
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error running advanced backtest: {e}")
+        logger.error(f"Error submitting optimization job: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _run_optimization_job(params: Dict[str, Any], report) -> Dict[str, Any]:
+    """Job de otimização de parâmetros (roda no processo de jobs do runner)"""
+    payload = params["payload"]
+    async with database_manager.get_session() as session:
+        service = StrategyOptimizerService(session)
+        service.progress_callback = report
+        return await service.optimize(
+            strategy_id=params["strategy_id"],
+            symbol=payload.symbol,
+            start_date=payload.start_date,
+            end_date=payload.end_date,
+            optimization=params["optimization"]
+        )
+
+
 @router.get("/backtest/data-availability/{symbol}")
 async def get_data_availability(symbol: str):
     """
@@ -1748,7 +2073,6 @@ async def get_strategy_chart_data(
     global transaction_db
     from datetime import datetime, timedelta, timezone
     import json
-    import aiohttp
     from decimal import Decimal
 
     # São Paulo timezone offset (UTC-3)
@@ -1875,108 +2199,37 @@ async def get_strategy_chart_data(
                 "status": sig["status"],
             })
 
-        # Fetch candles from Binance Futures API
-        candles_list = []
+        # Fetch candles (custom timeframes like 12m are aggregated server-side from 1m)
+        from infrastructure.services.candle_service import get_candle_service
+
         start_ts = int(start_date.timestamp() * 1000)
         end_ts = int(end_date.timestamp() * 1000)
-        url = "https://fapi.binance.com/fapi/v1/klines"
-
-        # Check if we need custom aggregation (e.g., 12m is not native to Binance)
         is_custom_tf = tf not in BINANCE_NATIVE_TIMEFRAMES
-        fetch_tf = "1m" if is_custom_tf else tf  # Use 1m for aggregation
-        target_minutes = int(tf[:-1]) if tf.endswith('m') else 60  # Parse target minutes
 
         logger.info(f"Fetching chart candles for {symbol} {tf}, days={days}, custom_tf={is_custom_tf}")
 
-        async with aiohttp.ClientSession() as session:
-            current_ts = start_ts
-            batch_count = 0
-            raw_candles = []  # For aggregation
-
-            # For custom timeframes, we need more 1m candles
-            max_batches = 50 if is_custom_tf else 10
-
-            while current_ts < end_ts and batch_count < max_batches:
-                params = {
-                    "symbol": symbol.upper(),
-                    "interval": fetch_tf,
-                    "startTime": current_ts,
-                    "endTime": end_ts,
-                    "limit": 1000
-                }
+        result = await get_candle_service().get_candles(
+            symbol=symbol,
+            interval=tf,
+            limit=(end_ts - start_ts) // timeframe_to_ms(tf) + 1,
+            start_time=start_ts,
+            end_time=end_ts,
+        )
+        if not result.get("success"):
+            logger.error(f"Failed to fetch klines: {result.get('error')}")
 
-                async with session.get(url, params=params) as resp:
-                    if resp.status != 200:
-                        error_text = await resp.text()
-                        logger.error(f"Failed to fetch klines: {resp.status} - {error_text}")
-                        break
-
-                    klines = await resp.json()
-                    if not klines:
-                        break
-
-                    batch_count += 1
-
-                    if is_custom_tf:
-                        # Store raw 1m candles for aggregation
-                        for k in klines:
-                            raw_candles.append({
-                                'time': k[0],
-                                'open': float(k[1]),
-                                'high': float(k[2]),
-                                'low': float(k[3]),
-                                'close': float(k[4]),
-                                'volume': float(k[5])
-                            })
-                    else:
-                        # Native timeframe - use directly
-                        for k in klines:
-                            utc_dt = datetime.fromtimestamp(k[0] / 1000, tz=timezone.utc)
-                            sp_dt = utc_dt.astimezone(SAO_PAULO_TZ)
-                            candle = Candle(
-                                timestamp=sp_dt.replace(tzinfo=None),
-                                open=Decimal(str(k[1])),
-                                high=Decimal(str(k[2])),
-                                low=Decimal(str(k[3])),
-                                close=Decimal(str(k[4])),
-                                volume=Decimal(str(k[5]))
-                            )
-                            candles_list.append(candle)
-
-                    # Move to next batch
-                    tf_ms = timeframe_to_ms(fetch_tf)
-                    current_ts = klines[-1][0] + tf_ms
-
-                await asyncio.sleep(0.05)  # Rate limiting
-
-        # Aggregate 1m candles into custom timeframe using the existing aggregator logic
-        if is_custom_tf and raw_candles:
-            from infrastructure.services.custom_timeframe_aggregator import CandleBuffer
-
-            buffer = CandleBuffer(target_minutes=target_minutes, symbol=symbol.upper())
-            buffer.max_history = 5000  # Allow more history for chart
-
-            # Process all 1m candles through buffer
-            for raw_candle in raw_candles:
-                buffer.add_one_minute_candle(raw_candle)
-
-            # Get all aggregated candles
-            aggregated = buffer.get_all_candles()
-            logger.info(f"Aggregated {len(raw_candles)} 1m candles into {len(aggregated)} {tf} candles")
-
-            # Convert aggregated to Candle objects
-            for agg in aggregated:
-                utc_dt = datetime.fromtimestamp(agg['time'] / 1000, tz=timezone.utc)
-                sp_dt = utc_dt.astimezone(SAO_PAULO_TZ)
-                candle = Candle(
-                    timestamp=sp_dt.replace(tzinfo=None),
-                    open=Decimal(str(agg['open'])),
-                    high=Decimal(str(agg['high'])),
-                    low=Decimal(str(agg['low'])),
-                    close=Decimal(str(agg['close'])),
-                    volume=Decimal(str(agg['volume']))
-                )
-                candles_list.append(candle)
+        candles_list = []
+        for k in result.get("candles", []):
+            utc_dt = datetime.fromtimestamp(k['time'] / 1000, tz=timezone.utc)
+            sp_dt = utc_dt.astimezone(SAO_PAULO_TZ)
+            candles_list.append(Candle(
+                timestamp=sp_dt.replace(tzinfo=None),
+                open=Decimal(str(k['open'])),
+                high=Decimal(str(k['high'])),
+                low=Decimal(str(k['low'])),
+                close=Decimal(str(k['close'])),
+                volume=Decimal(str(k['volume']))
+            ))
 
         logger.info(f"Fetched {len(candles_list)} candles for chart")
 
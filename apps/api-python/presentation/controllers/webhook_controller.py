@@ -10,6 +10,7 @@ from application.services.webhook_service import WebhookService
 from application.services.tradingview_webhook_service import TradingViewWebhookService
 from infrastructure.di.container import get_container
 from infrastructure.di.dependencies import get_webhook_service
+from infrastructure.pricing.price_oracle import ORDER_PRICE_MAX_AGE_SECONDS, get_price_oracle
 from presentation.middleware.auth import (
     get_current_user_id,
     get_optional_current_user_id,
@@ -246,15 +247,18 @@ def create_webhook_router() -> APIRouter:
                 elif action in ["compra", "buy", "long"]:
                     action = "buy"
 
-                # Buscar preço REAL do mercado
+                # Buscar preço REAL do mercado (oracle em memória; request direto se desatualizado)
                 import aiohttp
-                price = 0
-                async with aiohttp.ClientSession() as session:
-                    price_api = "https://fapi.binance.com/fapi/v1/ticker/price" if webhook.market_type == "futures" else "https://api.binance.com/api/v3/ticker/price"
-                    async with session.get(f"{price_api}?symbol={ticker}") as resp:
-                        price_data = await resp.json()
-                        price = float(price_data.get("price", 0))
-                        logger.info("Price fetched", ticker=ticker, price=price, api_response=price_data)
+                price_feed = "binance_futures" if webhook.market_type == "futures" else "binance"
+                price = get_price_oracle(price_feed).get_price(ticker, ORDER_PRICE_MAX_AGE_SECONDS) or 0
+                price_data = {"source": "price_oracle", "feed": price_feed}
+                if price <= 0:
+                    async with aiohttp.ClientSession() as session:
+                        price_api = "https://fapi.binance.com/fapi/v1/ticker/price" if webhook.market_type == "futures" else "https://api.binance.com/api/v3/ticker/price"
+                        async with session.get(f"{price_api}?symbol={ticker}") as resp:
+                            price_data = await resp.json()
+                            price = float(price_data.get("price", 0))
+                logger.info("Price fetched", ticker=ticker, price=price, api_response=price_data)
 
                 # Proteção contra divisão por zero
                 if price <= 0:
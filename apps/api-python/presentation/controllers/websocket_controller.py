@@ -314,6 +314,27 @@ async def notify_balance_update(user_id: str, balance_data: Dict[str, Any]) -> N
     logger.info(f"Balance update notification sent to user {user_id}")
 
 
+async def notify_backtest_update(user_id: str, event_type: str, job_data: Dict[str, Any]) -> None:
+    """
+    Notify user about backtest job progress/completion via WebSocket.
+
+    Args:
+        user_id: User to notify
+        event_type: backtest_progress, backtest_completed or backtest_failed
+        job_data: Job snapshot payload
+    """
+    manager = get_connection_manager()
+
+    message = {
+        "type": event_type,
+        "timestamp": datetime.utcnow().isoformat(),
+        "data": job_data
+    }
+
+    await manager.send_personal_message(message, user_id)
+    logger.debug(f"Backtest {event_type} notification sent to user {user_id}")
+
+
 # Router
 
 def create_websocket_router() -> APIRouter:
@@ -1,11 +1,12 @@
 """Authentication middleware and dependencies"""
 
-from typing import Optional
+from typing import Any, Dict, Optional
 from uuid import UUID
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from infrastructure.services.auth_service import AuthService
+from infrastructure.cache.principal_cache import get_principal_cache
 from infrastructure.database.models.user import User
 from infrastructure.di.dependencies import get_user_service
 from application.services.user_service import UserService
@@ -57,15 +58,50 @@ async def get_current_user_id(
     return user_id
 
 
+async def get_current_principal(
+    user_id: UUID = Depends(get_current_user_id),
+) -> Dict[str, Any]:
+    """
+    Get authorization data of the current user (cached, no DB work on hits)
+
+    Args:
+        user_id: Current user ID from token
+
+    Returns:
+        Dict: user_id, exists, is_active, is_admin, roles
+
+    Raises:
+        HTTPException: If user not found or inactive
+    """
+    principal = await get_principal_cache().get(user_id)
+
+    if not principal["exists"]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+        )
+
+    if not principal["is_active"]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user"
+        )
+
+    return principal
+
+
 async def get_current_user(
     user_id: UUID = Depends(get_current_user_id),
+    principal: Dict[str, Any] = Depends(get_current_principal),
     user_service: UserService = Depends(get_user_service),
 ) -> User:
     """
     Get current authenticated user
 
+    Authorization is resolved by get_current_principal; the user row is only
+    loaded for endpoints that need the profile itself.
+
     Args:
         user_id: Current user ID from token
+        principal: Cached principal (already checked: exists and active)
         user_service: User service
 
     Returns:
@@ -118,6 +154,7 @@ async def get_optional_current_user_id(
 
 # Dependency shortcuts
 CurrentUser = Depends(get_current_user)
+CurrentPrincipal = Depends(get_current_principal)
 CurrentUserID = Depends(get_current_user_id)
 OptionalUserID = Depends(get_optional_current_user_id)
 AuthSvc = Depends(get_auth_service)
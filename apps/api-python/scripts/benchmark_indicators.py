@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos indicadores vetorizados (ADX, OBV, SuperTrend).
+
+Compara, sobre candles sinteticos:
+- calculate_series vetorizado vs. o calculo anterior (calculate() por prefixo)
+- as primitivas (wilder_smooth, on_balance_volume, carry_band) vs. os loops
+  Python que existiam nos calculators
+
+Uso:
+    python scripts/benchmark_indicators.py [n_candles]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infrastructure.indicators import (  # noqa: E402
+    ADXCalculator,
+    Candle,
+    OBVCalculator,
+    SuperTrendCalculator,
+)
+from infrastructure.indicators.base import BaseIndicatorCalculator  # noqa: E402
+from infrastructure.indicators.primitives import (  # noqa: E402
+    carry_band,
+    on_balance_volume,
+    wilder_smooth,
+)
+
+
+def make_candles(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    closes = 30000 + np.cumsum(rng.normal(0, 50, n))
+    start = datetime(2024, 1, 1)
+    candles = []
+    for i, close in enumerate(closes):
+        spread = abs(rng.normal(0, 25, 2))
+        candles.append(Candle(
+            timestamp=start + timedelta(minutes=15 * i),
+            open=Decimal(str(round(close, 2))),
+            high=Decimal(str(round(close + spread[0], 2))),
+            low=Decimal(str(round(close - spread[1], 2))),
+            close=Decimal(str(round(close, 2))),
+            volume=Decimal(str(round(rng.random() * 100, 4))),
+        ))
+    return candles
+
+
+# ========== Loops anteriores (referencia) ==========
+
+def legacy_wilder(data, period):
+    result = np.zeros(len(data))
+    if period <= len(data):
+        result[period - 1] = np.mean(data[:period])
+    for i in range(period, len(data)):
+        result[i] = result[i - 1] + (data[i] - result[i - 1]) / period
+    return result
+
+
+def legacy_obv(closes, volumes):
+    obv = np.zeros(len(closes))
+    obv[0] = volumes[0]
+    for i in range(1, len(closes)):
+        if closes[i] > closes[i - 1]:
+            obv[i] = obv[i - 1] + volumes[i]
+        elif closes[i] < closes[i - 1]:
+            obv[i] = obv[i - 1] - volumes[i]
+        else:
+            obv[i] = obv[i - 1]
+    return obv
+
+
+def legacy_upper_band(basic, closes):
+    band = np.zeros(len(basic))
+    band[0] = basic[0]
+    for i in range(1, len(basic)):
+        if basic[i] < band[i - 1] or closes[i - 1] > band[i - 1]:
+            band[i] = basic[i]
+        else:
+            band[i] = band[i - 1]
+    return band
+
+
+def timed(func, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    candles = make_candles(n)
+
+    print("=" * 70)
+    print(f"BENCHMARK INDICADORES VETORIZADOS ({n} candles)")
+    print("=" * 70)
+
+    print(f"\n{'Serie completa':<28}{'por prefixo':>14}{'vetorizado':>14}{'speedup':>10}")
+    for calculator in (ADXCalculator(), OBVCalculator(), SuperTrendCalculator()):
+        previous = timed(BaseIndicatorCalculator.calculate_series, calculator, candles, repeat=1)
+        vectorized = timed(calculator.calculate_series, candles)
+        same = (
+            [r.values for r in calculator.calculate_series(candles)]
+            == [r.values for r in BaseIndicatorCalculator.calculate_series(calculator, candles)]
+        )
+        print(f"{type(calculator).__name__:<28}{previous:>13.3f}s{vectorized:>13.4f}s{previous / vectorized:>9.0f}x"
+              f"{'' if same else '  (VALORES DIFERENTES)'}")
+
+    rng = np.random.default_rng(1)
+    closes = 30000 + np.cumsum(rng.normal(0, 50, n))
+    volumes = rng.random(n) * 100
+    basic = closes + rng.random(n) * 100
+
+    print(f"\n{'Primitiva':<28}{'loop':>14}{'vetorizado':>14}{'speedup':>10}")
+    for name, legacy, vectorized, args in (
+        ("wilder_smooth(14)", legacy_wilder, wilder_smooth, (closes, 14)),
+        ("on_balance_volume", legacy_obv, on_balance_volume, (closes, volumes)),
+        ("carry_band(upper)", legacy_upper_band, lambda b, c: carry_band(b, c, upper=True), (basic, closes)),
+    ):
+        before = timed(legacy, *args)
+        after = timed(vectorized, *args)
+        print(f"{name:<28}{before * 1000:>12.2f}ms{after * 1000:>12.2f}ms{before / after:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Tests for CandlesCache"""
+
+import time
+
+import pytest
+
+from infrastructure.cache.candles_cache import BYTES_PER_CANDLE, CandlesCache
+
+from .test_shared_cache import InMemoryRedisBackend
+
+STEP = 60_000  # 1m
+
+
+def _candles(start, count, close=100.0):
+    return [
+        {"time": start + i * STEP, "open": 1.0, "high": 2.0, "low": 0.5, "close": close, "volume": 10.0}
+        for i in range(count)
+    ]
+
+
+def _live_start(count):
+    """Início de uma série de `count` candles cujo último é o candle em formação"""
+    now_ms = int(time.time() * 1000)
+    return (now_ms // STEP) * STEP - (count - 1) * STEP
+
+
+class TestCandlesCache:
+    """Test cases for CandlesCache"""
+
+    @pytest.mark.asyncio
+    async def test_any_limit_is_served_from_one_series(self):
+        cache = CandlesCache()
+        await cache.set("BTCUSDT", "1m", _candles(_live_start(1000), 1000), is_latest=True)
+
+        small = await cache.get("BTCUSDT", "1m", 500)
+        full = await cache.get("BTCUSDT", "1m", 1000)
+
+        assert len(small["candles"]) == 500
+        assert small["candles"][-1] == full["candles"][-1]
+        assert await cache.get("BTCUSDT", "1m", 1001) is None
+        assert cache.get_metrics()["cached_entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_tail_is_a_miss(self):
+        cache = CandlesCache()
+        await cache.set("BTCUSDT", "1m", _candles(_live_start(10), 10))
+
+        assert await cache.get("BTCUSDT", "1m", 10) is None
+        assert await cache.get_stale_tail("BTCUSDT", "1m", 10) is not None
+
+    @pytest.mark.asyncio
+    async def test_time_range_slice(self):
+        cache = CandlesCache()
+        await cache.set("BTCUSDT", "1m", _candles(0, 100))
+
+        forward = await cache.get_range("BTCUSDT", "1m", 10, 20 * STEP, 90 * STEP)
+        backward = await cache.get_range("BTCUSDT", "1m", 5, None, 50 * STEP)
+
+        assert [c["time"] for c in forward["candles"]] == [(20 + i) * STEP for i in range(10)]
+        assert [c["time"] for c in backward["candles"]] == [(46 + i) * STEP for i in range(5)]
+        # Fora da série
+        assert await cache.get_range("BTCUSDT", "1m", 10, 95 * STEP, 120 * STEP) is None
+        assert await cache.get_range("BTCUSDT", "1m", 10, None, 5 * STEP) is None
+
+    @pytest.mark.asyncio
+    async def test_incremental_merge_overwrites_overlap(self):
+        cache = CandlesCache()
+        await cache.set("BTCUSDT", "1m", _candles(0, 10))
+        await cache.set("BTCUSDT", "1m", _candles(8 * STEP, 5, close=200.0))
+
+        result = await cache.get_range("BTCUSDT", "1m", 100, 0, 12 * STEP)
+
+        assert len(result["candles"]) == 13
+        assert result["candles"][7]["close"] == 100.0
+        assert result["candles"][8]["close"] == 200.0
+        assert cache.get_metrics()["cached_kb"] == round(13 * BYTES_PER_CANDLE / 1024, 2)
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_respects_byte_budget(self):
+        cache = CandlesCache(max_bytes=150 * BYTES_PER_CANDLE)
+        await cache.set("AAAUSDT", "1m", _candles(0, 100))
+        await cache.set("BBBUSDT", "1m", _candles(0, 40))
+        await cache.get_range("AAAUSDT", "1m", 10, 0, 9 * STEP)  # AAA vira o mais recente
+        await cache.set("CCCUSDT", "1m", _candles(0, 40))
+
+        metrics = cache.get_metrics()
+        assert metrics["evictions"] == 1
+        assert metrics["cached_kb"] <= round(150 * BYTES_PER_CANDLE / 1024, 2)
+        assert await cache.get_range("BBBUSDT", "1m", 10, 0, 9 * STEP) is None
+        assert await cache.get_range("AAAUSDT", "1m", 10, 0, 9 * STEP) is not None
+
+    @pytest.mark.asyncio
+    async def test_series_shared_between_workers(self):
+        store, backends = {}, []
+        worker_a = CandlesCache(backend=InMemoryRedisBackend(store, backends))
+        worker_b = CandlesCache(backend=InMemoryRedisBackend(store, backends))
+
+        await worker_a.set("BTCUSDT", "1m", _candles(_live_start(300), 300), is_latest=True)
+        result = await worker_b.get("BTCUSDT", "1m", 200)
+
+        assert len(result["candles"]) == 200
+        assert worker_b.get_metrics()["l2_loads"] == 1
+
+        await worker_a.invalidate("BTCUSDT")
+        assert worker_b.get_metrics()["cached_entries"] == 0
@@ -0,0 +1,104 @@
+"""Tests for PrincipalCache (authorization data cached per user id)"""
+
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock
+
+from infrastructure.cache.principal_cache import PrincipalCache, build_principal
+from presentation.controllers import admin_controller
+from presentation.middleware import auth
+
+
+USER_ID = str(uuid.uuid4())
+
+
+def make_db(row):
+    db = MagicMock()
+    db.fetchrow = AsyncMock(return_value=row)
+    return db
+
+
+def user_row(is_active=True, is_admin=False, admin_role=None, admin_active=False):
+    return {"is_active": is_active, "is_admin": is_admin, "admin_role": admin_role, "admin_active": admin_active}
+
+
+def admin_request(user_id):
+    request = MagicMock()
+    request.query_params = {"admin_user_id": user_id}
+    return request
+
+
+class TestPrincipalCache:
+    """Test cases for PrincipalCache"""
+
+    def test_build_principal_roles(self):
+        principal = build_principal(user_row(is_admin=True, admin_role="super_admin", admin_active=True), USER_ID)
+
+        assert principal["roles"] == ["user", "admin", "super_admin"]
+        assert principal["exists"] and principal["is_active"] and principal["is_admin"]
+        assert build_principal(None, USER_ID)["exists"] is False
+
+    @pytest.mark.asyncio
+    async def test_hits_do_not_touch_database(self):
+        db = make_db(user_row())
+        cache = PrincipalCache(db)
+
+        for _ in range(5):
+            principal = await cache.get(USER_ID)
+
+        assert principal["is_active"] is True
+        assert db.fetchrow.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_reloads(self):
+        db = make_db(user_row())
+        cache = PrincipalCache(db)
+        await cache.get(USER_ID)
+
+        db.fetchrow.return_value = user_row(is_active=False)
+        await cache.invalidate(USER_ID)
+
+        assert (await cache.get(USER_ID))["is_active"] is False
+        assert db.fetchrow.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_user_id_is_not_queried(self):
+        db = make_db(user_row())
+
+        principal = await PrincipalCache(db).get("not-a-uuid")
+
+        assert principal["exists"] is False
+        db.fetchrow.assert_not_awaited()
+
+
+class TestPrincipalDependencies:
+    """Test cases for get_current_principal / verify_admin on the cache"""
+
+    @pytest.mark.asyncio
+    async def test_inactive_user_is_rejected(self, monkeypatch):
+        monkeypatch.setattr(auth, "get_principal_cache", lambda: PrincipalCache(make_db(user_row(is_active=False))))
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.get_current_principal(uuid.UUID(USER_ID))
+        assert exc.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_verify_admin_uses_cached_principal(self, monkeypatch):
+        db = make_db(user_row(is_admin=True))
+        cache = PrincipalCache(db)
+        monkeypatch.setattr(admin_controller, "get_principal_cache", lambda: cache)
+
+        for _ in range(3):
+            assert await admin_controller.verify_admin(admin_request(USER_ID)) == USER_ID
+        assert db.fetchrow.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_verify_admin_denies_non_admin_outside_dev(self, monkeypatch):
+        monkeypatch.setenv("ENV", "production")
+        monkeypatch.setattr(admin_controller, "get_principal_cache", lambda: PrincipalCache(make_db(user_row())))
+
+        with pytest.raises(HTTPException) as exc:
+            await admin_controller.verify_admin(admin_request(USER_ID))
+        assert exc.value.status_code == 403
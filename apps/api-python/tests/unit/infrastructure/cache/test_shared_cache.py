@@ -0,0 +1,97 @@
+"""Tests for SharedCache (L1 + L2 with cross-worker invalidation)"""
+
+from decimal import Decimal
+
+import pytest
+
+from infrastructure.cache.shared_cache import SharedCache, SharedCacheBackend, pack, unpack
+
+
+class InMemoryRedisBackend(SharedCacheBackend):
+    """Backend de teste: um dict faz o papel do Redis compartilhado entre 'workers'"""
+
+    def __init__(self, store, workers):
+        super().__init__()
+        self._store = store
+        self._workers = workers
+        workers.append(self)
+
+    @property
+    def available(self):
+        return True
+
+    async def get(self, namespace, key):
+        return self._store.get(self._key(namespace, key)), 60_000
+
+    async def set(self, namespace, key, data, ttl):
+        self._store[self._key(namespace, key)] = data
+
+    async def delete(self, namespace, key):
+        self._store.pop(self._key(namespace, key), None)
+
+    async def delete_prefix(self, namespace, prefix):
+        keys = [k for k in self._store if k.startswith(self._key(namespace, prefix))]
+        for k in keys:
+            del self._store[k]
+        return len(keys)
+
+    async def publish(self, namespace, key, is_prefix):
+        message = pack({"o": self.instance_id, "n": namespace, "k": key, "p": is_prefix})
+        for worker in self._workers:
+            await worker.handle_message(message)
+
+
+@pytest.fixture
+def workers():
+    store, backends = {}, []
+    a = SharedCache("positions", backend=InMemoryRedisBackend(store, backends))
+    b = SharedCache("positions", backend=InMemoryRedisBackend(store, backends))
+    return a, b
+
+
+class TestSharedCache:
+    """Test cases for SharedCache"""
+
+    def test_pack_roundtrip_converts_decimal(self):
+        assert unpack(pack({"balance": Decimal("1.5"), "ids": [1, 2]})) == {"balance": 1.5, "ids": [1, 2]}
+
+    @pytest.mark.asyncio
+    async def test_l1_only_without_backend(self):
+        cache = SharedCache("local_only", backend=SharedCacheBackend())
+        await cache.set("k", {"v": 1})
+
+        assert await cache.get("k") == {"v": 1}
+        assert cache.get_metrics()["backend"] == "memory"
+
+    @pytest.mark.asyncio
+    async def test_other_worker_hits_l2(self, workers):
+        a, b = workers
+        await a.set("user:1:positions", [{"symbol": "BTCUSDT"}])
+
+        assert await b.get("user:1:positions") == [{"symbol": "BTCUSDT"}]
+        assert b.get_metrics()["l2_hits"] == 1
+        # Segunda leitura já vem do L1
+        await b.get("user:1:positions")
+        assert b.get_metrics()["l1_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reaches_other_workers(self, workers):
+        a, b = workers
+        await a.set("user:1:positions", 1)
+        await a.set("user:1:metrics", 2)
+        await b.get("user:1:positions")
+
+        await a.invalidate_prefix("user:1:")
+
+        assert b.local_size() == 0
+        assert await b.get("user:1:positions") is None
+
+    @pytest.mark.asyncio
+    async def test_set_refreshes_other_workers_l1(self, workers):
+        a, b = workers
+        await a.set("k", "old")
+        await b.get("k")
+
+        await a.set("k", "new")
+
+        assert await b.get("k") == "new"
@@ -0,0 +1,185 @@
+"""Parity tests for the shared classic indicator library (alerts, live engines, backtests)"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from infrastructure.indicators import EMACrossCalculator, MACDCalculator, classic
+from infrastructure.services.indicator_alert_monitor import IndicatorAlertMonitor
+from infrastructure.services.strategy_websocket_monitor import StrategyWebSocketMonitor
+
+from .test_rolling import make_candles
+
+
+def make_closes(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    return 100 + np.cumsum(rng.normal(0, 1, n))
+
+
+# ========== Loops anteriores (referencia) ==========
+
+def loop_ema_sma(values, period):
+    """Previous calculator EMA (SMA seed, list starting at period - 1)"""
+    multiplier = 2 / (period + 1)
+    ema = [sum(values[:period]) / period]
+    for i in range(period, len(values)):
+        ema.append((values[i] - ema[-1]) * multiplier + ema[-1])
+    return ema
+
+
+def loop_ema_aligned(values, period):
+    """loop_ema_sma aligned with the input (NaN before the seed, leading NaNs skipped)"""
+    values = np.asarray(values, dtype=float)
+    first = int(np.flatnonzero(~np.isnan(values))[0])
+    result = np.full(len(values), np.nan)
+    result[first + period - 1:] = loop_ema_sma(list(values[first:]), period)
+    return result
+
+
+def loop_rsi(closes, period):
+    """Previous alert RSI, aligned with np.diff(closes)"""
+    deltas = np.diff(closes)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    avg_gain = np.zeros(len(deltas))
+    avg_loss = np.zeros(len(deltas))
+    avg_gain[period - 1] = np.mean(gains[:period])
+    avg_loss[period - 1] = np.mean(losses[:period])
+    for i in range(period, len(deltas)):
+        avg_gain[i] = (avg_gain[i - 1] * (period - 1) + gains[i]) / period
+        avg_loss[i] = (avg_loss[i - 1] * (period - 1) + losses[i]) / period
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = np.where(avg_loss != 0, avg_gain / avg_loss, 100)
+    return 100 - (100 / (1 + rs))
+
+
+def loop_kernel(closes, bandwidth):
+    """Previous O(n^2) Gaussian kernel regression"""
+    n = len(closes)
+    y_hat = np.zeros(n)
+    for i in range(n):
+        weights = np.exp(-0.5 * ((i - np.arange(n)) / bandwidth) ** 2)
+        y_hat[i] = np.sum(weights * closes) / np.sum(weights)
+    return y_hat
+
+
+class TestClassicIndicators:
+    """Array outputs match the previous loops"""
+
+    @pytest.mark.parametrize("period", [2, 9, 26])
+    def test_ema_is_sma_seeded(self, period):
+        closes = make_closes()
+        sma_seeded = classic.ema(closes, period)
+
+        assert np.isnan(sma_seeded[:period - 1]).all()
+        assert np.allclose(sma_seeded[period - 1:], loop_ema_sma(list(closes), period), rtol=1e-12)
+
+    def test_ema_skips_leading_nan(self):
+        values = np.concatenate(([np.nan] * 5, make_closes(50)))
+
+        assert np.allclose(classic.ema(values, 9)[5 + 8:], loop_ema_sma(list(values[5:]), 9), rtol=1e-12)
+
+    @pytest.mark.parametrize("period", [2, 14])
+    def test_rsi_matches_loop(self, period):
+        closes = make_closes()
+
+        assert np.allclose(classic.rsi(closes, period)[period:], loop_rsi(closes, period)[period - 1:], rtol=1e-10)
+
+    def test_rsi_without_losses_is_100(self):
+        # O loop anterior dos alertas retornava 100 - 100 / 101 (99.0099)
+        assert classic.rsi(np.arange(30.0), 14)[-1] == 100.0
+
+    def test_macd_matches_loop(self):
+        closes = make_closes()
+        macd_line, signal_line, histogram = classic.macd(closes, 12, 26, 9)
+
+        expected_macd = loop_ema_aligned(closes, 12) - loop_ema_aligned(closes, 26)
+        expected_signal = loop_ema_aligned(expected_macd, 9)
+        assert np.allclose(macd_line, expected_macd, rtol=1e-10, atol=1e-10, equal_nan=True)
+        assert np.allclose(signal_line, expected_signal, rtol=1e-10, atol=1e-10, equal_nan=True)
+        assert np.allclose(histogram, expected_macd - expected_signal, atol=1e-10, equal_nan=True)
+
+    def test_bollinger_matches_window_loop(self):
+        closes = make_closes()
+        bands = classic.bollinger(closes, 20, 2.0)
+
+        for i in range(19, len(closes)):
+            window = closes[i - 19:i + 1]
+            assert bands["middle"][i] == pytest.approx(np.mean(window), rel=1e-12)
+            assert bands["upper"][i] == pytest.approx(np.mean(window) + 2 * np.std(window), rel=1e-12)
+        assert np.isnan(bands["percent_b"][:19]).all()
+
+    @pytest.mark.parametrize("bandwidth", [1, 8, 25])
+    def test_kernel_regression_matches_loop(self, bandwidth):
+        closes = make_closes(400)
+
+        assert np.allclose(classic.kernel_regression(closes, bandwidth), loop_kernel(closes, bandwidth), rtol=1e-12)
+
+    def test_crossover(self):
+        fast = np.array([1.0, 2.0, 3.0, 3.0, 1.0, 3.0])
+        slow = np.array([2.0, 2.0, 2.0, 3.0, 2.0, 2.0])
+
+        # Toque no candle anterior so conta no modo nao estrito (calculators)
+        assert classic.crossover(fast, slow).tolist() == [0, 0, 1, 0, -1, 1]
+        assert classic.crossover(fast, slow, strict=True).tolist() == [0, 0, 0, 0, 0, 1]
+
+
+class TestSharedConsumers:
+    """Alerts and live strategies read the same arrays"""
+
+    @pytest.mark.parametrize("indicator,params,value_key", [
+        ("rsi", {"period": 14, "overbought": 0, "oversold": -1}, "value"),
+        ("bollinger", {"period": 20, "stddev": 1e-12}, "middle"),
+    ])
+    def test_alert_value_equals_live_snapshot(self, indicator, params, value_key):
+        closes = make_closes()
+        times = list(range(len(closes)))
+        monitor = IndicatorAlertMonitor(db=None)
+
+        signal = getattr(monitor, f"_calc_{indicator}_signal")(closes, times, params)
+        snapshot = getattr(classic, f"{indicator}_snapshot")(closes[:-1], params)
+
+        # Alerta avalia o ultimo candle fechado (-2): mesmo valor do snapshot sem o candle em formacao
+        assert signal["candle_time"] == times[-2]
+        assert signal["indicator_value"] == snapshot[value_key]
+
+    def test_ema_cross_signal_matches_loop(self):
+        closes = make_closes(400)
+        monitor = IndicatorAlertMonitor(db=None)
+        params = {"fast_period": 9, "slow_period": 21}
+        fast, slow = loop_ema_aligned(closes, 9), loop_ema_aligned(closes, 21)
+
+        for end in range(30, len(closes)):
+            window = closes[:end]
+            signal = monitor._calc_ema_cross_signal(window, list(range(end)), params)
+            if fast[end - 3] < slow[end - 3] and fast[end - 2] > slow[end - 2]:
+                assert signal["type"] == "buy"
+            elif fast[end - 3] > slow[end - 3] and fast[end - 2] < slow[end - 2]:
+                assert signal["type"] == "sell"
+            else:
+                assert signal is None
+
+    def test_websocket_monitor_delegates_to_library(self):
+        closes = make_closes()
+        monitor = StrategyWebSocketMonitor.__new__(StrategyWebSocketMonitor)
+
+        assert monitor._get_macd_values(closes, {}) == classic.macd_snapshot(closes, {})
+        assert monitor._get_nadaraya_watson_values(closes, {}) == classic.nadaraya_watson_snapshot(closes, {})
+        assert monitor._get_ema_cross_values(closes, {})["trend"] in (1, -1)
+
+    def test_alerts_live_and_backtest_share_one_seed(self):
+        # Alertas / engines ao vivo semeavam a EMA com o primeiro valor; agora
+        # todos usam a semente SMA dos calculators e do backtest
+        candles = make_candles(120)
+        closes = np.array([float(c.close) for c in candles])
+
+        backtest = MACDCalculator().calculate(candles).values
+        live = classic.macd_snapshot(closes, {})
+        assert backtest["macd"] == Decimal(str(round(live["macd"], 8)))
+        assert backtest["signal_line"] == Decimal(str(round(live["signal_line"], 8)))
+
+        backtest_cross = EMACrossCalculator().calculate(candles[:-1]).values
+        snapshot = classic.ema_cross_snapshot(closes[:-1], {})
+        assert backtest_cross["fast_ema"] == Decimal(str(round(snapshot["fast_ema"], 8)))
+        assert backtest_cross["slow_ema"] == Decimal(str(round(snapshot["slow_ema"], 8)))
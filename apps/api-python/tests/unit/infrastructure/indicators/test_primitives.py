@@ -0,0 +1,125 @@
+"""Tests for the shared array primitives and the ADX / OBV / SuperTrend built on them"""
+
+import numpy as np
+import pytest
+
+from infrastructure.indicators import (
+    ADXCalculator,
+    OBVCalculator,
+    SuperTrendCalculator,
+)
+from infrastructure.indicators.base import BaseIndicatorCalculator
+from infrastructure.indicators.primitives import (
+    carry_band,
+    directional_movement,
+    ema_filter,
+    on_balance_volume,
+    rolling_mean,
+    true_range,
+    wilder_smooth,
+)
+
+from .test_rolling import make_candles
+
+
+def loop_wilder(data, period):
+    """Previous implementation (ADX._wilder_smooth)"""
+    result = np.zeros(len(data))
+    if period <= len(data):
+        result[period - 1] = np.mean(data[:period])
+    for i in range(period, len(data)):
+        result[i] = result[i - 1] + (data[i] - result[i - 1]) / period
+    return result
+
+
+def loop_band(basic, closes, upper):
+    """Previous SuperTrend band carry-forward loop"""
+    band = np.zeros(len(basic))
+    band[0] = basic[0]
+    for i in range(1, len(basic)):
+        if upper:
+            restart = basic[i] < band[i - 1] or closes[i - 1] > band[i - 1]
+        else:
+            restart = basic[i] > band[i - 1] or closes[i - 1] < band[i - 1]
+        band[i] = basic[i] if restart else band[i - 1]
+    return band
+
+
+class TestPrimitives:
+    """Test cases for the array primitives"""
+
+    @pytest.mark.parametrize("period", [1, 2, 14, 50])
+    def test_wilder_smooth_matches_loop(self, period):
+        data = np.random.default_rng(period).random(5000) * 100
+
+        assert np.allclose(wilder_smooth(data, period), loop_wilder(data, period), rtol=1e-10, atol=1e-10)
+        assert not wilder_smooth(data[:period - 1], period).any()
+
+    def test_ema_filter_long_series_is_stable(self):
+        data = np.full(100_000, 3.0)
+
+        assert np.allclose(ema_filter(data, 0.01), 3.0)
+        with pytest.raises(ValueError):
+            ema_filter(data, 0)
+
+    def test_true_range_and_directional_movement(self):
+        highs = np.array([10.0, 12.0, 11.0, 11.5])
+        lows = np.array([9.0, 10.5, 9.0, 10.0])
+        closes = np.array([9.5, 11.0, 10.0, 11.0])
+
+        assert true_range(highs, lows, closes).tolist() == [1.0, 2.5, 2.0, 1.5]
+        plus_dm, minus_dm = directional_movement(highs, lows)
+        assert plus_dm.tolist() == [0.0, 2.0, 0.0, 0.5]
+        assert minus_dm.tolist() == [0.0, 0.0, 1.5, 0.0]
+
+    def test_obv_and_rolling_mean(self):
+        closes = [1.0, 2.0, 2.0, 1.5, 3.0]
+        volumes = [10.0, 5.0, 7.0, 2.0, 4.0]
+
+        obv = on_balance_volume(closes, volumes)
+        assert obv.tolist() == [10.0, 15.0, 15.0, 13.0, 17.0]
+        assert rolling_mean(obv, 3) == pytest.approx([40 / 3, 43 / 3, 15.0])
+        assert rolling_mean(obv, 6).size == 0
+
+    def test_rolling_mean_matches_window_mean_on_long_series(self):
+        rng = np.random.default_rng(5)
+        volumes = np.cumsum(rng.choice([-1, 1], 50_000) * rng.random(50_000) * 1e6)
+
+        expected = [np.mean(volumes[i - 19:i + 1]) for i in range(19, len(volumes))]
+        assert np.array_equal(rolling_mean(volumes, 20), expected)
+
+    @pytest.mark.parametrize("upper", [True, False])
+    def test_carry_band_matches_loop(self, upper):
+        rng = np.random.default_rng(11)
+        closes = 100 + np.cumsum(rng.normal(0, 1, 3000))
+        basic = closes + (1 if upper else -1) * rng.random(3000) * 4
+
+        assert np.array_equal(carry_band(basic, closes, upper), loop_band(basic, closes, upper))
+
+
+class TestVectorizedIndicators:
+    """calculate_series equals calculate() on every prefix"""
+
+    @pytest.mark.parametrize("calculator", [
+        ADXCalculator(),
+        ADXCalculator({"period": 3}),
+        OBVCalculator(),
+        OBVCalculator({"sma_period": 5, "signal_period": 3}),
+        SuperTrendCalculator(),
+        SuperTrendCalculator({"period": 3, "multiplier": 0.5}),
+    ])
+    def test_series_matches_per_prefix_calculate(self, calculator):
+        candles = make_candles(260)
+
+        series = calculator.calculate_series(candles)
+        expected = BaseIndicatorCalculator.calculate_series(calculator, candles)
+
+        assert calculator.vectorized_series is True
+        assert [r.timestamp for r in series] == [r.timestamp for r in expected]
+        assert [r.values for r in series] == [r.values for r in expected]
+
+    def test_supertrend_flips_with_price(self):
+        candles = make_candles(300)
+        trends = {int(r.values["trend"]) for r in SuperTrendCalculator({"multiplier": 1.0}).calculate_series(candles)}
+
+        assert trends == {1, -1}
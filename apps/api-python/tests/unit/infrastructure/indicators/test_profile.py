@@ -0,0 +1,180 @@
+"""Tests for the histogram price profiles and TPOCalculator built on them"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from infrastructure.indicators import (
+    Candle,
+    LiveProfile,
+    TPOCalculator,
+    build_profiles,
+    rolling_windows,
+    session_bounds,
+)
+
+from .test_rolling import make_candles
+
+
+def scaled_candles(n, seed=7, scale=300):
+    """BTC-like prices (auto tick >= 1)"""
+    return [
+        Candle(timestamp=c.timestamp, open=c.open * scale, high=c.high * scale,
+               low=c.low * scale, close=c.close * scale, volume=c.volume)
+        for c in make_candles(n, seed)
+    ]
+
+
+def naive_profile(candles, tick_size):
+    """Previous implementation: dict filled level by level"""
+    profile = defaultdict(int)
+    for candle in candles:
+        price_level = (float(candle.low) // tick_size) * tick_size
+        while price_level <= float(candle.high):
+            profile[round(price_level, 8)] += 1
+            price_level += tick_size
+    return dict(profile)
+
+
+def naive_levels(profile, value_area_percent=70.0):
+    """Previous POC / Value Area scan over the dict profile"""
+    max_count = max(profile.values())
+    poc_levels = [price for price, count in profile.items() if count == max_count]
+    poc = sum(poc_levels) / len(poc_levels)
+
+    target = int(sum(profile.values()) * (value_area_percent / 100))
+    prices = sorted(profile)
+    low = high = min(range(len(prices)), key=lambda i: abs(prices[i] - poc))
+    current = profile[prices[low]]
+    while current < target and (low > 0 or high < len(prices) - 1):
+        up = profile[prices[high + 1]] if high < len(prices) - 1 else -1
+        down = profile[prices[low - 1]] if low > 0 else -1
+        if up >= down:
+            high += 1
+            current += up
+        else:
+            low -= 1
+            current += down
+    return poc, prices[high], prices[low]
+
+
+class TestBuildProfiles:
+    """Test cases for build_profiles / PriceProfiles"""
+
+    @pytest.mark.parametrize("tick_size", [5.0, 12.5, 40.0])
+    def test_rolling_windows_match_dict_profile(self, tick_size):
+        candles = scaled_candles(200)
+        highs = [float(c.high) for c in candles]
+        lows = [float(c.low) for c in candles]
+        starts, ends = rolling_windows(len(candles), 24)
+
+        profiles = build_profiles(highs, lows, None, tick_size, starts, ends)
+        poc = profiles.poc()
+        vah, val = profiles.value_area(70.0, poc)
+
+        for s, (start, end) in enumerate(zip(starts, ends)):
+            expected = naive_profile(candles[start:end], tick_size)
+            assert profiles.profile(s) == pytest.approx(expected)
+            exp_poc, exp_vah, exp_val = naive_levels(expected)
+            assert (poc[s], vah[s], val[s]) == pytest.approx((exp_poc, exp_vah, exp_val))
+
+    def test_volume_is_spread_over_candle_bins(self):
+        profiles = build_profiles([10.9, 12.5, 11.9], [10.0, 11.2, 11.1], [50.0, 4.0, 1.0], 1.0, [0], [3])
+
+        assert profiles.profile(0) == {10.0: 1, 11.0: 2, 12.0: 1}
+        assert profiles.volume_profile(0) == pytest.approx({10.0: 50.0, 11.0: 3.0, 12.0: 2.0})
+        assert profiles.volume_poc()[0] == 10.0
+        assert profiles.poc()[0] == 11.0
+
+    def test_session_bounds_groups_by_time(self):
+        hours = np.arange(0, 72, 1) * 3600
+        starts, ends = session_bounds(hours, 24 * 3600)
+
+        assert starts.tolist() == [0, 24, 48]
+        assert ends.tolist() == [24, 48, 72]
+
+    def test_empty_session_is_rejected(self):
+        with pytest.raises(ValueError):
+            build_profiles([1.0], [1.0], None, 1.0, [0], [0])
+
+
+class TestLiveProfile:
+    """Test cases for LiveProfile"""
+
+    def test_incremental_matches_batch(self):
+        rng = np.random.default_rng(5)
+        lows = 100 + np.cumsum(rng.normal(0, 1, 40))
+        highs = lows + rng.random(40) * 3
+        volumes = rng.random(40) * 10
+        live = LiveProfile(0.5)
+
+        for high, low, volume in zip(highs[:-1], lows[:-1], volumes[:-1]):
+            live.add(high, low, volume)
+        # Candle em formacao atualizado varias vezes: so o ultimo conta
+        live.update_forming(highs[-1] + 5, lows[-1] - 5, 99.0)
+        live.update_forming(highs[-1], lows[-1], volumes[-1])
+
+        batch = build_profiles(highs, lows, volumes, 0.5, [0], [40])
+        snapshot = live.snapshot()
+        assert snapshot.profile(0) == batch.profile(0)
+        assert snapshot.volume_profile(0) == pytest.approx(batch.volume_profile(0))
+
+        vah, val = batch.value_area(70.0)
+        assert live.key_levels() == pytest.approx({
+            "poc": batch.poc()[0], "vah": vah[0], "val": val[0], "volume_poc": batch.volume_poc()[0],
+        })
+
+        live.clear_forming()
+        closed = build_profiles(highs[:-1], lows[:-1], volumes[:-1], 0.5, [0], [39])
+        assert live.snapshot().profile(0) == closed.profile(0)
+
+
+class TestTPOCalculator:
+    """TPOCalculator on the histogram profiles"""
+
+    def test_series_matches_per_candle_calculate(self):
+        candles = scaled_candles(150)
+        calc = TPOCalculator({"period": 30})
+
+        series = calc.calculate_series(candles)
+        expected = [calc.calculate(candles[:i]) for i in range(calc.required_candles, len(candles) + 1)]
+
+        assert [r.values for r in series] == [r.values for r in expected]
+        assert [r.timestamp for r in series] == [r.timestamp for r in expected]
+
+    def test_profile_matches_dict_implementation(self):
+        candles = scaled_candles(100)
+        calc = TPOCalculator()
+
+        result, profile = calc.calculate_with_profile(candles)
+        tick_size = float(result.values["tick_size"])
+        expected = naive_profile(candles[-calc.period:], tick_size)
+        poc, vah, val = naive_levels(expected)
+
+        assert profile == pytest.approx(expected)
+        assert result.values["poc"] == Decimal(str(round(poc, 8)))
+        assert result.values["vah"] == Decimal(str(round(vah, 8)))
+        assert result.values["val"] == Decimal(str(round(val, 8)))
+
+    def test_auto_tick_size_for_low_priced_assets(self):
+        # Range/row_size < 0.5 era arredondado para 0 (tick de 1e-8)
+        candles = make_candles(48)
+        calc = TPOCalculator()
+
+        tick_size = calc._calculate_tick_size(candles[-calc.period:])
+        closes = [float(c.close) for c in candles[-calc.period:]]
+        raw_tick = (max(closes) - min(closes)) / calc.row_size
+
+        assert raw_tick / 2 <= tick_size <= raw_tick * 2
+        assert len(calc.calculate_with_profile(candles)[1]) < 100
+
+    def test_daily_sessions(self):
+        candles = scaled_candles(24 * 3 + 5)
+        sessions = TPOCalculator().calculate_sessions(candles)
+
+        assert [s["candles"] for s in sessions] == [24, 24, 24, 5]
+        assert sessions[1]["start"] == candles[0].timestamp + timedelta(days=1)
+        assert all(s["val"] <= s["poc"] <= s["vah"] for s in sessions)
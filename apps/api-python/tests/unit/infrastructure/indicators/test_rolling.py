@@ -0,0 +1,135 @@
+"""Tests for the O(n) rolling extrema and the indicators built on them"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from infrastructure.indicators import (
+    Candle,
+    IchimokuCalculator,
+    RollingExtrema,
+    StochasticCalculator,
+    StochasticRSICalculator,
+    rolling_max,
+    rolling_min,
+)
+
+
+def naive_rolling(values, period, func):
+    """Previous implementation: np.max/np.min over a slice for every index"""
+    return np.array([func(values[i - period + 1:i + 1]) for i in range(period - 1, len(values))])
+
+
+def make_candles(n, seed=7):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    start = datetime(2024, 1, 1)
+    candles = []
+    for i, close in enumerate(closes):
+        high = close + abs(rng.normal(0, 0.5))
+        low = close - abs(rng.normal(0, 0.5))
+        candles.append(Candle(
+            timestamp=start + timedelta(hours=i),
+            open=Decimal(str(round(close, 4))),
+            high=Decimal(str(round(high, 4))),
+            low=Decimal(str(round(low, 4))),
+            close=Decimal(str(round(close, 4))),
+            volume=Decimal("10"),
+        ))
+    return candles
+
+
+class TestRollingExtrema:
+    """Test cases for rolling_max / rolling_min / RollingExtrema"""
+
+    @pytest.mark.parametrize("period", [1, 2, 3, 9, 26, 52, 120, 300])
+    def test_matches_naive_windows(self, period):
+        values = np.random.default_rng(period).normal(0, 1, 300)
+        values[::17] = values[::17].round(1)  # repeated values
+
+        assert np.array_equal(rolling_max(values, period), naive_rolling(values, period, np.max))
+        assert np.array_equal(rolling_min(values, period), naive_rolling(values, period, np.min))
+
+    def test_short_input_returns_empty(self):
+        assert rolling_max([1.0, 2.0], 3).size == 0
+        with pytest.raises(ValueError):
+            rolling_min([1.0], 0)
+
+    @pytest.mark.parametrize("period", [1, 5, 14])
+    def test_streaming_matches_batch(self, period):
+        rng = np.random.default_rng(3)
+        highs = rng.normal(100, 5, 200)
+        lows = highs - rng.random(200)
+        stream = RollingExtrema(period)
+
+        pushed = [stream.push(h, l) for h, l in zip(highs, lows)]
+
+        assert all(p is None for p in pushed[:period - 1])
+        assert [p[0] for p in pushed[period - 1:]] == rolling_max(highs, period).tolist()
+        assert [p[1] for p in pushed[period - 1:]] == rolling_min(lows, period).tolist()
+
+    def test_peek_includes_forming_candle_without_mutating(self):
+        stream = RollingExtrema(3)
+        for value in (5.0, 1.0, 4.0):
+            stream.push(value)
+
+        # Forming candle replaces the oldest (5.0) in the window
+        assert stream.peek(2.0) == (4.0, 1.0)
+        assert stream.peek(9.0, 0.5) == (9.0, 0.5)
+        assert stream.value == (5.0, 1.0)
+        assert stream.push(2.0) == (4.0, 1.0)
+
+
+class TestIndicatorsUseRollingExtrema:
+    """Indicator outputs are identical to the previous per-index slice loops"""
+
+    def test_ichimoku_matches_naive_donchian(self):
+        candles = make_candles(400)
+
+        class NaiveIchimoku(IchimokuCalculator):
+            def _donchian_channel(self, highs, lows, period):
+                result = np.zeros(len(highs))
+                result[period - 1:] = (naive_rolling(highs, period, np.max) + naive_rolling(lows, period, np.min)) / 2
+                return result
+
+        for parameters in (None, {"tenkan_period": 9, "kijun_period": 26, "senkou_b_period": 52, "displacement": 26}):
+            expected = NaiveIchimoku(parameters).calculate(candles).values
+            assert IchimokuCalculator(parameters).calculate(candles).values == expected
+
+    def test_stochastic_matches_naive_loop(self):
+        candles = make_candles(300)
+        calc = StochasticCalculator()
+        highs = np.array([float(c.high) for c in candles])
+        lows = np.array([float(c.low) for c in candles])
+        closes = np.array([float(c.close) for c in candles])
+
+        raw_k = []
+        for i in range(calc.k_period - 1, len(closes)):
+            highest = np.max(highs[i - calc.k_period + 1:i + 1])
+            lowest = np.min(lows[i - calc.k_period + 1:i + 1])
+            raw_k.append(((closes[i] - lowest) / (highest - lowest)) * 100 if highest - lowest > 0 else 50.0)
+        k_smooth = calc._sma(raw_k, calc.smooth)
+        d_values = calc._sma(k_smooth, calc.d_period)
+
+        result = calc.calculate(candles)
+        assert result.values["k"] == Decimal(str(round(k_smooth[-1], 2)))
+        assert result.values["d"] == Decimal(str(round(d_values[-1], 2)))
+
+    def test_stochastic_rsi_matches_naive_loop(self):
+        candles = make_candles(300)
+        calc = StochasticRSICalculator()
+        rsi_values = calc._calculate_rsi(np.array([float(c.close) for c in candles]))
+
+        stoch_rsi = []
+        for i in range(calc.stoch_period - 1, len(rsi_values)):
+            window = rsi_values[i - calc.stoch_period + 1:i + 1]
+            low, high = np.min(window), np.max(window)
+            stoch_rsi.append(((rsi_values[i] - low) / (high - low)) * 100 if high - low > 0 else 50.0)
+        k_values = calc._sma(stoch_rsi, calc.k_period)
+        d_values = calc._sma(k_values, calc.d_period)
+
+        result = calc.calculate(candles)
+        assert result.values["k"] == Decimal(str(round(k_values[-1], 2)))
+        assert result.values["d"] == Decimal(str(round(d_values[-1], 2)))
@@ -0,0 +1,134 @@
+"""Tests for the shared price oracle"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from infrastructure.pricing import price_oracle
+from infrastructure.pricing.binance_price_service import BinancePriceService
+from infrastructure.pricing.price_oracle import PriceOracle, get_price_oracle
+
+BINANCE_TICKERS = [
+    {"symbol": "BTCUSDT", "price": "65000.10"},
+    {"symbol": "ETHUSDT", "price": "3500.5"},
+    {"symbol": "FOOBUSD", "price": "2.0"},
+    {"symbol": "BUSDUSDT", "price": "0.999"},
+]
+BINGX_TICKERS = {"code": 0, "data": [
+    {"symbol": "AERO-USDT", "lastPrice": "0.8931"},
+    {"symbol": "DEAD-USDT", "lastPrice": "0"},
+]}
+
+
+class Feed:
+    """Mock bulk ticker endpoint counting requests"""
+
+    def __init__(self, payload, delay=0.0, status=200):
+        self.payload = payload
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+
+    async def __call__(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        return httpx.Response(self.status, json=self.payload)
+
+
+def make_oracle(feed_name, feed, **kwargs):
+    oracle = PriceOracle(feed_name, **kwargs)
+    oracle.transport = httpx.MockTransport(feed)
+    return oracle
+
+
+class TestPriceOracle:
+    """Test cases for PriceOracle"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_refresh_and_lookups(self):
+        oracle = make_oracle("binance", Feed(BINANCE_TICKERS))
+        assert oracle.is_stale and oracle.get_price("BTCUSDT") is None
+
+        assert await oracle.refresh() == 4
+        assert oracle.get_price("btc-usdt") == 65000.10
+        assert oracle.get_asset_usdt_price("USDC") == 1.0
+        assert oracle.get_asset_usdt_price("FOO") == pytest.approx(2.0 * 0.999)
+        assert oracle.get_asset_usdt_price("NOPE") is None
+
+        status = oracle.get_status()
+        assert status["symbols"] == 4 and status["stale"] is False and status["refreshes"] == 1
+        await oracle.stop()
+
+    @pytest.mark.asyncio
+    async def test_bingx_symbols_are_normalized(self):
+        oracle = make_oracle("bingx", Feed(BINGX_TICKERS))
+        await oracle.refresh()
+        assert oracle.prices == {"AEROUSDT": 0.8931}
+        assert oracle.get_price("AERO-USDT") == 0.8931
+        await oracle.stop()
+
+    @pytest.mark.asyncio
+    async def test_max_age_rejects_old_prices(self, monkeypatch):
+        oracle = make_oracle("binance", Feed(BINANCE_TICKERS))
+        await oracle.refresh()
+        now = price_oracle.time.monotonic()
+        monkeypatch.setattr(price_oracle.time, "monotonic", lambda: now + 60)
+
+        assert oracle.get_price("BTCUSDT") == 65000.10
+        assert oracle.get_price("BTCUSDT", max_age=10) is None
+        assert oracle.is_stale
+        await oracle.stop()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_stale_readers_share_one_request(self):
+        feed = Feed(BINANCE_TICKERS, delay=0.05)
+        oracle = make_oracle("binance", feed)
+
+        results = await asyncio.gather(*(oracle.ensure_fresh() for _ in range(10)))
+
+        assert feed.requests == 1
+        assert all(r["ETHUSDT"] == 3500.5 for r in results)
+        await oracle.ensure_fresh()
+        assert feed.requests == 1
+        await oracle.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_last_snapshot(self, monkeypatch):
+        feed = Feed(BINANCE_TICKERS)
+        oracle = make_oracle("binance", feed, stale_after=0)
+        await oracle.refresh()
+        feed.status = 503
+
+        prices = await oracle.ensure_fresh()
+
+        assert prices["BTCUSDT"] == 65000.10
+        assert oracle.get_status()["errors"] == 1
+        await oracle.stop()
+
+    @pytest.mark.asyncio
+    async def test_background_loop_refreshes(self):
+        feed = Feed(BINANCE_TICKERS)
+        oracle = make_oracle("binance", feed, refresh_interval=0.01)
+        await oracle.start()
+        await asyncio.sleep(0.05)
+        await oracle.stop()
+        assert feed.requests >= 3
+        assert not oracle.is_running
+
+    def test_unknown_feed_raises(self):
+        with pytest.raises(ValueError):
+            PriceOracle("kraken")
+
+    @pytest.mark.asyncio
+    async def test_price_service_reads_shared_oracle(self, monkeypatch):
+        feed = Feed(BINANCE_TICKERS)
+        monkeypatch.setattr(price_oracle, "_oracles", {})
+        get_price_oracle("binance").transport = httpx.MockTransport(feed)
+
+        first = await BinancePriceService(testnet=False).get_all_ticker_prices()
+        second = await BinancePriceService(testnet=False).get_all_ticker_prices()
+
+        assert first is second
+        assert feed.requests == 1
+        await get_price_oracle("binance").stop()
@@ -0,0 +1,159 @@
+"""Unit tests for the JWT revocation store"""
+
+import importlib
+import time
+
+import pytest
+
+from infrastructure.config import settings as settings_module
+from infrastructure.security import token_revocation
+from infrastructure.security.token_revocation import (
+    BloomFilter,
+    InMemoryRevocationBackend,
+    RedisRevocationBackend,
+    TokenRevocationStore,
+)
+
+
+class CountingBackend(InMemoryRevocationBackend):
+    """Shared backend stand-in (plays Redis for several 'workers') counting reads"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def active_revocations(self):
+        self.reads += 1
+        return super().active_revocations()
+
+
+class FlakyBackend(InMemoryRevocationBackend):
+    """Backend whose writes fail while `down` is set"""
+
+    def __init__(self):
+        super().__init__()
+        self.down = True
+
+    def revoke(self, jti, expires_at):
+        if self.down:
+            raise ConnectionError("redis down")
+        super().revoke(jti, expires_at)
+
+
+class TestBloomFilter:
+    """Test cases for BloomFilter"""
+
+    def test_no_false_negatives_and_low_false_positives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+
+        assert all(f"jti-{i}" in bloom for i in range(1000))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        assert false_positives < 300
+
+
+class TestTokenRevocationStore:
+    """Test cases for TokenRevocationStore"""
+
+    def test_checks_are_answered_locally(self):
+        backend = CountingBackend()
+        store = TokenRevocationStore(backend)
+        store.revoke("revoked", time.time() + 60)
+
+        assert store.is_revoked("revoked") is True
+        assert not any(store.is_revoked(f"jti-{i}") for i in range(500))
+        assert backend.reads == 0
+
+    def test_revocation_visible_to_other_workers_after_sync(self):
+        backend = CountingBackend()
+        worker_a = TokenRevocationStore(backend, sync_interval=3600)
+        worker_b = TokenRevocationStore(backend, sync_interval=3600)
+        assert worker_b.is_revoked("jti-1") is False
+
+        worker_a.revoke("jti-1", time.time() + 60)
+        worker_b.sync()
+
+        assert worker_b.is_revoked("jti-1") is True
+
+    def test_entries_expire_with_token(self, monkeypatch):
+        store = TokenRevocationStore(InMemoryRevocationBackend())
+        now = time.time()
+        store.revoke("jti-1", now + 30)
+        store.revoke("already-expired", now - 1)
+
+        assert store.is_revoked("jti-1") is True
+        assert store.is_revoked("already-expired") is False
+
+        monkeypatch.setattr(token_revocation.time, "time", lambda: now + 31)
+        assert store.is_revoked("jti-1") is False
+        assert store.sync() == 0
+
+    def test_failed_backend_write_is_retried_on_sync(self):
+        backend = FlakyBackend()
+        store = TokenRevocationStore(backend)
+        store.revoke("jti-1", time.time() + 60)
+
+        assert store.is_revoked("jti-1") is True
+        with pytest.raises(ConnectionError):
+            store.sync()
+        assert store.is_revoked("jti-1") is True
+
+        backend.down = False
+        assert store.sync() == 1
+        assert store.get_metrics()["pending_writes"] == 0
+        assert "jti-1" in backend.active_revocations()
+
+    def test_background_thread_syncs(self):
+        backend = InMemoryRevocationBackend()
+        store = TokenRevocationStore(backend, sync_interval=0.01)
+        store.start()
+        try:
+            backend.revoke("jti-1", time.time() + 60)  # revogado por outro worker
+            deadline = time.monotonic() + 2
+            while not store.is_revoked("jti-1") and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert store.is_revoked("jti-1") is True
+        finally:
+            store.stop()
+
+    def test_redis_backend_does_not_connect_at_build_time(self):
+        backend = RedisRevocationBackend("redis://127.0.0.1:1")
+        store = TokenRevocationStore(backend)
+
+        store.revoke("jti-1", time.time() + 60)
+
+        assert store.is_revoked("jti-1") is True
+        assert store.get_metrics()["pending_writes"] == 1
+
+
+class TestJWTManagerRevocation:
+    """JWTManager uses the shared revocation store"""
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        for name in ("SECRET_KEY", "TV_WEBHOOK_SECRET", "DATABASE_URL", "ENCRYPTION_KEY"):
+            monkeypatch.setenv(name, "test-" + name.lower())
+        monkeypatch.setattr(settings_module, "_settings", None)
+        jwt_module = importlib.import_module("infrastructure.security.jwt_manager")
+
+        manager = jwt_module.JWTManager()
+        manager._revocation_store = TokenRevocationStore(InMemoryRevocationBackend())
+        return manager
+
+    def test_revoked_access_token_is_rejected(self, manager):
+        pair = manager.create_token_pair("user-1", "u@example.com")
+        assert manager.validate_access_token(pair.access_token).is_valid
+
+        manager.revoke_token(pair.access_token)
+
+        result = manager.validate_access_token(pair.access_token)
+        assert not result.is_valid and result.error == "Token has been revoked"
+
+    def test_refresh_token_reuse_revokes_user_tokens(self, manager):
+        pair = manager.create_token_pair("user-1", "u@example.com")
+        assert manager.refresh_tokens(pair.refresh_token) is not None
+
+        assert manager.refresh_tokens(pair.refresh_token) is None
+        assert manager.revocation_store.sync() >= 1
@@ -0,0 +1,220 @@
+"""
+Equivalence tests: event-driven backtest fast path vs the bar-by-bar loop
+
+The fixture (fixtures/backtest_candles_1h.json) is a committed, synthetic
+random-walk series of 720 1h candles with volatility regimes, so both engines
+always run on exactly the same prices.
+"""
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from infrastructure.database.models.strategy import ConditionType, IndicatorType, LogicOperator
+from infrastructure.indicators.base import Candle
+from infrastructure.services.backtest_service import (
+    BacktestConfig,
+    BacktestService,
+    BacktestState,
+    CandleArrays,
+    build_signal_masks,
+)
+
+FIXTURE = Path(__file__).parent / "fixtures" / "backtest_candles_1h.json"
+
+INDICATORS = {
+    "rsi": (IndicatorType.RSI, {"period": 14}),
+    "bollinger": (IndicatorType.BOLLINGER, {}),
+}
+
+STRATEGIES = {
+    "long_only_signal_exits": {
+        ConditionType.ENTRY_LONG: [{"left": "rsi", "operator": "<", "right": "35"}],
+        ConditionType.EXIT_LONG: [{"left": "rsi", "operator": ">", "right": "60"}],
+    },
+    "long_short_bands": {
+        ConditionType.ENTRY_LONG: [
+            {"left": "close", "operator": "<", "right": "bb.lower"},
+            {"left": "rsi", "operator": "<", "right": "45"},
+        ],
+        ConditionType.ENTRY_SHORT: [{"left": "close", "operator": ">", "right": "bb.upper"}],
+        ConditionType.EXIT_LONG: [{"left": "close", "operator": ">", "right": "bb.middle"}],
+        ConditionType.EXIT_SHORT: [{"left": "close", "operator": "<", "right": "bb.middle"}],
+    },
+    "stops_only": {
+        ConditionType.ENTRY_LONG: [{"left": "rsi", "operator": ">", "right": "50"}],
+        ConditionType.ENTRY_SHORT: [{"left": "rsi", "operator": "<=", "right": "50"}],
+    },
+}
+
+CONFIGS = {
+    "default": BacktestConfig(),
+    "tight_stops": BacktestConfig(stop_loss_percent=Decimal("0.4"), take_profit_percent=Decimal("0.6")),
+    "wide_stops_no_costs": BacktestConfig(
+        stop_loss_percent=Decimal("10"),
+        take_profit_percent=Decimal("20"),
+        include_fees=False,
+        include_slippage=False,
+    ),
+}
+
+
+def load_candles():
+    data = json.loads(FIXTURE.read_text())
+    return [
+        Candle(
+            timestamp=datetime.fromtimestamp(row[0] / 1000, tz=timezone.utc),
+            open=Decimal(row[1]),
+            high=Decimal(row[2]),
+            low=Decimal(row[3]),
+            close=Decimal(row[4]),
+            volume=Decimal(row[5]),
+        )
+        for row in data["candles"]
+    ]
+
+
+@pytest.fixture(scope="module")
+def candles():
+    return load_candles()
+
+
+@pytest.fixture(scope="module")
+def indicator_columns(candles):
+    """Indicator context of every candle, computed once on growing windows"""
+    calculators = {
+        name: BacktestService.INDICATOR_CALCULATORS[indicator_type](parameters)
+        for name, (indicator_type, parameters) in INDICATORS.items()
+    }
+    start = max(calc.required_candles for calc in calculators.values())
+    columns = {}
+    for i in range(start, len(candles)):
+        for name, calculator in calculators.items():
+            result = calculator.calculate(candles[:i + 1])
+            if result and result.values:
+                for key, value in result.values.items():
+                    columns.setdefault(f"{name}.{key}", np.full(len(candles), np.nan))[i] = float(value)
+    return start, columns
+
+
+def operators_for(conditions):
+    return {condition_type: LogicOperator.AND for condition_type in conditions}
+
+
+async def run_both(candles, indicator_columns, conditions, config):
+    service = BacktestService(MagicMock())
+    start, columns = indicator_columns
+    operators = operators_for(conditions)
+
+    def indicator_values_at(i):
+        return {key: float(column[i]) for key, column in columns.items() if not np.isnan(column[i])}
+
+    loop_state = await service._simulate(
+        candles, start, indicator_values_at, conditions, operators, config,
+        BacktestState(capital=config.initial_capital)
+    )
+
+    arrays = CandleArrays.from_candles(candles)
+    masks = build_signal_masks(conditions, operators, {**columns, **arrays.price_columns()}, len(candles))
+    event_state = await service._simulate_events(
+        candles, start, len(candles), masks, config, BacktestState(capital=config.initial_capital), arrays
+    )
+    return service, loop_state, event_state
+
+
+class TestEventDrivenBacktest:
+    """Test cases for BacktestService._simulate_events"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("config_name", sorted(CONFIGS))
+    @pytest.mark.parametrize("strategy_name", sorted(STRATEGIES))
+    async def test_trades_equity_and_metrics_match_loop(self, candles, indicator_columns, strategy_name, config_name):
+        config = CONFIGS[config_name]
+        service, loop_state, event_state = await run_both(
+            candles, indicator_columns, STRATEGIES[strategy_name], config
+        )
+
+        assert len(loop_state.trades) >= 3
+        assert event_state.trades == loop_state.trades
+        assert event_state.capital == loop_state.capital
+        assert event_state.position == loop_state.position
+        assert event_state.entry_price == loop_state.entry_price
+        assert event_state.highest_price_since_entry == loop_state.highest_price_since_entry
+        assert event_state.lowest_price_since_entry == loop_state.lowest_price_since_entry
+        assert event_state.equity_curve == loop_state.equity_curve
+
+        assert service._calculate_metrics(event_state, config) == service._calculate_metrics(loop_state, config)
+
+    @pytest.mark.asyncio
+    async def test_exit_reasons_cover_every_event_kind(self, candles, indicator_columns):
+        _, loop_state, event_state = await run_both(
+            candles, indicator_columns, STRATEGIES["long_short_bands"], CONFIGS["default"]
+        )
+
+        reasons = {trade.exit_reason for trade in event_state.trades}
+        assert {"stop_loss", "take_profit", "signal_exit"} <= reasons
+        assert [t.exit_reason for t in event_state.trades] == [t.exit_reason for t in loop_state.trades]
+
+    def test_path_dependent_exits_keep_the_loop(self):
+        assert BacktestService._supports_event_driven(BacktestConfig())
+        assert not BacktestService._supports_event_driven(BacktestConfig(use_trailing_stop=True))
+        assert not BacktestService._supports_event_driven(BacktestConfig(use_break_even=True))
+        assert not BacktestService._supports_event_driven(BacktestConfig(use_partial_tp=True))
+
+    @pytest.mark.asyncio
+    async def test_regular_backtest_uses_fast_path_with_same_result(self, candles, monkeypatch):
+        service = BacktestService(MagicMock())
+        calculators = {
+            name: BacktestService.INDICATOR_CALCULATORS[indicator_type](parameters)
+            for name, (indicator_type, parameters) in INDICATORS.items()
+        }
+        conditions = STRATEGIES["long_short_bands"]
+        config = CONFIGS["default"]
+        events = MagicMock(wraps=service._simulate_events)
+        monkeypatch.setattr(service, "_simulate_events", events)
+
+        fast_state, fast_series = await service._run_simulation_with_indicators(
+            candles, calculators, conditions, operators_for(conditions), config,
+            BacktestState(capital=config.initial_capital)
+        )
+        assert events.call_count == 1
+
+        monkeypatch.setattr(BacktestService, "_supports_event_driven", staticmethod(lambda c: False))
+        loop_state, loop_series = await service._run_simulation_with_indicators(
+            candles, calculators, conditions, operators_for(conditions), config,
+            BacktestState(capital=config.initial_capital)
+        )
+
+        assert events.call_count == 1
+        assert fast_state.trades == loop_state.trades
+        assert fast_state.equity_curve == loop_state.equity_curve
+        assert fast_series.to_chart() == loop_series.to_chart()
+
+    @pytest.mark.asyncio
+    async def test_stored_result_still_returns_indicator_series(self, candles, monkeypatch):
+        service = BacktestService(MagicMock())
+        calculators = {
+            name: BacktestService.INDICATOR_CALCULATORS[indicator_type](parameters)
+            for name, (indicator_type, parameters) in INDICATORS.items()
+        }
+        stored = MagicMock()
+        service._strategy_repo = MagicMock(get_with_relations=AsyncMock(return_value=MagicMock(timeframe="1h")))
+        service._backtest_repo = MagicMock(get_by_config_hash=AsyncMock(return_value=stored))
+        monkeypatch.setattr(service, "_fetch_historical_data", AsyncMock(return_value=candles))
+        monkeypatch.setattr(service, "_initialize_calculators", lambda strategy: calculators)
+        simulate = MagicMock()
+        monkeypatch.setattr(service, "_run_simulation_with_indicators", simulate)
+
+        result, chart_data = await service.run_backtest_with_chart_data(
+            "strategy-1", "BTCUSDT", candles[0].timestamp, candles[-1].timestamp, config_hash="abc"
+        )
+
+        assert result is stored and chart_data["cached"] is True
+        assert simulate.call_count == 0
+        assert {"rsi.value", "bollinger.upper"} <= set(chart_data["indicators"])
+        assert chart_data["indicators"]["rsi.value"]
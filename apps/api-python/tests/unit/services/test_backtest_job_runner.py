@@ -0,0 +1,161 @@
+"""Tests for BacktestJobRunner"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from infrastructure.cache.shared_cache import SharedCache, SharedCacheBackend
+from infrastructure.services import backtest_job_runner
+from infrastructure.services.backtest_job_runner import BacktestJobRunner, _init_job_process
+
+
+# Jobs rodam em outro processo: funções de módulo, estado só via params/resultado
+
+async def sleep_work(params, report):
+    started = time.time()
+    await asyncio.sleep(params.get("seconds", 0))
+    return {"total_trades": 3, "started": started, "finished": time.time()}
+
+
+async def failing_work(params, report):
+    await report(500, 1000, 2)
+    await report(1000, 1000, 4)
+    raise ValueError("Not enough data")
+
+
+async def reporting_work(params, report):
+    for i in range(200):
+        await report(i, 200, 0)
+        await asyncio.sleep(0.05)
+    return {}
+
+
+@pytest.fixture(scope="module")
+def job_pool():
+    pool = ProcessPoolExecutor(
+        max_workers=2,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_job_process,
+        initargs=(None,),
+    )
+    yield pool
+    pool.shutdown(cancel_futures=True)
+
+
+@pytest.fixture
+def make_runner(job_pool):
+    runners = []
+
+    def factory(max_concurrent: int = 2) -> BacktestJobRunner:
+        backend = SharedCacheBackend()  # sem Redis: L1 apenas
+        runner = BacktestJobRunner(
+            max_concurrent=max_concurrent,
+            results_cache=SharedCache("test_backtest_results", backend=backend),
+            jobs_cache=SharedCache("test_backtest_jobs", backend=backend),
+            executor=job_pool,
+        )
+        runners.append(runner)
+        return runner
+
+    yield factory
+    for runner in runners:
+        runner.shutdown()
+
+
+class TestBacktestJobRunner:
+    """Test cases for BacktestJobRunner"""
+
+    @pytest.mark.asyncio
+    async def test_identical_submits_share_one_job_and_hit_cache_after(self, make_runner):
+        runner = make_runner()
+
+        first = await runner.submit("basic", sleep_work, {"seconds": 0.2}, cache_key="abc")
+        second = await runner.submit("basic", sleep_work, {"seconds": 0.2}, cache_key="abc")
+        assert second.id == first.id
+
+        done = await runner.wait(first.id)
+        assert done.status == "completed" and done.result["total_trades"] == 3
+
+        cached = await runner.submit("basic", sleep_work, {}, cache_key="abc")
+        assert cached.status == "completed" and cached.cached is True
+        assert cached.result == done.result
+
+    @pytest.mark.asyncio
+    async def test_jobs_run_outside_the_event_loop_and_concurrency_is_bounded(self, make_runner):
+        runner = make_runner(max_concurrent=1)
+
+        jobs = [await runner.submit("basic", sleep_work, {"seconds": 0.1}) for _ in range(2)]
+        ticks = 0
+        while not all(job.finished for job in jobs):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        results = [(await runner.wait(job.id)).result for job in jobs]
+
+        # O loop continuou livre enquanto os jobs rodavam, um de cada vez
+        assert ticks >= 10
+        assert results[1]["started"] >= results[0]["finished"]
+
+    @pytest.mark.asyncio
+    async def test_progress_is_published_and_failure_keeps_exception(self, make_runner, monkeypatch):
+        monkeypatch.setattr(backtest_job_runner, "PROGRESS_PUBLISH_INTERVAL", 0.01)
+        runner = make_runner()
+        events = []
+
+        async def notify(event_type, data):
+            events.append((event_type, data["progress"]["candles_processed"]))
+
+        job = await runner.submit("basic", failing_work, {}, notify=notify)
+        job = await runner.wait(job.id)
+
+        assert job.status == "failed"
+        assert isinstance(job.exception, ValueError)
+        assert job.progress["simulations_completed"] == 1
+        assert job.progress["trades"] == 4
+        assert events[-1][0] == "backtest_failed"
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job(self, make_runner, monkeypatch):
+        monkeypatch.setattr(backtest_job_runner, "PROGRESS_PUBLISH_INTERVAL", 0.01)
+        runner = make_runner()
+
+        job = await runner.submit("basic", reporting_work, {})
+        while job.progress["candles_processed"] == 0:
+            await asyncio.sleep(0.01)
+
+        assert await runner.cancel(job.id) is True
+        job = await runner.wait(job.id)
+        assert job.status == "cancelled"
+        assert job.progress["candles_processed"] < 199
+        assert (await runner.get_job(job.id))["status"] == "cancelled"
+
+    @pytest.mark.asyncio
+    async def test_cancel_from_another_worker_goes_through_shared_state(self, make_runner, monkeypatch):
+        monkeypatch.setattr(backtest_job_runner, "PROGRESS_PUBLISH_INTERVAL", 0.01)
+        owner = make_runner()
+        job = await owner.submit("basic", reporting_work, {})
+        while job.progress["candles_processed"] == 0:
+            await asyncio.sleep(0.01)
+
+        # Outro worker: não tem o job em memória, só o snapshot compartilhado
+        other = make_runner()
+        other._snapshots = owner._snapshots
+        assert (await other.get_job(job.id))["status"] == "running"
+        assert await other.cancel(job.id) is True
+
+        assert (await owner.wait(job.id)).status == "cancelled"
+        assert await other.cancel(job.id) is False
+
+    @pytest.mark.asyncio
+    async def test_inflight_jobs_are_not_shared_across_owners(self, make_runner):
+        runner = make_runner()
+
+        mine = await runner.submit("basic", sleep_work, {"seconds": 0.1}, cache_key="abc", owner_user_id="user-1")
+        theirs = await runner.submit("basic", sleep_work, {"seconds": 0.1}, cache_key="abc", owner_user_id="user-2")
+
+        assert theirs.id != mine.id
+        assert (await runner.get_job(theirs.id))["owner_user_id"] == "user-2"
+        await runner.wait(mine.id)
+        await runner.wait(theirs.id)
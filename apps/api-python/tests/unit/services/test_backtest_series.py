@@ -0,0 +1,86 @@
+"""Tests for columnar backtest series (equity curve / indicator series)"""
+
+import math
+
+import numpy as np
+
+from infrastructure.services.backtest_series import (
+    EQUITY_CURVE_FORMAT,
+    EquityCurve,
+    IndicatorSeries,
+    decode_equity_curve,
+    lttb_indices,
+)
+
+
+class TestLttb:
+    """Test cases for lttb_indices"""
+
+    def test_keeps_endpoints_and_extremes(self):
+        x = np.arange(10_000)
+        y = np.sin(x / 500) * 100
+        y[4321] = 1_000  # pico isolado
+        y[7777] = -1_000  # drawdown isolado
+
+        keep = lttb_indices(x, y, 300)
+
+        assert len(keep) == 300
+        assert keep[0] == 0 and keep[-1] == len(x) - 1
+        assert np.all(np.diff(keep) > 0)
+        assert 4321 in keep and 7777 in keep
+
+    def test_short_series_is_untouched(self):
+        assert lttb_indices([1, 2, 3], [1, 2, 3], 500).tolist() == [0, 1, 2]
+
+
+class TestEquityCurve:
+    """Test cases for EquityCurve"""
+
+    def test_grows_past_reserved_capacity(self):
+        curve = EquityCurve()
+        curve.reserve(2)
+        for i in range(100):
+            curve.append(1_700_000_000 + i * 60, 10_000 + i, 50 + i)
+        curve.extend(np.array([1, 2, 3]), 9_000.0, np.array([1.0, 2.0, 3.0]))
+
+        assert len(curve) == 103
+        assert curve.equities[99] == 10_099
+        assert curve.equities[-3:].tolist() == [9_000.0] * 3
+
+    def test_encode_downsamples_and_decodes_to_points(self):
+        curve = EquityCurve()
+        curve.extend(
+            np.arange(2_000) * 3600,
+            np.array([10_000 + 50 * math.sin(i / 40) for i in range(2_000)]),
+            np.full(2_000, 42_000.123456789),
+        )
+
+        encoded = curve.encode(max_points=500)
+        points = decode_equity_curve(encoded)
+
+        assert encoded["format"] == EQUITY_CURVE_FORMAT
+        assert len(encoded["time"]) == len(encoded["equity"]) == len(encoded["price"]) == 500
+        assert points[0] == {"timestamp": "1970-01-01T00:00:00+00:00", "equity": 10_000.0, "price": 42_000.12345679}
+        assert points[-1]["timestamp"] == "1970-03-25T07:00:00+00:00"
+
+    def test_legacy_point_lists_pass_through(self):
+        legacy = [{"timestamp": "2024-01-01T00:00:00", "equity": 10_000.0, "price": 1.0}]
+
+        assert decode_equity_curve(legacy) == legacy
+        assert decode_equity_curve(None) == []
+
+
+class TestIndicatorSeries:
+    """Test cases for IndicatorSeries"""
+
+    def test_chart_points_skip_missing_values(self):
+        series = IndicatorSeries([100, 200, 300, 400])
+        series.record("rsi.value", 1, 30.5)
+        series.record("rsi.value", 3, 70.0)
+        series.record("ema.value", 2, 1.5)
+
+        assert series.to_chart() == {
+            "rsi.value": [{"time": 200, "value": 30.5}, {"time": 400, "value": 70.0}],
+            "ema.value": [{"time": 300, "value": 1.5}],
+        }
+        assert np.isnan(series.columns["rsi.value"][0])
@@ -0,0 +1,155 @@
+"""Tests for BotRoutingTable and BotStatsBuffer"""
+
+import uuid
+
+import pytest
+from unittest.mock import AsyncMock
+
+from infrastructure.services import bot_routing_table
+from infrastructure.services.bot_routing_table import BotRoutingTable
+from infrastructure.services.bot_stats_buffer import BotStatsBuffer
+
+BOT_ID = uuid.uuid4()
+
+
+class FakeRoutingDb:
+    """Simula as consultas da routing table (versão + bots + subscriptions)"""
+
+    def __init__(self):
+        self.version = 1
+        self.status = "active"
+        self.fetch_calls = 0
+
+    async def fetchval(self, query, *args):
+        return self.version
+
+    async def fetch(self, query, *args):
+        self.fetch_calls += 1
+        if "FROM bots" in query and "bot_subscriptions" not in query:
+            return [{
+                "id": BOT_ID, "name": "Master", "status": self.status, "market_type": "futures",
+                "allowed_directions": "both", "master_webhook_path": "secret-path-0123456789",
+            }]
+        return [{"subscription_id": uuid.uuid4(), "bot_id": BOT_ID, "exchange": "binance"}]
+
+
+class TestBotRoutingTable:
+    """Test cases for BotRoutingTable"""
+
+    @pytest.mark.asyncio
+    async def test_lookups_do_not_hit_db_until_version_changes(self):
+        db = FakeRoutingDb()
+        table = BotRoutingTable(db)
+
+        route = await table.get_by_path("secret-path-0123456789")
+        subs = await table.get_subscriptions(BOT_ID)
+        assert route.bot_id == BOT_ID and len(subs) == 1
+        loads = db.fetch_calls
+
+        await table.get_bot(BOT_ID)
+        assert await table.refresh() is False
+        assert db.fetch_calls == loads
+
+        db.version, db.status = 2, "paused"
+        assert await table.refresh() is True
+        assert (await table.get_bot(BOT_ID)).status == "paused"
+
+    @pytest.mark.asyncio
+    async def test_unknown_path_rechecks_version_at_most_once_per_interval(self, monkeypatch):
+        db = FakeRoutingDb()
+        table = BotRoutingTable(db)
+        await table.refresh(force=True)
+
+        db.fetchval = AsyncMock(return_value=1)
+        assert await table.get_by_path("unknown") is None
+        assert db.fetchval.await_count == 0  # acabou de verificar
+
+        monkeypatch.setattr(bot_routing_table, "MISS_RECHECK_SECONDS", 0)
+        assert await table.get_by_path("unknown") is None
+        assert db.fetchval.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_version_table_reloads_with_backoff(self, monkeypatch):
+        db = FakeRoutingDb()
+        db.fetchval = AsyncMock(side_effect=Exception('relation "bot_routing_version" does not exist'))
+        table = BotRoutingTable(db, refresh_interval=2.0)
+        clock = [1000.0]
+        monkeypatch.setattr(bot_routing_table.time, "monotonic", lambda: clock[0])
+
+        assert await table.refresh(force=True) is True
+        loads = db.fetch_calls
+
+        clock[0] += 2.0  # backoff já dobrou para 4s
+        assert await table.refresh() is False
+        assert db.fetch_calls == loads
+
+        clock[0] += 2.0
+        assert await table.refresh() is True
+        clock[0] += 4.0  # agora 8s
+        assert await table.refresh() is False
+
+        for _ in range(10):
+            clock[0] += 10_000
+            await table.refresh()
+        assert table._unversioned_backoff == bot_routing_table.UNVERSIONED_MAX_BACKOFF_SECONDS
+
+        db.fetchval = AsyncMock(return_value=5)
+        assert await table.refresh() is True
+        assert table._unversioned_backoff == 2.0
+        assert await table.refresh() is False
+
+    @pytest.mark.asyncio
+    async def test_snapshot_excludes_live_risk_counters(self):
+        db = FakeRoutingDb()
+        db.fetch = AsyncMock(side_effect=db.fetch)
+        await BotRoutingTable(db).refresh(force=True)
+
+        subscription_query = db.fetch.await_args_list[1].args[0]
+        assert "bs.current_daily_loss_usd" not in subscription_query
+        assert "bs.current_positions" not in subscription_query
+
+    @pytest.mark.asyncio
+    async def test_subscription_snapshot_is_copied(self):
+        table = BotRoutingTable(FakeRoutingDb())
+
+        subs = await table.get_subscriptions(BOT_ID)
+        subs[0]["exchange"] = "changed"
+
+        assert (await table.get_subscriptions(BOT_ID))[0]["exchange"] == "binance"
+
+
+class TestBotStatsBuffer:
+    """Test cases for BotStatsBuffer"""
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_one_update_per_table(self):
+        db = AsyncMock()
+        buffer = BotStatsBuffer(db)
+        sub_id = uuid.uuid4()
+
+        for _ in range(3):
+            buffer.record_bot_signal(BOT_ID)
+        buffer.record_subscription_result(sub_id, True)
+        buffer.record_subscription_result(sub_id, False)
+
+        assert await buffer.flush() == 2
+        assert db.execute.await_count == 2
+        bot_args = db.execute.await_args_list[0].args
+        sub_args = db.execute.await_args_list[1].args
+        assert bot_args[1:] == ([BOT_ID], [3])
+        assert sub_args[2:5] == ([2], [1], [1])
+        assert buffer.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_deltas(self):
+        db = AsyncMock()
+        db.execute.side_effect = ConnectionError("db down")
+        buffer = BotStatsBuffer(db)
+
+        buffer.record_bot_signal(BOT_ID)
+        assert await buffer.flush() == 0
+        buffer.record_bot_signal(BOT_ID)
+
+        db.execute.side_effect = None
+        await buffer.flush()
+        assert db.execute.await_args.args[1:] == ([BOT_ID], [2])
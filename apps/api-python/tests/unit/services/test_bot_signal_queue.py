@@ -0,0 +1,143 @@
+"""Tests for the master webhook signal queue"""
+
+import asyncio
+import uuid
+from datetime import timedelta
+
+import pytest
+from unittest.mock import AsyncMock
+
+from infrastructure.services.bot_signal_queue import (
+    DEDUPE_WINDOW_SECONDS,
+    BotSignalWorker,
+    InMemorySignalQueue,
+    build_dedupe_key,
+)
+
+BOT_ID = uuid.uuid4()
+
+
+def _worker(queue, broadcast, **kwargs):
+    service = AsyncMock()
+    service.broadcast_signal = AsyncMock(side_effect=broadcast)
+    return BotSignalWorker(db_pool=AsyncMock(), queue=queue, broadcast_service=service, **kwargs)
+
+
+class TestDedupeKey:
+    """Test cases for build_dedupe_key"""
+
+    def test_explicit_alert_id_wins(self):
+        a = build_dedupe_key(BOT_ID, "BTCUSDT", "buy", {"alert_id": "abc", "price": 1})
+        b = build_dedupe_key(BOT_ID, "BTCUSDT", "buy", {"alert_id": "abc", "price": 2})
+
+        assert a == b
+
+    def test_fingerprint_depends_on_signal_content(self):
+        payload = {"ticker": "BTCUSDT", "action": "buy"}
+        first = build_dedupe_key(BOT_ID, "BTCUSDT", "buy", payload)
+
+        assert build_dedupe_key(BOT_ID, "BTCUSDT", "buy", dict(payload)) == first
+        assert build_dedupe_key(BOT_ID, "BTCUSDT", "sell", payload) != first
+
+
+class TestSignalQueue:
+    """Test cases for InMemorySignalQueue + BotSignalWorker"""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_enqueue_returns_same_signal(self):
+        queue = InMemorySignalQueue()
+        first = await queue.enqueue(BOT_ID, "BTCUSDT", "buy", payload={"alert_id": "1"})
+        retry = await queue.enqueue(BOT_ID, "BTCUSDT", "buy", payload={"alert_id": "1"})
+
+        assert retry["duplicate"] is True
+        assert retry["signal_id"] == first["signal_id"]
+        assert await queue.get_stats() == {"pending": 1}
+
+    @pytest.mark.asyncio
+    async def test_fingerprint_window_starts_at_original_signal(self):
+        queue = InMemorySignalQueue()
+        payload = {"ticker": "BTCUSDT", "action": "buy"}
+        first = await queue.enqueue(BOT_ID, "BTCUSDT", "buy", payload=payload)
+        original = queue._items[first["queue_id"]]
+
+        # Retry logo antes do fim da janela (mesmo que cruze um minuto cheio)
+        original["created_at"] -= timedelta(seconds=DEDUPE_WINDOW_SECONDS - 5)
+        assert (await queue.enqueue(BOT_ID, "BTCUSDT", "buy", payload=payload))["duplicate"] is True
+
+        # Fora da janela: um sinal igual é um novo sinal
+        original["created_at"] -= timedelta(seconds=10)
+        later = await queue.enqueue(BOT_ID, "BTCUSDT", "buy", payload=payload)
+        assert later["duplicate"] is False
+        assert later["signal_id"] != first["signal_id"]
+
+    @pytest.mark.asyncio
+    async def test_worker_broadcasts_with_preallocated_signal_id(self):
+        queue = InMemorySignalQueue()
+        queued = await queue.enqueue(BOT_ID, "BTCUSDT", "buy")
+
+        async def broadcast(**kwargs):
+            return {"success": True, "signal_id": str(kwargs["signal_id"])}
+
+        worker = _worker(queue, broadcast)
+        assert await worker.run_once() == 1
+
+        call = worker.broadcast_service.broadcast_signal.await_args.kwargs
+        assert call["signal_id"] == queued["signal_id"]
+        assert await queue.get_stats() == {"done": 1}
+        assert await worker.run_once() == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_is_retried_then_marked_failed(self):
+        queue = InMemorySignalQueue()
+        await queue.enqueue(BOT_ID, "BTCUSDT", "buy")
+
+        async def broadcast(**kwargs):
+            raise ConnectionError("exchange down")
+
+        worker = _worker(queue, broadcast)
+        await worker.run_once()
+
+        assert await queue.get_stats() == {"pending": 1}
+        # Backoff: não é re-entregue imediatamente
+        assert await worker.run_once() == 0
+
+        item = next(iter(queue._items.values()))
+        item["attempts"] = item["max_attempts"] - 1
+        item["available_at"] = item["available_at"].replace(year=2000)
+        await worker.run_once()
+
+        assert await queue.get_stats() == {"failed": 1}
+        assert worker.get_metrics()["retried"] == 1
+
+    @pytest.mark.asyncio
+    async def test_abandoned_processing_is_redelivered(self):
+        queue = InMemorySignalQueue()
+        await queue.enqueue(BOT_ID, "BTCUSDT", "buy")
+
+        crashed = await queue.claim("worker-a")
+        assert await queue.claim("worker-b") == []
+
+        queue._items[crashed[0]["id"]]["locked_at"] = crashed[0]["locked_at"].replace(year=2000)
+        redelivered = await queue.claim("worker-b")
+
+        assert redelivered[0]["signal_id"] == crashed[0]["signal_id"]
+        assert redelivered[0]["attempts"] == 2
+
+    @pytest.mark.asyncio
+    async def test_running_broadcast_keeps_its_claim(self):
+        queue = InMemorySignalQueue()
+        queued = await queue.enqueue(BOT_ID, "BTCUSDT", "buy")
+        reclaimed = []
+
+        async def broadcast(**kwargs):
+            stored = queue._items[queued["queue_id"]]
+            stored["locked_at"] = stored["locked_at"].replace(year=2000)
+            await asyncio.sleep(0.05)  # heartbeat renova locked_at
+            reclaimed.extend(await queue.claim("worker-b"))
+            return {"success": True}
+
+        worker = _worker(queue, broadcast, heartbeat_interval=0.01)
+        await worker.run_once()
+
+        assert reclaimed == []
+        assert await queue.get_stats() == {"done": 1}
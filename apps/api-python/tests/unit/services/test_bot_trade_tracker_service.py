@@ -0,0 +1,97 @@
+"""Tests for BotTradeTrackerService bot metrics"""
+
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from infrastructure.services.bot_trade_tracker_service import BotTradeTrackerService
+
+
+def make_db():
+    db = MagicMock()
+    db.fetchrow = AsyncMock(return_value=None)
+    db.fetchval = AsyncMock(return_value=uuid4())
+    db.execute = AsyncMock()
+    db.fetch = AsyncMock(return_value=[])
+    return db
+
+
+def executed_sql(db, fragment):
+    return [c for c in db.execute.await_args_list if fragment in c.args[0]]
+
+
+class TestBotMetrics:
+    """Test cases for incremental and set-based bot metrics"""
+
+    @pytest.mark.asyncio
+    async def test_trade_close_updates_bot_aggregates_incrementally(self):
+        db = make_db()
+        tracker = BotTradeTrackerService(db)
+        subscription_id = uuid4()
+
+        result = await tracker.record_trade_close(
+            subscription_id=subscription_id,
+            signal_execution_id=uuid4(),
+            ticker="BTCUSDT",
+            side="buy",
+            entry_price=100.0,
+            exit_price=90.0,
+            quantity=2.0,
+            pnl_usd=-20.0,
+        )
+
+        assert result["success"] is True
+        (call,) = executed_sql(db, "UPDATE bots")
+        assert call.args[1:] == (subscription_id, 0, 1, -20.0, -10.0)
+        assert "WHERE id = (SELECT bot_id FROM bot_subscriptions WHERE id = $1)" in call.args[0]
+
+    @pytest.mark.asyncio
+    async def test_bot_metrics_failure_does_not_fail_trade_recording(self):
+        db = make_db()
+
+        async def execute(sql, *args):
+            if "UPDATE bots" in sql:
+                raise RuntimeError("column total_wins does not exist")
+
+        db.execute = AsyncMock(side_effect=execute)
+        tracker = BotTradeTrackerService(db)
+
+        result = await tracker.record_trade_close(
+            subscription_id=uuid4(),
+            signal_execution_id=uuid4(),
+            ticker="ETHUSDT",
+            side="sell",
+            entry_price=10.0,
+            exit_price=9.0,
+            quantity=1.0,
+            pnl_usd=1.0,
+        )
+
+        assert result["success"] is True
+
+    @pytest.mark.asyncio
+    async def test_recompute_is_a_single_statement(self):
+        db = make_db()
+        db.fetch = AsyncMock(return_value=[{"bot_id": "b1", "name": "Bot", "total_wins": 3}])
+        tracker = BotTradeTrackerService(db)
+
+        rows = await tracker.recompute_bot_metrics()
+
+        assert rows == [{"bot_id": "b1", "name": "Bot", "total_wins": 3}]
+        db.fetch.assert_awaited_once()
+        sql = db.fetch.await_args.args[0]
+        assert "GROUP BY bot_id" in sql and "UPDATE bots" in sql and "FROM metrics m" in sql
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_trade_without_pnl_pct_is_left_out_of_avg_pnl(self):
+        db = make_db()
+        tracker = BotTradeTrackerService(db)
+        subscription_id = uuid4()
+
+        await tracker._apply_trade_to_bot_metrics(subscription_id, 5.0, None, True)
+
+        (call,) = executed_sql(db, "UPDATE bots")
+        assert call.args[1:] == (subscription_id, 1, 0, 5.0, None)
+        assert "closed_trades_count + ($5::numeric IS NOT NULL)::int" in call.args[0]
@@ -0,0 +1,101 @@
+"""Tests for close-driven group scheduling"""
+
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock
+
+from infrastructure.services.candle_close_scheduler import CandleCloseScheduler, next_close_ms
+
+
+def ms(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class FakeClock:
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+
+    def __call__(self):
+        return self.now_ms
+
+
+class TestNextClose:
+    """Boundaries follow the exchange candles"""
+
+    @pytest.mark.parametrize("timeframe,now,expected", [
+        ("1h", (2026, 3, 4, 10, 15), (2026, 3, 4, 11, 0)),
+        ("4h", (2026, 3, 4, 10, 15), (2026, 3, 4, 12, 0)),
+        ("15m", (2026, 3, 4, 10, 15), (2026, 3, 4, 10, 30)),
+        # Periodo custom reinicia a 00:00 UTC: o ultimo do dia fecha na virada
+        ("7m", (2026, 3, 4, 23, 58), (2026, 3, 5, 0, 0)),
+        ("1d", (2026, 3, 4, 10, 15), (2026, 3, 5, 0, 0)),
+        ("1w", (2026, 3, 4, 10, 15), (2026, 3, 9, 0, 0)),  # Segunda-feira
+        ("1M", (2026, 12, 31, 23, 59), (2027, 1, 1, 0, 0)),
+        ("30s", (2026, 3, 4, 10, 15, 10), (2026, 3, 4, 10, 15, 30)),
+    ])
+    def test_next_close(self, timeframe, now, expected):
+        assert next_close_ms(timeframe, ms(*now)) == ms(*expected)
+
+    def test_boundary_itself_is_not_a_close(self):
+        assert next_close_ms("1h", ms(2026, 3, 4, 11, 0)) == ms(2026, 3, 4, 12, 0)
+
+
+class TestCandleCloseScheduler:
+    """Test cases for slots, streamed closes and intrabar debounce"""
+
+    @pytest.mark.asyncio
+    async def test_groups_fire_only_on_their_close(self):
+        clock = FakeClock(ms(2026, 3, 4, 10, 15))
+        callback = AsyncMock()
+        scheduler = CandleCloseScheduler(callback, grace_seconds=1, intrabar=False, clock=clock)
+        await scheduler.set_groups([("BTCUSDT", "1h"), ("ETHUSDT", "1h"), ("BTCUSDT", "4h")])
+
+        clock.now_ms = ms(2026, 3, 4, 10, 59, 59)
+        assert await scheduler.run_due() == {"close": [], "update": []}
+        assert scheduler.seconds_until_next() == pytest.approx(2.0)
+
+        clock.now_ms = ms(2026, 3, 4, 11, 0, 1)
+        await scheduler.run_due()
+        callback.assert_awaited_once_with([("BTCUSDT", "1h"), ("ETHUSDT", "1h")], "close")
+
+        # Atrasado duas horas: dispara uma vez e reagenda para o proximo fechamento
+        clock.now_ms = ms(2026, 3, 4, 13, 30)
+        assert await scheduler.run_due() == {
+            "close": [("BTCUSDT", "1h"), ("BTCUSDT", "4h"), ("ETHUSDT", "1h")], "update": []
+        }
+        assert scheduler.pop_due(ms(2026, 3, 4, 13, 59)) == []
+        assert scheduler.get_metrics()["closes"] == 5
+
+    @pytest.mark.asyncio
+    async def test_streamed_close_fires_ahead_of_timer(self):
+        clock = FakeClock(ms(2026, 3, 4, 10, 15))
+        callback = AsyncMock()
+        scheduler = CandleCloseScheduler(callback, intrabar=True, intrabar_min_interval=5, clock=clock)
+        scheduler.add("BTCUSDT", "1h")
+
+        clock.now_ms = ms(2026, 3, 4, 10, 59, 59, 900000)
+        scheduler.notify_update("BTCUSDT", "1h", closed=True, candle_time_ms=ms(2026, 3, 4, 10, 0))
+        await scheduler.run_due()
+        callback.assert_awaited_once_with([("BTCUSDT", "1h")], "close")
+
+        # O timer nao repete o mesmo fechamento
+        assert scheduler.pop_due(ms(2026, 3, 4, 11, 0, 5)) == []
+
+        # Intrabar: no maximo uma avaliacao a cada 5s por grupo
+        clock.now_ms = ms(2026, 3, 4, 11, 0, 10)
+        scheduler.notify_update("BTCUSDT", "1h")
+        clock.now_ms += 2000
+        scheduler.notify_update("BTCUSDT", "1h")
+        await scheduler.run_due()
+        callback.assert_awaited_with([("BTCUSDT", "1h")], "update")
+        assert callback.await_count == 2
+
+    def test_updates_are_ignored_without_intrabar(self):
+        scheduler = CandleCloseScheduler(AsyncMock(), intrabar=False, clock=FakeClock(ms(2026, 3, 4, 10, 15)))
+        scheduler.add("BTCUSDT", "1h")
+
+        scheduler.notify_update("BTCUSDT", "1h")
+        scheduler.notify_update("ETHUSDT", "1h", closed=True)
+
+        assert scheduler.seconds_until_next() > 0
@@ -0,0 +1,132 @@
+"""Tests for CandleService"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock
+
+from infrastructure.services.candle_service import (
+    CandleService,
+    interval_to_ms,
+    kline_to_candle,
+)
+
+
+def _kline(open_time, close=100.0):
+    return [open_time, "99.0", "101.0", "98.0", str(close), "10.0", open_time + 59_999]
+
+
+class TestHelpers:
+    """Test cases for interval/kline helpers"""
+
+    def test_interval_to_ms(self):
+        assert interval_to_ms("1m") == 60_000
+        assert interval_to_ms("4h") == 4 * 3_600_000
+
+    def test_kline_to_candle_keeps_ms(self):
+        candle = kline_to_candle(_kline(1_700_000_000_000, close=105.5))
+
+        assert candle["time"] == 1_700_000_000_000
+        assert candle["close"] == 105.5
+
+
+class TestCandleService:
+    """Test cases for CandleService"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_are_coalesced(self):
+        service = CandleService()
+        release = asyncio.Event()
+
+        async def slow_load(*args):
+            await release.wait()
+            return {"success": True, "candles": [], "market_type": "futures", "source": "binance_public"}
+
+        service._load = AsyncMock(side_effect=slow_load)
+
+        tasks = [asyncio.create_task(service.get_candles("btcusdt", "1h", limit=100)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert service._load.await_count == 1
+        assert all(r["success"] for r in results)
+        assert service.get_metrics()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_block_followers(self):
+        service = CandleService()
+        release = asyncio.Event()
+
+        async def slow_load(*args):
+            await release.wait()
+            return {"success": True, "candles": [], "market_type": "futures", "source": "binance_public"}
+
+        service._load = AsyncMock(side_effect=slow_load)
+
+        leader = asyncio.create_task(service.get_candles("btcusdt", "1h", limit=100))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(service.get_candles("btcusdt", "1h", limit=100))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        result = await asyncio.wait_for(follower, timeout=1)
+        assert result["success"]
+        assert leader.cancelled()
+        assert service._load.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_ranged_fetch_paginates_past_default_cap(self):
+        service = CandleService()
+        start = 0
+        step = interval_to_ms("1m")
+
+        async def fake_page(symbol, interval, market_type, limit, start_time, end_time):
+            data = [_kline(start_time + i * step) for i in range(limit)]
+            return {"success": True, "data": data, "market_type": market_type}
+
+        service._fetch_page = AsyncMock(side_effect=fake_page)
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(asyncio, "sleep", AsyncMock())
+            result = await service._fetch_from_exchange(
+                "BTCUSDT", "1m", 25_000, start, start + 25_000 * step, "futures"
+            )
+
+        assert result["success"] is True
+        assert len(result["candles"]) == 25_000
+        assert result["candles"][-1]["time"] == 24_999 * step
+
+    @pytest.mark.asyncio
+    async def test_backward_fetch_paginates_past_default_cap(self):
+        service = CandleService()
+        step = interval_to_ms("1m")
+        end = 30_000 * step
+
+        async def fake_page(symbol, interval, market_type, limit, start_time, end_time):
+            first = end_time - (end_time % step) - (limit - 1) * step
+            data = [_kline(first + i * step) for i in range(limit)]
+            return {"success": True, "data": data, "market_type": market_type}
+
+        service._fetch_page = AsyncMock(side_effect=fake_page)
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(asyncio, "sleep", AsyncMock())
+            # Ex: base 1m de 500 candles de 50m (sem start_time) = 25k minutos
+            result = await service._fetch_from_exchange("BTCUSDT", "1m", 25_000, None, end, "futures")
+
+        assert len(result["candles"]) == 25_000
+        assert result["candles"][-1]["time"] == end
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("interval", ["abc", "0m", "-5m"])
+    async def test_unknown_interval_raises_value_error(self, interval):
+        service = CandleService()
+        service._fetch_page = AsyncMock()
+
+        with pytest.raises(ValueError, match="Unsupported interval"):
+            await service.get_candles("BTCUSDT", interval, use_database=False)
+
+        service._fetch_page.assert_not_awaited()
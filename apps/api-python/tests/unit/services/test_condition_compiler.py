@@ -0,0 +1,127 @@
+"""Tests for the compiled strategy condition evaluator"""
+
+import random
+
+import numpy as np
+import pytest
+
+from infrastructure.database.models.strategy import LogicOperator
+from infrastructure.services.condition_compiler import CompiledConditionSet
+
+
+class TestCompiledConditionSet:
+    """Test cases for CompiledConditionSet"""
+
+    def test_and_skips_conditions_with_missing_operands(self):
+        condition_set = CompiledConditionSet([
+            {"left": "rsi.value", "operator": "<", "right": "30"},
+            {"left": "missing.value", "operator": ">", "right": "1"},
+        ], LogicOperator.AND)
+
+        assert condition_set.evaluate({"rsi.value": 25.0}) is True
+        assert condition_set.evaluate({"rsi.value": 35.0}) is False
+        assert condition_set.evaluate({}) is False  # nada avaliável
+
+    def test_or_aliases_and_operand_constants(self):
+        condition_set = CompiledConditionSet([
+            {"left": "rsi", "operator": ">", "right": 70},
+            {"left": "close", "operator": "<", "right": "bb.lower"},
+        ], "OR")
+
+        assert condition_set.evaluate({"rsi.value": 75.0}) is True
+        assert condition_set.evaluate({"close": 90.0, "bollinger.lower": 95.0}) is True
+        assert condition_set.evaluate({"rsi.value": 50.0, "close": 100.0, "bollinger.lower": 95.0}) is False
+
+    def test_equality_uses_tolerance_and_unknown_operator_is_false(self):
+        assert CompiledConditionSet([{"left": "a", "operator": "==", "right": "1"}]).evaluate({"a": 1.00001})
+        assert not CompiledConditionSet([{"left": "a", "operator": "~", "right": "1"}]).evaluate({"a": 1.0})
+
+    @pytest.mark.parametrize("logic", ["AND", "OR"])
+    def test_mask_matches_scalar_evaluation(self, logic):
+        rng = random.Random(7)
+        length = 300
+        columns = {
+            key: [None if rng.random() < 0.15 else rng.uniform(0, 100) for _ in range(length)]
+            for key in ("rsi.value", "adx.adx", "close")
+        }
+        condition_set = CompiledConditionSet([
+            {"left": "rsi", "operator": "<=", "right": "40"},
+            {"left": "adx", "operator": ">", "right": "close"},
+            {"left": "close", "operator": "!=", "right": "50"},
+        ], logic)
+
+        arrays = {k: np.array([np.nan if v is None else v for v in vals]) for k, vals in columns.items()}
+        mask = condition_set.evaluate_mask(arrays, length)
+
+        for i in range(length):
+            context = {k: vals[i] for k, vals in columns.items() if vals[i] is not None}
+            assert bool(mask[i]) == condition_set.evaluate(context), i
+
+
+def _baseline_compare(left: float, op: str, right: float) -> bool:
+    """Cópia literal do _compare antigo (StrategyEngineService / StrategyWebSocketMonitor)"""
+    ops = {
+        "<": lambda a, b: a < b,
+        ">": lambda a, b: a > b,
+        "<=": lambda a, b: a <= b,
+        ">=": lambda a, b: a >= b,
+        "==": lambda a, b: abs(a - b) < 0.0001,
+        "!=": lambda a, b: abs(a - b) >= 0.0001,
+        "crosses_above": lambda a, b: a > b,
+        "crosses_below": lambda a, b: a < b,
+    }
+    return ops.get(op, lambda a, b: False)(left, right)
+
+
+BASELINE_OPERATORS = ["<", ">", "<=", ">=", "==", "!=", "crosses_above", "crosses_below", "~"]
+
+
+class TestBaselineParity:
+    """O avaliador compilado deve decidir exatamente como o _compare antigo"""
+
+    @staticmethod
+    def _pairs(seed: int, count: int = 500):
+        rng = random.Random(seed)
+        pairs = []
+        for _ in range(count):
+            left = rng.choice([rng.uniform(-100, 100), float(rng.randint(-3, 3))])
+            roll = rng.random()
+            if roll < 0.2:
+                right = left  # iguais
+            elif roll < 0.4:
+                right = left + rng.uniform(-0.0002, 0.0002)  # perto da tolerância do ==
+            else:
+                right = rng.choice([rng.uniform(-100, 100), float(rng.randint(-3, 3))])
+            pairs.append((left, right))
+        return pairs
+
+    @pytest.mark.parametrize("op", BASELINE_OPERATORS)
+    def test_scalar_matches_baseline_compare(self, op):
+        condition_set = CompiledConditionSet([{"left": "a", "operator": op, "right": "b"}])
+
+        for left, right in self._pairs(11):
+            expected = _baseline_compare(left, op, right)
+            assert condition_set.evaluate({"a": left, "b": right}) is expected, (left, op, right)
+
+    @pytest.mark.parametrize("op", BASELINE_OPERATORS)
+    def test_mask_matches_baseline_compare(self, op):
+        pairs = self._pairs(23)
+        columns = {
+            "a": np.array([left for left, _ in pairs]),
+            "b": np.array([right for _, right in pairs]),
+        }
+        mask = CompiledConditionSet([{"left": "a", "operator": op, "right": "b"}]).evaluate_mask(columns, len(pairs))
+
+        for i, (left, right) in enumerate(pairs):
+            assert bool(mask[i]) is _baseline_compare(left, op, right), (left, op, right)
+
+    @pytest.mark.parametrize("op", ["crosses_above", "crosses_below"])
+    def test_crosses_only_look_at_current_bar(self, op):
+        # Sem histórico: uma condição que já vinha verdadeira continua disparando
+        condition_set = CompiledConditionSet([{"left": "a", "operator": op, "right": "0"}])
+        value = 1.0 if op == "crosses_above" else -1.0
+
+        assert condition_set.evaluate({"a": value}) is True
+        assert condition_set.evaluate({"a": value}) is True
+        mask = condition_set.evaluate_mask({"a": np.array([value, value, value])}, 3)
+        assert mask.tolist() == [True, True, True]
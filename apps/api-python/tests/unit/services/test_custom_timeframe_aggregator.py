@@ -0,0 +1,80 @@
+"""Tests for vectorized custom timeframe aggregation"""
+
+import random
+
+from infrastructure.services.custom_timeframe_aggregator import (
+    CandleBuffer,
+    aggregate_candles,
+    period_start_ms,
+)
+
+MINUTE = 60_000
+DAY = 24 * 60 * MINUTE
+
+
+def _minutes(start, count, seed=7):
+    rng = random.Random(seed)
+    candles, price = [], 100.0
+    for i in range(count):
+        o = price
+        c = o + rng.uniform(-1, 1)
+        candles.append({
+            "time": start + i * MINUTE,
+            "open": o,
+            "high": max(o, c) + rng.random(),
+            "low": min(o, c) - rng.random(),
+            "close": c,
+            "volume": rng.uniform(1, 10),
+        })
+        price = c
+    return candles
+
+
+class TestAggregateCandles:
+    """Test cases for aggregate_candles / period_start_ms"""
+
+    def test_period_start_aligns_to_utc_day(self):
+        day = 19_000 * DAY
+        # 90m: o dia não é múltiplo de 90m a partir da época, o período reinicia à meia-noite
+        assert period_start_ms(day + 95 * MINUTE, 90) == day + 90 * MINUTE
+        assert period_start_ms(day + 5 * MINUTE, 12) == day
+
+    def test_matches_candle_buffer(self):
+        day = 19_000 * DAY
+        minutes = _minutes(day + 5 * MINUTE, 600)
+
+        buffer = CandleBuffer(target_minutes=12, symbol="BTCUSDT")
+        buffer.max_history = 1000
+        for candle in minutes:
+            buffer.add_one_minute_candle(candle)
+        expected = buffer.get_all_candles()
+        # CandleBuffer emite o primeiro período (parcial) e o período em formação
+        expected = [c for c in expected if c["time"] > day]
+
+        result = aggregate_candles(minutes, 12)
+
+        assert [c["time"] for c in result] == [c["time"] for c in expected]
+        for got, want in zip(result, expected):
+            for column in ("open", "high", "low", "close", "volume"):
+                assert abs(got[column] - want[column]) < 1e-9
+
+    def test_partial_first_period(self):
+        day = 19_000 * DAY
+        minutes = _minutes(day + 5 * MINUTE, 30)
+
+        dropped = aggregate_candles(minutes, 12)
+        kept = aggregate_candles(minutes, 12, drop_partial_first=False)
+
+        assert [c["time"] for c in dropped] == [day + 12 * MINUTE, day + 24 * MINUTE]
+        assert kept[0]["time"] == day
+        assert kept[0]["open"] == minutes[0]["open"]
+
+    def test_gaps_do_not_shift_periods(self):
+        day = 19_000 * DAY
+        minutes = _minutes(day, 24)
+        del minutes[14:20]  # sem negociação em parte do segundo período
+
+        result = aggregate_candles(minutes, 12)
+
+        assert [c["time"] for c in result] == [day, day + 12 * MINUTE]
+        assert result[1]["close"] == minutes[-1]["close"]
@@ -0,0 +1,151 @@
+"""Tests for batched IndicatorAlertMonitor evaluation"""
+
+import uuid
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+
+from infrastructure.services.indicator_alert_monitor import IndicatorAlertMonitor
+
+
+def make_alert(indicator_params, symbol="BTCUSDT", signal_type="both"):
+    return {
+        "id": uuid.uuid4(), "user_id": uuid.uuid4(), "indicator_type": "rsi",
+        "symbol": symbol, "timeframe": "1h", "signal_type": signal_type,
+        "indicator_params": indicator_params, "message_template": None,
+        "push_enabled": True, "email_enabled": False, "sound_type": "default",
+        "cooldown_seconds": 300, "last_triggered_at": None,
+    }
+
+
+def make_candles(n=100, last_close=None):
+    # Queda continua: RSI < 30 no ultimo candle fechado
+    closes = list(100 - np.arange(n) * 0.5)
+    if last_close is not None:
+        closes[-1] = last_close
+    return [{"time": 1_700_000_000 + i * 3600, "close": c, "high": c, "low": c} for i, c in enumerate(closes)]
+
+
+class FakeAlertDb:
+    """Simula a versao dos alertas e o SELECT dos alertas ativos"""
+
+    def __init__(self, alerts):
+        self.alerts = alerts
+        self.version = 1
+        self.fetch_calls = 0
+
+    async def fetchval(self, query, *args):
+        return self.version
+
+    async def fetch(self, query, *args):
+        self.fetch_calls += 1
+        return [dict(a) for a in self.alerts]
+
+
+class TestBatchedEvaluation:
+    """Test cases for the grouped, deduplicated alert evaluation"""
+
+    @pytest.mark.asyncio
+    async def test_each_distinct_config_is_calculated_once_per_candle(self):
+        alerts = [make_alert({"period": 14}) for _ in range(200)] + [make_alert({"period": 7})]
+        db = FakeAlertDb(alerts)
+        monitor = IndicatorAlertMonitor(db)
+        monitor._fetch_candles = AsyncMock(return_value=make_candles())
+        monitor._trigger_alert = AsyncMock()
+
+        await monitor._check_all_alerts()
+
+        assert monitor._stats["calculations"] == 2
+        assert monitor._trigger_alert.await_count == 201
+        signal = monitor._trigger_alert.await_args.args[1]
+        assert signal["type"] == "buy"
+
+        # Mesmo candle e mesma versao: sem reload, sem recalculo, sem novo disparo
+        await monitor._check_all_alerts()
+        assert db.fetch_calls == 1
+        assert monitor._stats["calculations"] == 2
+        assert monitor._stats["groups_unchanged"] == 1
+        assert monitor._trigger_alert.await_count == 201
+
+        # Candle em formacao mudou: recalcula uma vez por configuracao
+        monitor._fetch_candles.return_value = make_candles(last_close=60.0)
+        await monitor._check_all_alerts()
+        assert monitor._stats["calculations"] == 4
+
+    def test_fingerprint_tracks_forming_candle_range(self):
+        candles = make_candles()
+        fingerprint = IndicatorAlertMonitor._candle_fingerprint(candles)
+
+        # Mesmo close, mas high/low do candle em formacao mudaram
+        moved = [dict(c) for c in candles]
+        moved[-1]["high"] += 5
+        assert IndicatorAlertMonitor._candle_fingerprint(moved) != fingerprint
+        assert IndicatorAlertMonitor._candle_fingerprint([dict(c) for c in candles]) == fingerprint
+
+    @pytest.mark.asyncio
+    async def test_alert_set_reloads_only_when_version_changes(self):
+        db = FakeAlertDb([make_alert({"period": 14}, signal_type="sell")])
+        monitor = IndicatorAlertMonitor(db)
+        monitor._fetch_candles = AsyncMock(return_value=make_candles())
+        monitor._trigger_alert = AsyncMock()
+
+        await monitor._check_all_alerts()
+        assert monitor._trigger_alert.await_count == 0
+
+        db.alerts.append(make_alert({"period": 14}, symbol="ETHUSDT"))
+        await monitor._check_all_alerts()
+        assert db.fetch_calls == 1
+
+        db.version = 2
+        await monitor._check_all_alerts()
+        assert db.fetch_calls == 2
+        assert monitor.get_metrics()["groups"] == 2
+        assert monitor._trigger_alert.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cooldown_applies_without_reload(self):
+        alert = make_alert({"period": 14})
+        monitor = IndicatorAlertMonitor(FakeAlertDb([alert]))
+        monitor._fetch_candles = AsyncMock(return_value=make_candles())
+        monitor._trigger_alert = AsyncMock()
+
+        await monitor._check_all_alerts()
+        # Novo candle com o mesmo sinal: ainda dentro do cooldown em memoria
+        monitor._fetch_candles.return_value = make_candles(n=101)
+        await monitor._check_all_alerts()
+
+        assert monitor._trigger_alert.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_scheduler_evaluates_only_closed_groups(self):
+        db = FakeAlertDb([make_alert({"period": 14}), make_alert({"period": 14}, symbol="ETHUSDT")])
+        monitor = IndicatorAlertMonitor(db)
+        monitor._fetch_candles = AsyncMock(return_value=make_candles())
+        monitor._trigger_alert = AsyncMock()
+        await monitor._refresh_alerts()
+
+        await monitor._on_groups_due([("ETHUSDT", "1h")], "update")
+        assert monitor._fetch_candles.await_count == 0
+
+        await monitor._on_groups_due([("ETHUSDT", "1h")], "close")
+        monitor._fetch_candles.assert_awaited_once_with("ETHUSDT", "1h")
+        assert monitor._trigger_alert.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_alert_edited_in_place_is_evaluated_after_reload(self):
+        alert = make_alert({"period": 14}, signal_type="sell")
+        db = FakeAlertDb([alert, make_alert({"period": 14}, symbol="ETHUSDT")])
+        monitor = IndicatorAlertMonitor(db)
+        monitor._fetch_candles = AsyncMock(return_value=make_candles())
+        monitor._trigger_alert = AsyncMock()
+        await monitor._refresh_alerts()
+
+        # Mesmo id, signal_type editado: o grupo muda, o outro nao
+        alert["signal_type"] = "both"
+        monitor.invalidate_alerts()
+        changed = await monitor._apply_alert_changes()
+
+        assert changed == [("BTCUSDT", "1h")]
+        monitor._fetch_candles.assert_awaited_once_with("BTCUSDT", "1h")
+        assert monitor._trigger_alert.await_count == 1
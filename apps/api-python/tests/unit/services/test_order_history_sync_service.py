@@ -0,0 +1,196 @@
+"""Tests for OrderHistorySyncService"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from infrastructure.services.order_history_sync_service import (
+    FETCH_LIMIT,
+    FUTURES_MAX_WINDOW_MS,
+    OrderHistorySyncService,
+    compute_watermark,
+    normalize_order,
+)
+
+
+def _binance_order(order_id, order_time, status="FILLED", side="BUY"):
+    return {
+        "orderId": order_id,
+        "symbol": "BTCUSDT",
+        "side": side,
+        "type": "MARKET",
+        "status": status,
+        "origQty": "0.01",
+        "executedQty": "0.01" if status == "FILLED" else "0",
+        "price": "0",
+        "cummulativeQuoteQty": "500",
+        "time": order_time,
+        "updateTime": order_time + 10,
+    }
+
+
+class TestNormalizeOrder:
+    """Test cases for normalize_order"""
+
+    def test_binance_spot_order(self):
+        row = normalize_order(_binance_order(1, 1_700_000_000_000), "SPOT")
+
+        assert row["exchange_order_id"] == "1"
+        assert row["symbol"] == "BTCUSDT"
+        assert row["side"] == "buy"
+        assert row["status"] == "FILLED"
+        assert row["price"] is None
+        assert row["quote_quantity"] == 500.0
+        assert row["order_time"] == 1_700_000_000_000
+        assert row["update_time"] == 1_700_000_000_010
+
+    def test_order_without_id_is_skipped(self):
+        assert normalize_order({"symbol": "BTCUSDT", "time": 1}, "SPOT") is None
+
+    def test_bingx_symbol_is_normalized(self):
+        row = normalize_order({"orderId": "9", "symbol": "BTC-USDT", "time": 5, "side": "SELL"}, "FUTURES")
+
+        assert row["symbol"] == "BTCUSDT"
+        assert row["market_type"] == "FUTURES"
+
+
+class TestComputeWatermark:
+    """Test cases for compute_watermark"""
+
+    def test_advances_to_newest_final_order(self):
+        orders = [normalize_order(_binance_order(i, 1000 * i), "SPOT") for i in range(1, 4)]
+
+        assert compute_watermark(orders, None, None) == ("3", 3000)
+
+    def test_open_order_does_not_hold_watermark(self):
+        orders = [
+            normalize_order(_binance_order(1, 1000), "SPOT"),
+            normalize_order(_binance_order(2, 2000, status="NEW"), "SPOT"),
+            normalize_order(_binance_order(3, 3000), "SPOT"),
+        ]
+
+        assert compute_watermark(orders, None, None) == ("3", 3000)
+
+    def test_empty_delta_keeps_previous(self):
+        assert compute_watermark([], "7", 7000) == ("7", 7000)
+
+    def test_never_moves_backwards_without_open_orders(self):
+        orders = [normalize_order(_binance_order(5, 5000), "SPOT")]
+
+        assert compute_watermark(orders, "9", 9000) == ("5", 9000)
+
+
+class TestOrderHistorySyncService:
+    """Test cases for OrderHistorySyncService.sync_account"""
+
+    @pytest.fixture
+    def mock_db(self):
+        db = AsyncMock()
+        db.fetch.return_value = []
+        return db
+
+    @pytest.fixture
+    def service(self, mock_db):
+        return OrderHistorySyncService(mock_db)
+
+    @pytest.mark.asyncio
+    async def test_first_sync_fetches_and_stores(self, service, mock_db):
+        connector = MagicMock()
+        connector.get_account_orders = AsyncMock(return_value={
+            "success": True, "orders": [_binance_order(1, 1000)]
+        })
+        connector.get_futures_orders = AsyncMock(return_value={"success": True, "orders": []})
+
+        result = await service.sync_account("acc-1", connector, symbols=["BTCUSDT"])
+
+        assert result["success"] is True
+        assert result["fetched_count"] == 1
+        assert result["symbols_checked"] == 2
+        # orders + watermarks stored in batch
+        assert mock_db.executemany.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_delta_starts_from_watermark(self, service, mock_db):
+        mock_db.fetch.side_effect = [
+            [{
+                "symbol": "BTCUSDT", "market_type": "SPOT",
+                "last_order_id": "3", "last_order_time": 3000, "last_synced_at": None,
+            }],
+            [],  # discovered symbols
+            [],  # stored open orders
+        ]
+        connector = MagicMock(spec=["get_account_orders"])
+        connector.get_account_orders = AsyncMock(return_value={"success": True, "orders": []})
+
+        await service.sync_account("acc-1", connector)
+
+        connector.get_account_orders.assert_awaited_once()
+        assert connector.get_account_orders.await_args.kwargs["start_time"] == 3000
+
+    @pytest.mark.asyncio
+    async def test_full_page_continues_from_newest_order(self, service):
+        first_page = [_binance_order(i, 1000 + i) for i in range(FETCH_LIMIT)]
+        connector = MagicMock(spec=["get_account_orders"])
+        connector.get_account_orders = AsyncMock(side_effect=[
+            {"success": True, "orders": first_page},
+            {"success": True, "orders": [first_page[-1], _binance_order(FETCH_LIMIT, 5000)]},
+        ])
+
+        orders = await service._fetch_delta(connector, "BTCUSDT", "SPOT", None, 1000, 10_000)
+
+        assert len(orders) == FETCH_LIMIT + 1
+        assert connector.get_account_orders.await_args.kwargs["start_time"] == 1000 + FETCH_LIMIT - 1
+
+    @pytest.mark.asyncio
+    async def test_old_futures_watermark_pages_in_seven_day_windows(self, service):
+        connector = MagicMock(spec=["get_account_orders", "get_futures_orders"])
+        connector.get_futures_orders = AsyncMock(return_value={"success": True, "orders": []})
+        now_ms = 20 * 24 * 60 * 60 * 1000
+        watermark = {"last_order_id": "1", "last_order_time": 0}
+
+        assert await service._fetch_delta(connector, "BTCUSDT", "FUTURES", watermark, 0, now_ms) == []
+
+        windows = [(c.kwargs["start_time"], c.kwargs["end_time"]) for c in connector.get_futures_orders.await_args_list]
+        assert windows == [
+            (0, FUTURES_MAX_WINDOW_MS - 1),
+            (FUTURES_MAX_WINDOW_MS, 2 * FUTURES_MAX_WINDOW_MS - 1),
+            (2 * FUTURES_MAX_WINDOW_MS, now_ms),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_open_orders_are_refreshed_separately(self, service, mock_db):
+        mock_db.fetch.side_effect = [
+            [{
+                "symbol": "BTCUSDT", "market_type": "SPOT",
+                "last_order_id": "3", "last_order_time": 3000, "last_synced_at": None,
+            }],
+            [],  # discovered symbols
+            [{"symbol": "BTCUSDT", "market_type": "SPOT", "order_time": 1000}],
+        ]
+        connector = MagicMock(spec=["get_account_orders"])
+        connector.get_account_orders = AsyncMock(side_effect=[
+            {"success": True, "orders": [_binance_order(1, 1000)]},  # ordem aberta agora FILLED
+            {"success": True, "orders": []},  # delta depois do watermark
+        ])
+
+        result = await service.sync_account("acc-1", connector)
+
+        first_call = connector.get_account_orders.await_args_list[0].kwargs
+        assert (first_call["start_time"], first_call["end_time"]) == (1000, 1000)
+        assert result["fetched_count"] == 1
+        stored = mock_db.executemany.await_args_list[0].args[1]
+        assert stored[0][7] == "FILLED"
+        # Watermark continua no delta, não volta para a ordem aberta
+        assert mock_db.executemany.await_args_list[1].args[1][0] == ("acc-1", "BTCUSDT", "SPOT", "3", 3000)
+
+    @pytest.mark.asyncio
+    async def test_account_without_symbols_is_marked_synced(self, service, mock_db):
+        connector = MagicMock(spec=["get_account_orders"])
+
+        result = await service.sync_account("acc-1", connector)
+
+        assert result["symbols_checked"] == 0
+        assert "order_sync_accounts" in mock_db.execute.await_args.args[0]
+
+        mock_db.fetchval.return_value = 1
+        assert await service.has_synced("acc-1") is True
+        assert "order_sync_accounts" in mock_db.fetchval.await_args.args[0]
@@ -0,0 +1,80 @@
+"""Tests for PnlRollupService"""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from infrastructure.services.bot_trade_tracker_service import BotTradeTrackerService
+from infrastructure.services.pnl_rollup_service import PnlRollupService
+
+
+def make_db():
+    db = MagicMock()
+    db.fetchrow = AsyncMock(return_value=None)
+    db.fetchval = AsyncMock(return_value=uuid4())
+    db.execute = AsyncMock()
+    db.fetch = AsyncMock(return_value=[])
+    return db
+
+
+def bucket(day, pnl, wins, losses):
+    return {
+        "bucket_start": datetime(2024, 3, day, tzinfo=timezone.utc),
+        "pnl_usd": pnl,
+        "trades_count": wins + losses,
+        "wins": wins,
+        "losses": losses,
+    }
+
+
+class TestPnlRollupService:
+    """Test cases for PnlRollupService"""
+
+    def test_history_accumulates_buckets(self):
+        history = PnlRollupService.build_history([
+            bucket(1, 10.0, 1, 0),
+            bucket(2, -4.0, 0, 2),
+            bucket(4, 6.5, 1, 0),
+        ])
+
+        assert [point["date"] for point in history] == ["2024-03-01", "2024-03-02", "2024-03-04"]
+        assert [point["cumulative_pnl"] for point in history] == [10.0, 6.0, 12.5]
+        assert history[-1]["cumulative_trades"] == 4
+        assert history[-1]["win_rate"] == 50.0
+        assert PnlRollupService.summarize(history) == {
+            "total_pnl_usd": 12.5, "total_trades": 4, "wins": 2, "losses": 2, "win_rate": 50.0
+        }
+
+    def test_hourly_points_keep_the_time(self):
+        history = PnlRollupService.build_history([bucket(1, 1.0, 1, 0)], "hour")
+        assert history[0]["date"] == "2024-03-01T00:00:00+00:00"
+
+    @pytest.mark.asyncio
+    async def test_invalid_scope_and_granularity_raise(self):
+        service = PnlRollupService(make_db())
+        with pytest.raises(ValueError):
+            await service.get_buckets("user", [uuid4()])
+        with pytest.raises(ValueError):
+            await service.get_buckets("bot", [uuid4()], "minute")
+
+    @pytest.mark.asyncio
+    async def test_trade_close_updates_all_buckets_in_one_statement(self):
+        db = make_db()
+        tracker = BotTradeTrackerService(db)
+        subscription_id = uuid4()
+
+        await tracker.record_trade_close(
+            subscription_id=subscription_id,
+            signal_execution_id=uuid4(),
+            ticker="BTCUSDT",
+            side="buy",
+            entry_price=100.0,
+            exit_price=110.0,
+            quantity=1.0,
+            pnl_usd=10.0,
+        )
+
+        (call,) = [c for c in db.execute.await_args_list if "pnl_rollups" in c.args[0]]
+        assert call.args[1:] == (subscription_id, None, 10.0, 1, 0)
@@ -0,0 +1,151 @@
+"""Tests for SpotCostBasisLedger"""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from infrastructure.services.spot_cost_basis_ledger import (
+    SpotCostBasisLedger,
+    apply_fill,
+    base_asset,
+    empty_position,
+    position_summary,
+)
+
+
+def _order(order_id, side, filled, price, update_time, symbol="LINKUSDT", market_type="SPOT"):
+    return {
+        "exchange_order_id": str(order_id),
+        "symbol": symbol,
+        "side": side,
+        "status": "FILLED",
+        "market_type": market_type,
+        "filled_quantity": filled,
+        "average_price": price,
+        "price": None,
+        "quote_quantity": None,
+        "update_time": update_time,
+    }
+
+
+def _saved_positions(db):
+    """Positions written by the last _save call (asset -> summary)"""
+    args = db.execute.await_args.args
+    assets, quantities, avg_costs, lots = args[5], args[6], args[8], args[12]
+    return {
+        asset: {"quantity": qty, "avg_cost": avg, "lots": json.loads(lot)}
+        for asset, qty, avg, lot in zip(assets, quantities, avg_costs, lots)
+    }
+
+
+class TestApplyFill:
+    """Test cases for the average-cost / FIFO math"""
+
+    def test_buys_average_and_sell_consumes_oldest_lot(self):
+        position = empty_position("LINK")
+        apply_fill(position, "buy", 10, 10.0)
+        apply_fill(position, "buy", 10, 20.0)
+        apply_fill(position, "sell", 15, 30.0)
+
+        summary = position_summary(position)
+        assert summary["quantity"] == 5
+        assert summary["avg_cost"] == pytest.approx(15.0)
+        assert summary["realized_pnl"] == pytest.approx((30 - 15) * 15)
+        assert summary["lots"] == [[5, 20.0]]
+        assert summary["fifo_cost"] == pytest.approx(100.0)
+        assert summary["realized_pnl_fifo"] == pytest.approx(10 * 20 + 5 * 10)
+
+    def test_sell_beyond_tracked_quantity_closes_position(self):
+        position = empty_position("LINK")
+        apply_fill(position, "buy", 1, 10.0)
+        apply_fill(position, "sell", 3, 12.0)
+
+        assert position["quantity"] == 0 and position["lots"] == []
+        assert position["realized_pnl"] == pytest.approx(2.0)
+
+    def test_base_asset_only_for_usd_quotes(self):
+        assert base_asset("LINK-USDT") == "LINK"
+        assert base_asset("BTCFDUSD") == "BTC"
+        assert base_asset("ETHBTC") is None
+        assert base_asset("USDCUSDT") is None
+
+
+class TestSpotCostBasisLedger:
+    """Test cases for incremental ledger updates"""
+
+    @pytest.mark.asyncio
+    async def test_applies_only_new_fill_quantity(self):
+        db = MagicMock()
+        db.fetch = AsyncMock(side_effect=[
+            [{"exchange_order_id": "2", "applied_quantity": 4}],  # order 2 partially applied before
+            [{
+                "asset": "LINK", "quantity": 4, "total_cost": 40, "avg_cost": 10, "fifo_cost": 40,
+                "realized_pnl": 0, "realized_pnl_fifo": 0, "lots": "[[4, 10.0]]",
+                "fills_count": 1, "last_fill_time": 1000,
+            }],
+        ])
+        db.execute = AsyncMock()
+        ledger = SpotCostBasisLedger(db)
+
+        applied = await ledger.apply_orders("acc-1", [
+            _order(2, "buy", 10, 10.0, 2000),
+            _order(3, "buy", 1, 1.0, 3000, market_type="FUTURES"),
+            _order(4, "buy", 1, 0.1, 3000, symbol="LINKBTC"),
+        ])
+
+        assert applied == 1
+        positions = _saved_positions(db)
+        assert positions["LINK"]["quantity"] == 10
+        assert positions["LINK"]["avg_cost"] == pytest.approx(10.0)
+        assert positions["LINK"]["lots"] == [[4, 10.0], [6, 10.0]]
+        assert db.execute.await_args.args[2:5] == (["2"], ["LINK"], [10])
+
+    @pytest.mark.asyncio
+    async def test_already_applied_orders_are_skipped(self):
+        db = MagicMock()
+        db.fetch = AsyncMock(return_value=[{"exchange_order_id": "1", "applied_quantity": 5}])
+        db.execute = AsyncMock()
+        ledger = SpotCostBasisLedger(db)
+
+        assert await ledger.apply_orders("acc-1", [_order(1, "buy", 5, 10.0, 1000)]) == 0
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_rebuild_replays_history_in_order(self):
+        db = MagicMock()
+        db.fetch = AsyncMock(return_value=[
+            _order(1, "buy", 2, 100.0, 1000, symbol="ETHUSDT"),
+            _order(2, "buy", 2, 200.0, 2000, symbol="ETHUSDT"),
+            _order(3, "sell", 3, 300.0, 3000, symbol="ETHUSDT"),
+        ])
+        db.execute = AsyncMock()
+        ledger = SpotCostBasisLedger(db)
+
+        assert await ledger.rebuild("acc-1") == 3
+
+        positions = _saved_positions(db)
+        assert positions["ETH"]["quantity"] == 1
+        assert positions["ETH"]["avg_cost"] == pytest.approx(150.0)
+        assert positions["ETH"]["lots"] == [[1, 200.0]]
+
+    @pytest.mark.asyncio
+    async def test_cost_references_skip_closed_positions(self):
+        def row(asset, quantity, avg_cost, lots):
+            return {
+                "asset": asset, "quantity": quantity, "total_cost": quantity * avg_cost, "avg_cost": avg_cost,
+                "fifo_cost": 0, "realized_pnl": 0, "realized_pnl_fifo": 0, "lots": json.dumps(lots),
+                "fills_count": len(lots), "last_fill_time": 1000,
+            }
+
+        db = MagicMock()
+        db.fetch = AsyncMock(return_value=[
+            row("LINK", 10, 15.0, [[5, 10.0], [5, 20.0]]),
+            row("ETH", 0, 0.0, []),
+        ])
+        ledger = SpotCostBasisLedger(db)
+
+        average_costs, last_buy_prices = await ledger.get_cost_references("acc-1")
+
+        assert average_costs == {"LINK": pytest.approx(15.0)}
+        assert last_buy_prices == {"LINK": 20.0}
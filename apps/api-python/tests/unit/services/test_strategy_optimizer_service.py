@@ -0,0 +1,200 @@
+"""Tests for StrategyOptimizerService"""
+
+import math
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from infrastructure.database.models.strategy import ConditionType, IndicatorType, LogicOperator
+from infrastructure.indicators.base import Candle
+from infrastructure.services.backtest_service import BacktestConfig, BacktestState
+from infrastructure.services.condition_compiler import columns_to_arrays, compile_condition_sets
+from infrastructure.services.strategy_optimizer_service import (
+    OptimizationConfig,
+    ParameterRange,
+    StrategyOptimizerService,
+    compute_indicator_columns,
+    get_indicator_pool,
+    shutdown_indicator_pool,
+)
+
+START = datetime(2024, 1, 1)
+
+
+def make_candles(count: int = 260):
+    candles = []
+    for i in range(count):
+        price = 100 + 8 * math.sin(i / 7) + 3 * math.sin(i / 2.3)
+        candles.append(Candle(
+            timestamp=START + timedelta(hours=i),
+            open=Decimal(str(round(price - 0.2, 4))),
+            high=Decimal(str(round(price + 1, 4))),
+            low=Decimal(str(round(price - 1, 4))),
+            close=Decimal(str(round(price, 4))),
+            volume=Decimal("10"),
+        ))
+    return candles
+
+
+CONDITIONS = {
+    ConditionType.ENTRY_LONG: [{"left": "rsi.value", "operator": "<", "right": "35"}],
+    ConditionType.EXIT_LONG: [{"left": "rsi.value", "operator": ">", "right": "65"}],
+}
+OPERATORS = {
+    ConditionType.ENTRY_LONG: LogicOperator.AND,
+    ConditionType.EXIT_LONG: LogicOperator.AND,
+}
+
+
+def make_service(candles):
+    service = StrategyOptimizerService(MagicMock())
+    strategy = SimpleNamespace(
+        timeframe="1h",
+        indicators=[
+            SimpleNamespace(indicator_type=IndicatorType.RSI, parameters={"period": 14}),
+            SimpleNamespace(indicator_type=IndicatorType.EMA, parameters={}),
+        ],
+        conditions=[
+            SimpleNamespace(condition_type=ct, get_conditions_list=lambda c=conds: c, logic_operator=LogicOperator.AND)
+            for ct, conds in CONDITIONS.items()
+        ],
+    )
+    service._strategy_repo = MagicMock(get_with_relations=AsyncMock(return_value=strategy))
+    service._fetch_historical_data = AsyncMock(return_value=candles)
+    return service
+
+
+class TestParameterRange:
+    """Test cases for ParameterRange"""
+
+    def test_integer_range_expands_inclusive(self):
+        assert ParameterRange.from_spec("rsi", "period", min_value=10, max_value=20, step=5).values == [10, 15, 20]
+
+    def test_missing_bounds_raise(self):
+        with pytest.raises(ValueError):
+            ParameterRange.from_spec("rsi", "period", min_value=10)
+
+
+class TestStrategyOptimizerService:
+    """Test cases for StrategyOptimizerService"""
+
+    @pytest.mark.asyncio
+    async def test_precomputed_columns_match_regular_simulation(self):
+        candles = make_candles()
+        service = make_service(candles)
+        config = BacktestConfig()
+        calculators = {"rsi": StrategyOptimizerService.INDICATOR_CALCULATORS[IndicatorType.RSI]({"period": 14})}
+
+        regular, _ = await service._run_simulation_with_indicators(
+            candles, calculators, CONDITIONS, OPERATORS, config, BacktestState(capital=config.initial_capital)
+        )
+
+        required, columns = compute_indicator_columns("rsi", {"period": 14}, candles)
+        arrays = columns_to_arrays({f"rsi.{k}": v for k, v in columns.items()})
+        masks = {
+            ct: condition_set.evaluate_mask(arrays, len(candles))
+            for ct, condition_set in compile_condition_sets(CONDITIONS, OPERATORS).items()
+        }
+        swept = await service._run_candidate(
+            candles, masks, required, len(candles), CONDITIONS, OPERATORS, config
+        )
+
+        # _run_candidate fecha a posição aberta no fim (como run_backtest_with_chart_data)
+        if regular.position:
+            last = candles[-1]
+            service._close_position(regular, last.close, last.timestamp, "end_of_backtest", config)
+        expected = service._calculate_metrics(regular, config)
+
+        assert expected["total_trades"] >= 2
+        assert swept["total_trades"] == expected["total_trades"]
+        assert swept["total_pnl"] == float(expected["total_pnl"])
+
+    @pytest.mark.asyncio
+    async def test_grid_sweep_shares_indicator_columns(self):
+        service = make_service(make_candles())
+        optimization = OptimizationConfig(
+            parameters=[ParameterRange.from_spec("rsi", "period", values=[10, 14, 14, 20])],
+            min_trades=0,
+            max_workers=1,
+        )
+
+        result = await service.optimize("s1", "BTCUSDT", START, START + timedelta(days=11), optimization)
+
+        assert result["candidates_evaluated"] == 3
+        assert result["distinct_indicator_sets"] == 4  # 3 RSI + 1 EMA compartilhado
+        assert [row["rank"] for row in result["ranked"]] == [1, 2, 3]
+        service._fetch_historical_data.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_walk_forward_reoptimizes_on_each_in_sample_window(self):
+        candles = make_candles(400)
+        service = make_service(candles)
+        periods = [6, 10, 14, 20]
+        optimization = OptimizationConfig(
+            parameters=[ParameterRange.from_spec("rsi", "period", values=periods)],
+            objective="total_pnl_percent",
+            walk_forward_folds=3,
+            min_trades=0,
+            max_workers=1,
+        )
+
+        result = await service.optimize("s1", "BTCUSDT", START, START + timedelta(days=17), optimization)
+        walk_forward = result["walk_forward"]
+        assert len(walk_forward["folds"]) == 3
+
+        # O vencedor de cada fold é o melhor só no trecho in-sample
+        timestamps = [c.timestamp.isoformat() for c in candles]
+        for fold in walk_forward["folds"]:
+            fold_start = timestamps.index(fold["in_sample_start"])
+            split = timestamps.index(fold["out_of_sample_start"])
+            scores = {}
+            for period in periods:
+                required, columns = compute_indicator_columns("rsi", {"period": period}, candles)
+                arrays = columns_to_arrays({f"rsi.{k}": v for k, v in columns.items()})
+                masks = {
+                    ct: condition_set.evaluate_mask(arrays, len(candles))
+                    for ct, condition_set in compile_condition_sets(CONDITIONS, OPERATORS).items()
+                }
+                metrics = await service._run_candidate(
+                    candles, masks, fold_start, split, CONDITIONS, OPERATORS, optimization.backtest
+                )
+                scores[period] = metrics["total_pnl_percent"]
+
+            assert fold["parameters"] == {"rsi.period": max(scores, key=scores.get)}
+            assert fold["in_sample_score"] == max(scores.values())
+
+    @pytest.mark.asyncio
+    async def test_bayesian_sweep_never_repeats_candidates(self):
+        service = make_service(make_candles())
+        optimization = OptimizationConfig(
+            parameters=[ParameterRange.from_spec("rsi", "period", min_value=5, max_value=20, step=1)],
+            method="bayesian",
+            max_candidates=12,
+            min_trades=0,
+            walk_forward_folds=1,
+            max_workers=2,
+        )
+        reports = []
+
+        async def report(done, total, trades):
+            reports.append((done, total))
+
+        service.progress_callback = report
+        result = await service.optimize("s1", "BTCUSDT", START, START + timedelta(days=11), optimization)
+
+        periods = [row["parameters"]["rsi.period"] for row in result["ranked"]]
+        assert len(periods) == 12 and len(set(periods)) == 12
+        assert reports[-1] == (12, 12)
+        assert service.progress_callback is report
+
+    def test_indicator_pool_is_reused_for_the_same_candles(self):
+        candles = make_candles()
+        try:
+            pool = get_indicator_pool(candles, 1)
+            assert get_indicator_pool(list(candles), 1) is pool
+            assert get_indicator_pool(make_candles(261), 1) is not pool
+        finally:
+            shutdown_indicator_pool()
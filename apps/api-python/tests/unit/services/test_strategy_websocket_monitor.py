@@ -0,0 +1,71 @@
+"""Tests for StrategyWebSocketMonitor custom timeframe buffers"""
+
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from infrastructure.exchanges.binance_websocket import KlineData
+from infrastructure.services import strategy_websocket_monitor
+from infrastructure.services.custom_timeframe_aggregator import aggregate_candles
+from infrastructure.services.strategy_websocket_monitor import StrategyRuntimeState, StrategyWebSocketMonitor
+
+MINUTE = 60_000
+PERIOD_START = 1_699_920_000_000  # 00:00 UTC: periodos custom recomecam a cada dia
+
+
+def _minute(time_ms, price):
+    return {"time": time_ms, "open": price, "high": price + 2, "low": price - 2, "close": price + 1, "volume": 1.0}
+
+
+def _kline(time_ms, price, is_closed=False):
+    return KlineData(
+        symbol="BTCUSDT",
+        interval="1m",
+        timestamp=datetime.fromtimestamp(time_ms / 1000),
+        open=Decimal(price),
+        high=Decimal(price + 2),
+        low=Decimal(price - 2),
+        close=Decimal(price + 1),
+        volume=Decimal(1),
+        is_closed=is_closed,
+    )
+
+
+class TestAggregatedBuffer:
+    """Test cases for the 7m buffer built from 1m klines"""
+
+    @pytest.mark.asyncio
+    async def test_period_in_progress_is_seeded_from_history(self, monkeypatch):
+        minutes = [_minute(PERIOD_START + i * MINUTE, 100 + i) for i in range(3)]
+        history = [{**_minute(PERIOD_START - 7 * MINUTE, 90), "volume": 7.0}] + aggregate_candles(
+            minutes, 7, drop_partial_first=False
+        )
+        service = MagicMock(get_candles=AsyncMock(side_effect=[
+            {"success": True, "candles": history},
+            {"success": True, "candles": minutes},
+        ]))
+        monkeypatch.setattr(strategy_websocket_monitor, "get_candle_service", lambda: service)
+
+        monitor = StrategyWebSocketMonitor.__new__(StrategyWebSocketMonitor)
+        monitor._calculate_indicators = AsyncMock()
+        state = StrategyRuntimeState(
+            strategy_id="s1", strategy_name="test", symbols=["BTCUSDT"], timeframe="7m", bot_id=None
+        )
+
+        await monitor._load_historical_candles(state, "BTCUSDT")
+        assert service.get_candles.await_args.kwargs == {
+            "symbol": "BTCUSDT", "interval": "1m", "limit": 7, "start_time": PERIOD_START
+        }
+
+        # 4o minuto do periodo: o candle agregado continua com os 3 anteriores
+        monitor._update_aggregated_buffer(state, "BTCUSDT", _kline(PERIOD_START + 3 * MINUTE, 103))
+
+        current = state.candle_buffers["BTCUSDT"][-1]
+        assert current["time"] == PERIOD_START
+        assert current["open"] == 100
+        assert current["low"] == 98
+        assert current["close"] == 104
+        assert current["volume"] == 4.0
+        assert len(state.candle_buffers["BTCUSDT"]) == 2